@@ -30,6 +30,7 @@ class IngressConfig(AppConfig):
     label = 'ingress'
 
     def ready(self):
+        from . import handlers  # noqa
         from .plugins.ingress import register
 
         register()
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+"""Index of shared certs, helps finding the matched cert of a hostname without scanning all certs"""
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Pattern, Sequence, Tuple
+
+from django.core.cache import cache
+
+from paas_wl.networking.ingress.models import AppDomainSharedCert
+
+# A wildcard("*") in CN matches exactly one label, see `AppDomainSharedCert.match_hostname`
+WILDCARD = '*'
+WILDCARD_LABEL_PATTERN = re.compile(r'[a-zA-Z0-9-]+')
+
+
+class _TrieNode:
+    __slots__ = ('children', 'cert_pos')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        # The position of the first cert whose CN ends at current node
+        self.cert_pos: Optional[int] = None
+
+
+class SharedCertIndex:
+    """A trie built from the CNs of shared certs, each CN is split into labels and inserted in reversed order,
+    for example: "*.foo.com" -> ["com", "foo", "*"]. Looking up a hostname only costs O(labels).
+
+    When multiple certs match a hostname, the first one in `certs` wins, same as scanning the certs one by one.
+
+    :param certs: the shared certs to be indexed
+    """
+
+    def __init__(self, certs: Sequence[AppDomainSharedCert]):
+        self.certs = list(certs)
+        self._root = _TrieNode()
+        # CNs which have a partial wildcard label(such as "foo-*.bar.com") can not be indexed by the trie,
+        # they are matched by regular expression.
+        self._patterns: List[Tuple[int, Pattern]] = []
+
+        for pos, cert in enumerate(self.certs):
+            for cn in cert.auto_match_cns.split(';'):
+                self._add(cn, pos)
+
+    def match(self, hostname: str) -> Optional[AppDomainSharedCert]:
+        """Get the first cert which matches given hostname, return None if not found"""
+        positions = [pos for pos, pattern in self._patterns if pattern.match(hostname)]
+        nodes = [self._root]
+        for label in reversed(hostname.split('.')):
+            next_nodes = []
+            for node in nodes:
+                # The hostname is matched literally, a "*" label in the hostname never matches anything
+                if label != WILDCARD and (child := node.children.get(label)):
+                    next_nodes.append(child)
+                if (child := node.children.get(WILDCARD)) and WILDCARD_LABEL_PATTERN.fullmatch(label):
+                    next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                break
+
+        positions.extend(node.cert_pos for node in nodes if node.cert_pos is not None)
+        return self.certs[min(positions)] if positions else None
+
+    def _add(self, cn: str, pos: int):
+        labels = cn.split('.')
+        if any(WILDCARD in label and label != WILDCARD for label in labels):
+            pattern = re.escape(cn).replace(r'\*', WILDCARD_LABEL_PATTERN.pattern)
+            self._patterns.append((pos, re.compile(f'^{pattern}$')))
+            return
+
+        node = self._root
+        for label in reversed(labels):
+            node = node.children.setdefault(label, _TrieNode())
+        if node.cert_pos is None:
+            node.cert_pos = pos
+
+
+class SharedCertIndexRegistry:
+    """Process-level registry of the shared cert indexes, one index per region. The indexes are rebuilt after
+    `invalidate` was called in any process, the version is shared by the cache.
+    """
+
+    version_cache_key = 'wl:shared_cert_index:version'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, Tuple[Optional[int], SharedCertIndex]] = {}
+
+    def get(self, region: str) -> SharedCertIndex:
+        """Get the index of shared certs in given region"""
+        version = cache.get(self.version_cache_key)
+        with self._lock:
+            cached = self._indexes.get(region)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        index = SharedCertIndex(AppDomainSharedCert.objects.filter(region=region))
+        with self._lock:
+            self._indexes[region] = (version, index)
+        return index
+
+    def invalidate(self):
+        """Invalidate the indexes of all processes, should be called when any shared cert was changed"""
+        cache.set(self.version_cache_key, time.time_ns(), timeout=None)
+        self.clear()
+
+    def clear(self):
+        """Clear the indexes of current process"""
+        with self._lock:
+            self._indexes = {}
+
+
+shared_cert_indexes = SharedCertIndexRegistry()
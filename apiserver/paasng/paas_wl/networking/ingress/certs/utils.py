@@ -18,11 +18,14 @@ to the current version of the project delivered to anyone in the future.
 """
 import base64
 import logging
-from typing import Optional, Tuple
+from typing import List, Optional, Tuple
 
 from django.utils.encoding import force_bytes, force_str
 
-from paas_wl.networking.ingress.models import AppDomain, AppDomainSharedCert, BasicCert, Domain
+from paas_wl.cluster.models import Cluster
+from paas_wl.cluster.utils import get_cluster_by_app
+from paas_wl.networking.ingress.certs.index import shared_cert_indexes
+from paas_wl.networking.ingress.models import AppDomain, AppDomainSharedCert, AppSubpath, BasicCert, Domain
 from paas_wl.platform.applications.models import WlApp
 from paas_wl.resources.base import kres
 from paas_wl.resources.utils.basic import get_client_by_app
@@ -95,7 +98,37 @@ def pick_shared_cert(region: str, host: str) -> Optional[AppDomainSharedCert]:
     :param region: Filter certs by given region
     :param host: Hostname for finding valid cert object
     """
-    for cert in AppDomainSharedCert.objects.filter(region=region):
-        if cert.match_hostname(host):
-            return cert
-    return None
+    return shared_cert_indexes.get(region).match(host)
+
+
+def find_subdomain_apps(cert: AppDomainSharedCert) -> List[WlApp]:
+    """Find all WlApps whose sub-domain addresses are using given shared cert"""
+    app_ids = AppDomain.objects.filter(shared_cert=cert).values_list('app_id').distinct()
+    return list(WlApp.objects.filter(pk__in=app_ids))
+
+
+def find_subpath_apps(cert: AppDomainSharedCert) -> List[WlApp]:
+    """Find all WlApps whose sub-path addresses are using given shared cert"""
+    # Find related applications, first filter all clusters which configured
+    # "sub_path_domains" and it's host matches given certificate.
+    cluster_names = []
+    for cluster in Cluster.objects.all():
+        for domain in cluster.ingress_config.sub_path_domains:
+            if pick_shared_cert(cluster.region, domain.name) == cert:
+                cluster_names.append(cluster.name)
+                break
+
+    if not cluster_names:
+        return []
+
+    app_ids = AppSubpath.objects.filter(region=cert.region).values_list('app_id').distinct()
+    apps = []
+    # Although AppSubpath has "cluster_name" field, it's value is not set at
+    # this moment. So it's impossible to filter affected applications by simply
+    # querying "cluster_name" field.
+    #
+    # TODO: Improve below logic when AppSubpath model was improved
+    for app in WlApp.objects.filter(pk__in=app_ids).order_by('name'):
+        if get_cluster_by_app(app).name in cluster_names:
+            apps.append(app)
+    return apps
@@ -16,6 +16,9 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
+import copy
+import hashlib
+import json
 import logging
 import re
 from collections import defaultdict
@@ -32,7 +35,10 @@ from paas_wl.cluster.utils import get_cluster_by_app
 from paas_wl.networking.ingress.entities.utils import LegacyNginxRewrittenProvider, NginxRegexRewrittenProvider
 from paas_wl.platform.applications.models import WlApp
 from paas_wl.resources.base import kres
+from paas_wl.resources.base.exceptions import ResourceMissing
 from paas_wl.resources.kube_res.base import AppEntity, AppEntityDeserializer, AppEntityManager, AppEntitySerializer
+from paas_wl.resources.kube_res.exceptions import AppEntityNotFound
+from paasng.metrics.metrics import INGRESS_SYNC_COUNTER
 
 ANNOT_SERVER_SNIPPET = 'nginx.ingress.kubernetes.io/server-snippet'
 ANNOT_CONFIGURATION_SNIPPET = 'nginx.ingress.kubernetes.io/configuration-snippet'
@@ -43,6 +49,11 @@ ANNOT_SSL_REDIRECT = 'nginx.ingress.kubernetes.io/ssl-redirect'
 # 可以在下发 Ingress 时候添加注解 bkbcs.tencent.com/skip-filter-clb: "true" 以跳过 bcs-webhook 的拦截
 # l7-lb-controller 状态查询：kubectl get deploy l7-lb-controller -n kube-system
 ANNOT_SKIP_FILTER_CLB = 'bkbcs.tencent.com/skip-filter-clb'
+# The hash of the desired state, used for skipping the unchanged ingress when syncing
+ANNOT_DESIRED_STATE_HASH = 'bkapp.paas.bk.tencent.com/desired-state-hash'
+
+# The field manager name when applying ingress by server-side apply
+INGRESS_FIELD_MANAGER = 'bkpaas'
 
 # Annotations managed by system
 reserved_annotations = {
@@ -51,6 +62,7 @@ reserved_annotations = {
     ANNOT_REWRITE_TARGET,
     ANNOT_SSL_REDIRECT,
     ANNOT_SKIP_FILTER_CLB,
+    ANNOT_DESIRED_STATE_HASH,
 }
 
 
@@ -532,4 +544,65 @@ class ProcessIngress(AppEntity):
         deserializers = lazy(make_deserializers, list)()
 
 
-ingress_kmodel: AppEntityManager[ProcessIngress] = AppEntityManager[ProcessIngress](ProcessIngress)
+def make_desired_state_hash(body: Dict) -> str:
+    """Make the hash of the ingress body, fields which are irrelevant to the desired state are ignored"""
+    body = copy.deepcopy(body)
+    body['metadata'].pop('resourceVersion', None)
+    body['metadata'].get('annotations', {}).pop(ANNOT_DESIRED_STATE_HASH, None)
+    return hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()
+
+
+class IngressManager(AppEntityManager[ProcessIngress]):
+    """Manager for ProcessIngress, supports skipping the unchanged ingress when syncing"""
+
+    def sync(self, res: ProcessIngress, server_side_apply: Optional[bool] = None) -> bool:
+        """Write the ingress to kubernetes only if its desired state was changed. The hash of the desired state
+        is stored in the annotations, when it's identical to the one of the existing resource, the writing will
+        be skipped to avoid the unnecessary reloading of ingress controller.
+
+        NOTE: Modifications made by others(such as `kubectl edit`) are not detected, use `save` to overwrite them.
+
+        :param res: a concrete ingress object(fetched by `get`) or a new ingress object
+        :param server_side_apply: whether to write the ingress by server-side apply, only the fields managed by
+            the platform will be sent, default to `settings.APP_INGRESS_SERVER_SIDE_APPLY`
+        :return: whether the ingress was written
+        """
+        self.guide_res_argument(res)
+        if server_side_apply is None:
+            server_side_apply = settings.APP_INGRESS_SERVER_SIDE_APPLY
+
+        serializer = self._make_serializer(res.app)
+        body = serializer.serialize(res, original_obj=res._kube_data)
+        desired_hash = make_desired_state_hash(body)
+        if res.is_concrete():
+            existing_annotations = res._kube_data.metadata.annotations or {}
+            if existing_annotations.get(ANNOT_DESIRED_STATE_HASH) == desired_hash:
+                logger.debug('Ingress<%s> is unchanged, skip syncing', res.name)
+                INGRESS_SYNC_COUNTER.labels(result='skipped').inc()
+                return False
+
+        body['metadata']['annotations'][ANNOT_DESIRED_STATE_HASH] = desired_hash
+        namespace = self._get_namespace(res.app)
+        with self.kres(res.app, api_version=serializer.get_apiversion()) as kres_client:
+            if server_side_apply:
+                body['metadata'].pop('resourceVersion', None)
+                kube_data = kres_client.server_side_apply(
+                    res.name, body, field_manager=INGRESS_FIELD_MANAGER, namespace=namespace
+                )
+                result = 'applied'
+            elif res.is_concrete():
+                try:
+                    kube_data = kres_client.replace_or_patch(res.name, body, namespace=namespace)
+                except ResourceMissing as e:
+                    raise AppEntityNotFound(f'{res.name} not found') from e
+                result = 'updated'
+            else:
+                kube_data = kres_client.create(res.name, body, namespace=namespace)
+                result = 'created'
+
+        res._kube_data = kube_data
+        INGRESS_SYNC_COUNTER.labels(result=result).inc()
+        return True
+
+
+ingress_kmodel: IngressManager = IngressManager(ProcessIngress)
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from paas_wl.networking.ingress.certs.index import shared_cert_indexes
+from paas_wl.networking.ingress.models import AppDomainSharedCert
+
+
+@receiver(post_save, sender=AppDomainSharedCert)
+@receiver(post_delete, sender=AppDomainSharedCert)
+def on_shared_cert_updated(sender, instance, using, *args, **kwargs):
+    """Rebuild the shared cert indexes when shared certs were updated
+
+    The indexes are invalidated after the transaction is committed, otherwise a concurrent reader may
+    rebuild the indexes from the uncommitted(old) data and cache them.
+    """
+    transaction.on_commit(shared_cert_indexes.invalidate, using=using)
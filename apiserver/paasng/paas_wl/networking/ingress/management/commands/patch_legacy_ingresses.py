@@ -25,6 +25,7 @@ import arrow
 from django.core.management.base import BaseCommand
 
 from paas_wl.networking.ingress.managers import LegacyAppIngressMgr
+from paas_wl.networking.ingress.reconciler import BulkReconciler
 from paas_wl.networking.ingress.utils import make_service_name
 from paas_wl.platform.applications.models import Release, WlApp
 
@@ -50,8 +51,24 @@ class Command(BaseCommand):
         parser.add_argument(
             '-a', '--app', dest="apps", default=None, nargs="+", help="legacy app name which need to patch"
         )
+        parser.add_argument('--concurrency', type=int, default=4, help="max number of workers of each cluster")
+        parser.add_argument(
+            '--rate-limit', type=float, default=10, help="max number of apps processed per second in each cluster"
+        )
 
-    def handle(self, apps, dry_run, pattern, process_type, with_create, app_created_after, *args, **options):
+    def handle(
+        self,
+        apps,
+        dry_run,
+        pattern,
+        process_type,
+        with_create,
+        app_created_after,
+        concurrency,
+        rate_limit,
+        *args,
+        **options,
+    ):
         qs = WlApp.objects.all().order_by('created')
         if apps:
             qs = qs.filter(name__in=apps)
@@ -61,8 +78,15 @@ class Command(BaseCommand):
             app_created_after_dt = arrow.get(app_created_after).datetime
             qs = qs.filter(created__gte=app_created_after_dt)
 
-        for app in qs:
-            self._patch_app_ingress(app, dry_run, pattern, process_type, with_create)
+        reconciler = BulkReconciler(
+            lambda app: self._patch_app_ingress(app, dry_run, pattern, process_type, with_create),
+            concurrency=concurrency,
+            rate_limit=rate_limit,
+        )
+        report = reconciler.run(qs)
+        print(f"Patch legacy ingresses finished, {report.summary()}")
+        for app_name, error in report.failures.items():
+            print(f"Unable to patch ingresses for app {app_name}: {error}")
 
     def _patch_app_ingress(self, app: WlApp, dry_run, pattern, process_type, with_create):
         # Only process released apps
@@ -75,12 +99,8 @@ class Command(BaseCommand):
         mgr = LegacyAppIngressMgr(app)
         service_name = None
         can_sync = False
-        try:
-            domains = mgr.list_desired_domains()
-        except Exception:
-            logger.exception("list domains failed for app %s", app.name)
-            return
-
+        # Errors are raised to the reconciler, so the app will be reported as failed
+        domains = mgr.list_desired_domains()
         for domain in domains:
             if fnmatch(domain.host, pattern):
                 can_sync = not dry_run
@@ -95,7 +115,4 @@ class Command(BaseCommand):
 
         if can_sync:
             print(f"syncing ingress for app {app.name}")
-            try:
-                mgr.sync(service_name)
-            except Exception as err:
-                logger.error("sync ingresses failed for app %s, err: %s", app.name, err)
+            mgr.sync(service_name)
@@ -22,6 +22,7 @@ import logging
 
 from django.core.management.base import BaseCommand
 
+from paas_wl.networking.ingress.reconciler import BulkReconciler
 from paas_wl.platform.applications.models import WlApp
 from paas_wl.resources.base.exceptions import ResourceMissing
 from paas_wl.resources.base.kres import KService
@@ -38,20 +39,32 @@ class Command(BaseCommand):
 
     help = 'Patch existed kubernetes services'
 
-    def handle(self, *args, **options):
-        for app in WlApp.objects.all().order_by('created'):
-            client = get_client_by_app(app)
-            for process_type in app.get_structure():
-                default_service_name = f"{app.region}-{app.scheduler_safe_name}-{process_type}"
-                try:
-                    svc = KService(client).get(default_service_name, namespace=app.namespace)
-                except ResourceMissing:
-                    continue
-
-                print(f"Existed service found for app {app.name}, serivce={default_service_name}")
-                annotations = svc.metadata.annotations or {}
-                if not annotations:
-                    print(f"Updating service, set annotation to process_type={process_type}")
-                    annotations['process_type'] = process_type
-                    svc.metadata.annotations = annotations
-                    KService(client).replace_or_patch(default_service_name, svc, namespace=app.namespace)
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=4, help="max number of workers of each cluster")
+        parser.add_argument(
+            '--rate-limit', type=float, default=10, help="max number of apps processed per second in each cluster"
+        )
+
+    def handle(self, concurrency, rate_limit, *args, **options):
+        reconciler = BulkReconciler(self._patch_app_services, concurrency=concurrency, rate_limit=rate_limit)
+        report = reconciler.run(WlApp.objects.all().order_by('created'))
+        print(f"Patch services finished, {report.summary()}")
+        for app_name, error in report.failures.items():
+            print(f"Unable to patch services for app {app_name}: {error}")
+
+    def _patch_app_services(self, app: WlApp):
+        client = get_client_by_app(app)
+        for process_type in app.get_structure():
+            default_service_name = f"{app.region}-{app.scheduler_safe_name}-{process_type}"
+            try:
+                svc = KService(client).get(default_service_name, namespace=app.namespace)
+            except ResourceMissing:
+                continue
+
+            print(f"Existed service found for app {app.name}, serivce={default_service_name}")
+            annotations = svc.metadata.annotations or {}
+            if not annotations:
+                print(f"Updating service, set annotation to process_type={process_type}")
+                annotations['process_type'] = process_type
+                svc.metadata.annotations = annotations
+                KService(client).replace_or_patch(default_service_name, svc, namespace=app.namespace)
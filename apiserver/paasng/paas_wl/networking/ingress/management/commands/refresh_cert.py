@@ -21,17 +21,23 @@ protocol for applications. When a cert file was updated during a renewal, this
 command has to be called in order to refresh all Secret resources which contains
 the content of certificate.
 """
+import itertools
 import sys
 from functools import partial
-from typing import Iterable, List, Sequence
+from typing import Iterable, List, Optional, Sequence
 
 import cryptography.x509
 from django.core.management.base import BaseCommand
 
-from paas_wl.cluster.models import Cluster
-from paas_wl.cluster.utils import get_cluster_by_app
-from paas_wl.networking.ingress.certs.utils import pick_shared_cert, update_or_create_secret_by_cert
-from paas_wl.networking.ingress.models import AppDomain, AppDomainSharedCert, AppSubpath
+from paas_wl.networking.ingress.certs.index import SharedCertIndex
+from paas_wl.networking.ingress.certs.utils import (
+    find_subdomain_apps,
+    find_subpath_apps,
+    update_or_create_secret_by_cert,
+)
+from paas_wl.networking.ingress.models import AppDomain, AppDomainSharedCert
+from paas_wl.networking.ingress.reconciler import BulkReconciler
+from paas_wl.networking.ingress.tasks import make_cert_checkpoint
 from paas_wl.platform.applications.models import WlApp
 
 
@@ -51,6 +57,15 @@ class Command(BaseCommand):
             ),
         )
         parser.add_argument("--dry-run", action="store_true", help="Enable dry run mode")
+        parser.add_argument("--concurrency", type=int, default=4, help="Max number of workers of each cluster")
+        parser.add_argument(
+            "--rate-limit", type=float, default=10, help="Max number of apps processed per second in each cluster"
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the checkpoint of last run, refresh the Secrets of all apps again",
+        )
 
     def handle(self, *args, **options) -> None:
         return self.handle_refresh(options)
@@ -83,7 +98,14 @@ class Command(BaseCommand):
         # The update will walk through all affected applications. Each cert only
         # have a single copy of Secret in one namespace, although it may be shared
         # by multiple Ingresses, so this approach will do fine.
-        self.update_secrets(apps, cert, options['dry_run'])
+        self.update_secrets(
+            apps,
+            cert,
+            options['dry_run'],
+            concurrency=options['concurrency'],
+            rate_limit=options['rate_limit'],
+            restart=options['restart'],
+        )
         return
 
     def scan_and_update(self, cert: AppDomainSharedCert, dry_run: bool):
@@ -114,53 +136,56 @@ class Command(BaseCommand):
     def find_subdomain_apps(self, cert: AppDomainSharedCert) -> Sequence[WlApp]:
         """Find all affected WlApps for subdomain addresses"""
         self.print("Refreshing Secret resources for sub-domains...")
-        app_ids = AppDomain.objects.filter(shared_cert=cert).values_list('app_id').distinct()
-        return list(WlApp.objects.filter(pk__in=app_ids))
+        return find_subdomain_apps(cert)
 
-    def find_subpath_apps(self, cert: AppDomainSharedCert):
+    def find_subpath_apps(self, cert: AppDomainSharedCert) -> Sequence[WlApp]:
         """Find all affected WlApps for subpath addresses"""
         self.print("Refreshing Secret resources for sub-paths...")
-        # Find related applications, first filter all clusters which configured
-        # "sub_path_domains" and it's host matches given certificate.
-        cluster_names = []
-        for cluster in Cluster.objects.all():
-            for domain in cluster.ingress_config.sub_path_domains:
-                if pick_shared_cert(cluster.region, domain.name) == cert:
-                    cluster_names.append(cluster.name)
-                    break
-
-        if not cluster_names:
-            return []
-
-        app_ids = AppSubpath.objects.filter(region=cert.region).values_list('app_id').distinct()
-        apps = []
-        # Although AppSubpath has "cluster_name" field, it's value is not set at
-        # this moment. So it's impossible to filter affected applications by simply
-        # querying "cluster_name" field.
-        #
-        # TODO: Improve below logic when AppSubpath model was improved
-        for app in WlApp.objects.filter(pk__in=app_ids).order_by('name'):
-            if get_cluster_by_app(app).name in cluster_names:
-                apps.append(app)
-        return apps
-
-    def update_secrets(self, apps: Sequence[WlApp], cert: AppDomainSharedCert, dry_run: bool):
-        """Update Secret resource which was created by given certificate and lives in each WlApp's namespace."""
+        return find_subpath_apps(cert)
+
+    def update_secrets(
+        self,
+        apps: Sequence[WlApp],
+        cert: AppDomainSharedCert,
+        dry_run: bool,
+        concurrency: int = 4,
+        rate_limit: float = 10,
+        restart: bool = False,
+    ):
+        """Update Secret resource which was created by given certificate and lives in each WlApp's namespace.
+
+        The apps are processed concurrently, grouped by cluster. The finished apps are recorded in a checkpoint,
+        they will be skipped when the command is run again, unless `restart` is True.
+        """
         cnt = len(apps)
-        error_cnt = 0
         self.print(f"App(Namespace) count: {cnt}")
-        for i, app in enumerate(apps, start=1):
-            self.print(f"({i}/{cnt}) Processing {app}..")
-            if dry_run:
-                self.print('(dry-run mode) Update skipped.')
-                continue
-
-            try:
-                update_or_create_secret_by_cert(app, cert)
-            except Exception as e:
-                self.print(f'Unable to update Secret for {app}: {str(e).splitlines()[0]}')
-                error_cnt += 1
-        self.print(self.style.SUCCESS(f'Update Secrets finished, error count: {error_cnt}'))
+        if dry_run:
+            self.print('(dry-run mode) Update skipped.')
+            return
+
+        checkpoint = make_cert_checkpoint(cert)
+        if restart:
+            checkpoint.clear()
+
+        # "next()" of itertools.count is atomic, it's safe to be called by multiple workers
+        counter = itertools.count(1)
+
+        def _on_finished(app: WlApp, error: Optional[Exception]):
+            i = next(counter)
+            if error:
+                self.print(f'({i}/{cnt}) Unable to update Secret for {app}: {error!r}')
+            else:
+                self.print(f"({i}/{cnt}) Processed {app}")
+
+        reconciler = BulkReconciler(
+            lambda app: update_or_create_secret_by_cert(app, cert),
+            concurrency=concurrency,
+            rate_limit=rate_limit,
+            checkpoint=checkpoint,
+            on_finished=_on_finished,
+        )
+        report = reconciler.run(apps)
+        self.print(self.style.SUCCESS(f'Update Secrets finished, {report.summary()}'))
 
     def display_cert(self, cert: AppDomainSharedCert):
         """Display the information of given cert object"""
@@ -193,8 +218,9 @@ class Command(BaseCommand):
 
 def find_uninitialized_domains(cert: AppDomainSharedCert) -> Iterable[AppDomain]:
     """Find all domains which matches the given certificate but not initialized yet"""
+    index = SharedCertIndex([cert])
     for domain in AppDomain.objects.filter(region=cert.region).iterator():
         if domain.cert or domain.shared_cert:
             continue
-        if cert.match_hostname(domain.host):
+        if index.match(domain.host):
             yield domain
@@ -207,7 +207,7 @@ class IngressUpdater:
                 rewrite_to_root=rewrite_to_root,
                 set_header_x_script_name=set_header_x_script_name,
             )
-            ingress_kmodel.save(desired_ingress)
+            ingress_kmodel.sync(desired_ingress)
         else:
             if restore_default_when_invalid and default_service_name:
                 # Restore service name to default if it's invalid
@@ -220,14 +220,14 @@ class IngressUpdater:
                     )
                     ingress.service_name = default_service_name
 
-            logger.info('Updating existed ingress<%s>', ingress.name)
             ingress.domains = domains
             ingress.server_snippet = server_snippet
             ingress.configuration_snippet = configuration_snippet
             ingress.annotations = annotations or {}
             ingress.rewrite_to_root = rewrite_to_root
             ingress.set_header_x_script_name = set_header_x_script_name
-            ingress_kmodel.save(ingress)
+            if ingress_kmodel.sync(ingress):
+                logger.info('Updated existed ingress<%s>', ingress.name)
 
     def update_target(self, service_name: str, service_port_name: str):
         """Update target service and port_name for current ingress resource"""
@@ -238,7 +238,7 @@ class IngressUpdater:
         )
         ingress.service_name = service_name
         ingress.service_port_name = service_port_name
-        ingress_kmodel.save(ingress)
+        ingress_kmodel.sync(ingress)
 
     def _service_name_valid(self, name: str) -> bool:
         """Check that a service name is valid."""
@@ -0,0 +1,233 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+"""Bulk reconciler for applying changes(such as refreshing the ingresses or the cert secrets) to a large
+number of apps, the apps are grouped by cluster and processed by a bounded number of workers per cluster.
+"""
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from django.core.cache import cache
+from django.db import connections
+
+from paas_wl.cluster.utils import get_cluster_by_app
+from paas_wl.platform.applications.models import WlApp
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    """A thread-safe limiter which allows at most `rate` calls per second, the calls are spread evenly
+
+    :param rate: the max calls per second, no limit when it's 0
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate if rate > 0 else 0
+        self._lock = threading.Lock()
+        self._next_at = 0.0
+
+    def acquire(self):
+        """Block until the next call is allowed"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait_seconds = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.interval
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+
+class ReconcileCheckpoint:
+    """Records the finished apps of a reconciling job, so an interrupted job can be resumed by skipping them.
+
+    :param name: the name of the job, jobs with same name share the checkpoint
+    :param flush_every: write the checkpoint to the cache every N finished apps
+    :param timeout: expiration time(seconds) of the checkpoint
+    """
+
+    def __init__(self, name: str, flush_every: int = 50, timeout: int = 7 * 24 * 3600):
+        self.cache_key = f'wl:ingress_reconciler:checkpoint:{name}'
+        self.flush_every = flush_every
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._done: Set[str] = set(cache.get(self.cache_key) or ())
+        self._unflushed = 0
+
+    def is_done(self, app: WlApp) -> bool:
+        return app.name in self._done
+
+    def mark_done(self, app: WlApp):
+        with self._lock:
+            self._done.add(app.name)
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._flush()
+
+    def flush(self):
+        """Write the checkpoint to the cache"""
+        with self._lock:
+            self._flush()
+
+    def clear(self):
+        """Clear the checkpoint, the next job will start from scratch"""
+        with self._lock:
+            self._done = set()
+            self._unflushed = 0
+            cache.delete(self.cache_key)
+
+    def _flush(self):
+        cache.set(self.cache_key, list(self._done), timeout=self.timeout)
+        self._unflushed = 0
+
+
+@dataclass
+class ReconcileReport:
+    """The report of a reconciling job
+
+    :param skipped: count of the apps which were skipped because they were done according to the checkpoint
+    :param failures: the error messages of the failed apps, keyed by app name
+    """
+
+    total: int = 0
+    succeeded: int = 0
+    skipped: int = 0
+    failures: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0
+
+    @property
+    def failed(self) -> int:
+        return len(self.failures)
+
+    @property
+    def throughput(self) -> float:
+        """Processed apps per second"""
+        if not self.elapsed:
+            return 0
+        return (self.succeeded + self.failed) / self.elapsed
+
+    def summary(self) -> str:
+        return (
+            f'total: {self.total}, succeeded: {self.succeeded}, failed: {self.failed}, skipped: {self.skipped}, '
+            f'elapsed: {self.elapsed:.1f}s, throughput: {self.throughput:.2f} apps/s'
+        )
+
+
+class BulkReconciler:
+    """Apply `handler` to many apps concurrently. The apps are grouped by cluster, each cluster has its own
+    workers and rate limiter, so a slow cluster will not block the others.
+
+    :param handler: the function to be applied to each app, the app is considered failed if an exception is raised
+    :param concurrency: the max number of workers of each cluster
+    :param rate_limit: the max number of apps to be processed per second in each cluster, 0 means no limit
+    :param checkpoint: when given, the finished apps will be recorded and skipped in the next run
+    :param on_finished: callback called when an app is finished, args: (app, error), error is None if succeeded
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[WlApp], None],
+        concurrency: int = 4,
+        rate_limit: float = 10,
+        checkpoint: Optional[ReconcileCheckpoint] = None,
+        on_finished: Optional[Callable[[WlApp, Optional[Exception]], None]] = None,
+    ):
+        self.handler = handler
+        self.concurrency = max(concurrency, 1)
+        self.rate_limit = rate_limit
+        self.checkpoint = checkpoint
+        self.on_finished = on_finished
+        self._lock = threading.Lock()
+
+    def run(self, apps: Iterable[WlApp]) -> ReconcileReport:
+        """Reconcile the given apps, blocks until all apps are processed"""
+        started_at = time.perf_counter()
+        report = ReconcileReport()
+        apps_by_cluster: Dict[str, List[WlApp]] = defaultdict(list)
+        for app in apps:
+            report.total += 1
+            if self.checkpoint and self.checkpoint.is_done(app):
+                report.skipped += 1
+                continue
+            try:
+                cluster_name = get_cluster_by_app(app).name
+            except Exception as e:
+                report.failures[app.name] = f'unable to get cluster: {e}'
+                continue
+            apps_by_cluster[cluster_name].append(app)
+
+        threads = []
+        for cluster_name, cluster_apps in apps_by_cluster.items():
+            logger.info('Reconciling %s apps in cluster %s', len(cluster_apps), cluster_name)
+            tasks: queue.SimpleQueue = queue.SimpleQueue()
+            for app in cluster_apps:
+                tasks.put(app)
+
+            limiter = RateLimiter(self.rate_limit)
+            for i in range(min(self.concurrency, len(cluster_apps))):
+                t = threading.Thread(
+                    target=self._work, args=(tasks, limiter, report), name=f'reconciler-{cluster_name}-{i}'
+                )
+                t.start()
+                threads.append(t)
+
+        for t in threads:
+            t.join()
+
+        if self.checkpoint:
+            self.checkpoint.flush()
+        report.elapsed = time.perf_counter() - started_at
+        return report
+
+    def _work(self, tasks: queue.SimpleQueue, limiter: RateLimiter, report: ReconcileReport):
+        try:
+            while True:
+                try:
+                    app = tasks.get_nowait()
+                except queue.Empty:
+                    return
+
+                limiter.acquire()
+                self._process(app, report)
+        finally:
+            # Close the database connections opened by current thread
+            connections.close_all()
+
+    def _process(self, app: WlApp, report: ReconcileReport):
+        error: Optional[Exception] = None
+        try:
+            self.handler(app)
+        except Exception as e:
+            logger.warning('Unable to reconcile app %s: %s', app.name, e)
+            error = e
+
+        with self._lock:
+            if error:
+                report.failures[app.name] = str(error).splitlines()[0] if str(error) else repr(error)
+            else:
+                report.succeeded += 1
+        if not error and self.checkpoint:
+            self.checkpoint.mark_done(app)
+        if self.on_finished:
+            self.on_finished(app, error)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+import logging
+
+from celery import shared_task
+
+from paas_wl.networking.ingress.certs.utils import (
+    find_subdomain_apps,
+    find_subpath_apps,
+    update_or_create_secret_by_cert,
+)
+from paas_wl.networking.ingress.models import AppDomainSharedCert
+from paas_wl.networking.ingress.reconciler import BulkReconciler, ReconcileCheckpoint
+
+logger = logging.getLogger(__name__)
+
+
+def make_cert_checkpoint(cert: AppDomainSharedCert) -> ReconcileCheckpoint:
+    """Make the checkpoint for refreshing secrets of given cert, a new checkpoint is used after the cert
+    was updated, so every renewal will refresh all secrets.
+    """
+    return ReconcileCheckpoint(f'refresh_cert:{cert.name}:{int(cert.updated.timestamp())}')
+
+
+@shared_task
+def refresh_cert_secrets(cert_name: str, concurrency: int = 4, rate_limit: float = 10):
+    """Refresh the Secret resources of given shared cert in all affected apps' namespaces. The progress is
+    checkpointed, the finished apps will be skipped when the task is run again.
+
+    :param cert_name: name of the shared cert
+    :param concurrency: the max number of workers of each cluster
+    :param rate_limit: the max number of apps to be processed per second in each cluster
+    """
+    cert = AppDomainSharedCert.objects.get(name=cert_name)
+    apps = sorted(set(find_subdomain_apps(cert)) | set(find_subpath_apps(cert)), key=lambda app: app.name)
+
+    reconciler = BulkReconciler(
+        lambda app: update_or_create_secret_by_cert(app, cert),
+        concurrency=concurrency,
+        rate_limit=rate_limit,
+        checkpoint=make_cert_checkpoint(cert),
+    )
+    report = reconciler.run(apps)
+    logger.info('Refresh secrets of cert %s finished, %s', cert_name, report.summary())
+    for app_name, error in report.failures.items():
+        logger.warning('Unable to refresh secret of cert %s for app %s: %s', cert_name, app_name, error)
@@ -35,3 +35,21 @@ class ArtifactType(str, StructuredEnum):
     SLUG = EnumField('slug')
     IMAGE = EnumField('image')
     NONE = EnumField('none')
+
+
+class OutputStreamStorage(str, StructuredEnum):
+    """storage format of output stream"""
+
+    # 每行日志保存为一条记录
+    LINES = EnumField('lines', label='逐行存储')
+    # 日志按批次压缩后追加保存为分块，并记录分块的行号与字节偏移量索引
+    CHUNKS = EnumField('chunks', label='压缩分块存储')
+
+
+# The max number of lines in one chunk of output stream
+OUTPUT_STREAM_CHUNK_MAX_LINES = 1000
+
+# Single-line writes of a chunks stream are buffered, the buffer is written as one chunk when it has this
+# many lines, or when its oldest line has been buffered for this many seconds(checked on the next write)
+OUTPUT_STREAM_WRITE_BUFFER_MAX_LINES = 100
+OUTPUT_STREAM_WRITE_BUFFER_FLUSH_INTERVAL = 1
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+# Generated by Django 3.2.12 on 2023-06-20 10:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import paas_wl.platform.applications.models.misc
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('api', '0011_build_image_id'),
+    ]
+
+    operations = [
+        # Existing streams are line based, the default value for new streams is set by the next operation
+        migrations.AddField(
+            model_name='outputstream',
+            name='storage',
+            field=models.CharField(default='lines', help_text='日志存储格式，见 OutputStreamStorage', max_length=16),
+        ),
+        migrations.AlterField(
+            model_name='outputstream',
+            name='storage',
+            field=models.CharField(
+                default=paas_wl.platform.applications.models.misc.get_default_output_stream_storage,
+                help_text='日志存储格式，见 OutputStreamStorage',
+                max_length=16,
+            ),
+        ),
+        migrations.CreateModel(
+            name='OutputStreamChunk',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seq', models.PositiveIntegerField(help_text='分块序号，从 0 开始')),
+                ('start_line', models.PositiveIntegerField(help_text='分块首行的行号，从 0 开始')),
+                ('line_count', models.PositiveIntegerField(help_text='分块包含的行数')),
+                ('start_offset', models.PositiveBigIntegerField(help_text='分块首行在完整日志中的字节偏移量')),
+                ('size', models.PositiveIntegerField(help_text='分块解压后的字节数')),
+                ('data', models.BinaryField(help_text='zlib 压缩后的日志内容')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                (
+                    'output_stream',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='api.outputstream'
+                    ),
+                ),
+            ],
+            options={
+                'unique_together': {('output_stream', 'seq')},
+            },
+        ),
+        migrations.AddIndex(
+            model_name='outputstreamchunk',
+            index=models.Index(fields=['output_stream', 'start_line'], name='outputstreamchunk_line_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='outputstreamchunk',
+            index=models.Index(fields=['output_stream', 'start_offset'], name='outputstreamchunk_offset_idx'),
+        ),
+    ]
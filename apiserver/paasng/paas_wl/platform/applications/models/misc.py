@@ -16,18 +16,141 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
+import datetime
+import json
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple
 
-from django.db import models
+from django.conf import settings
+from django.db import models, router, transaction
 
+from paas_wl.platform.applications.constants import (
+    OUTPUT_STREAM_CHUNK_MAX_LINES,
+    OUTPUT_STREAM_WRITE_BUFFER_FLUSH_INTERVAL,
+    OUTPUT_STREAM_WRITE_BUFFER_MAX_LINES,
+    OutputStreamStorage,
+)
 from paas_wl.platform.applications.models import UuidAuditedModel
 
 
+@dataclass
+class OutputLine:
+    """A line of output stream, regardless of the storage format"""
+
+    stream: str
+    line: str
+    created: datetime.datetime
+
+
+def get_default_output_stream_storage() -> str:
+    return settings.OUTPUT_STREAM_STORAGE
+
+
 class OutputStream(UuidAuditedModel):
+    storage = models.CharField(
+        max_length=16, default=get_default_output_stream_storage, help_text='日志存储格式，见 OutputStreamStorage'
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Buffered single-line writes of chunks storage, see `write`
+        self._write_buffer: List[Tuple[str, str]] = []
+        self._buffered_at = 0.0
+
     def write(self, line, stream='STDOUT'):
+        """Write a line, for chunks storage the line is buffered and saved with the following lines as one
+        chunk, call `flush` after the last write.
+        """
+        if self.storage == OutputStreamStorage.CHUNKS:
+            # 逐行写入时若每行都保存为一个分块, 每行都需要一次加锁的事务, 且分块几乎无法压缩, 因此先缓冲再批量写入
+            if not self._write_buffer:
+                self._buffered_at = time.monotonic()
+            self._write_buffer.append((line, stream))
+            if (
+                len(self._write_buffer) >= OUTPUT_STREAM_WRITE_BUFFER_MAX_LINES
+                or time.monotonic() - self._buffered_at >= OUTPUT_STREAM_WRITE_BUFFER_FLUSH_INTERVAL
+            ):
+                self.flush()
+            return
+
         if not line.endswith('\n'):
             line += '\n'
         OutputStreamLine.objects.create(output_stream=self, line=line, stream=stream)
 
+    def flush(self):
+        """Save the buffered lines, only chunks storage buffers lines"""
+        if self._write_buffer:
+            self.bulk_write([])
+
+    def bulk_write(self, lines: Iterable[Tuple[str, str]]):
+        """Write multiple lines in one query, the buffered lines(if any) are saved before them
+
+        :param lines: a list of (line, stream)
+        """
+        buffered, self._write_buffer = self._write_buffer, []
+        lines = [(line if line.endswith('\n') else line + '\n', stream) for line, stream in [*buffered, *lines]]
+        if not lines:
+            return
+
+        if self.storage == OutputStreamStorage.CHUNKS:
+            for i in range(0, len(lines), OUTPUT_STREAM_CHUNK_MAX_LINES):
+                OutputStreamChunk.objects.append(self, lines[i : i + OUTPUT_STREAM_CHUNK_MAX_LINES])
+            return
+
+        # NOTE: lines created in one query may share the same "created" value, always order lines by
+        # ("created", "id") when reading
+        OutputStreamLine.objects.bulk_create(
+            [OutputStreamLine(output_stream=self, line=line, stream=stream) for line, stream in lines]
+        )
+
+    def count_lines(self) -> int:
+        """Count the total lines of current stream"""
+        self.flush()
+        if self.storage == OutputStreamStorage.CHUNKS:
+            last_chunk = self.chunks.order_by('-seq').first()
+            return last_chunk.end_line if last_chunk else 0
+        return self.lines.count()
+
+    def iter_lines(self, start: int = 0, limit: Optional[int] = None) -> Iterator[OutputLine]:
+        """Iterate the lines of current stream, only the chunks/rows needed are loaded
+
+        :param start: line number(starts from 0) of the first line
+        :param limit: max number of lines, no limit when None
+        """
+        self.flush()
+        if self.storage == OutputStreamStorage.CHUNKS:
+            yield from OutputStreamChunk.objects.iter_lines(self, start, limit)
+            return
+
+        qs = self.lines.order_by('created', 'id')
+        qs = qs[start : start + limit] if limit is not None else qs[start:]
+        for obj in qs.iterator():
+            yield OutputLine(stream=obj.stream, line=obj.line, created=obj.created)
+
+    def tail_lines(self, n: int) -> List[OutputLine]:
+        """Get the last n lines of current stream"""
+        total = self.count_lines()
+        return list(self.iter_lines(start=max(total - n, 0)))
+
+    def get_line_number(self, offset: int) -> int:
+        """Get the number of the line which contains the byte at given offset, the offset is counted
+        on the UTF-8 encoded content of the whole stream.
+        """
+        self.flush()
+        if self.storage == OutputStreamStorage.CHUNKS:
+            return OutputStreamChunk.objects.get_line_number(self, offset)
+
+        # Legacy line based streams have no offset index, scan the lines one by one
+        line_number, pos = 0, 0
+        for line in self.lines.order_by('created', 'id').values_list('line', flat=True).iterator():
+            pos += len(line.encode())
+            if pos > offset:
+                break
+            line_number += 1
+        return line_number
+
 
 class OutputStreamLine(models.Model):
     output_stream = models.ForeignKey('OutputStream', related_name='lines', on_delete=models.CASCADE)
@@ -43,6 +166,106 @@ class OutputStreamLine(models.Model):
         return '%s-%s' % (self.id, self.line)
 
 
+class OutputStreamChunkManager(models.Manager):
+    def append(self, output_stream: OutputStream, lines: List[Tuple[str, str]]) -> 'OutputStreamChunk':
+        """Append lines to the stream as a new chunk
+
+        :param lines: a list of (line, stream)
+        """
+        data = zlib.compress(json.dumps([[stream, line] for line, stream in lines]).encode())
+        size = sum(len(line.encode()) for line, _ in lines)
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            # Lock the stream object to make sure the chunks index is continuous when there are concurrent writers
+            list(OutputStream.objects.select_for_update().filter(pk=output_stream.pk).values_list('pk'))
+            last_chunk = self.filter(output_stream=output_stream).order_by('-seq').first()
+            return self.create(
+                output_stream=output_stream,
+                seq=last_chunk.seq + 1 if last_chunk else 0,
+                start_line=last_chunk.end_line if last_chunk else 0,
+                line_count=len(lines),
+                start_offset=last_chunk.end_offset if last_chunk else 0,
+                size=size,
+                data=data,
+            )
+
+    def iter_lines(
+        self, output_stream: OutputStream, start: int = 0, limit: Optional[int] = None
+    ) -> Iterator[OutputLine]:
+        """Iterate the lines of given stream, starts from line number `start`"""
+        if limit is not None and limit <= 0:
+            return
+
+        qs = self.filter(output_stream=output_stream)
+        first_chunk = qs.filter(start_line__lte=start).order_by('-seq').only('seq').first()
+        if first_chunk:
+            qs = qs.filter(seq__gte=first_chunk.seq)
+
+        count = 0
+        # Load the chunks lazily, so paging a huge stream only decompress the chunks needed
+        for chunk in qs.order_by('seq').iterator(chunk_size=10):
+            for idx, line in enumerate(chunk.load_lines(), start=chunk.start_line):
+                if idx < start:
+                    continue
+                yield line
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def get_line_number(self, output_stream: OutputStream, offset: int) -> int:
+        """Get the number of the line which contains the byte at given offset"""
+        chunk = self.filter(output_stream=output_stream, start_offset__lte=offset).order_by('-seq').first()
+        if not chunk:
+            return 0
+        if offset >= chunk.end_offset:
+            return chunk.end_line
+
+        pos = chunk.start_offset
+        for idx, line in enumerate(chunk.load_lines(), start=chunk.start_line):
+            pos += len(line.line.encode())
+            if pos > offset:
+                return idx
+        return chunk.end_line
+
+
+class OutputStreamChunk(models.Model):
+    """A compressed chunk of output stream, chunks are append-only and never modified after created.
+
+    The line number and byte offset of each chunk are stored as an index, so the logs can be paged or
+    tailed without loading the whole stream.
+    """
+
+    output_stream = models.ForeignKey('OutputStream', related_name='chunks', on_delete=models.CASCADE)
+    seq = models.PositiveIntegerField(help_text='分块序号，从 0 开始')
+    start_line = models.PositiveIntegerField(help_text='分块首行的行号，从 0 开始')
+    line_count = models.PositiveIntegerField(help_text='分块包含的行数')
+    start_offset = models.PositiveBigIntegerField(help_text='分块首行在完整日志中的字节偏移量')
+    size = models.PositiveIntegerField(help_text='分块解压后的字节数')
+    data = models.BinaryField(help_text='zlib 压缩后的日志内容')
+    created = models.DateTimeField(auto_now_add=True)
+
+    objects = OutputStreamChunkManager()
+
+    class Meta:
+        unique_together = ('output_stream', 'seq')
+        indexes = [
+            models.Index(fields=['output_stream', 'start_line'], name='outputstreamchunk_line_idx'),
+            models.Index(fields=['output_stream', 'start_offset'], name='outputstreamchunk_offset_idx'),
+        ]
+
+    @property
+    def end_line(self) -> int:
+        return self.start_line + self.line_count
+
+    @property
+    def end_offset(self) -> int:
+        return self.start_offset + self.size
+
+    def load_lines(self) -> List[OutputLine]:
+        """Decompress the lines in current chunk, all lines share the creation time of the chunk"""
+        items = json.loads(zlib.decompress(bytes(self.data)))
+        return [OutputLine(stream=stream, line=line, created=self.created) for stream, line in items]
+
+
 class OneOffCommand(UuidAuditedModel):
     """这个类是没用的不要再看了"""
 
@@ -65,10 +288,12 @@ class OneOffCommand(UuidAuditedModel):
 
     def write_error_info(self, exit_code):
         self.output_stream.write("one-off command exit with: %s" % exit_code)
+        self.output_stream.flush()
 
         self.exit_code = int(exit_code)
         self.save()
 
     def success_exit(self):
+        self.output_stream.flush()
         self.exit_code = 0
         self.save()
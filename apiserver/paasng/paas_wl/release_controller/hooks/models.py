@@ -24,7 +24,7 @@ from django.db import models
 from django.utils import timezone
 
 from paas_wl.platform.applications.models import WlApp
-from paas_wl.platform.applications.models.misc import OutputStream
+from paas_wl.platform.applications.models.misc import OutputLine, OutputStream
 from paas_wl.utils.constants import CommandStatus, CommandType
 from paas_wl.utils.models import UuidAuditedModel
 
@@ -123,8 +123,8 @@ class Command(UuidAuditedModel):
         return self.app.region
 
     @property
-    def lines(self):
-        return self.output_stream.lines.all().order_by('created')
+    def lines(self) -> List[OutputLine]:
+        return list(self.output_stream.iter_lines())
 
     @property
     def split_command(self) -> List[str]:
@@ -18,28 +18,132 @@ to the current version of the project delivered to anyone in the future.
 """
 """Base utils for kubernetes scheduler"""
 import logging
-from functools import lru_cache
-from typing import Dict, List
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
 
 from blue_krill.connections.ha_endpoint_pool import HAEndpointPool
+from django.conf import settings
+from django.core.cache import cache
 from kubernetes.client import ApiClient as BaseApiClient
 from kubernetes.client.rest import RESTClientObject
 from urllib3.exceptions import HTTPError
 
 from paas_wl.cluster.models import EnhancedConfiguration
 from paas_wl.cluster.pools import ContextConfigurationPoolMap
+from paas_wl.resources.base.kube_client import get_discoverer_cache
+from paasng.metrics.metrics import KUBE_CLIENT_ENDPOINT_FAILURE_COUNTER, KUBE_CLIENT_REQUEST_HISTOGRAM
 
 logger = logging.getLogger(__name__)
 
 
-@lru_cache
-def get_global_configuration_pool() -> Dict[str, HAEndpointPool]:
-    """Get the global config pool object.
+class ClusterClientRegistry:
+    """Long-lived registry of kubernetes clients, one client per cluster. The registry owns the HA endpoint
+    pools and the HTTP connection pools(`RESTClientObject`) of every cluster, so the connections can be
+    reused by all requests in current process.
+
+    When clusters were updated, call `invalidate` to reset the registry, the other processes will be reset
+    automatically within `check_interval` seconds.
 
-    NOTE: This function is cached for performance. When the clusters have been updated,
-    the cache must be cleared.
+    :param check_interval: interval(seconds) for checking if the clusters has been updated by other processes
     """
-    return ContextConfigurationPoolMap.from_db()
+
+    generation_cache_key = 'wl:cluster_client_registry:generation'
+
+    def __init__(self, check_interval: float = 30):
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._ep_pools: Optional[Dict[str, HAEndpointPool]] = None
+        self._clients: Dict[str, 'EnhancedApiClient'] = {}
+        self._rest_clients: Dict[int, Tuple[str, EnhancedConfiguration, RESTClientObject]] = {}
+        self._generation: Optional[int] = None
+        self._generation_loaded = False
+        self._checked_at = 0.0
+
+    def get_ep_pools(self) -> Dict[str, HAEndpointPool]:
+        """Get the endpoint pools of all clusters, keyed by cluster name"""
+        self._check_generation()
+        with self._lock:
+            if self._ep_pools is None:
+                self._ep_pools = ContextConfigurationPoolMap.from_db()
+            return self._ep_pools
+
+    def get_client(self, cluster_name: str) -> 'EnhancedApiClient':
+        """Get the client of given cluster
+
+        :raise KeyError: when cluster does not exist
+        """
+        ep_pools = self.get_ep_pools()
+        with self._lock:
+            if cluster_name not in self._clients:
+                self._clients[cluster_name] = EnhancedApiClient(
+                    ep_pool=ep_pools[cluster_name], cluster_name=cluster_name
+                )
+            return self._clients[cluster_name]
+
+    def get_rest_client(self, cluster_name: str, configuration: EnhancedConfiguration) -> RESTClientObject:
+        """Get the HTTP client of given configuration, which holds the urllib3 connection pools"""
+        key = id(configuration)
+        with self._lock:
+            if key not in self._rest_clients:
+                if settings.K8S_CONNECTION_POOL_MAXSIZE:
+                    configuration.connection_pool_maxsize = settings.K8S_CONNECTION_POOL_MAXSIZE
+                # Keep a reference of configuration object to make sure the id will not be reused
+                self._rest_clients[key] = (cluster_name, configuration, RESTClientObject(configuration))
+            return self._rest_clients[key][2]
+
+    def list_rest_clients(self) -> List[Tuple[str, EnhancedConfiguration, RESTClientObject]]:
+        """List all HTTP clients, returns a list of (cluster_name, configuration, rest_client)"""
+        with self._lock:
+            return list(self._rest_clients.values())
+
+    def invalidate(self):
+        """Reset current registry, and notify other processes to reset"""
+        generation = time.time_ns()
+        try:
+            cache.set(self.generation_cache_key, generation, timeout=None)
+        except Exception:
+            logger.exception('Unable to update the generation of cluster client registry')
+        self._reset()
+        with self._lock:
+            self._generation = generation
+            self._generation_loaded = True
+
+    def _reset(self):
+        with self._lock:
+            for _, _, rest_client in self._rest_clients.values():
+                rest_client.pool_manager.clear()
+            self._ep_pools = None
+            self._clients = {}
+            self._rest_clients = {}
+        # The discovered API resources may be changed with the clusters' endpoints or credentials
+        get_discoverer_cache().invalidate_all()
+
+    def _check_generation(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return
+
+        self._checked_at = now
+        try:
+            generation = cache.get(self.generation_cache_key)
+        except Exception:
+            logger.exception('Unable to get the generation of cluster client registry')
+            return
+
+        if self._generation_loaded and generation != self._generation:
+            logger.info('Clusters have been updated, reset the client registry')
+            self._reset()
+        self._generation = generation
+        self._generation_loaded = True
+
+
+client_registry = ClusterClientRegistry()
+
+
+def get_global_configuration_pool() -> Dict[str, HAEndpointPool]:
+    """Get the global config pool object."""
+    return client_registry.get_ep_pools()
 
 
 class EnhancedApiClient(BaseApiClient):
@@ -48,15 +152,29 @@ class EnhancedApiClient(BaseApiClient):
     1. Client-side HA support using multiple endpoints
     2. Hostname overridden(via custom resolver).
 
+    The client object is thread-safe, it can be shared by multiple threads because the elected configuration
+    is stored in thread local.
+
     Arguments:
 
     :param ep_pool: Endpoints Pool object.
+    :param cluster_name: Name of the cluster, used for sharing the discovery cache.
     """
 
-    def __init__(self, ep_pool: HAEndpointPool, *args, **kwargs):
+    def __init__(self, ep_pool: HAEndpointPool, *args, cluster_name: str = '', **kwargs):
         self.ep_pool = ep_pool
-        configuration = ep_pool.get()
-        super().__init__(configuration, *args, **kwargs)
+        self.cluster_name = cluster_name
+        self._local = threading.local()
+        self._default_configuration = ep_pool.get()
+        super().__init__(self._default_configuration, *args, **kwargs)
+
+    @property  # type: ignore
+    def configuration(self) -> EnhancedConfiguration:
+        return getattr(self._local, 'configuration', self._default_configuration)
+
+    @configuration.setter
+    def configuration(self, configuration: EnhancedConfiguration):
+        self._local.configuration = configuration
 
     def call_api(self, *args, **kwargs):
         """Call Kubernetes API"""
@@ -66,21 +184,34 @@ class EnhancedApiClient(BaseApiClient):
         # will stay intact because it's value was set in `BaseApiClient.__init__` method. This behaviour is not
         # harmful to current implementation, but due to this vulnerability, we may have to change current
         # implementation(e.g. create another `Client` object) in order to make things work in the future.
-        self.configuration: EnhancedConfiguration = self.ep_pool.get()
+        self.configuration = self.ep_pool.get()
+        host = self.configuration.host
+        started_at = time.perf_counter()
         try:
             with self.configuration.activate_resolver():
-                logger.debug('Send request to Kubernetes API %s...', self.configuration.host)
+                logger.debug('Send request to Kubernetes API %s...', host)
                 ret = super().call_api(*args, **kwargs)
         except HTTPError:
+            KUBE_CLIENT_ENDPOINT_FAILURE_COUNTER.labels(cluster=self.cluster_name, host=host).inc()
+            self._observe(host, 'error', started_at)
             self.ep_pool.fail()
             raise
+        except Exception:
+            self._observe(host, 'error', started_at)
+            raise
         else:
+            self._observe(host, 'ok', started_at)
             self.ep_pool.succeed()
         return ret
 
+    def _observe(self, host: str, status: str, started_at: float):
+        KUBE_CLIENT_REQUEST_HISTOGRAM.labels(cluster=self.cluster_name, host=host, status=status).observe(
+            time.perf_counter() - started_at
+        )
+
     @property
     def rest_client(self) -> RESTClientObject:
-        return make_rest_client(self.configuration)
+        return client_registry.get_rest_client(self.cluster_name, self.configuration)
 
     @rest_client.setter
     def rest_client(self, client: RESTClientObject):
@@ -89,27 +220,17 @@ class EnhancedApiClient(BaseApiClient):
         """
 
 
-@lru_cache(maxsize=128)
-def make_rest_client(configuration: EnhancedConfiguration) -> RESTClientObject:
-    """Use LRU cache to avoid re-creating HTTP connections"""
-    return RESTClientObject(configuration)
-
-
 def get_all_cluster_names() -> List[str]:
     return list(get_global_configuration_pool().keys())
 
 
 def get_client_by_cluster_name(cluster_name: str) -> EnhancedApiClient:
-    """Initialize an kubernetes api client object by given context
-
-    TODO/IMPORTANT: Add cache to reuse connection pools which were maintained by every individual client object
-    """
+    """Get the kubernetes api client object by given cluster name, the client is shared in current process"""
     if not cluster_name:
         raise ValueError("context_name must not be empty")
 
-    if cluster_name not in get_all_cluster_names():
+    try:
+        return client_registry.get_client(cluster_name)
+    except KeyError:
         # if the context which user want to use do not exist, raise a ValueError
         raise ValueError(f'context "{cluster_name}" not found in settings, ' f'all context: {get_all_cluster_names()}')
-
-    ep_pool = get_global_configuration_pool()[cluster_name]
-    return EnhancedApiClient(ep_pool=ep_pool)
@@ -21,3 +21,13 @@ to the current version of the project delivered to anyone in the future.
 BKAPP_CATEGORY = "bkapp"
 
 QUERY_LOG_DEFAULT_TIMEOUT = 300
+
+# The TTL(seconds) of the shared kubernetes API discovery cache
+DISCOVERY_CACHE_TTL = 60 * 10
+
+# The max seconds of each WATCH request sent by the resource waiter
+WAITER_WATCH_TIMEOUT = 60
+
+# The initial and max seconds of the backoff before the resource waiter lists again after a failed WATCH request
+WAITER_RETRY_BACKOFF_BASE = 0.5
+WAITER_RETRY_BACKOFF_MAX = 10
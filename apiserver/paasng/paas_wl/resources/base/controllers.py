@@ -19,7 +19,6 @@ to the current version of the project delivered to anyone in the future.
 import datetime
 import logging
 import os
-import time
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Dict, Optional, Tuple
 
@@ -27,6 +26,7 @@ import arrow
 from django.conf import settings
 from django.utils.timezone import localtime
 from kubernetes.client.rest import ApiException
+from kubernetes.dynamic.resource import ResourceInstance
 
 from paas_wl.release_controller.hooks.entities import Command, command_kmodel
 from paas_wl.resources.base.exceptions import (
@@ -39,6 +39,7 @@ from paas_wl.resources.base.exceptions import (
     ResourceMissing,
 )
 from paas_wl.resources.base.kres import KNamespace, KPod
+from paas_wl.resources.base.waiter import ResourceWaiter, WaitResourceTimeout
 from paas_wl.resources.kube_res.base import AppEntityManager
 from paas_wl.resources.kube_res.exceptions import AppEntityNotFound
 from paas_wl.utils.kubestatus import (
@@ -116,8 +117,6 @@ class NamespacesHandler(ResourceHandlerBase):
 
 
 class WaitPodDelete:
-    _check_interval = 1
-
     def __init__(self, namespace: str, name: str, client: 'EnhancedApiClient'):
         self.namespace = namespace
         self.name = name
@@ -130,15 +129,12 @@ class WaitPodDelete:
         :param raise_timeout: whether to throw an exception when timeout.
         :return: whether actually be deleted, `true` for be deleted.
         """
-        now = datetime.datetime.now()
-        when_timeout = now + datetime.timedelta(seconds=max_wait_seconds)
-        while now <= when_timeout:
-            time.sleep(self._check_interval)
-            now = datetime.datetime.now()
-            try:
-                KPod(self.client).get(name=self.name, namespace=self.namespace)
-            except ResourceMissing:
-                return True
+        waiter = ResourceWaiter(KPod(self.client), self.name, namespace=self.namespace)
+        try:
+            waiter.wait(lambda obj: obj is None, timeout=max_wait_seconds)
+            return True
+        except WaitResourceTimeout:
+            pass
         if raise_timeout:
             raise ResourceDeleteTimeout(resource_type="pod", namespace=self.namespace, name=self.name)
         return False
@@ -208,13 +204,12 @@ class PodScheduleHandler(ResourceHandlerBase):
         :raises: PodAbsentError when Pod is not found
         :raises: PodTimeoutError when Pod does not succeed in given timeout seconds
         """
-        time_started = time.time()
-        while timeout is None or time.time() - time_started < timeout:
-            try:
-                _, health_status = self._get_pod_status(namespace, pod_name)
-            except ResourceMissing as e:
-                raise PodAbsentError(f"Pod<{namespace}/{pod_name}> not found") from e
 
+        def _is_succeeded(pod: Optional[ResourceInstance]) -> bool:
+            if pod is None:
+                raise PodAbsentError(f"Pod<{namespace}/{pod_name}> not found")
+
+            health_status = check_pod_health_status(parse_pod(pod))
             if health_status.status == HealthStatusType.UNHEALTHY:
                 exit_code = extract_exit_code(health_status) or -1
                 raise PodNotSucceededError(
@@ -223,11 +218,13 @@ class PodScheduleHandler(ResourceHandlerBase):
                     message=health_status.message,
                     exit_code=exit_code,
                 )
-            elif health_status.status == HealthStatusType.HEALTHY:
-                return True
-            else:
-                time.sleep(check_period)
-                continue
+            return health_status.status == HealthStatusType.HEALTHY
+
+        try:
+            ResourceWaiter(KPod(self.client), pod_name, namespace=namespace).wait(_is_succeeded, timeout=timeout)
+            return True
+        except WaitResourceTimeout:
+            pass
         raise PodTimeoutError(f"Pod<{namespace}/{pod_name}> didn't succeeded in {timeout} seconds.")
 
     def _get_pod_logs(self, namespace: str, pod_name: str, timeout: int, **kwargs):
@@ -463,27 +460,23 @@ class CommandHandler(PodScheduleHandler):
         """
         namespace = command.app.namespace
         pod_name = command.name
-        time_started = time.time()
-        while timeout is None or time.time() - time_started < timeout:
-            try:
-                command_in_k8s = command_kmodel.get(command.app, command.name)
-            except AppEntityNotFound as e:
-                raise PodAbsentError(f"Pod<{namespace}/{pod_name}> not found") from e
+
+        def _is_succeeded(command_in_k8s: Optional[Command]) -> bool:
+            if command_in_k8s is None:
+                raise PodAbsentError(f"Pod<{namespace}/{pod_name}> not found")
 
             # Pod 执行成功或主容器正常退出, 视为成功
             if command_in_k8s.phase == "Succeeded" or command_in_k8s.main_container_exit_code == os.EX_OK:
                 return True
             elif command_in_k8s.phase == "Running":
-                time.sleep(check_period)
-                continue
+                return False
 
             # 执行可能出现异常, 需要从 pod 中查询更多详情
             v1pod = parse_pod(command_in_k8s._kube_data)
             health_status = check_pod_health_status(v1pod)
             if health_status.status == HealthStatusType.PROGRESSING:
                 # PROGRESSING 意味着 Pod 处于 Pending 且无异常事件(例如拉取镜像异常; 无节点可调度等), 继续等待
-                time.sleep(check_period)
-                continue
+                return False
 
             exit_code = extract_exit_code(health_status) or command_in_k8s.main_container_exit_code
             raise PodNotSucceededError(
@@ -492,6 +485,12 @@ class CommandHandler(PodScheduleHandler):
                 message=health_status.message,
                 exit_code=exit_code,
             )
+
+        try:
+            command_kmodel.wait_for(command.app, command.name, _is_succeeded, timeout=timeout)
+            return True
+        except WaitResourceTimeout:
+            pass
         raise PodTimeoutError(f"Pod<{namespace}/{pod_name}> didn't succeeded in {timeout} seconds.")
 
     def wait_for_logs_readiness(self, command: Command, timeout: int):
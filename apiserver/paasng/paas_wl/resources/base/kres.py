@@ -21,7 +21,6 @@ to the current version of the project delivered to anyone in the future.
 import functools
 import json
 import logging
-import time
 from contextlib import contextmanager
 from enum import Enum
 from types import ModuleType
@@ -42,7 +41,8 @@ from paas_wl.resources.base.exceptions import (
     ResourceDeleteTimeout,
     ResourceMissing,
 )
-from paas_wl.resources.base.kube_client import CoreDynamicClient
+from paas_wl.resources.base.kube_client import CoreDynamicClient, get_discoverer_cache
+from paas_wl.resources.base.waiter import ResourceWaiter, WaitResourceTimeout
 from paas_wl.utils.kubestatus import parse_pod
 
 logger = logging.getLogger(__name__)
@@ -151,8 +151,9 @@ class BaseKresource:
 
         self.client = _api_client
 
-        # TODO: Add cache
-        self.dynamic_client = CoreDynamicClient(self.client)
+        # The dynamic client(including the discovered API resources) is shared by all kres objects of
+        # the same cluster endpoint
+        self.dynamic_client: CoreDynamicClient = get_discoverer_cache().get(self.client)
         self.version = self.dynamic_client.version
 
         self.request_timeout = request_timeout or get_default_options().get("request_timeout")
@@ -180,6 +181,15 @@ class BaseKresource:
         """Clone a Kres object from another"""
         return cls(obj.client, obj.request_timeout)
 
+    def invalidate_discovery(self):
+        """Invalidate the shared discovery cache of current cluster, the API resources will be discovered
+        again when next kres object was created. Should be called when the cached resources were found stale.
+        """
+        cluster_name = getattr(self.client, 'cluster_name', '')
+        if cluster_name:
+            logger.info('Invalidating discovery cache of cluster %s, kind: %s', cluster_name, self.kind)
+            get_discoverer_cache().invalidate(cluster_name, self.client.configuration.host)
+
 
 class BaseOperations:
     """Base operation class for kubernetes resources
@@ -195,6 +205,13 @@ class BaseOperations:
         self.kres = kres
         self.request_timeout = request_timeout
 
+        try:
+            self._init_resources()
+        except ResourceNotFoundError:
+            self.kres.invalidate_discovery()
+            raise
+
+    def _init_resources(self):
         self._available_resources = self.client.resources.search(kind=self.kres.kind)
         try:
             self._preferred_resource = self.client.get_preferred_resource(self.kres.kind)
@@ -279,6 +296,28 @@ class NameBasedOperations(BaseOperations):
             obj = _func(name=name, body=body, namespace=namespace, **extra_kwargs)
         return obj
 
+    def server_side_apply(
+        self, name: str, body: Dict, field_manager: str, namespace: Namespace = None, force_conflicts: bool = True
+    ) -> ResourceInstance:
+        """Apply a resource by server-side apply, the resource will be created if it does not exist. Only the
+        fields in body will be owned by `field_manager`, the fields owned by others are kept as they are.
+
+        See also: https://kubernetes.io/docs/reference/using-api/server-side-apply/
+
+        :param field_manager: name of the field manager
+        :param force_conflicts: whether to take the ownership of the conflicting fields from other managers
+        :return: Applied instance
+        """
+        # The body of "application/apply-patch+yaml" request must be serialized in advance, JSON is valid YAML
+        return self.resource.server_side_apply(
+            body=json.dumps(body),
+            name=name,
+            namespace=namespace,
+            field_manager=field_manager,
+            force_conflicts=force_conflicts,
+            **self.default_kwargs,
+        )
+
     def create_or_update(
         self,
         name: str,
@@ -440,9 +479,16 @@ class LabelBasedOperations(BaseOperations):
         :param namespace: Resource namespace, only required for is_namespaced resource
         :returns: Various kinds of kubernetes lists
         """
-        list_resp = self.resource.get(
-            label_selector=self.make_labels_string(labels), namespace=namespace, **self.default_kwargs
-        )
+        try:
+            list_resp = self.resource.get(
+                label_selector=self.make_labels_string(labels), namespace=namespace, **self.default_kwargs
+            )
+        except ApiException as e:
+            # Listing resources never returns 404 unless the resource itself was removed from the cluster,
+            # the cached discovery data must be stale.
+            if e.status == 404:
+                self.kres.invalidate_discovery()
+            raise
         return KubeObjectList(list_resp)
 
     def delete_collection(self, labels: Dict[str, str], namespace: Namespace = None):
@@ -494,16 +540,15 @@ class KNamespace(BaseKresource):
         """Calling this function will blocks until the default ServiceAccount was created
 
         :param timeout: timeout seconds for this join operation, default to never timeout
-        :param check_period: wait interval for polling
+        :param check_period: not used, the ServiceAccount is watched instead of polling, kept for compatibility
         :raises: CreateServiceAccountTimeout if sa unable to appears in given timeout
         """
-        time_started = time.time()
-        while timeout is None or time.time() - time_started < timeout:
-            if self.default_sa_exists(namespace):
-                return None
+        waiter = ResourceWaiter(KServiceAccount.clone_from(self), 'default', namespace=namespace)
+        try:
+            waiter.wait(self._is_default_sa_ready, timeout=timeout)
+        except WaitResourceTimeout:
             logger.warning("No default ServiceAccount found in namespace %s", namespace)
-            time.sleep(check_period)
-        raise CreateServiceAccountTimeout(namespace=namespace, timeout=timeout)
+            raise CreateServiceAccountTimeout(namespace=namespace, timeout=timeout)
 
     def wait_until_removed(
         self,
@@ -515,19 +560,15 @@ class KNamespace(BaseKresource):
         """Calling this function will blocks until the given namespace was deleted
 
         :param timeout: timeout seconds for this join operation
-        :param check_period: wait interval for polling
+        :param check_period: not used, the namespace is watched instead of polling, kept for compatibility
         :param raise_timeout: whether to throw an exception when timeout.
         :raises: ResourceDeleteTimeout if the namespace is still exists in given timeout and raise_timeout is True
         """
-        now = time.time()
-        when_timeout = now + timeout
-        while now < when_timeout:
-            now = time.time()
-            try:
-                self.get(namespace)
-            except ResourceMissing:
-                return True
-            time.sleep(check_period)
+        try:
+            ResourceWaiter(self, namespace).wait(lambda obj: obj is None, timeout=timeout)
+            return True
+        except WaitResourceTimeout:
+            pass
         if raise_timeout:
             raise ResourceDeleteTimeout(resource_type=self.kind, namespace=namespace, name='')
 
@@ -541,6 +582,10 @@ class KNamespace(BaseKresource):
             sa = KServiceAccount.clone_from(self).get('default', namespace=namespace)
         except ResourceMissing:
             return False
+        return self._is_default_sa_ready(sa)
+
+    @staticmethod
+    def _is_default_sa_ready(sa: Optional[ResourceInstance]) -> bool:
         # "sa" and "sa.secret" sometimes can be None
         # TODO k8s 1.24+ 将不会自动为 default sa 关联 token
         # https://github.com/kubernetes/kubernetes/blob/master/CHANGELOG/CHANGELOG-1.24.md#urgent-upgrade-notes
@@ -569,21 +614,21 @@ class KPod(BaseKresource):
 
         :param target_statuses: return normally when pod's status is one of given statuses
         :param timeout: timeout seconds for this join operation, default to never timeout
-        :param check_period: wait interval for polling
+        :param check_period: not used, the pod is watched instead of polling, kept for compatibility
         :raises: ReadTargetStatusTimeout
         """
-        time_started = time.time()
-        pod = None
-        while timeout is None or time.time() - time_started < timeout:
-            try:
-                pod = parse_pod(self.get(name, namespace=namespace))
-            except ResourceMissing:
+
+        def _reached(obj: Optional[ResourceInstance]) -> bool:
+            if obj is None:
                 logger.warning("Pod %s %s not found.", namespace, name)
-            else:
-                if pod.status.phase in target_statuses:
-                    return
-            time.sleep(check_period)
-        raise ReadTargetStatusTimeout(pod_name=name, max_seconds=timeout, extra_value=pod)
+                return False
+            return obj.status.phase in target_statuses
+
+        try:
+            ResourceWaiter(self, name, namespace=namespace).wait(_reached, timeout=timeout)
+        except WaitResourceTimeout as e:
+            pod = parse_pod(e.last_obj) if e.last_obj is not None else None
+            raise ReadTargetStatusTimeout(pod_name=name, max_seconds=timeout, extra_value=pod)
 
     def get_log(self, name: str, namespace: Namespace, timeout: float = QUERY_LOG_DEFAULT_TIMEOUT, **kwargs):
         # TODO: Use dynamic client instead of `CoreV1Api`
@@ -16,14 +16,21 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
+import json
 import logging
-from typing import Any, Dict
+import threading
+import time
+from functools import partial
+from typing import Any, Callable, Dict, Optional, Set, Tuple
 
 from kubernetes.dynamic import DynamicClient, Resource
+from kubernetes.dynamic.discovery import CacheDecoder, CacheEncoder
 from kubernetes.dynamic.discovery import LazyDiscoverer as _LazyDiscoverer
 from kubernetes.dynamic.discovery import ResourceGroup
 from kubernetes.dynamic.exceptions import NotFoundError, ResourceNotFoundError, ResourceNotUniqueError
 
+from paas_wl.resources.base.constants import DISCOVERY_CACHE_TTL
+
 logger = logging.getLogger(__name__)
 
 
@@ -129,6 +136,167 @@ class CoreDynamicClient(DynamicClient):
         return super().request(method, path, body=body, **params)
 
 
+class SharedLazyDiscoverer(LazyDiscoverer):
+    """A `LazyDiscoverer` which loads the discovery data from `DiscovererCache` instead of the disk cache file.
+
+    The data is decoded with the dynamic client which owns current discoverer, so every discovered `Resource`
+    is bound to the caller's own client. When the data was updated(a full discovery or a lazily discovered
+    api group), it will be written back to the cache by calling `on_update`.
+
+    :param data: the encoded discovery data, load from the disk cache file(or discover) when not given
+    :param on_update: callback which receives the encoded discovery data
+    :param refresh: whether to ignore the cached data and start a full discovery
+    """
+
+    def __init__(
+        self,
+        client,
+        cache_file,
+        data: Optional[str] = None,
+        on_update: Optional[Callable[[str], None]] = None,
+        refresh: bool = False,
+    ):
+        self._shared_data = data
+        self._on_update = on_update
+        self._force_refresh = refresh
+        super().__init__(client, cache_file)
+
+    def _Discoverer__init_cache(self, refresh=False):
+        """Override the private `Discoverer.__init_cache` method to load data from memory"""
+        refresh = refresh or self._force_refresh
+        self._force_refresh = False
+        if not refresh and self._shared_data is not None:
+            try:
+                self._cache = json.loads(self._shared_data, cls=partial(CacheDecoder, self.client))
+            except Exception:
+                logger.exception('Unable to decode the shared discovery data, start refreshing')
+                refresh = True
+            else:
+                self._load_server_info()
+                self.discover()
+                return
+
+        super()._Discoverer__init_cache(refresh)
+        if not refresh:
+            # The data was loaded from the disk cache file, share it with others
+            self._publish()
+
+    def _write_cache(self):
+        super()._write_cache()
+        self._publish()
+
+    def _publish(self):
+        if self._on_update:
+            self._on_update(json.dumps(self._cache, cls=CacheEncoder))
+
+
+class DiscovererCache:
+    """Process-wide cache for the discovery data of kubernetes clusters. The API resources discovered by
+    `LazyDiscoverer` are shared by all kres objects which talk to the same cluster endpoint, so the discovery
+    requests(and the reading of the disk cache file) will not be repeated for every kres object.
+
+    Only the discovery data is cached, every dynamic client is built around the caller's own api client.
+    Clients which do not carry a `cluster_name` attribute(such as `EnhancedApiClient` does) will not use
+    the cache.
+
+    :param ttl: seconds before a cached entry expires, the expired entry will be refreshed by a new discovery
+    """
+
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._stale_keys: Set[Tuple[str, str]] = set()
+        # The generation of each key, increased when the key was invalidated, the discovery data written
+        # by the discoverers of an older generation will be ignored
+        self._generations: Dict[Tuple[str, str], int] = {}
+
+    def get(self, api_client) -> CoreDynamicClient:
+        """Get a dynamic client for given api client, reuse the cached discovery data when possible"""
+        key = self._make_key(api_client)
+        if key is None:
+            return CoreDynamicClient(api_client)
+
+        data: Optional[str] = None
+        force_refresh = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and not self._is_expired(entry[1]):
+                self.hits += 1
+                data = entry[0]
+            else:
+                self.misses += 1
+                force_refresh = bool(entry) or key in self._stale_keys
+                self._stale_keys.discard(key)
+                self._entries.pop(key, None)
+            generation = self._generations.setdefault(key, 0)
+
+        if force_refresh:
+            # The disk cache file may be stale too, force a full discovery
+            logger.info('Discovery cache of %s is stale, start refreshing', key)
+        on_update = partial(self._set, key, generation)
+        return CoreDynamicClient(
+            api_client,
+            discoverer=partial(SharedLazyDiscoverer, data=data, on_update=on_update, refresh=force_refresh),
+        )
+
+    def invalidate(self, cluster_name: str, host: Optional[str] = None):
+        """Remove the cached entries of given cluster, the next `get` will trigger a full discovery
+
+        :param host: only remove entries of this endpoint if given
+        """
+        with self._lock:
+            for key in self._generations:
+                if key[0] == cluster_name and (host is None or key[1] == host):
+                    self._entries.pop(key, None)
+                    self._stale_keys.add(key)
+                    self._generations[key] += 1
+
+    def invalidate_all(self):
+        """Remove the cached entries of all clusters, the next `get` of every cluster will trigger a full
+        discovery
+        """
+        with self._lock:
+            for key in self._generations:
+                self._entries.pop(key, None)
+                self._stale_keys.add(key)
+                self._generations[key] += 1
+
+    def clear(self):
+        with self._lock:
+            for key in self._generations:
+                self._generations[key] += 1
+            self._entries.clear()
+            self._stale_keys.clear()
+
+    def _set(self, key: Tuple[str, str], generation: int, data: str):
+        with self._lock:
+            if self._generations.get(key) != generation:
+                return
+            self._entries[key] = (data, time.monotonic())
+
+    def _is_expired(self, created_at: float) -> bool:
+        return bool(self.ttl) and time.monotonic() - created_at > self.ttl  # type: ignore
+
+    @staticmethod
+    def _make_key(api_client) -> Optional[Tuple[str, str]]:
+        cluster_name = getattr(api_client, 'cluster_name', '')
+        configuration = getattr(api_client, 'configuration', None)
+        if not (cluster_name and configuration):
+            return None
+        return cluster_name, configuration.host
+
+
+_discoverer_cache = DiscovererCache(ttl=DISCOVERY_CACHE_TTL)
+
+
+def get_discoverer_cache() -> DiscovererCache:
+    """Get the process-wide discoverer cache object"""
+    return _discoverer_cache
+
+
 def patch_resource_field_cls():
     """Path original ResourceField class, raise exception when access a non-existent attribute"""
 
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+"""Wait for kubernetes resources using WATCH requests instead of polling"""
+import json
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Callable, Optional, Tuple
+
+from kubernetes import watch
+from kubernetes.client.exceptions import ApiException
+from kubernetes.dynamic.resource import ResourceInstance
+from urllib3.exceptions import HTTPError
+
+from paas_wl.resources.base.constants import WAITER_RETRY_BACKOFF_BASE, WAITER_RETRY_BACKOFF_MAX, WAITER_WATCH_TIMEOUT
+
+if TYPE_CHECKING:
+    from paas_wl.resources.base.kres import BaseKresource, Namespace
+
+logger = logging.getLogger(__name__)
+
+# The condition will be called with the latest object, or None when the resource does not exist
+WaitCondition = Callable[[Optional[ResourceInstance]], bool]
+
+
+class WaitResourceTimeout(Exception):
+    """The condition of resource is not satisfied in given timeout
+
+    :param last_obj: the last seen object, None if the resource does not exist
+    """
+
+    def __init__(self, name: str, timeout: Optional[float], last_obj: Optional[ResourceInstance]):
+        self.name = name
+        self.timeout = timeout
+        self.last_obj = last_obj
+        super().__init__(f'{name} does not satisfy the condition in {timeout} seconds')
+
+
+class ResourceWaiter:
+    """Wait for a single resource to satisfy a condition. Instead of getting the resource periodically,
+    the waiter sends one LIST request to get the current state, then WATCH the resource(field selector on
+    name) from the listed resource version, so the state transitions are noticed immediately.
+
+    The waiter lists again when a WATCH request ends, which covers the expired resource version(410 Gone)
+    and the network errors. After a failed WATCH request, the waiter backs off exponentially before listing
+    again, the backoff never exceeds the remaining time.
+
+    :param kres: kres object of the resource kind, e.g. `KPod(client)`
+    :param name: name of the resource
+    :param namespace: namespace of the resource
+    :param watch_timeout: max seconds of each WATCH request
+    """
+
+    def __init__(
+        self,
+        kres: 'BaseKresource',
+        name: str,
+        namespace: 'Namespace' = None,
+        watch_timeout: float = WAITER_WATCH_TIMEOUT,
+    ):
+        self.kres = kres
+        self.name = name
+        self.namespace = namespace
+        self.watch_timeout = watch_timeout
+        self._resource = kres.ops_name.resource
+
+    def wait(self, condition: WaitCondition, timeout: Optional[float] = None) -> Optional[ResourceInstance]:
+        """Block until `condition` returns True, exceptions raised by `condition` will be propagated.
+
+        :param timeout: timeout seconds, default to never timeout
+        :return: the object which satisfies the condition
+        :raises: WaitResourceTimeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        failures = 0
+        while True:
+            obj, resource_version = self._list()
+            if condition(obj):
+                return obj
+
+            remaining = self._get_remaining(deadline)
+            if remaining is not None and remaining <= 0:
+                raise WaitResourceTimeout(self.name, timeout, obj)
+
+            satisfied, obj, failed = self._wait_events(condition, resource_version, remaining)
+            if satisfied:
+                return obj
+
+            if deadline is not None and time.monotonic() >= deadline:
+                # Check the latest state once before giving up
+                obj, _ = self._list()
+                if condition(obj):
+                    return obj
+                raise WaitResourceTimeout(self.name, timeout, obj)
+
+            failures = failures + 1 if failed else 0
+            if failures:
+                self._backoff(failures, deadline)
+
+    def _wait_events(
+        self, condition: WaitCondition, resource_version: str, remaining: Optional[float]
+    ) -> Tuple[bool, Optional[ResourceInstance], bool]:
+        """Check the condition on every event until the WATCH request ends
+
+        :return: (whether the condition is satisfied, the latest object, whether the WATCH request failed)
+        """
+        obj = None
+        try:
+            for event_type, event_obj in self._watch(resource_version, remaining):
+                if event_type == 'DELETED':
+                    obj = None
+                elif event_type in ('ADDED', 'MODIFIED'):
+                    obj = event_obj
+                else:
+                    continue
+
+                if condition(obj):
+                    return True, obj, False
+        except ApiException as e:
+            # The resource version is expired(the watch stream raises ERROR events as ApiException), list again
+            if e.status != 410:
+                raise
+            logger.info('Resource version of %s expired, list again', self.name)
+            return False, obj, True
+        except HTTPError as e:
+            # Timeout or broken connection, list again
+            logger.debug('Watch request of %s ended: %s', self.name, e)
+            return False, obj, True
+        return False, obj, False
+
+    def _backoff(self, failures: int, deadline: Optional[float]):
+        """Sleep before listing again after `failures` consecutive failed WATCH requests"""
+        delay = min(WAITER_RETRY_BACKOFF_BASE * 2 ** (failures - 1), WAITER_RETRY_BACKOFF_MAX)
+        remaining = self._get_remaining(deadline)
+        if remaining is not None:
+            delay = min(delay, remaining)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _list(self) -> Tuple[Optional[ResourceInstance], str]:
+        """List the resource by name, return the object(None if not exists) and the resource version"""
+        resp = self._resource.get(
+            namespace=self.namespace,
+            field_selector=self._field_selector,
+            serialize=False,
+            **self.kres.ops_name.default_kwargs,
+        )
+        ret = json.loads(resp.data)
+        items = ret.get('items') or []
+        if not items:
+            return None, ret['metadata']['resourceVersion']
+
+        # The items of a list response do not contain "kind" and "apiVersion"
+        item = {'kind': self._resource.kind, 'apiVersion': ret.get('apiVersion'), **items[0]}
+        return ResourceInstance(self._resource, item), ret['metadata']['resourceVersion']
+
+    def _watch(self, resource_version: str, remaining: Optional[float]):
+        """Watch the resource from given resource version, yield (event_type, object)"""
+        watch_timeout = self.watch_timeout if remaining is None else min(self.watch_timeout, remaining)
+        stream = watch.Watch().stream(
+            self._resource.get,
+            namespace=self.namespace,
+            field_selector=self._field_selector,
+            resource_version=resource_version,
+            serialize=False,
+            # The server side timeout must be an integer, use the client side timeout to make it precise
+            timeout_seconds=max(math.ceil(watch_timeout), 1),
+            _request_timeout=watch_timeout,
+        )
+        for event in stream:
+            yield event['type'], ResourceInstance(self._resource, event['raw_object'])
+
+    @property
+    def _field_selector(self) -> str:
+        return f'metadata.name={self.name}'
+
+    @staticmethod
+    def _get_remaining(deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        return deadline - time.monotonic()
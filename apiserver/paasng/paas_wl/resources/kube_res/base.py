@@ -16,9 +16,7 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
-import datetime
 import logging
-import time
 from abc import ABCMeta, abstractmethod
 from collections import OrderedDict
 from contextlib import contextmanager
@@ -45,6 +43,7 @@ from kubernetes.dynamic import ResourceField, ResourceInstance
 from paas_wl.platform.applications.models import WlApp
 from paas_wl.resources.base import kres
 from paas_wl.resources.base.exceptions import ResourceDeleteTimeout, ResourceMissing
+from paas_wl.resources.base.waiter import ResourceWaiter, WaitResourceTimeout
 from paas_wl.resources.kube_res.exceptions import (
     APIServerVersionIncompatible,
     AppEntityNotFound,
@@ -295,6 +294,30 @@ class AppEntityReader(Generic[AET]):
         res._kube_data = kube_data
         return res
 
+    def wait_for(
+        self, app: WlApp, name: str, condition: Callable[[Optional[AET]], bool], timeout: Optional[float] = None
+    ) -> Optional[AET]:
+        """Block until the resource satisfies `condition`, the resource is watched instead of polling.
+
+        :param condition: will be called with the latest resource, or None when the resource does not exist,
+            exceptions raised by it will be propagated
+        :param timeout: timeout seconds, default to never timeout
+        :return: the resource which satisfies the condition
+        :raises: WaitResourceTimeout
+        """
+        deserializer = self._make_deserializer(app)
+
+        def _load(kube_data: Optional[ResourceInstance]) -> Optional[AET]:
+            if kube_data is None:
+                return None
+            res = deserializer.deserialize(app, kube_data)
+            res._kube_data = kube_data
+            return res
+
+        with self.kres(app, api_version=deserializer.get_apiversion()) as kres_client:
+            waiter = ResourceWaiter(kres_client, name, namespace=self._get_namespace(app))
+            return _load(waiter.wait(lambda kube_data: condition(_load(kube_data)), timeout=timeout))
+
     def list_by_app(self, app: WlApp, labels: Optional[Dict] = None) -> List[AET]:
         """List all app's resources"""
         return self.list_by_app_with_meta(app, labels=labels).items
@@ -498,8 +521,6 @@ class AppEntityManager(AppEntityReader, Generic[AET]):
 class WaitDelete(Generic[AET]):
     """A helper to wait resource actually be deleted from the k8s server"""
 
-    _check_interval = 1
-
     def __init__(self, reader: AppEntityReader[AET], app: WlApp, name: str, namespace: str):
         self.reader = reader
         self.app = app
@@ -513,15 +534,11 @@ class WaitDelete(Generic[AET]):
         :param raise_timeout: whether to throw an exception when timeout.
         :return: whether actually be deleted, `true` for be deleted.
         """
-        now = datetime.datetime.now()
-        when_timeout = now + datetime.timedelta(seconds=max_wait_seconds)
-        while now <= when_timeout:
-            time.sleep(self._check_interval)
-            now = datetime.datetime.now()
-            try:
-                self.reader.get(app=self.app, name=self.name)
-            except AppEntityNotFound:
-                return True
+        try:
+            self.reader.wait_for(self.app, self.name, lambda res: res is None, timeout=max_wait_seconds)
+            return True
+        except WaitResourceTimeout:
+            pass
         if raise_timeout:
             raise ResourceDeleteTimeout(
                 resource_type=self.reader.entity_type.__name__, namespace=self.namespace, name=self.name
@@ -39,6 +39,7 @@ from paas_wl.workloads.autoscaling.exceptions import AutoscalingUnsupported
 from paas_wl.workloads.autoscaling.models import AutoscalingConfig, ScalingObjectRef
 from paas_wl.workloads.processes.constants import ProcessTargetStatus
 from paas_wl.workloads.processes.exceptions import ProcessNotFound, ProcessOperationTooOften, ScaleProcessError
+from paas_wl.workloads.processes.informers import is_informer_enabled, list_instances, list_processes
 from paas_wl.workloads.processes.managers import AppProcessManager
 from paas_wl.workloads.processes.models import Process, ProcessSpec
 from paas_wl.workloads.processes.readers import instance_kmodel, process_kmodel
@@ -302,10 +303,14 @@ def get_processes_status(app: WlApp) -> List[Process]:
     except Release.DoesNotExist:
         return results
 
+    use_informer = is_informer_enabled()
     for process_type in procfile:
         try:
-            process = process_kmodel.get_by_type(app, process_type)
-            process.instances = instance_kmodel.list_by_process_type(app, process_type)
+            if use_informer:
+                process = _get_process_from_informer(app, process_type)
+            else:
+                process = process_kmodel.get_by_type(app, process_type)
+                process.instances = instance_kmodel.list_by_process_type(app, process_type)
         except AppEntityNotFound:
             logger.info("process<%s/%s> missing in k8s cluster" % (app.name, process_type))
             continue
@@ -314,6 +319,19 @@ def get_processes_status(app: WlApp) -> List[Process]:
     return results
 
 
+def _get_process_from_informer(app: WlApp, process_type: str) -> Process:
+    """Get process(including instances) by type from the informers
+
+    :raises: AppEntityNotFound if not found
+    """
+    procs = list_processes(app, process_type).items
+    if not procs:
+        raise AppEntityNotFound(f'No processes can be found with type={process_type}')
+    process = procs[0]
+    process.instances = list_instances(app, process_type).items
+    return process
+
+
 def env_is_running(env: ModuleEnvironment) -> bool:
     """Check if an env is running, which mean a successful deployment is available
     for the env. This status is useful in many situations, such as creating a custom
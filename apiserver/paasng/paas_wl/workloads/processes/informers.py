@@ -0,0 +1,412 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+"""In-process informers for processes and instances
+
+An informer maintains only one LIST+WATCH for a kind of resource in an app's namespace, the
+entities were kept in memory. Reads and watch streams of the same app are all served by the informer
+instead of calling the kube-apiserver for every request.
+
+NOTE: The informers are shared within current process only, every worker process keeps its own informers.
+"""
+import copy
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Generator, Generic, List, Optional, Set, Tuple, Type
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from kubernetes.dynamic import ResourceField
+
+from paas_wl.cluster.utils import get_cluster_by_app
+from paas_wl.platform.applications.models import WlApp
+from paas_wl.resources.kube_res.base import AET, AppEntityReader, ResourceList
+from paas_wl.resources.kube_res.exceptions import WatchKubeResourceError
+from paas_wl.workloads.processes.models import Instance, Process
+from paas_wl.workloads.processes.readers import ProcessAPIAdapter, instance_kmodel, process_kmodel
+
+logger = logging.getLogger(__name__)
+
+# Event type which will be sent to subscribers when events can not be delivered correctly, the
+# subscriber should re-list the resources after receiving this event.
+EVENT_TYPE_ERROR = 'ERROR'
+
+
+class Subscription:
+    """A subscription of informer events, multiple informers can share one subscription object
+
+    :param maxsize: max number of events buffered for current subscriber, when the buffer is full,
+        the subscription will be marked as overflowed and stop receiving more events.
+    """
+
+    def __init__(self, maxsize: int = 1000):
+        self.queue: 'queue.Queue[Dict]' = queue.Queue(maxsize=maxsize)
+        self.overflowed = False
+        self.informers: List['ResourceInformer'] = []
+
+    def put(self, event: Dict):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            logger.warning('Subscription buffer is full, stop delivering events to it')
+            self.overflowed = True
+
+    def iter_events(self, timeout_seconds: float) -> Generator[Dict, None, None]:
+        """Iterate over the received events until timeout
+
+        :param timeout_seconds: total seconds before the iteration stops
+        """
+        deadline = time.monotonic() + timeout_seconds
+        try:
+            while (remaining := deadline - time.monotonic()) > 0:
+                try:
+                    yield self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if self.overflowed and self.queue.empty():
+                    yield {'type': EVENT_TYPE_ERROR, 'message': 'too many events, please list resources again'}
+                    break
+        finally:
+            self.close()
+
+    def close(self):
+        for informer in self.informers:
+            informer.unsubscribe(self)
+        self.informers = []
+
+
+class ResourceInformer(Generic[AET]):
+    """Maintains the entities of one kind in an app's namespace by a background LIST+WATCH loop
+
+    :param reader: The reader object for listing and watching resources
+    :param app: The app object
+    :param index_func: A function returns the index key of an entity, such as the process type
+    :param items_filter: A function for filtering the listed entities, such as removing the hook instances
+    :param watch_timeout: timeout seconds for every single watch request
+    :param idle_timeout: the informer stops when no one uses it for this long
+    :param history_size: how many recent events are kept, for resuming watches by resource version
+    """
+
+    def __init__(
+        self,
+        reader: AppEntityReader[AET],
+        app: WlApp,
+        index_func: Callable[[AET], str],
+        items_filter: Optional[Callable[[WlApp, List[AET]], List[AET]]] = None,
+        watch_timeout: int = 60 * 5,
+        idle_timeout: int = 60 * 5,
+        history_size: int = 500,
+    ):
+        self.reader = reader
+        self.app = app
+        self.index_func = index_func
+        self.items_filter = items_filter
+        self.watch_timeout = watch_timeout
+        self.idle_timeout = idle_timeout
+
+        self._lock = threading.RLock()
+        self._synced = threading.Event()
+        # Set when the first LIST has been attempted, no matter whether it succeeded or not
+        self._sync_attempted = threading.Event()
+        self.last_error: Optional[Exception] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_accessed = time.monotonic()
+
+        self._items: Dict[str, AET] = {}
+        self._index: Dict[str, Set[str]] = {}
+        self._resource_version: Optional[str] = None
+        self._subscriptions: Set[Subscription] = set()
+        # The history is complete for all events later than `_history_start_rv`
+        self._history: Deque[Tuple[int, Dict]] = deque(maxlen=history_size)
+        self._history_start_rv = 0
+
+    def start(self):
+        with self._lock:
+            if self.is_alive():
+                return
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+    def is_alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive()) and not self._stopped.is_set()
+
+    def wait_for_synced(self, timeout: float) -> bool:
+        """Wait until the first LIST has been finished, return False if timeout or the latest LIST/WATCH has
+        failed, the caller should not wait for the informer again until it's synced by a later retry.
+        """
+        self._touch()
+        self._sync_attempted.wait(timeout)
+        return self._synced.is_set()
+
+    def list(self, labels: Optional[Dict] = None, index_key: Optional[str] = None) -> ResourceList[AET]:
+        """List entities from memory, the result objects are copies of the stored ones
+
+        :param labels: only include entities with given labels
+        :param index_key: only include entities with given index key(such as process type)
+        """
+        self._touch()
+        with self._lock:
+            if index_key is not None:
+                objs = [self._items[name] for name in self._index.get(index_key, ())]
+            else:
+                objs = list(self._items.values())
+            rv = self._resource_version
+
+        items = [copy.copy(obj) for obj in objs if self._match_labels(obj, labels)]
+        if self.items_filter:
+            items = self.items_filter(self.app, items)
+        items.sort(key=lambda obj: obj.name)
+        return ResourceList[AET](items=items, metadata=ResourceField({'resourceVersion': rv}))
+
+    def subscribe(self, subscription: Subscription, resource_version: Optional[int] = None):
+        """Subscribe events, behaves like the kubernetes watch API:
+
+        - when resource_version is None, synthetic "ADDED" events of all entities will be sent first
+        - otherwise only events with greater resource version will be sent, if the history of given
+          version is no longer available, an "ERROR" event will be sent.
+        """
+        self._touch()
+        with self._lock:
+            if resource_version is None:
+                for obj in self._items.values():
+                    subscription.put({'type': 'ADDED', 'res_object': copy.copy(obj)})
+            elif resource_version < self._history_start_rv:
+                subscription.put(
+                    {'type': EVENT_TYPE_ERROR, 'message': f'too old resource version: {resource_version}'}
+                )
+            else:
+                for rv, event in self._history:
+                    if rv > resource_version:
+                        subscription.put(event)
+
+            self._subscriptions.add(subscription)
+            subscription.informers.append(self)
+
+    def unsubscribe(self, subscription: Subscription):
+        self._touch()
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def _run(self):
+        try:
+            while not self._stopped.is_set():
+                if self._is_idle():
+                    logger.info('Informer of %s for app %s is idle, stop it', self.reader.entity_type, self.app)
+                    break
+
+                try:
+                    self._list()
+                    self._watch()
+                except Exception as e:
+                    logger.exception(
+                        'Informer of %s for app %s failed, retry later', self.reader.entity_type, self.app
+                    )
+                    self.last_error = e
+                    # The stored entities may be stale from now on, readers should fall back to direct LISTs
+                    # until a relist succeeds
+                    self._synced.clear()
+                    self._sync_attempted.set()
+                    self._stopped.wait(5)
+                finally:
+                    close_old_connections()
+        finally:
+            self._stopped.set()
+            connection.close()
+
+    def _list(self):
+        resources = self.reader.list_by_app_with_meta(self.app)
+        rv = resources.get_resource_version()
+        with self._lock:
+            # Send events for the differences between the old and the new items
+            new_items = {obj.name: obj for obj in resources.items}
+            for name, obj in self._items.items():
+                if name not in new_items:
+                    self._broadcast('DELETED', obj)
+            for obj in new_items.values():
+                self._broadcast('MODIFIED' if obj.name in self._items else 'ADDED', obj)
+
+            self._items = {}
+            self._index = {}
+            for obj in resources.items:
+                self._store(obj)
+            self._resource_version = rv
+            self._history.clear()
+            self._history_start_rv = int(rv)
+        self.last_error = None
+        self._synced.set()
+        self._sync_attempted.set()
+
+    def _watch(self):
+        """Watch resources from the latest resource version, return when the watch request ends. Raise
+        exception when the resource version is expired.
+        """
+        while not (self._stopped.is_set() or self._is_idle()):
+            try:
+                stream = self.reader.watch_by_app(
+                    self.app, resource_version=self._resource_version, timeout_seconds=self.watch_timeout
+                )
+                for event in stream:
+                    self._handle_event(event)
+                    if self._stopped.is_set():
+                        return
+            except WatchKubeResourceError as e:
+                logger.info('Resource version expired, list again, reason: %s', e)
+                return
+
+    def _handle_event(self, event: Dict):
+        obj: AET = event['res_object']
+        rv = obj.get_resource_version()
+        with self._lock:
+            if event['type'] == 'DELETED':
+                self._remove(obj.name)
+            else:
+                self._remove(obj.name)
+                self._store(obj)
+            self._resource_version = rv
+            self._broadcast(event['type'], obj)
+
+    def _store(self, obj: AET):
+        self._items[obj.name] = obj
+        self._index.setdefault(self.index_func(obj), set()).add(obj.name)
+
+    def _remove(self, name: str):
+        obj = self._items.pop(name, None)
+        if obj is not None:
+            self._index.get(self.index_func(obj), set()).discard(name)
+
+    def _broadcast(self, type_: str, obj: AET):
+        event = {'type': type_, 'res_object': obj}
+        rv = obj.get_resource_version()
+        if rv:
+            if len(self._history) == self._history.maxlen:
+                self._history_start_rv = self._history[0][0]
+            self._history.append((int(rv), event))
+        for subscription in self._subscriptions:
+            subscription.put({'type': type_, 'res_object': copy.copy(obj)})
+
+    def _touch(self):
+        self._last_accessed = time.monotonic()
+
+    def _is_idle(self) -> bool:
+        with self._lock:
+            if self._subscriptions:
+                return False
+        return time.monotonic() - self._last_accessed > self.idle_timeout
+
+    @staticmethod
+    def _match_labels(obj: AET, labels: Optional[Dict]) -> bool:
+        if not labels:
+            return True
+        obj_labels = obj._kube_data.metadata.labels if obj._kube_data else None
+        if not obj_labels:
+            return False
+        return all(obj_labels.get(key) == value for key, value in labels.items())
+
+
+class InformerRegistry:
+    """Holds the running informers of current process, keyed by cluster, namespace, entity type and app.
+
+    The app is a part of the key because entities are bound to the app which owns the informer, and
+    the modules of a cloud-native application share one namespace.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._informers: Dict[Tuple[str, str, Type, str], ResourceInformer] = {}
+
+    def get(self, reader: AppEntityReader[AET], app: WlApp, **kwargs) -> ResourceInformer[AET]:
+        """Get a running informer, a new informer will be started if absent
+
+        :param kwargs: extra params for initializing the informer
+        """
+        key = (get_cluster_by_app(app).name, app.namespace, reader.entity_type, str(app.uuid))
+        with self._lock:
+            informer = self._informers.get(key)
+            if informer is None or not informer.is_alive():
+                informer = ResourceInformer(reader, app, **kwargs)
+                informer.start()
+                self._informers[key] = informer
+            return informer
+
+    def stop_all(self):
+        with self._lock:
+            for informer in self._informers.values():
+                informer.stop()
+            self._informers.clear()
+
+
+informer_registry = InformerRegistry()
+
+
+def is_informer_enabled() -> bool:
+    return settings.PROCESS_INFORMER_ENABLED
+
+
+def get_process_informer(app: WlApp) -> Optional[ResourceInformer[Process]]:
+    """Get the synced process informer of app, return None when it's not ready"""
+    return _get_synced_informer(process_kmodel, app, index_func=lambda obj: obj.type)
+
+
+def get_instance_informer(app: WlApp) -> Optional[ResourceInformer[Instance]]:
+    """Get the synced instance informer of app, return None when it's not ready"""
+    return _get_synced_informer(
+        instance_kmodel,
+        app,
+        index_func=lambda obj: obj.process_type,
+        items_filter=instance_kmodel.filter_insts,
+    )
+
+
+def _get_synced_informer(reader: AppEntityReader[AET], app: WlApp, **kwargs) -> Optional[ResourceInformer[AET]]:
+    informer = informer_registry.get(reader, app, **kwargs)
+    if not informer.wait_for_synced(settings.PROCESS_INFORMER_SYNC_TIMEOUT):
+        logger.warning('Informer of %s for app %s is not synced in time', reader.entity_type, app)
+        return None
+    return informer
+
+
+def list_processes(app: WlApp, process_type: Optional[str] = None) -> ResourceList[Process]:
+    """List processes of app, read from the informer if it's enabled
+
+    :param process_type: only include processes of this type if given
+    """
+    labels = ProcessAPIAdapter.get_kube_pod_selector(app, process_type) if process_type else None
+    if is_informer_enabled() and (informer := get_process_informer(app)):
+        return informer.list(labels=labels, index_key=process_type)
+    return process_kmodel.list_by_app_with_meta(app, labels=labels)
+
+
+def list_instances(app: WlApp, process_type: Optional[str] = None) -> ResourceList[Instance]:
+    """List instances of app, read from the informer if it's enabled
+
+    :param process_type: only include instances of this type if given
+    """
+    labels = ProcessAPIAdapter.get_kube_pod_selector(app, process_type) if process_type else None
+    if is_informer_enabled() and (informer := get_instance_informer(app)):
+        return informer.list(labels=labels, index_key=process_type)
+    return instance_kmodel.list_by_app_with_meta(app, labels=labels)
@@ -70,13 +70,16 @@ class InstanceReader(AppEntityReader[Instance]):
     def list_by_app_with_meta(self, app: 'WlApp', labels: Optional[Dict] = None) -> ResourceList[Instance]:
         """Overwrite original method to remove slugbuilder pods"""
         resources = super().list_by_app_with_meta(app, labels=labels)
-        if app.type == WlAppType.CLOUD_NATIVE:
-            resources.items = list(self.filter_cnative_insts(app, resources.items))
-        else:
-            # Ignore instances with no valid "release_version" label
-            resources.items = [r for r in resources.items if r.version > 0]
+        resources.items = self.filter_insts(app, resources.items)
         return resources
 
+    def filter_insts(self, app: 'WlApp', items: List[Instance]) -> List[Instance]:
+        """Remove instances which are not belong to any processes"""
+        if app.type == WlAppType.CLOUD_NATIVE:
+            return list(self.filter_cnative_insts(app, items))
+        # Ignore instances with no valid "release_version" label
+        return [r for r in items if r.version > 0]
+
     def get_logs(self, obj: Instance, tail_lines: Optional[int] = None, **kwargs):
         """Get logs from kubernetes api"""
         with self.kres(obj.app) as kres_client:
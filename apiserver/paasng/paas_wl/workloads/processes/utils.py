@@ -17,9 +17,17 @@ We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
 import os
-from typing import List
+import time
+from typing import Iterator, List, Optional, Set, Tuple
 
 from paas_wl.resources.base.kube_client import CoreDynamicClient
+from paas_wl.workloads.processes.constants import PROCESS_NAME_KEY
+
+# 分页查询 Deployment 时每页的数量
+DEPLOYMENT_LIST_PAGE_SIZE = 500
+
+# 蓝鲸应用的 Deployment 至少带有以下标签之一(普通应用为 pod_selector, 云原生应用为进程名), 用于在 apiserver 端过滤
+BKAPP_DEPLOYMENT_LABEL_SELECTORS = ("pod_selector", PROCESS_NAME_KEY)
 
 
 def get_command_name(command: str) -> str:
@@ -40,22 +48,66 @@ def find_deployment_condition(conditions: List, cond_type: str):
     return None
 
 
-def list_unavailable_deployment(client: CoreDynamicClient) -> List:
-    """查询整个命名空间下的deployments，并通过replica，获取不处于 Available 的 deployments"""
-    unavailable_deployments = []
+def is_deployment_available(deployment) -> bool:
+    """判断 Deployment 是否处于 Available 状态"""
+    # 只有当前就绪的副本数等于需要的副本数时, Deployment 才完成滚动更新
+    if deployment.status.get("updatedReplicas", None) != deployment.status.get("replicas", None):
+        return False
+    available_cond = find_deployment_condition(deployment.status.get("conditions") or [], "Available")
+    return bool(available_cond and available_cond.status == "True")
+
+
+def iter_deployments(
+    client: CoreDynamicClient,
+    label_selector: Optional[str] = None,
+    page_size: int = DEPLOYMENT_LIST_PAGE_SIZE,
+    deadline: Optional[float] = None,
+) -> Iterator:
+    """分页查询集群中所有命名空间下的 Deployments
+
+    :param label_selector: 标签选择器, 由 apiserver 过滤
+    :param page_size: 每页的数量
+    :param deadline: 截止时间(time.monotonic()), 超过后抛出 TimeoutError
+    """
     kind_deployment = client.get_preferred_resource(kind="Deployment")
-    deployment_list = client.get(kind_deployment)
+    continue_token = None
+    while True:
+        kwargs = {}
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("listing deployments timed out")
+            kwargs["_request_timeout"] = remaining
+
+        deployment_list = client.get(
+            kind_deployment, label_selector=label_selector, limit=page_size, _continue=continue_token, **kwargs
+        )
+        yield from deployment_list.items
 
-    for deployment in deployment_list.items:
-        # 判断 Deployment 是否由蓝鲸应用的工作负载
-        if not deployment.metadata.namespace.startswith('bkapp'):
-            continue
+        continue_token = deployment_list.metadata.get("continue")
+        if not continue_token:
+            return
 
-        # 只有当前就绪的副本数等于需要的副本数时, Deployment 才完成滚动更新
-        if deployment.status.get("updatedReplicas", None) == deployment.status.get("replicas", None):
-            available_cond = find_deployment_condition(deployment.status.get("conditions") or [], "Available")
-            if available_cond and available_cond.status == "True":
+
+def list_unavailable_deployment(client: CoreDynamicClient, deadline: Optional[float] = None) -> List:
+    """查询集群中蓝鲸应用的 deployments，并通过replica，获取不处于 Available 的 deployments
+
+    :param deadline: 截止时间(time.monotonic()), 超过后抛出 TimeoutError
+    """
+    unavailable_deployments = []
+    visited: Set[Tuple[str, str]] = set()
+    for label_selector in BKAPP_DEPLOYMENT_LABEL_SELECTORS:
+        for deployment in iter_deployments(client, label_selector=label_selector, deadline=deadline):
+            # 判断 Deployment 是否由蓝鲸应用的工作负载
+            if not deployment.metadata.namespace.startswith('bkapp'):
                 continue
-        # 其他情况的 Deployment 均认为 unavailable
-        unavailable_deployments.append(deployment)
+
+            key = (deployment.metadata.namespace, deployment.metadata.name)
+            if key in visited:
+                continue
+            visited.add(key)
+
+            # 其他情况的 Deployment 均认为 unavailable
+            if not is_deployment_available(deployment):
+                unavailable_deployments.append(deployment)
     return unavailable_deployments
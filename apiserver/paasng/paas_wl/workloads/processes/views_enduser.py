@@ -48,16 +48,16 @@ from paas_wl.workloads.processes.drf_serializers import (
     WatchProcessesSLZ,
 )
 from paas_wl.workloads.processes.exceptions import ProcessNotFound, ProcessOperationTooOften, ScaleProcessError
+from paas_wl.workloads.processes.informers import list_instances, list_processes
 from paas_wl.workloads.processes.managers import AppProcessManager
 from paas_wl.workloads.processes.models import Instance, ProcessSpec
-from paas_wl.workloads.processes.readers import instance_kmodel, process_kmodel
 from paas_wl.workloads.processes.watch import watch_process_events
 from paasng.accessories.iam.permissions.resources.application import AppAction
 from paasng.accounts.permissions.application import application_perm_class
 from paasng.platform.applications.mixins import ApplicationCodeInPathMixin
 from paasng.platform.applications.models import ModuleEnvironment
 from paasng.platform.operations.constant import OperationType
-from paasng.utils.rate_limit.constants import UserAction
+from paasng.utils.rate_limit.constants import RateLimitAlgorithm, UserAction
 from paasng.utils.rate_limit.fixed_window import rate_limits_by_user
 
 logger = logging.getLogger(__name__)
@@ -142,7 +142,6 @@ class ProcessesViewSet(GenericViewSet, ApplicationCodeInPathMixin):
 
 
 class ListAndWatchProcsViewSet(GenericViewSet, ApplicationCodeInPathMixin):
-
     permission_classes = [IsAuthenticated, application_perm_class(AppAction.BASIC_DEVELOP)]
 
     # Use special negotiation class to accept "text/event-stream" content type
@@ -166,7 +165,9 @@ class ListAndWatchProcsViewSet(GenericViewSet, ApplicationCodeInPathMixin):
         data['cnative_proc_specs'] = CNativeProcSpecSLZ(get_proc_specs(env), many=True).data
         return Response(data)
 
-    @rate_limits_by_user(UserAction.WATCH_PROCESS, window_size=60, threshold=10)
+    @rate_limits_by_user(
+        UserAction.WATCH_PROCESS, window_size=60, threshold=10, algorithm=RateLimitAlgorithm.SLIDING_WINDOW
+    )
     def watch(self, request, code, module_name, environment):
         """实时监听进程与进程实例变动情况"""
         wl_app = self.get_wl_app_via_path()
@@ -210,10 +211,10 @@ def get_proc_insts(wl_app: WlApp, release_id: Optional[str] = None) -> Dict:
     :param release_id: if given, include instances created by given release only
     :return: A dict with "processes" and "instances"
     """
-    procs = process_kmodel.list_by_app_with_meta(app=wl_app)
+    procs = list_processes(wl_app)
     procs_items = ProcSpecsSerializer(procs.items, many=True)
 
-    insts = instance_kmodel.list_by_app_with_meta(app=wl_app)
+    insts = list_instances(wl_app)
     insts_items = InstanceForDisplaySLZ(insts.items, many=True)
 
     # Filter instances if required
@@ -29,6 +29,12 @@ from paas_wl.platform.applications.models import WlApp
 from paas_wl.platform.system_api.serializers import InstanceSerializer, ProcSpecsSerializer
 from paas_wl.resources.kube_res.base import AppEntity
 from paas_wl.resources.kube_res.exceptions import WatchKubeResourceError
+from paas_wl.workloads.processes.informers import (
+    Subscription,
+    get_instance_informer,
+    get_process_informer,
+    is_informer_enabled,
+)
 from paas_wl.workloads.processes.models import Instance, Process
 from paas_wl.workloads.processes.readers import instance_kmodel, process_kmodel
 
@@ -44,6 +50,20 @@ def watch_process_events(
     :param rv_proc: if given, only events with greater resource_version will be returned
     :param rv_inst: same as rv_proc, but for ProcInst type
     """
+    if is_informer_enabled():
+        proc_informer, inst_informer = get_process_informer(app), get_instance_informer(app)
+        if proc_informer and inst_informer:
+            # Events of both informers are delivered to one subscription, no extra threads are required
+            subscription = Subscription()
+            proc_informer.subscribe(subscription, resource_version=rv_proc)
+            inst_informer.subscribe(subscription, resource_version=rv_inst)
+            try:
+                for event in subscription.iter_events(timeout_seconds):
+                    yield asdict(ProcWatchEvent.make_event(event))
+            finally:
+                subscription.close()
+            return
+
     kwargs = {'timeout_seconds': timeout_seconds}
 
     event_gens: List[Iterable] = [
@@ -57,20 +77,30 @@ def watch_process_events(
     # Use with caution.
     parallel_gen = ParallelChainedGenerator(event_gens)
     parallel_gen.start()
-    for event in parallel_gen.iter_results():
-        yield asdict(ProcWatchEvent.make_event(event))
-
-    parallel_gen.close()
+    try:
+        for event in parallel_gen.iter_results():
+            yield asdict(ProcWatchEvent.make_event(event))
+    finally:
+        # Stop consuming the generators when the client has gone away
+        parallel_gen.close()
 
 
 class ParallelChainedGenerator:
-    """Consumes multiple generators in parallel"""
+    """Consumes multiple generators in parallel
+
+    :param maxsize: max number of buffered results, the consuming of generators will be blocked when the
+        buffer is full, until the results were taken away by `iter_results`.
+    """
+
+    # A special object which marks the end of a generator
+    _sentinel = object()
 
-    def __init__(self, generators: List):
-        self.queue: 'queue.Queue[Any]' = queue.Queue()
+    def __init__(self, generators: List, maxsize: int = 1000):
+        self.queue: 'queue.Queue[Any]' = queue.Queue(maxsize=maxsize)
         self.generators = generators
         self.tasks: List = []
         self._started = False
+        self._closed = threading.Event()
 
     def start(self):
         """Start current generator"""
@@ -86,36 +116,47 @@ class ParallelChainedGenerator:
         """Consumes generator and put result to queue"""
         try:
             for value in gen:
-                self.queue.put(value)
+                if not self._put(value):
+                    break
         except WatchKubeResourceError as e:
             logger.warning('Watch resource error: %s', str(e))
-            self.queue.put({'type': 'ERROR', 'message': str(e)})
+            self._put({'type': 'ERROR', 'message': str(e)})
         except Exception as e:
             logger.exception('Error while consuming generator: %s', str(e))
         finally:
+            self._put(self._sentinel)
             # Always close connection in every thread to avoid leaking of database connections
             connection.close()
 
+    def _put(self, item: Any) -> bool:
+        """Put an item to queue, block when the queue is full
+
+        :return: False if current generator has been closed
+        """
+        while not self._closed.is_set():
+            try:
+                self.queue.put(item, timeout=1)
+            except queue.Full:
+                continue
+            return True
+        return False
+
     def iter_results(self) -> Generator[Any, None, None]:
         """yield results as a generator"""
         if not self._started:
             raise ValueError('current generator is not started yet')
 
-        while True:
-            try:
-                item = self.queue.get(timeout=0.5)
-            except queue.Empty:
-                pass
-            else:
-                yield item
-                self.queue.task_done()
-
-            all_task_finished = all(not task.is_alive() for task in self.tasks)
-            if all_task_finished and self.queue.empty():
-                break
+        finished_cnt = 0
+        while finished_cnt < len(self.tasks):
+            item = self.queue.get()
+            if item is self._sentinel:
+                finished_cnt += 1
+                continue
+            yield item
 
     def close(self):
-        pass
+        """Close current generator, the consuming threads will exit when they receive next result"""
+        self._closed.set()
 
 
 @dataclass
@@ -16,20 +16,85 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
-from typing import Dict, List, Union
+import logging
+from typing import Dict, Iterable, List, Union
 
 from bkpaas_auth.core.encoder import user_id_encoder
 from django.conf import settings
+from django.core.cache import cache
 
 from paasng.accessories.iam.members.models import ApplicationGradeManager, ApplicationUserGroup
+from paasng.accessories.iam.permissions.resources.application import user_app_policy_cache
 from paasng.platform.applications.constants import ApplicationRole
 
 from .client import BKIAMClient
 from .constants import APP_DEFAULT_ROLES, NEVER_EXPIRE_DAYS
 
+logger = logging.getLogger(__name__)
+
 IAM_CLI = BKIAMClient()
 
 
+class UserGroupMembersCache:
+    """权限中心用户组成员的缓存，以用户组 ID 为键，通过本模块变更成员时会主动失效
+
+    :param timeout: 缓存过期时间（秒），为 0 时不使用缓存
+    """
+
+    key_prefix = 'bk_paas3:iam:user_group_members'
+
+    def __init__(self, timeout: int):
+        self.timeout = timeout
+
+    def get(self, user_group_id: int) -> List[str]:
+        """获取用户组成员"""
+        return self.get_many([user_group_id])[user_group_id]
+
+    def get_many(self, user_group_ids: Iterable[int]) -> Dict[int, List[str]]:
+        """批量获取用户组成员，未命中缓存的用户组将从权限中心查询
+
+        :returns: {user_group_id: ['username1', 'username2']}
+        """
+        user_group_ids = list(dict.fromkeys(user_group_ids))
+        members: Dict[int, List[str]] = {}
+        if self.timeout and user_group_ids:
+            try:
+                cached = cache.get_many([self._make_key(group_id) for group_id in user_group_ids])
+            except Exception:
+                logger.exception('Unable to get user group members from cache')
+                cached = {}
+            for group_id in user_group_ids:
+                if (key := self._make_key(group_id)) in cached:
+                    members[group_id] = cached[key]
+
+        fetched = {
+            group_id: IAM_CLI.fetch_user_group_members(group_id)
+            for group_id in user_group_ids
+            if group_id not in members
+        }
+        if self.timeout and fetched:
+            try:
+                cache.set_many({self._make_key(k): v for k, v in fetched.items()}, timeout=self.timeout)
+            except Exception:
+                logger.exception('Unable to set user group members to cache')
+
+        members.update(fetched)
+        return members
+
+    def invalidate(self, user_group_ids: Iterable[int]):
+        """使用户组成员的缓存失效"""
+        try:
+            cache.delete_many([self._make_key(group_id) for group_id in user_group_ids])
+        except Exception:
+            logger.exception('Unable to delete user group members from cache')
+
+    def _make_key(self, user_group_id: int) -> str:
+        return f'{self.key_prefix}:{user_group_id}'
+
+
+user_group_members_cache = UserGroupMembersCache(timeout=settings.IAM_USER_GROUP_MEMBERS_CACHE_TIMEOUT)
+
+
 def fetch_role_members(app_code: str, role: ApplicationRole) -> List[str]:
     """
     通过指定应用与角色，获取对应的用户组信息
@@ -37,9 +102,7 @@ def fetch_role_members(app_code: str, role: ApplicationRole) -> List[str]:
     :param app_code: 蓝鲸应用 ID
     :param role: 应用角色
     """
-    return IAM_CLI.fetch_user_group_members(
-        user_group_id=ApplicationUserGroup.objects.get(app_code=app_code, role=role).user_group_id
-    )
+    return user_group_members_cache.get(ApplicationUserGroup.objects.get(app_code=app_code, role=role).user_group_id)
 
 
 def add_role_members(
@@ -62,11 +125,14 @@ def add_role_members(
             usernames=usernames,
         )
 
-    return IAM_CLI.add_user_group_members(
-        user_group_id=ApplicationUserGroup.objects.get(app_code=app_code, role=role).user_group_id,
-        usernames=usernames,
-        expired_after_days=expired_after_days,
-    )
+    user_group_id = ApplicationUserGroup.objects.get(app_code=app_code, role=role).user_group_id
+    try:
+        return IAM_CLI.add_user_group_members(
+            user_group_id=user_group_id, usernames=usernames, expired_after_days=expired_after_days
+        )
+    finally:
+        user_group_members_cache.invalidate([user_group_id])
+        user_app_policy_cache.invalidate(usernames)
 
 
 def delete_role_members(app_code: str, role: ApplicationRole, usernames: Union[List[str], str]):
@@ -86,38 +152,42 @@ def delete_role_members(app_code: str, role: ApplicationRole, usernames: Union[L
             usernames=usernames,
         )
 
-    return IAM_CLI.delete_user_group_members(
-        user_group_id=ApplicationUserGroup.objects.get(app_code=app_code, role=role).user_group_id,
-        usernames=usernames,
-    )
+    user_group_id = ApplicationUserGroup.objects.get(app_code=app_code, role=role).user_group_id
+    try:
+        return IAM_CLI.delete_user_group_members(user_group_id=user_group_id, usernames=usernames)
+    finally:
+        user_group_members_cache.invalidate([user_group_id])
+        user_app_policy_cache.invalidate(usernames)
 
 
-def fetch_user_roles(app_code: str, username: str) -> List[ApplicationRole]:
-    """原实现中用户只会有一个角色，但是接入权限中心后，角色表现为用户组，同一用户可能有多个角色"""
+def fetch_user_roles_in_apps(app_codes: Iterable[str], username: str) -> Dict[str, List[ApplicationRole]]:
+    """批量获取用户在多个应用中的角色，所有应用的用户组成员一次性从缓存（或权限中心）中获取
+
+    :returns: {app_code: [role1, role2]}，按角色优先级排序，无角色时为 [ApplicationRole.NOBODY]
+    """
+    app_codes = list(app_codes)
     if username == settings.ADMIN_USERNAME:
-        return [ApplicationRole.ADMINISTRATOR]
+        return {app_code: [ApplicationRole.ADMINISTRATOR] for app_code in app_codes}
 
-    user_roles = []
-    for group in ApplicationUserGroup.objects.filter(app_code=app_code).order_by('role'):
-        if username in IAM_CLI.fetch_user_group_members(group.user_group_id):
-            user_roles.append(group.role)
+    groups = list(ApplicationUserGroup.objects.filter(app_code__in=app_codes).order_by('role'))
+    members = user_group_members_cache.get_many(group.user_group_id for group in groups)
 
-    if not user_roles:
-        return [ApplicationRole.NOBODY]
+    user_roles: Dict[str, List[ApplicationRole]] = {app_code: [] for app_code in app_codes}
+    for group in groups:
+        if username in members[group.user_group_id]:
+            user_roles[group.app_code].append(group.role)
 
-    return user_roles
+    return {app_code: roles or [ApplicationRole.NOBODY] for app_code, roles in user_roles.items()}
 
 
-def fetch_user_main_role(app_code: str, username: str) -> ApplicationRole:
-    """获取用户在某个应用中最高优先级的角色"""
-    if username == settings.ADMIN_USERNAME:
-        return ApplicationRole.ADMINISTRATOR
+def fetch_user_roles(app_code: str, username: str) -> List[ApplicationRole]:
+    """原实现中用户只会有一个角色，但是接入权限中心后，角色表现为用户组，同一用户可能有多个角色"""
+    return fetch_user_roles_in_apps([app_code], username)[app_code]
 
-    for group in ApplicationUserGroup.objects.filter(app_code=app_code).order_by('role'):
-        if username in IAM_CLI.fetch_user_group_members(group.user_group_id):
-            return group.role
 
-    return ApplicationRole.NOBODY
+def fetch_user_main_role(app_code: str, username: str) -> ApplicationRole:
+    """获取用户在某个应用中最高优先级的角色"""
+    return fetch_user_roles(app_code, username)[0]
 
 
 def remove_user_all_roles(app_code: str, usernames: Union[List[str], str]):
@@ -139,8 +209,12 @@ def remove_user_all_roles(app_code: str, usernames: Union[List[str], str]):
         group.role: group.user_group_id for group in ApplicationUserGroup.objects.filter(app_code=app_code)
     }
     # 再将所有的内建角色权限清理掉
-    for role in APP_DEFAULT_ROLES:
-        IAM_CLI.delete_user_group_members(role_group_id_map[role], usernames)
+    try:
+        for role in APP_DEFAULT_ROLES:
+            IAM_CLI.delete_user_group_members(role_group_id_map[role], usernames)
+    finally:
+        user_group_members_cache.invalidate(role_group_id_map.values())
+        user_app_policy_cache.invalidate(usernames)
 
 
 def fetch_application_members(app_code: str) -> List[Dict]:
@@ -149,8 +223,10 @@ def fetch_application_members(app_code: str) -> List[Dict]:
     顺序：管理员 - 开发者 - 运营者
     """
     member_map: Dict[str, Dict] = {}
-    for group in ApplicationUserGroup.objects.filter(app_code=app_code).order_by('role'):
-        for username in IAM_CLI.fetch_user_group_members(group.user_group_id):
+    groups = list(ApplicationUserGroup.objects.filter(app_code=app_code).order_by('role'))
+    members = user_group_members_cache.get_many(group.user_group_id for group in groups)
+    for group in groups:
+        for username in members[group.user_group_id]:
             if username not in member_map:
                 member_map[username] = {
                     'roles': [group.role],
@@ -166,7 +242,9 @@ def fetch_application_members(app_code: str) -> List[Dict]:
 def delete_builtin_user_groups(app_code: str):
     """删除应用的内建用户组"""
     user_groups = ApplicationUserGroup.objects.filter(app_code=app_code)
-    IAM_CLI.delete_user_groups(user_groups.values_list('user_group_id', flat=True))
+    user_group_ids = list(user_groups.values_list('user_group_id', flat=True))
+    IAM_CLI.delete_user_groups(user_group_ids)
+    user_group_members_cache.invalidate(user_group_ids)
     user_groups.delete()
 
 
@@ -25,6 +25,7 @@ from django.core.management.base import BaseCommand
 
 from paasng.accessories.iam.client import BKIAMClient
 from paasng.accessories.iam.constants import NEVER_EXPIRE_DAYS
+from paasng.accessories.iam.helpers import user_group_members_cache
 from paasng.accessories.iam.members.models import ApplicationGradeManager, ApplicationUserGroup
 from paasng.platform.applications.constants import ApplicationRole
 from paasng.platform.applications.models import Application, ApplicationMembership
@@ -260,6 +261,10 @@ class Command(BaseCommand):
                 except Exception as e:
                     migrate_logs.append(f'failed to add app operator: {username}, maybe was resigned: {str(e)}')
 
+        # 成员已变更，清理用户组成员缓存
+        user_group_members_cache.invalidate(
+            self.user_group_map[key] for key in all_role_keys if key in self.user_group_map
+        )
         migrate_logs.append(f'migrate application [{app_name}/{app_code}] user role success! {idx}/{self.total_count}')
 
         return migrate_logs
@@ -17,15 +17,21 @@ We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
 import logging
+import operator
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, Type
+from functools import reduce
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Type
 
 from attrs import define, field, validators
 from bkpaas_auth.core.encoder import user_id_encoder
 from blue_krill.data_types.enum import EnumField, StructuredEnum
 from django.conf import settings
+from django.core.cache import cache
 from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
+from iam.contrib.converter.queryset import DjangoQuerySetConverter
+from iam.eval.constants import OP
 from iam.exceptions import AuthAPIError
 
 from paasng.accessories.iam.constants import ResourceType
@@ -99,6 +105,109 @@ class AppRequest(ResourceRequest):
         return cls(code=init_data['code'])
 
 
+class AppFilterConverter(DjangoQuerySetConverter):
+    """将权限中心的策略转换为 Django 过滤条件
+
+    用户加入的每个用户组都会产生一条策略，应用较多时会得到由 OR 连接的大量 eq/in 条件，直接转换会生成层级很深的 Q 对象
+    和冗长的 SQL。因此将 OR 条件中同一字段上的 eq/in 条件合并为一个 IN 查询。
+    """
+
+    def _or(self, content):
+        values: Dict[str, Set] = defaultdict(set)
+        filters = []
+        for item in self._flatten_or(content):
+            field = (self.key_mapping or {}).get(item.get('field'))
+            if field and item['op'] in (OP.EQ, OP.IN):
+                value = item['value']
+                values[field].update(value if isinstance(value, (list, tuple)) else [value])
+            else:
+                filters.append(self.convert(item))
+
+        filters.extend(self._in(field, sorted(field_values)) for field, field_values in values.items())
+        return reduce(operator.or_, filters)
+
+    def _flatten_or(self, content: List[Dict]) -> Iterator[Dict]:
+        for item in content:
+            if item['op'] == OP.OR:
+                yield from self._flatten_or(item['content'])
+            else:
+                yield item
+
+
+class RawPolicyConverter:
+    """不做任何转换，直接返回权限中心的原始策略，以便缓存"""
+
+    def __init__(self, key_mapping=None):
+        self.key_mapping = key_mapping
+
+    def convert(self, policies):
+        return policies
+
+
+class UserAppPolicyCache:
+    """用户在应用上的权限策略（权限中心 policy query 的结果）缓存，以 (用户名, 操作) 为键，成员变更时主动失效
+
+    权限中心同步（用户组成员信息 —> 具体的权限策略）存在时延，成员变更后的 sync_delay 秒内查询到的仍可能是旧策略，
+    因此失效缓存的同时会为用户设置变更标记，标记存在期间不缓存查询结果，以免旧策略被重新缓存
+
+    :param timeout: 缓存过期时间（秒），为 0 时不使用缓存
+    :param sync_delay: 权限中心同步策略的时延（秒）
+    """
+
+    key_prefix = 'bk_paas3:iam:app_policies'
+
+    def __init__(self, timeout: int, sync_delay: int = 0):
+        self.timeout = timeout
+        self.sync_delay = sync_delay
+
+    def get_or_query(self, username: str, action: str, query: Callable[[], Optional[Dict]]) -> Optional[Dict]:
+        """获取缓存的策略，未命中时调用 query 查询并缓存结果（包括空策略）"""
+        if not self.timeout:
+            return query()
+
+        key, changed_key = self._make_key(username, action), self._make_changed_key(username)
+        try:
+            # 使用单元素元组包装，以区分缓存未命中与空策略
+            entries: Dict[str, Any] = cache.get_many([key, changed_key])
+        except Exception:
+            logger.exception('Unable to get app policies from cache')
+            entries = {}
+        if entries.get(key) is not None:
+            return entries[key][0]
+
+        policies = query()
+        if changed_key in entries:
+            # 权限中心可能尚未完成同步，查询结果不一定是最新的
+            return policies
+        try:
+            cache.set(key, (policies,), timeout=self.timeout)
+        except Exception:
+            logger.exception('Unable to set app policies to cache')
+        return policies
+
+    def invalidate(self, usernames: Iterable[str]):
+        """使用户所有操作的策略缓存失效，并在权限中心完成同步前不再缓存这些用户的策略"""
+        usernames = list(usernames)
+        keys = [self._make_key(username, action) for username in usernames for action in AppAction.get_values()]
+        try:
+            if self.sync_delay:
+                cache.set_many({self._make_changed_key(username): 1 for username in usernames}, self.sync_delay)
+            cache.delete_many(keys)
+        except Exception:
+            logger.exception('Unable to delete app policies from cache')
+
+    def _make_key(self, username: str, action: str) -> str:
+        return f'{self.key_prefix}:{username}:{action}'
+
+    def _make_changed_key(self, username: str) -> str:
+        return f'{self.key_prefix}:{username}:changed'
+
+
+user_app_policy_cache = UserAppPolicyCache(
+    timeout=settings.IAM_APP_POLICY_CACHE_TIMEOUT, sync_delay=settings.IAM_POLICY_SYNC_DELAY
+)
+
+
 class ApplicationPermission(Permission):
     """应用权限"""
 
@@ -217,11 +326,17 @@ class ApplicationPermission(Permission):
         key_mapping = {"application.id": "code"}
 
         try:
-            filters = self.iam.make_filter(request, key_mapping=key_mapping)
+            policies = user_app_policy_cache.get_or_query(
+                request.subject.id,
+                request.action.id,
+                lambda: self.iam.make_filter(request, converter_class=RawPolicyConverter),
+            )
         except AuthAPIError as e:
             logger.warning("generate user app filters failed: %s", str(e))
             return None
 
+        filters = AppFilterConverter(key_mapping).convert(policies) if policies else None
+
         # 因权限中心同步（用户组成员信息 —> 具体的权限策略）存在时延（约 20s），
         # 因此在应用创建后的短时间内，需特殊豁免以免在列表页无法查询到最新的应用
         perm_exempt_filter = Q(
@@ -16,8 +16,10 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
+import hashlib
 import itertools
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
 from datetime import datetime
 from json.decoder import JSONDecodeError
@@ -25,6 +27,9 @@ from typing import Any, Dict, List, Optional
 
 import requests
 from django.conf import settings
+from django.core.cache import cache
+
+from paasng.utils.basic import get_requests_session
 
 from .serializers import DocumentSLZ
 
@@ -71,21 +76,31 @@ def get_json_response(resp: requests.Response, only_allow_ok_status=True) -> Any
         raise ValueError('content is not valid JSON')
 
 
+class SearchError(Exception):
+    """Unable to get results from the search backend"""
+
+
 class BaseSearcher:
     def search(self, keyword: str) -> SearchDocResults:
+        """Search documents by keyword
+
+        :raises: SearchError when the backend is unavailable
+        """
         raise NotImplementedError
 
 
 class BKDocumentSearcher(BaseSearcher):
-    BKDOC_SEARCH_BASE_URL = settings.BKDOC_URL + '/search/?keyword={}'
+    BKDOC_SEARCH_BASE_URL = settings.BKDOC_URL + '/search/'
 
     def search(self, keyword: str) -> SearchDocResults:
         """Call blueking document API to get matching documents"""
-        resp = requests.get(self.BKDOC_SEARCH_BASE_URL.format(keyword))
         try:
+            resp = get_requests_session().get(
+                self.BKDOC_SEARCH_BASE_URL, params={'keyword': keyword}, timeout=settings.DOCUMENT_SEARCH_TIMEOUT
+            )
             json_data = get_json_response(resp)
-        except ValueError:
-            return SearchDocResults(docs=[], count=0)
+        except (requests.RequestException, ValueError) as e:
+            raise SearchError(f'unable to search bk document: {e}') from e
 
         results = []
         for item in json_data:
@@ -96,6 +111,25 @@ class BKDocumentSearcher(BaseSearcher):
         return SearchDocResults(docs=results, count=len(results))
 
 
+def search_with_cache(searcher: BaseSearcher, keyword: str) -> SearchDocResults:
+    """Search documents by keyword, the results will be cached for `DOCUMENT_SEARCH_CACHE_TIMEOUT` seconds,
+    failed searches are not cached.
+
+    :raises: SearchError when the backend is unavailable
+    """
+    timeout = settings.DOCUMENT_SEARCH_CACHE_TIMEOUT
+    if not timeout:
+        return searcher.search(keyword)
+
+    digest = hashlib.md5(keyword.encode()).hexdigest()
+    cache_key = f'bk_paas3:search:{searcher.__class__.__name__}:{digest}'
+    results = cache.get(cache_key)
+    if results is None:
+        results = searcher.search(keyword)
+        cache.set(cache_key, results, timeout=timeout)
+    return results
+
+
 SEARCHER_CLS = [BKDocumentSearcher]
 try:
     from .backends_ext import update_searcher_cls
@@ -106,8 +140,15 @@ except ImportError:
 
 
 class MixSearcher:
-    def __init__(self):
+    """Search documents from all backends concurrently, backends which failed or did not finish before
+    the deadline will be ignored, so the results may be partial.
+
+    :param timeout: the max seconds to wait for the backends, default to `DOCUMENT_SEARCH_TIMEOUT`
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
         self.searchers = [cls() for cls in SEARCHER_CLS]
+        self.timeout = settings.DOCUMENT_SEARCH_TIMEOUT if timeout is None else timeout
 
     @staticmethod
     def to_simple_payload(doc: SearchDocumentary) -> Dict:
@@ -115,7 +156,22 @@ class MixSearcher:
         return DocumentSLZ(doc).data
 
     def search(self, keyword: str) -> List[Dict]:
-        search_results = [searcher.search(keyword).docs for searcher in self.searchers]
+        executor = ThreadPoolExecutor(max_workers=max(len(self.searchers), 1), thread_name_prefix='doc-searcher')
+        futures = [executor.submit(search_with_cache, searcher, keyword) for searcher in self.searchers]
+        wait(futures, timeout=self.timeout)
+        # Do not wait for the slow backends, their threads will exit after the requests were timed out
+        executor.shutdown(wait=False)
+
+        search_results = []
+        for searcher, future in zip(self.searchers, futures):
+            if not future.done():
+                logger.warning('Searcher %s timed out, keyword: %s', searcher.__class__.__name__, keyword)
+                continue
+            try:
+                search_results.append(future.result().docs)
+            except Exception:
+                logger.exception('Searcher %s failed, keyword: %s', searcher.__class__.__name__, keyword)
+
         items = []
         for item in itertools.zip_longest(*search_results):
             # 按 1:1 混合各个 searcher 的结果
@@ -16,6 +16,8 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
+import logging
+
 from django.utils.functional import cached_property
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework.pagination import LimitOffsetPagination
@@ -24,9 +26,11 @@ from rest_framework.viewsets import ViewSet
 
 from paasng.platform.applications.models import UserApplicationFilter
 
-from .backends import BKDocumentSearcher, MixSearcher
+from .backends import BKDocumentSearcher, MixSearcher, SearchDocResults, SearchError, search_with_cache
 from .serializers import AppSearchResultSLZ, DocSearchResultSLZ, DocumentSearchWordSLZ, DocumentSLZ, UniversalSearchSLZ
 
+logger = logging.getLogger(__name__)
+
 
 class MixDocumentSearch(ViewSet):
     @swagger_auto_schema(
@@ -90,7 +94,11 @@ class BkDocsSearchViewset(ViewSet):
         """
         slz = UniversalSearchSLZ(data=request.GET)
         slz.is_valid(raise_exception=True)
-        results = BKDocumentSearcher().search(keyword=slz.data['keyword'])
+        try:
+            results = search_with_cache(BKDocumentSearcher(), slz.data['keyword'])
+        except SearchError:
+            logger.exception('Unable to search bk document')
+            results = SearchDocResults(docs=[], count=0)
 
         # Slice search results
         start = slz.data['offset']
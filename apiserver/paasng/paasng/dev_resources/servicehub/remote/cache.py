@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+"""Local cache for instances of remote services
+"""
+import json
+import logging
+from typing import Dict, Optional
+
+from blue_krill.encrypt.handler import EncryptHandler
+from blue_krill.encrypt.utils import get_default_secret_key
+from django.conf import settings
+from django.core.cache import cache
+
+from paasng.dev_resources.servicehub.remote.client import RemoteServiceClient
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteInstanceCache:
+    """Cache the instance data retrieved from remote services, so that the env variables of an application
+    can be assembled without calling the remote service every time. The data contains credentials, it is
+    encrypted before being written to the cache.
+
+    The cache should be invalidated whenever the instance was changed by us(provisioned, config synced or
+    deleted), changes made by the remote service itself will be visible after the cache expired.
+    """
+
+    key_prefix = 'bk_paas3:remote_svc_instance'
+
+    def get_or_retrieve(self, client: RemoteServiceClient, instance_id: str) -> Dict:
+        """Get the instance data from cache, retrieve it from remote service if not cached
+
+        :raises: RemoteClientError
+        """
+        data = self.get(instance_id)
+        if data is not None:
+            return data
+
+        data = client.retrieve_instance(instance_id)
+        self.set(instance_id, data)
+        return data
+
+    def get(self, instance_id: str) -> Optional[Dict]:
+        if not self.timeout:
+            return None
+
+        try:
+            value = cache.get(self._make_key(instance_id))
+            if value is None:
+                return None
+            return json.loads(self._make_handler().decrypt(value))
+        except Exception:
+            logger.exception('Unable to get the cached data of remote instance %s', instance_id)
+            return None
+
+    def set(self, instance_id: str, data: Dict):
+        if not self.timeout:
+            return
+
+        try:
+            value = self._make_handler().encrypt(json.dumps(data))
+            cache.set(self._make_key(instance_id), value, timeout=self.timeout)
+        except Exception:
+            logger.exception('Unable to cache the data of remote instance %s', instance_id)
+
+    def invalidate(self, instance_id: str):
+        try:
+            cache.delete(self._make_key(instance_id))
+        except Exception:
+            logger.exception('Unable to invalidate the cached data of remote instance %s', instance_id)
+
+    @property
+    def timeout(self) -> int:
+        return settings.REMOTE_SERVICE_INSTANCE_CACHE_TIMEOUT
+
+    def _make_key(self, instance_id: str) -> str:
+        return f'{self.key_prefix}:{instance_id}'
+
+    @staticmethod
+    def _make_handler() -> EncryptHandler:
+        return EncryptHandler(secret_key=get_default_secret_key())
+
+
+remote_instance_cache = RemoteInstanceCache()
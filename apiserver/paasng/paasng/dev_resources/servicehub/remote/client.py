@@ -20,17 +20,25 @@ to the current version of the project delivered to anyone in the future.
 """
 import json
 import logging
+import threading
+import time
 from contextlib import contextmanager
 from dataclasses import MISSING, dataclass
-from typing import Dict, List
+from http.cookiejar import DefaultCookiePolicy
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import urljoin
 
 import requests
 from blue_krill.auth.jwt import ClientJWTAuth, JWTAuthConf
 from blue_krill.text import desensitize_url
+from django.conf import settings
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
+from urllib3.util.retry import Retry
 
-from .exceptions import RClientResponseError, RemoteClientError
+from paasng.metrics import REMOTE_SERVICE_CIRCUIT_OPEN_COUNTER, REMOTE_SERVICE_REQUEST_HISTOGRAM
+
+from .exceptions import RClientResponseError, RemoteClientError, RemoteServiceUnavailable
 
 logger = logging.getLogger(__name__)
 
@@ -109,6 +117,111 @@ def wrap_request_exc(client: 'RemoteServiceClient'):
         raise RemoteClientError(f'invalid json response: {e}') from e
 
 
+class CircuitBreaker:
+    """A simple circuit breaker, it opens after `failure_threshold` consecutive failures and rejects all
+    requests while it's open. After `recovery_timeout` seconds, one trial request is allowed, the breaker
+    will be closed if the trial succeeded, or opened again otherwise.
+
+    :param failure_threshold: number of consecutive failures to open the breaker, 0 means never open
+    :param recovery_timeout: seconds to wait before allowing a trial request
+    """
+
+    def __init__(self, failure_threshold: int, recovery_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_progress = False
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._opened_at is not None
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_in_progress or time.monotonic() - self._opened_at < self.recovery_timeout:
+                return False
+            self._trial_in_progress = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            # A failed trial opens the breaker again
+            if self._trial_in_progress or (self.failure_threshold and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+            self._trial_in_progress = False
+
+
+class BrokerConnections:
+    """Long-lived HTTP sessions and circuit breakers of remote services, one for each service config(broker),
+    so the connections to a broker can be reused by all clients in current process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sessions: Dict[Tuple[str, str], requests.Session] = {}
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+
+    def get_session(self, config: RemoteSvcConfig) -> requests.Session:
+        key = (config.name, config.endpoint_url)
+        with self._lock:
+            if key not in self._sessions:
+                self._sessions[key] = self._make_session()
+            return self._sessions[key]
+
+    def get_breaker(self, config: RemoteSvcConfig) -> CircuitBreaker:
+        key = (config.name, config.endpoint_url)
+        with self._lock:
+            if key not in self._breakers:
+                self._breakers[key] = CircuitBreaker(
+                    settings.REMOTE_SERVICE_CIRCUIT_BREAKER_THRESHOLD,
+                    settings.REMOTE_SERVICE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+                )
+            return self._breakers[key]
+
+    def clear(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions = {}
+            self._breakers = {}
+
+    @staticmethod
+    def _make_session() -> requests.Session:
+        # Only connection errors and gateway errors are retried, read errors are not retried because the
+        # broker may be processing the request. Gateway errors are retried for GET requests only, because
+        # the broker may have already applied a PUT/DELETE request before the gateway gave up.
+        retry = Retry(
+            total=settings.REMOTE_SERVICE_CLIENT_MAX_RETRIES,
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            method_whitelist=frozenset(['GET']),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_maxsize=settings.REMOTE_SERVICE_CLIENT_POOL_MAXSIZE, max_retries=retry)
+        session = requests.Session()
+        # The session is shared by all clients in current process, cookies must not leak between requests
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+
+broker_connections = BrokerConnections()
+
+
 class RemoteServiceClient:
     """Client for remote services"""
 
@@ -120,6 +233,41 @@ class RemoteServiceClient:
         self.config = config
         self.auth = ClientJWTAuth(config.get_jwt_auth_conf())
 
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request to remote service with the pooled session of current broker
+
+        :param method: "get", "put", "post" or "delete"
+        :raises: RemoteServiceUnavailable when the circuit breaker is open, RequestException
+        """
+        breaker = broker_connections.get_breaker(self.config)
+        if not breaker.allow_request():
+            REMOTE_SERVICE_CIRCUIT_OPEN_COUNTER.labels(service=self.config.name).inc()
+            raise RemoteServiceUnavailable(f'remote service {self.config.name} is unavailable, circuit is open')
+
+        session = broker_connections.get_session(self.config)
+        started_at = time.perf_counter()
+        try:
+            resp = getattr(session, method)(url, auth=self.auth, **kwargs)
+        except Exception:
+            # Any exception must be recorded, otherwise a failed trial request would keep the breaker
+            # half-open forever
+            breaker.record_failure()
+            self._observe(method, 'error', started_at)
+            raise
+
+        # Client errors(4xx) mean that the broker is still working
+        if resp.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        self._observe(method, str(resp.status_code), started_at)
+        return resp
+
+    def _observe(self, method: str, status: str, started_at: float):
+        REMOTE_SERVICE_REQUEST_HISTOGRAM.labels(service=self.config.name, method=method, status=status).observe(
+            time.perf_counter() - started_at
+        )
+
     @staticmethod
     def validate_resp(resp: requests.Response):
         """Validate response status code"""
@@ -137,7 +285,7 @@ class RemoteServiceClient:
         :return: {"version": ...}
         """
         with wrap_request_exc(self):
-            resp = requests.get(self.config.meta_info_url, auth=self.auth, timeout=self.REQUEST_LIST_TIMEOUT)
+            resp = self._request('get', self.config.meta_info_url, timeout=self.REQUEST_LIST_TIMEOUT)
             self.validate_resp(resp)
             return resp.json()
 
@@ -148,7 +296,7 @@ class RemoteServiceClient:
         :return: [<service dict>, ...]
         """
         with wrap_request_exc(self):
-            resp = requests.get(self.config.index_url, auth=self.auth, timeout=self.REQUEST_LIST_TIMEOUT)
+            resp = self._request('get', self.config.index_url, timeout=self.REQUEST_LIST_TIMEOUT)
             self.validate_resp(resp)
             return resp.json()
 
@@ -159,9 +307,7 @@ class RemoteServiceClient:
         :return: None
         """
         with wrap_request_exc(self):
-            resp = requests.put(
-                self.config.create_service_url, json=data, auth=self.auth, timeout=self.REQUEST_CREATE_TIMEOUT
-            )
+            resp = self._request('put', self.config.create_service_url, json=data, timeout=self.REQUEST_CREATE_TIMEOUT)
             self.validate_resp(resp)
 
     def update_service(self, service_id: str, data: Dict):
@@ -172,7 +318,7 @@ class RemoteServiceClient:
         """
         url = self.config.update_service_url.format(service_id=service_id)
         with wrap_request_exc(self):
-            resp = requests.put(url, json=data, auth=self.auth, timeout=self.REQUEST_CREATE_TIMEOUT)
+            resp = self._request('put', url, json=data, timeout=self.REQUEST_CREATE_TIMEOUT)
             self.validate_resp(resp)
 
     def create_plan(self, service_id: str, data: Dict):
@@ -184,7 +330,7 @@ class RemoteServiceClient:
         url = self.config.create_plan_url
         data["service"] = service_id
         with wrap_request_exc(self):
-            resp = requests.post(url, json=data, auth=self.auth, timeout=self.REQUEST_CREATE_TIMEOUT)
+            resp = self._request('post', url, json=data, timeout=self.REQUEST_CREATE_TIMEOUT)
             self.validate_resp(resp)
 
     def update_plan(self, service_id: str, plan_id: str, data: Dict):
@@ -196,7 +342,7 @@ class RemoteServiceClient:
         url = self.config.update_plan_url.format(plan_id=plan_id)
         data["service"] = service_id
         with wrap_request_exc(self):
-            resp = requests.put(url, json=data, auth=self.auth, timeout=self.REQUEST_CREATE_TIMEOUT)
+            resp = self._request('put', url, json=data, timeout=self.REQUEST_CREATE_TIMEOUT)
             self.validate_resp(resp)
 
     def provision_instance(self, service_id: str, plan_id: str, instance_id: str, params: Dict) -> Dict:
@@ -208,7 +354,7 @@ class RemoteServiceClient:
         url = self.config.create_instance_url.format(service_id=service_id, instance_id=instance_id)
         payload = {'plan_id': plan_id, 'params': params}
         with wrap_request_exc(self):
-            resp = requests.post(url, json=payload, auth=self.auth, timeout=self.REQUEST_CREATE_TIMEOUT)
+            resp = self._request('post', url, json=payload, timeout=self.REQUEST_CREATE_TIMEOUT)
             self.validate_resp(resp)
             return resp.json()
 
@@ -220,7 +366,7 @@ class RemoteServiceClient:
         """
         url = self.config.retrieve_instance_url.format(instance_id=instance_id)
         with wrap_request_exc(self):
-            resp = requests.get(url, auth=self.auth, timeout=self.REQUEST_LIST_TIMEOUT)
+            resp = self._request('get', url, timeout=self.REQUEST_LIST_TIMEOUT)
             self.validate_resp(resp)
             return resp.json()
 
@@ -235,7 +381,7 @@ class RemoteServiceClient:
             url = self.config.delete_instance_url.format(instance_id=instance_id)
 
         with wrap_request_exc(self):
-            resp = requests.delete(url, auth=self.auth, timeout=self.REQUEST_DELETE_TIMEOUT)
+            resp = self._request('delete', url, timeout=self.REQUEST_DELETE_TIMEOUT)
             self.validate_resp(resp)
             return
 
@@ -246,20 +392,20 @@ class RemoteServiceClient:
         """
         url = self.config.update_inst_config_url.format(instance_id=instance_id)
         with wrap_request_exc(self):
-            resp = requests.put(url, json=config, auth=self.auth, timeout=self.REQUEST_CREATE_TIMEOUT)
+            resp = self._request('put', url, json=config, timeout=self.REQUEST_CREATE_TIMEOUT)
             self.validate_resp(resp)
             return resp.json()
 
     def create_client_side_instance(self, service_id: str, instance_id: str, params: Dict):
         url = self.config.create_client_side_instance_url.format(service_id=service_id, instance_id=instance_id)
         with wrap_request_exc(self):
-            resp = requests.post(url, json=params, auth=self.auth, timeout=self.REQUEST_CREATE_TIMEOUT)
+            resp = self._request('post', url, json=params, timeout=self.REQUEST_CREATE_TIMEOUT)
             self.validate_resp(resp)
             return resp.json()
 
     def destroy_client_side_instance(self, instance_id: str):
         url = self.config.destroy_client_side_instance_url.format(instance_id=instance_id)
         with wrap_request_exc(self):
-            resp = requests.delete(url, auth=self.auth, timeout=self.REQUEST_DELETE_TIMEOUT)
+            resp = self._request('delete', url, timeout=self.REQUEST_DELETE_TIMEOUT)
             self.validate_resp(resp)
             return
@@ -20,6 +20,7 @@ to the current version of the project delivered to anyone in the future.
 """
 import logging
 from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Generator, List, Optional
 
 from django.conf import settings
@@ -152,16 +153,24 @@ def fetch_all_remote_services() -> Generator[FetchResult, None, None]:
     if not isinstance(remote_svc_configs, list):
         raise ImproperlyConfigured('SERVICE_REMOTE_ENDPOINTS must be list type')
 
-    for endpoint_conf in remote_svc_configs:
-        config = RemoteSvcConfig.from_json(endpoint_conf)
-        try:
-            yield fetch_remote_service(config)
-        except FetchRemoteSvcError:
-            logger.exception("unable to load remote service.")
-        except Exception:
-            logger.exception("unable to load remote service.")
-        else:
-            logger.debug(f"successfully loaded {config}.")
+    configs = [RemoteSvcConfig.from_json(endpoint_conf) for endpoint_conf in remote_svc_configs]
+    if not configs:
+        return
+
+    # Fetch all services concurrently, the results are yielded in the order of configs
+    max_workers = max(min(settings.REMOTE_SERVICES_FETCH_CONCURRENCY, len(configs)), 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(fetch_remote_service, config) for config in configs]
+        for config, future in zip(configs, futures):
+            try:
+                ret = future.result()
+            except FetchRemoteSvcError:
+                logger.exception("unable to load remote service.")
+            except Exception:
+                logger.exception("unable to load remote service.")
+            else:
+                logger.debug(f"successfully loaded {config}.")
+                yield ret
 
 
 def initialize_remote_services(remote_store: RemoteServiceStore):
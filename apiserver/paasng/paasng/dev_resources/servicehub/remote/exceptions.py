@@ -34,6 +34,10 @@ class RemoteClientError(Exception):
     """Base exception class for remote.client module"""
 
 
+class RemoteServiceUnavailable(RemoteClientError):
+    """Requests to the remote service are rejected because its circuit breaker is open"""
+
+
 class RClientResponseError(RemoteClientError):
     """Exception when response is not valid, provides an extra "payload" field for more detailed
     error messages
@@ -34,6 +34,7 @@ from paas_wl.cluster.shim import EnvClusterService, get_cluster_egress_info
 from paasng.accessories.bkmonitorv3.client import make_bk_monitor_client
 from paasng.dev_resources.servicehub import constants, exceptions
 from paasng.dev_resources.servicehub.models import RemoteServiceEngineAppAttachment, RemoteServiceModuleAttachment
+from paasng.dev_resources.servicehub.remote.cache import remote_instance_cache
 from paasng.dev_resources.servicehub.remote.client import RemoteServiceClient
 from paasng.dev_resources.servicehub.remote.collector import refresh_remote_service
 from paasng.dev_resources.servicehub.remote.exceptions import (
@@ -104,6 +105,8 @@ VERSION_WITH_REST_UPSERT = '0.2.0'
 class RemotePlanObj(PlanObj):
     @classmethod
     def from_data(cls, data: Dict):
+        # The data may be shared by the store, make a copy before modifying it
+        data = dict(data)
         data.setdefault("is_active", True)
         properties = data.get("properties") or {}
         is_eager = data.pop("is_eager", False)
@@ -242,6 +245,7 @@ class RemoteEngineAppInstanceRel(EngineAppInstanceRel):
         # Write back to database
         self.db_obj.service_instance_id = instance_id
         self.db_obj.save(update_fields=['service_instance_id'])
+        remote_instance_cache.invalidate(instance_id)
 
         # Update instance config
         if service_obj.supports_inst_config():
@@ -271,6 +275,8 @@ class RemoteEngineAppInstanceRel(EngineAppInstanceRel):
             self.remote_client.update_instance_config(instance_id, config={'paas_app_info': paas_app_info})
         except Exception:
             logger.exception(f'Error when updating instance config for {instance_id}')
+        finally:
+            remote_instance_cache.invalidate(str(instance_id))
 
     def recycle_resource(self):
         """对于 remote service 我们默认其已经具备了回收的能力"""
@@ -280,6 +286,7 @@ class RemoteEngineAppInstanceRel(EngineAppInstanceRel):
             except Exception as e:
                 logger.exception("Error occurs during recycling")
                 raise exceptions.SvcInstanceDeleteError("unable to delete instance") from e
+            remote_instance_cache.invalidate(str(self.db_obj.service_instance_id))
         self.db_obj.service_instance_id = None
         self.db_obj.save()
 
@@ -289,7 +296,7 @@ class RemoteEngineAppInstanceRel(EngineAppInstanceRel):
             raise ValueError('relationship is not provisioned yet')
 
         # TODO: failure tolerance
-        instance_data = self.remote_client.retrieve_instance(str(self.db_obj.service_instance_id))
+        instance_data = remote_instance_cache.get_or_retrieve(self.remote_client, str(self.db_obj.service_instance_id))
         # TODO: More data validations
         if not instance_data.get('uuid') == str(self.db_obj.service_instance_id):
             raise exceptions.SvcInstanceNotAvailableError('uuid in data does not match')
@@ -393,6 +400,8 @@ class RemotePlainInstanceMgr(PlainInstanceMgr):
             self.remote_client.update_instance_config(str(instance_id), config={'paas_app_info': paas_app_info})
         except Exception:
             logger.exception(f'Error when updating instance config for {instance_id}')
+        finally:
+            remote_instance_cache.invalidate(str(instance_id))
 
     def is_provisioned(self):
         return self.db_obj.service_instance_id is not None
@@ -433,6 +442,7 @@ class RemotePlainInstanceMgr(PlainInstanceMgr):
             return
 
         self.remote_client.destroy_client_side_instance(instance_id=str(self.db_obj.service_instance_id))
+        remote_instance_cache.invalidate(str(self.db_obj.service_instance_id))
         logger.info("going to delete remote service attachment from db")
         # delete rel itself from real db
         self.db_obj.delete()
@@ -22,8 +22,11 @@ import copy
 import json
 import logging
 import pickle
-from collections import OrderedDict
-from typing import Callable, Dict, List, Optional, Set
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 from django.conf import settings
 from django.utils.encoding import force_bytes, force_str
@@ -60,6 +63,45 @@ def get_remote_store():
     return _g_services_store
 
 
+@dataclass(frozen=True)
+class ServicesSnapshot:
+    """An immutable snapshot of all remote services, with indexes for fast lookups.
+
+    The service dicts are shared by all readers of the snapshot, they **must not** be modified.
+
+    :param generation: the generation of the store when the snapshot was loaded
+    :param loaded_at: the monotonic time when the snapshot was loaded
+    """
+
+    generation: str
+    loaded_at: float
+    services: Tuple[Dict, ...]
+    by_uuid: Dict[str, Dict] = field(default_factory=dict)
+    by_region: Dict[str, List[Dict]] = field(default_factory=dict)
+    by_region_category: Dict[Tuple[str, Any], List[Dict]] = field(default_factory=dict)
+
+    @classmethod
+    def build(cls, generation: str, services: List[Dict]) -> 'ServicesSnapshot':
+        by_uuid: Dict[str, Dict] = {}
+        by_region: Dict[str, List[Dict]] = defaultdict(list)
+        by_region_category: Dict[Tuple[str, Any], List[Dict]] = defaultdict(list)
+        for service in services:
+            by_uuid[service['uuid']] = service
+            # 服务支持的 region 由 plans 决定, 去重后保持原有顺序
+            regions = dict.fromkeys(plan['properties'].get('region') for plan in service['plans'])
+            for region in regions:
+                by_region[region].append(service)
+                by_region_category[(region, service.get('category'))].append(service)
+        return cls(
+            generation=generation,
+            loaded_at=time.monotonic(),
+            services=tuple(services),
+            by_uuid=by_uuid,
+            by_region=dict(by_region),
+            by_region_category=dict(by_region_category),
+        )
+
+
 class StoreMixin:
     get: Callable
     all: Callable
@@ -163,10 +205,16 @@ class RedisStore(StoreMixin):
     namespace = '1'
     encoding = 'utf-8'
     registered_services_key = namespace + 'remote:registered:service:uuid'
+    # The generation is increased by every write, readers reload the local snapshot when it changes
+    generation_key = namespace + 'remote:services:generation'
     expires = settings.REMOTE_SERVICES_UPDATE_INTERVAL_MINUTES * 60 * 10
+    # Reload the local snapshot at least once within this period(seconds), even if the generation stays the same
+    snapshot_max_age = settings.REMOTE_SERVICES_UPDATE_INTERVAL_MINUTES * 60
 
     def __init__(self):
         self.redis = get_default_redis(self.cache_key)
+        self._snapshot: Optional[ServicesSnapshot] = None
+        self._snapshot_lock = threading.Lock()
 
     def _make_svc_info_key(self, uuid: str) -> str:
         return self.namespace + f"remote:service:info:{uuid}"
@@ -203,6 +251,7 @@ class RedisStore(StoreMixin):
             pipe.set(info_key, _dumps(service), self.expires)
             pipe.set(config_key, _dumps(config), self.expires)
             pipe.sadd(self.registered_services_key, sid.encode(self.encoding))
+            pipe.incr(self.generation_key)
             pipe.execute()
 
     def get_source_config(self, uuid: str) -> RemoteSvcConfig:
@@ -213,18 +262,53 @@ class RedisStore(StoreMixin):
         return RemoteSvcConfig.from_json(_loads(config))
 
     def get(self, uuid: str, region: str) -> Dict:
-        """Get a service instance by uuid"""
-        result = self.redis.get(self._make_svc_info_key(uuid))
-        if result is None:
+        """Get a service instance by uuid, the result is shared and must not be modified"""
+        snapshot = self._get_snapshot()
+        item = snapshot.by_uuid.get(uuid)
+        if item is None:
             raise ServiceNotFound(f'remote service with id={uuid} not found')
 
-        item = _loads(result)
         if not self._svc_supports_region(item, region):
             raise RuntimeError('service does not contains a plan in given region')
         return item
 
+    def filter(self, region: str, conditions: Optional[Dict] = None) -> List[Dict]:
+        """Find a list of services by given conditions, the results are shared and must not be modified
+
+        :param conditions: a dict of conditions, eg. {"category": 1}
+        """
+        snapshot = self._get_snapshot()
+        conditions = dict(conditions or {})
+        if 'category' in conditions:
+            candidates = snapshot.by_region_category.get((region, conditions.pop('category')), [])
+        else:
+            candidates = snapshot.by_region.get(region, [])
+        return [svc for svc in candidates if all(svc.get(key) == value for key, value in conditions.items())]
+
     def all(self) -> List[Dict]:
-        """List all services"""
+        """List all services, the results are shared and must not be modified"""
+        return list(self._get_snapshot().services)
+
+    def _get_snapshot(self) -> ServicesSnapshot:
+        """Get the local snapshot of all services, reload it when the store has been updated"""
+        generation = force_str(self.redis.get(self.generation_key) or b'0', encoding=self.encoding)
+        snapshot = self._snapshot
+        if snapshot is not None and self._is_snapshot_fresh(snapshot, generation):
+            return snapshot
+
+        with self._snapshot_lock:
+            # The snapshot may have been reloaded by other threads
+            snapshot = self._snapshot
+            if snapshot is None or not self._is_snapshot_fresh(snapshot, generation):
+                snapshot = ServicesSnapshot.build(generation, self._load_services())
+                self._snapshot = snapshot
+        return snapshot
+
+    def _is_snapshot_fresh(self, snapshot: ServicesSnapshot, generation: str) -> bool:
+        return snapshot.generation == generation and time.monotonic() - snapshot.loaded_at < self.snapshot_max_age
+
+    def _load_services(self) -> List[Dict]:
+        """Load all services from redis"""
         keys = self.get_service_keys()
         if not keys:
             return []
@@ -252,6 +336,7 @@ class RedisStore(StoreMixin):
             pipe.delete(self._make_svc_info_key(i))
 
         pipe.delete(self.registered_services_key)
+        pipe.incr(self.generation_key)
         pipe.execute()
 
 
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+"""Benchmark the source packaging with a synthetic source tree"""
+import gzip
+import os
+import tarfile
+import time
+from pathlib import Path
+from typing import Callable
+
+from django.core.management.base import BaseCommand
+
+from paasng.dev_resources.sourcectl.utils import (
+    DockerIgnore,
+    compress_directory_ext,
+    generate_temp_dir,
+    generate_temp_file,
+)
+
+DOCKER_IGNORE_CONTENT = """
+# Synthetic rules similar with a monorepo project
+**/*.pyc
+**/__pycache__
+node_modules
+**/*.log
+docs/**
+!docs/README.md
+tests/fixtures/*.bin
+.git
+"""
+
+
+class Command(BaseCommand):
+    help = "Benchmark the source packaging(dockerignore matching + tar + gzip) with a synthetic source tree"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--files', type=int, default=50000, help="number of files in the source tree")
+        parser.add_argument('--file_size', type=int, default=2048, help="size of each file in bytes")
+        parser.add_argument('--workers', type=int, default=None, help="number of compressing threads")
+
+    def handle(self, *args, **options):
+        docker_ignore = DockerIgnore(DOCKER_IGNORE_CONTENT)
+        with generate_temp_dir() as source_dir:
+            started_at = time.perf_counter()
+            self.make_source_tree(source_dir, options['files'], options['file_size'])
+            self.stdout.write(f'Generated {options["files"]} files in {time.perf_counter() - started_at:.2f}s')
+
+            self.run_benchmark('legacy', lambda dest: legacy_compress(source_dir, dest, docker_ignore))
+            self.run_benchmark(
+                'parallel',
+                lambda dest: compress_directory_ext(
+                    source_dir, dest, docker_ignore.should_ignore, workers=options['workers']
+                ),
+            )
+
+    def run_benchmark(self, name: str, compress: Callable[[Path], None]):
+        with generate_temp_file(suffix='.tar.gz') as dest:
+            started_at = time.perf_counter()
+            compress(dest)
+            elapsed = time.perf_counter() - started_at
+            self.stdout.write(f'{name}: {elapsed:.2f}s, package size: {dest.stat().st_size} bytes')
+
+    @staticmethod
+    def make_source_tree(source_dir: Path, files: int, file_size: int):
+        """Make a source tree with nested directories, part of the files will be ignored"""
+        # Half random content, so the compressing is neither too easy nor too hard
+        content = os.urandom(file_size // 2).hex().encode()[:file_size]
+        suffixes = ['.py', '.py', '.py', '.pyc', '.md', '.log', '.js']
+        for i in range(files):
+            top = ['src', 'docs', 'node_modules', 'tests/fixtures'][i % 4]
+            path = source_dir / top / f'pkg{i // 1000}' / f'mod{i // 50}' / f'file{i}{suffixes[i % len(suffixes)]}'
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(content)
+
+
+def legacy_compress(source_path: Path, target_path: Path, docker_ignore: DockerIgnore):
+    """The previous implementation: recursive walking, linear patterns matching and single thread gzip"""
+
+    def should_ignore(filename: str) -> bool:
+        ignored = False
+        for invert, pattern in docker_ignore.patterns:
+            if pattern.match(filename):
+                ignored = not invert
+        return ignored
+
+    def compress_core(tarball: tarfile.TarFile, p: Path):
+        arcname = str(p.relative_to(source_path))
+        if should_ignore(arcname):
+            return
+        if p.is_dir():
+            for sub in p.iterdir():
+                compress_core(tarball, sub)
+        else:
+            tarball.add(p, arcname)
+
+    with gzip.GzipFile(target_path, mode="w", mtime=0) as gz:
+        with tarfile.open(fileobj=gz, mode="w|") as tf:  # type: ignore
+            compress_core(tf, source_path)
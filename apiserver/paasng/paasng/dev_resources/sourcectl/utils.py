@@ -18,6 +18,7 @@ to the current version of the project delivered to anyone in the future.
 """
 import logging
 import os
+import re
 import shutil
 import subprocess
 import tarfile
@@ -26,6 +27,7 @@ from contextlib import contextmanager
 from pathlib import Path, PureWindowsPath
 from typing import Callable, ContextManager, Iterator, List, Optional, Tuple, Union
 
+from paasng.utils.parallel_gzip import ParallelGzipWriter
 from paasng.utils.patternmatcher import Pattern
 
 logger = logging.getLogger(__name__)
@@ -42,17 +44,30 @@ class DockerIgnore:
             if invert:
                 pattern_str = pattern_str[1:]
             self.patterns.append((invert, Pattern(pattern_str)))
+        self._matchers = self._compile_matchers(self.patterns)
 
     def should_ignore(self, filename: str) -> bool:
         """detect whether to ignore given filename,
         return True to ignore, False to include
         """
-        should_ignore = False
-        for invert, pattern in self.patterns:
-            matched = pattern.match(filename)
-            if matched:
-                should_ignore = not invert
-        return should_ignore
+        # The last matched pattern decides the result, so check the matchers in reverse order
+        for invert, matcher in self._matchers:
+            if matcher.match(filename):
+                return not invert
+        return False
+
+    @staticmethod
+    def _compile_matchers(patterns: List[Tuple[bool, Pattern]]) -> List[Tuple[bool, re.Pattern]]:
+        """Compile the patterns into combined regexps, consecutive patterns with the same "invert" flag
+        are merged into one regexp. The result is in reverse order.
+        """
+        groups: List[Tuple[bool, List[str]]] = []
+        for invert, pattern in patterns:
+            if groups and groups[-1][0] == invert:
+                groups[-1][1].append(pattern.to_regexp_str())
+            else:
+                groups.append((invert, [pattern.to_regexp_str()]))
+        return [(invert, re.compile("|".join(f"(?:{r})" for r in regs))) for invert, regs in reversed(groups)]
 
     @classmethod
     def clean_path(cls, path: str) -> str:
@@ -98,13 +113,17 @@ class DockerIgnore:
 
 
 def compress_directory_ext(
-    source_path: Union[str, Path], target_path: Union[str, Path], should_ignore: Optional[ExcludeChecker] = None
+    source_path: Union[str, Path],
+    target_path: Union[str, Path],
+    should_ignore: Optional[ExcludeChecker] = None,
+    workers: Optional[int] = None,
 ):
     """Compress a directory using tar+gz
 
     :param source_path: dir to be compressed
     :param target_path: tarball output path
     :param should_ignore: an optional checker the check whether compress a file in source_path
+    :param workers: number of threads for gzip compressing, default to the number of CPUs(max 8)
 
     If the should_ignore parameter is not provided, the tar command will be used for packaging, as it is faster.
     """
@@ -115,23 +134,41 @@ def compress_directory_ext(
     if should_ignore is None:
         return compress_directory(source_path, target_path)
 
-    def compress_core(tarball: tarfile.TarFile, p: Path):
-        arcname = str(p.relative_to(source_path))
-        if should_ignore and should_ignore(arcname):
-            return
-        if p.is_dir():
-            for sub in p.iterdir():
-                compress_core(tarball, sub)
-        else:
-            tarball.add(p, arcname)
+    with open(target_path, "wb") as fp:
+        gz = ParallelGzipWriter(fp, level=9, workers=workers)
+        with gz, tarfile.open(fileobj=gz, mode="w|") as tf:  # type: ignore
+            for path, arcname in iter_source_files(str(source_path), should_ignore):
+                tf.add(path, arcname)
 
-    try:
-        from gzip import GzipFile
-    except ImportError:
-        raise tarfile.CompressionError("gzip module is not available")
 
-    with GzipFile(target_path, mode="w", mtime=0) as gz, tarfile.open(fileobj=gz, mode="w|") as tf:  # type: ignore
-        compress_core(tf, source_path)
+def iter_source_files(source_path: str, should_ignore: ExcludeChecker) -> Iterator[Tuple[str, str]]:
+    """Walk the directory and yield (path, arcname) of files which should be packaged, the entries are
+    sorted by name so the result is stable. Ignored directories are pruned without being walked.
+
+    :param source_path: dir to be walked
+    :param should_ignore: the checker the check whether a relative path should be ignored
+    """
+    if should_ignore("."):
+        return
+
+    # Use an explicit stack instead of recursion to support deep directories
+    stack: List[Tuple[str, str]] = [(source_path, "")]
+    while stack:
+        dir_path, dir_arcname = stack.pop()
+        with os.scandir(dir_path) as it:
+            entries = sorted(it, key=lambda e: e.name)
+
+        sub_dirs = []
+        for entry in entries:
+            arcname = dir_arcname + entry.name
+            if should_ignore(arcname):
+                continue
+            if entry.is_dir():
+                sub_dirs.append((entry.path, arcname + "/"))
+            else:
+                yield entry.path, arcname
+        # Push in reverse order so the directories are popped in name order
+        stack.extend(reversed(sub_dirs))
 
 
 def compress_directory(source_path, target_path):
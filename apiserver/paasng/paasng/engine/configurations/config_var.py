@@ -16,16 +16,26 @@ We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
 """Config variables related functions"""
-from typing import TYPE_CHECKING, Dict, Optional
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 
 from django.conf import settings
+from django.db import connections
+from django.utils.translation import gettext as _
 
 from paasng.dev_resources.servicehub.manager import mixed_service_mgr
 from paasng.dev_resources.servicehub.sharing import ServiceSharingManager
 from paasng.engine.configurations.ingress import AppDefaultDomains, AppDefaultSubpaths
 from paasng.engine.constants import AppInfoBuiltinEnv, AppRunTimeBuiltinEnv
+from paasng.engine.exceptions import EnvVarsSourceTimeout
 from paasng.engine.models import Deployment
 from paasng.engine.models.config_var import add_prefix_to_key, get_config_vars
+from paasng.engine.utils.output import DeployStream, Style
 from paasng.platform.applications.models import ModuleEnvironment
 from paasng.platform.modules.helpers import ModuleRuntimeManager
 from paasng.platform.oauth2.exceptions import BkOauthClientDoesNotExist
@@ -41,9 +51,14 @@ if TYPE_CHECKING:
 
 from .provider import env_vars_providers
 
+logger = logging.getLogger(__name__)
+
 
 def get_env_variables(
-    env: ModuleEnvironment, include_builtin=True, deployment: Optional[Deployment] = None
+    env: ModuleEnvironment,
+    include_builtin=True,
+    deployment: Optional[Deployment] = None,
+    stream: Optional[DeployStream] = None,
 ) -> Dict[str, str]:
     """Get env vars for current environment, this will includes:
 
@@ -54,45 +69,208 @@ def get_env_variables(
 
     :param include_builtin: Whether include builtin config vars
     :param deployment: Optional deployment object to get vars defined in description file
+    :param stream: Optional deploy stream, the time spent on each source will be written to it
     :returns: Dict of env vars
+    :raises: EnvVarsSourceTimeout when any source took too long
     """
-    result = {}
-    engine_app = env.get_engine_app()
+    assembler = EnvVarsAssembler(make_env_vars_sources(env, include_builtin, deployment))
+    try:
+        return assembler.assemble()
+    finally:
+        logger.info('Env variables of %s assembled, timings: %s', env.engine_app.name, assembler.format_timings())
+        if stream:
+            message = _('获取环境变量耗时: {timings}').format(timings=assembler.format_timings())
+            stream.write_message(Style.Warning(message) if assembler.has_failures else message)
+
 
-    # Part: Gather values from registered env variables providers, it has lowest priority
-    result.update(env_vars_providers.gather(env, deployment))
+def make_env_vars_sources(
+    env: ModuleEnvironment, include_builtin=True, deployment: Optional[Deployment] = None
+) -> List['EnvVarsSource']:
+    """Make the sources of env vars for current environment, the latter source has higher priority"""
+    engine_app = env.get_engine_app()
+    sources = [
+        # Part: Gather values from registered env variables providers, it has lowest priority
+        EnvVarsSource('providers', lambda: env_vars_providers.gather(env, deployment)),
+    ]
 
     # Part: system-wide env vars
     if include_builtin:
-        result.update(get_builtin_env_variables(engine_app, settings.CONFIGVAR_SYSTEM_PREFIX))
+        sources.append(
+            EnvVarsSource('builtin', lambda: get_builtin_env_variables(engine_app, settings.CONFIGVAR_SYSTEM_PREFIX))
+        )
+
+    sources += [
+        # Part: Address for bk_docs_center saas
+        # Q: Why not in the get_builtin_env_variables method？
+        # method(get_preallocated_address) and module(ConfigVar) will be referenced circularly
+        EnvVarsSource('bk_docs', lambda: {'BK_DOCS_URL_PREFIX': get_bk_doc_url_prefix()}),
+        # Part: insert blobstore env vars
+        EnvVarsSource('blobstore', lambda: generate_blobstore_env_vars(engine_app)),
+        # Part: user defined env vars
+        # Q: Why don't we using engine_app directly to get ConfigVars?
+        #
+        # Because Config Vars, unlike ServiceInstance, is not bind to EngineApp. It
+        # has application global type which shares under every engine_app/environment of an
+        # application.
+        EnvVarsSource('config_vars', lambda: get_config_vars(env.module, env.environment)),
+        # Part: env vars shared from other modules
+        EnvVarsSource('shared_services', lambda: ServiceSharingManager(env.module).get_env_variables(env)),
+        # Part: env vars provided by services
+        EnvVarsSource('services', lambda: mixed_service_mgr.get_env_vars(engine_app)),
+        # Part: Application's default sub domains/paths
+        EnvVarsSource(
+            'default_entrances',
+            lambda: {**AppDefaultDomains(env).as_env_vars(), **AppDefaultSubpaths(env).as_env_vars()},
+        ),
+    ]
+    return sources
+
+
+@dataclass
+class EnvVarsSource:
+    """A source of env variables
+
+    :param name: name of the source, used for logging
+    :param getter: function which returns the env variables
+    :param timeout: max seconds of waiting for the source, use the default value when not given
+    """
+
+    name: str
+    getter: Callable[[], Dict[str, str]]
+    timeout: Optional[float] = None
 
-    # Part: Address for bk_docs_center saas
-    # Q: Why not in the get_builtin_env_variables method？
 
-    # method(get_preallocated_address) and module(ConfigVar) will be referenced circularly
-    result.update({'BK_DOCS_URL_PREFIX': get_bk_doc_url_prefix()})
+@dataclass
+class EnvVarsSourceTiming:
+    """The time spent on getting env variables from a source
 
-    # Part: insert blobstore env vars
-    result.update(generate_blobstore_env_vars(engine_app))
+    :param status: "ok", "error" or "timeout"
+    """
+
+    name: str
+    elapsed: float
+    status: str
 
-    # Part: user defined env vars
-    # Q: Why don't we using engine_app directly to get ConfigVars?
-    #
-    # Because Config Vars, unlike ServiceInstance, is not bind to EngineApp. It
-    # has application global type which shares under every engine_app/environment of an
-    # application.
-    result.update(get_config_vars(engine_app.env.module, engine_app.env.environment))
 
-    # Part: env vars shared from other modules
-    result.update(ServiceSharingManager(env.module).get_env_variables(env))
+class EnvVarsAssembler:
+    """Assemble env variables from multiple sources, sources are independent of each other so they can be
+    fetched concurrently, the results are always merged in the order of sources.
 
-    # Part: env vars provided by services
-    result.update(mixed_service_mgr.get_env_vars(engine_app))
+    :param sources: sources of env variables, the latter has higher priority
+    :param concurrency: max threads for fetching sources, sources will be fetched in current thread
+        one by one when it's less than 2, default to `settings.ENV_VARS_GATHER_CONCURRENCY`
+    :param timeout: default max seconds of waiting for each source, it is measured from the time when the
+        source starts running in a worker(the time queued for a free worker is excluded), it only works when
+        sources are fetched concurrently, default to `settings.ENV_VARS_SOURCE_TIMEOUT`
+    """
 
-    # Part: Application's default sub domains/paths
-    result.update(AppDefaultDomains(env).as_env_vars())
-    result.update(AppDefaultSubpaths(env).as_env_vars())
-    return result
+    def __init__(
+        self, sources: List[EnvVarsSource], concurrency: Optional[int] = None, timeout: Optional[float] = None
+    ):
+        self.sources = sources
+        self.concurrency = settings.ENV_VARS_GATHER_CONCURRENCY if concurrency is None else concurrency
+        self.timeout = settings.ENV_VARS_SOURCE_TIMEOUT if timeout is None else timeout
+        self._lock = threading.Lock()
+        self._timings: Dict[str, EnvVarsSourceTiming] = {}
+
+    def assemble(self) -> Dict[str, str]:
+        """Fetch env variables from all sources and merge them
+
+        :raises: EnvVarsSourceTimeout when any source took too long, other exceptions raised by the sources
+        """
+        with self._lock:
+            self._timings = {}
+
+        if self.concurrency > 1 and len(self.sources) > 1:
+            results = self._fetch_concurrently()
+        else:
+            results = [self._fetch(source) for source in self.sources]
+
+        env_vars: Dict[str, str] = {}
+        for result in results:
+            env_vars.update(result)
+        return env_vars
+
+    @property
+    def timings(self) -> List[EnvVarsSourceTiming]:
+        """Timings of the sources which have been fetched, in the order of sources"""
+        with self._lock:
+            return [self._timings[s.name] for s in self.sources if s.name in self._timings]
+
+    @property
+    def has_failures(self) -> bool:
+        return any(t.status != 'ok' for t in self.timings)
+
+    def format_timings(self) -> str:
+        """Format timings in a human-readable string, e.g. "builtin: 0.05s, services: 1.20s" """
+        items = []
+        for t in self.timings:
+            suffix = '' if t.status == 'ok' else f'({t.status})'
+            items.append(f'{t.name}: {t.elapsed:.2f}s{suffix}')
+        return ', '.join(items)
+
+    def _fetch_concurrently(self) -> List[Dict[str, str]]:
+        executor = ThreadPoolExecutor(max_workers=min(self.concurrency, len(self.sources)))
+        clocks = [_SourceClock() for _ in self.sources]
+        futures: List[Future] = [
+            executor.submit(self._fetch_in_worker, source, clock) for source, clock in zip(self.sources, clocks)
+        ]
+        try:
+            results = []
+            for source, clock, future in zip(self.sources, clocks, futures):
+                timeout = self.timeout if source.timeout is None else source.timeout
+                try:
+                    # Sources are started in order, so the current one gets a worker soon after the previous
+                    # ones are finished, waiting for it to start is bounded by the timeout just in case
+                    if not clock.started.wait(timeout):
+                        raise FutureTimeoutError
+                    results.append(future.result(timeout=max(clock.started_at + timeout - time.perf_counter(), 0)))
+                except FutureTimeoutError:
+                    self._record(source, clock.elapsed(), 'timeout')
+                    raise EnvVarsSourceTimeout(source.name, timeout)
+            return results
+        finally:
+            for future in futures:
+                future.cancel()
+            # Do not wait for the slow sources, they will be finished in background
+            executor.shutdown(wait=False)
+
+    def _fetch_in_worker(self, source: EnvVarsSource, clock: '_SourceClock') -> Dict[str, str]:
+        clock.start()
+        try:
+            return self._fetch(source)
+        finally:
+            connections.close_all()
+
+    def _fetch(self, source: EnvVarsSource) -> Dict[str, str]:
+        started_at = time.perf_counter()
+        status = 'error'
+        try:
+            result = source.getter()
+            status = 'ok'
+            return result
+        finally:
+            self._record(source, time.perf_counter() - started_at, status)
+
+    def _record(self, source: EnvVarsSource, elapsed: float, status: str):
+        with self._lock:
+            # The timing of a timed-out source should not be overwritten when it's finished in background
+            self._timings.setdefault(source.name, EnvVarsSourceTiming(source.name, elapsed, status))
+
+
+class _SourceClock:
+    """Records when a source starts running in a worker thread"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.started_at = 0.0
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self.started.set()
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at if self.started.is_set() else 0.0
 
 
 def generate_env_vars_for_app(app: 'Application', config_vars_prefix: str) -> Dict[str, str]:
@@ -44,7 +44,7 @@ from paasng.engine.deploy.bg_build.utils import (
 from paasng.engine.exceptions import DeployInterruptionFailed
 from paasng.engine.models.deployment import Deployment
 from paasng.engine.models.phases import DeployPhaseTypes
-from paasng.engine.utils.output import ConsoleStream, DeployStream, RedisWithModelStream, Style
+from paasng.engine.utils.output import BufferedRedisWithModelStream, ConsoleStream, DeployStream, Style
 from paasng.engine.workflow import DeployStep
 from paasng.platform.core.storages.redisdb import get_default_redis
 
@@ -73,12 +73,16 @@ def start_bg_build_process(deploy_id, bp_id, stream_channel_id=None, metadata=No
     if stream_channel_id:
         stream_channel = StreamChannel(stream_channel_id, redis_db=get_default_redis())
         stream_channel.initialize()
-        stream = RedisWithModelStream(build_process, stream_channel)
+        stream = BufferedRedisWithModelStream(build_process, stream_channel)
     else:
         stream = ConsoleStream()
 
     bp_executor = BuildProcessExecutor(Deployment.objects.get(pk=deploy_id), build_process, stream)
-    bp_executor.execute(metadata=metadata)
+    try:
+        bp_executor.execute(metadata=metadata)
+    finally:
+        # The channel is still used by following steps, only flush the buffered messages
+        stream.flush()
 
 
 def interrupt_build_proc(bp_id: UUID) -> bool:
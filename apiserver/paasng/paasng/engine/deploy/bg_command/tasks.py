@@ -24,7 +24,7 @@ from celery import shared_task
 
 from paas_wl.release_controller.hooks.models import Command, CommandTemplate
 from paas_wl.resources.actions.exec import AppCommandExecutor
-from paasng.engine.utils.output import ConsoleStream, DeployStream, RedisWithModelStream
+from paasng.engine.utils.output import BufferedRedisWithModelStream, ConsoleStream, DeployStream
 from paasng.platform.applications.models import ModuleEnvironment
 from paasng.platform.core.storages.redisdb import get_default_redis
 
@@ -67,9 +67,12 @@ def execute_bg_command(uuid: str, stream_channel_id: Optional[str] = None, extra
     if stream_channel_id:
         stream_channel = StreamChannel(stream_channel_id, redis_db=get_default_redis())
         stream_channel.initialize()
-        stream = RedisWithModelStream(command, stream_channel)
+        stream = BufferedRedisWithModelStream(command, stream_channel)
     else:
         stream = ConsoleStream()
 
     executor = AppCommandExecutor(command=command, stream=stream, extra_envs=extra_envs or {})
-    executor.perform()
+    try:
+        executor.perform()
+    finally:
+        stream.flush()
@@ -16,6 +16,7 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
+import hashlib
 import logging
 from pathlib import Path
 from typing import TYPE_CHECKING, Dict, Optional
@@ -30,7 +31,7 @@ from paas_wl.platform.applications.models.build import BuildProcess
 from paas_wl.platform.applications.models.misc import OutputStream
 from paasng.dev_resources.servicehub.manager import mixed_service_mgr
 from paasng.dev_resources.sourcectl.utils import (
-    ExcludeChecker,
+    DockerIgnore,
     compress_directory_ext,
     generate_temp_dir,
     generate_temp_file,
@@ -44,7 +45,7 @@ from paasng.engine.constants import BuildStatus, JobStatus, RuntimeType
 from paasng.engine.deploy.base import DeployPoller
 from paasng.engine.deploy.bg_build.bg_build import start_bg_build_process
 from paasng.engine.deploy.release import start_release_step
-from paasng.engine.models import Deployment
+from paasng.engine.models import Deployment, SourcePackageCache
 from paasng.engine.models.phases import DeployPhaseTypes
 from paasng.engine.phases_steps.steps import update_step_by_line
 from paasng.engine.signals import post_phase_end, pre_appenv_build, pre_phase_start
@@ -55,6 +56,7 @@ from paasng.engine.utils.source import (
     get_app_description_handler,
     get_dockerignore,
     get_processes,
+    get_source_package_cache_key,
     get_source_package_path,
     tag_module_from_source_files,
 )
@@ -104,14 +106,26 @@ class BaseBuilder(DeployStep):
     PHASE_TYPE = DeployPhaseTypes.BUILD
 
     def compress_and_upload(
-        self, relative_source_dir: Path, source_destination_path: str, should_ignore: Optional[ExcludeChecker] = None
-    ):
+        self, relative_source_dir: Path, source_destination_path: str, dockerignore: Optional[DockerIgnore] = None
+    ) -> str:
         """Download, compress and upload module source files
 
         :param Path relative_source_dir: 源码目录(相对路径), 当源码目录不为 Path(".") 时, 表示仅打包上传 relative_source_dir 下的源码文件.
         :param str source_destination_path: 表示将源码归档包上传至对象存储中的位置.
+        :param dockerignore: 打包时使用的 .dockerignore 规则
+        :return: 源码包在对象存储中的位置, 当复用了已上传的源码包时, 与 source_destination_path 不同
         """
         module = self.deployment.app_environment.module
+        cache_key = get_source_package_cache_key(self.deployment, relative_source_dir, dockerignore)
+        if cache_key and (cache := SourcePackageCache.objects.get_valid(cache_key)):
+            logger.info("Reuse source package %s for deployment %s", cache.storage_path, self.deployment.id)
+            self.stream.write_message(
+                _("Source files of revision {revision} have been uploaded, reuse the package").format(
+                    revision=self.deployment.source_revision
+                )
+            )
+            return cache.storage_path
+
         with generate_temp_dir() as working_dir:
             source_dir = working_dir.absolute() / relative_source_dir
             download_source_to_dir(module, self.deployment.operator, self.deployment, working_dir)
@@ -131,12 +145,23 @@ class BaseBuilder(DeployStep):
 
             tag_module_from_source_files(module, source_dir)
             with generate_temp_file(suffix='.tar.gz') as package_path:
+                should_ignore = dockerignore.should_ignore if dockerignore else None
                 compress_directory_ext(source_dir, package_path, should_ignore=should_ignore)
                 check_source_package(self.engine_app, package_path, self.stream)
                 logger.info(f"Uploading source files to {source_destination_path}")
                 make_blob_store(bucket=settings.BLOBSTORE_BUCKET_APP_SOURCE).upload_file(
                     package_path, source_destination_path
                 )
+                if cache_key:
+                    SourcePackageCache.objects.record(
+                        module,
+                        cache_key,
+                        revision=self.deployment.source_revision,
+                        storage_path=source_destination_path,
+                        sha256=file_sha256(package_path),
+                        size=package_path.stat().st_size,
+                    )
+        return source_destination_path
 
     def handle_app_description(self):
         """Handle application description for deployment"""
@@ -231,7 +256,7 @@ class ApplicationBuilder(BaseBuilder):
 
         with self.procedure_force_phase('上传仓库代码', phase=preparation_phase):
             source_destination_path = get_source_package_path(self.deployment)
-            self.compress_and_upload(relative_source_dir, source_destination_path)
+            source_destination_path = self.compress_and_upload(relative_source_dir, source_destination_path)
 
         with self.procedure_force_phase('配置资源实例', phase=preparation_phase) as p:
             self.provision_services(p, module)
@@ -247,7 +272,7 @@ class ApplicationBuilder(BaseBuilder):
 
     def async_start_build_process(self, source_tar_path: str, procfile: Dict[str, str]):
         """Start a new build process and check the status periodically"""
-        env_vars = get_env_variables(self.module_environment, deployment=self.deployment)
+        env_vars = get_env_variables(self.module_environment, deployment=self.deployment, stream=self.stream)
         build_process_id = start_buildpacks_build(
             self.deployment, self.version_info, str(self.deployment.id), source_tar_path, procfile, env_vars
         )
@@ -278,10 +303,8 @@ class ImageBuilder(BaseBuilder):
 
         with self.procedure_force_phase('上传仓库代码', phase=preparation_phase):
             source_destination_path = get_source_package_path(self.deployment)
-            self.compress_and_upload(
-                relative_source_dir,
-                source_destination_path,
-                should_ignore=dockerignore.should_ignore if dockerignore else None,
+            source_destination_path = self.compress_and_upload(
+                relative_source_dir, source_destination_path, dockerignore=dockerignore
             )
 
         with self.procedure_force_phase('配置资源实例', phase=preparation_phase) as p:
@@ -308,6 +331,15 @@ class ImageBuilder(BaseBuilder):
         BuildProcessPoller.start(params, BuildProcessResultHandler)
 
 
+def file_sha256(path: Path) -> str:
+    """Calculate the sha256 digest of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fp:
+        for chunk in iter(lambda: fp.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
 class BuildProcessPoller(DeployPoller):
     """Poller for querying the status of build process
     Finish when the building process in engine side was completed
@@ -359,8 +391,8 @@ class BuildProcessPoller(DeployPoller):
 
         # TODO: Use a flag value to indicate the progress of the scanning of the log,
         # so that we won't need to scan the log from the beginning every time.
-        for line in build_proc.output_stream.lines.all().values_list('line', flat=True):
-            update_step_by_line(line, pattern_maps, phase)
+        for line in build_proc.output_stream.iter_lines():
+            update_step_by_line(line.line, pattern_maps, phase)
 
 
 class BuildProcessResultHandler(CallbackHandler):
@@ -113,12 +113,17 @@ class EngineDeployClient:
         )
         return str(build.uuid)
 
-    def list_build_proc_logs(self, build_process_id: str) -> List[LogLine]:
-        """Get current status of build process"""
+    def list_build_proc_logs(self, build_process_id: str, tail: Optional[int] = None) -> List[LogLine]:
+        """Get the logs of build process
+
+        :param tail: only return the last N lines if given
+        """
         build_proc = BuildProcess.objects.get(pk=build_process_id)
+        output_stream = build_proc.output_stream
+        output_lines = output_stream.tail_lines(tail) if tail else output_stream.iter_lines()
 
         lines: List[LogLine] = []
-        for line in build_proc.output_stream.lines.all().order_by('created'):
+        for line in output_lines:
             lines.append({'stream': line.stream, 'line': line.line, 'created': line.created})
         return lines
 
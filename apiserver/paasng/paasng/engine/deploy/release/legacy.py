@@ -37,6 +37,7 @@ from paasng.engine.models.deployment import Deployment
 from paasng.engine.models.phases import DeployPhaseTypes
 from paasng.engine.models.processes import ProcessManager
 from paasng.engine.signals import on_release_created
+from paasng.engine.utils.output import DeployStream
 from paasng.engine.workflow import DeployStep
 from paasng.platform.applications.models import ModuleEnvironment
 
@@ -60,7 +61,7 @@ class ApplicationReleaseMgr(DeployStep):
 
         with self.procedure('部署应用'):
             release_id = release_by_engine(
-                self.module_environment, str(self.deployment.build_id), deployment=self.deployment
+                self.module_environment, str(self.deployment.build_id), deployment=self.deployment, stream=self.stream
             )
             self.sync_entrance_configs()
             # Emit a signal to notify that the ModuleEnvironment is going to release
@@ -143,7 +144,12 @@ class ReleaseResultHandler(CallbackHandler):
         return details
 
 
-def release_by_engine(env: ModuleEnvironment, build_id: str, deployment: Optional[Deployment] = None) -> str:
+def release_by_engine(
+    env: ModuleEnvironment,
+    build_id: str,
+    deployment: Optional[Deployment] = None,
+    stream: Optional[DeployStream] = None,
+) -> str:
     """Create a new release for the given environment. If the optional deployment
     object is given, will start an async waiting procedure which waits for the release
     to be finished.
@@ -151,6 +157,7 @@ def release_by_engine(env: ModuleEnvironment, build_id: str, deployment: Optiona
     :param env: The environment to create the release for.
     :param build_id: The ID of the finished build object.
     :param deployment: if not given, will try using the latest succeed deployment for getting desc env vars
+    :param stream: optional deploy stream for writing the time spent on getting env vars
     :return: The ID of the created release object.
     """
     if not deployment:
@@ -169,7 +176,7 @@ def release_by_engine(env: ModuleEnvironment, build_id: str, deployment: Optiona
         procfile = get_processes_by_build(build_id)
         deployment_id = None
 
-    extra_envs = get_env_variables(env, deployment=deployment)
+    extra_envs = get_env_variables(env, deployment=deployment, stream=stream)
 
     # Create the release and start the background task to wait for the release if needed
     release = EngineDeployClient(env.get_engine_app()).create_release(build_id, deployment_id, extra_envs, procfile)
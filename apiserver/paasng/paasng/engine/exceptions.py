@@ -72,3 +72,12 @@ class DeployShouldAbortError(Exception):
 
     def __str__(self):
         return self.reason
+
+
+class EnvVarsSourceTimeout(Exception):
+    """Getting env variables from a source took too long"""
+
+    def __init__(self, source_name: str, timeout: float):
+        self.source_name = source_name
+        self.timeout = timeout
+        super().__init__(f'Getting env variables from "{source_name}" timed out after {timeout} seconds')
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+"""Benchmark the throughput of writing deployment logs, compares the unbuffered and buffered streams"""
+import time
+import uuid
+from types import SimpleNamespace
+
+from blue_krill.redis_tools.messaging import StreamChannel
+from django.core.management.base import BaseCommand
+
+from paas_wl.platform.applications.models.misc import OutputStream
+from paasng.engine.utils.output import BufferedRedisWithModelStream, RedisWithModelStream
+from paasng.platform.core.storages.redisdb import get_default_redis
+
+
+class Command(BaseCommand):
+    help = "Benchmark the throughput of writing build/command logs to database and redis channel"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=2000, help="number of lines to write")
+        parser.add_argument('--line_length', type=int, default=120, help="length of each line")
+
+    def handle(self, *args, **options):
+        lines = options['lines']
+        message = 'x' * options['line_length']
+        for stream_cls in [RedisWithModelStream, BufferedRedisWithModelStream]:
+            elapsed = self.run_benchmark(stream_cls, message, lines)
+            self.stdout.write(f'{stream_cls.__name__}: {lines} lines in {elapsed:.3f}s, {lines / elapsed:.1f} lines/s')
+
+    def run_benchmark(self, stream_cls, message: str, lines: int) -> float:
+        output_stream = OutputStream.objects.create()
+        stream_channel = StreamChannel(f'benchmark-{uuid.uuid4().hex}', redis_db=get_default_redis())
+        stream_channel.initialize()
+        stream = stream_cls(SimpleNamespace(output_stream=output_stream), stream_channel)
+        try:
+            started_at = time.perf_counter()
+            for _ in range(lines):
+                stream.write_message(message)
+            stream.close()
+            return time.perf_counter() - started_at
+        finally:
+            # Lines will be deleted by cascade
+            output_stream.delete()
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+# Generated by Django 3.2.12 on 2023-06-25 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('modules', '0010_remove_module_runtime_type'),
+        ('engine', '0014_deployment_bkapp_revision_id'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourcePackageCache',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('region', models.CharField(help_text='部署区域', max_length=32)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('cache_key', models.CharField(help_text='源码包输入参数的 sha256 摘要', max_length=64, unique=True)),
+                ('revision', models.CharField(help_text='源码版本号', max_length=128)),
+                ('storage_path', models.CharField(help_text='源码包在对象存储中的路径', max_length=2048)),
+                ('sha256', models.CharField(help_text='源码包的 sha256 摘要', max_length=64)),
+                ('size', models.BigIntegerField(help_text='源码包大小')),
+                (
+                    'module',
+                    models.ForeignKey(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='source_package_caches',
+                        to='modules.module',
+                    ),
+                ),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
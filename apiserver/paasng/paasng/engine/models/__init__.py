@@ -22,6 +22,7 @@ from .deployment import Deployment
 from .offline import OfflineOperation
 from .oneoffcmd import OneOffCommand
 from .operations import ModuleEnvironmentOperations
+from .package_cache import SourcePackageCache
 from .phases import DeployPhase, DeployPhaseTypes
 from .steps import DeployStep
 
@@ -37,4 +38,5 @@ __all__ = [
     'DeployPhaseTypes',
     'DeployPhase',
     'DeployStep',
+    'SourcePackageCache',
 ]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+import logging
+from typing import Optional
+
+from blue_krill.storages.blobstore.bkrepo import RequestError
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.db import models
+
+from paasng.utils.blobstore import make_blob_store
+from paasng.utils.models import TimestampedModel
+
+logger = logging.getLogger(__name__)
+
+
+class SourcePackageCacheManager(models.Manager):
+    def get_valid(self, cache_key: str) -> Optional['SourcePackageCache']:
+        """Get the cache by key, return None if the package file no longer exists in blobstore"""
+        cache = self.filter(cache_key=cache_key).first()
+        if not cache:
+            return None
+
+        # The packages may be deleted by the cleaner, make sure it still exists
+        try:
+            make_blob_store(bucket=settings.BLOBSTORE_BUCKET_APP_SOURCE).get_file_metadata(cache.storage_path)
+        except Exception as e:
+            if not _is_object_missing(e):
+                # 对象存储暂时不可用时无法确认源码包状态，本次不使用缓存，但保留缓存记录
+                logger.warning("Unable to check source package %s of cache %s: %s", cache.storage_path, cache_key, e)
+                return None
+            logger.info("Source package %s of cache %s is missing, remove the cache", cache.storage_path, cache_key)
+            cache.delete()
+            return None
+        return cache
+
+    def record(self, module, cache_key: str, revision: str, storage_path: str, sha256: str, size: int):
+        """Record an uploaded package, caches which point to the same storage path are removed because
+        the package file has been overwritten.
+        """
+        self.filter(storage_path=storage_path).exclude(cache_key=cache_key).delete()
+        self.update_or_create(
+            cache_key=cache_key,
+            defaults={
+                'region': module.region,
+                'module': module,
+                'revision': revision,
+                'storage_path': storage_path,
+                'sha256': sha256,
+                'size': size,
+            },
+        )
+
+
+def _is_object_missing(exc: Exception) -> bool:
+    """Check if the error raised by blobstore means the object does not exist"""
+    if isinstance(exc, ClientError):
+        return exc.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound')
+    if isinstance(exc, RequestError):
+        return str(getattr(exc, 'code', '')) == '404'
+    return False
+
+
+class SourcePackageCache(TimestampedModel):
+    """Uploaded source package of a module, keyed by the digest of everything that affects the package content
+    (module, revision, source dir, dockerignore rules and processes). Deployments with the same key reuse the
+    package instead of downloading, compressing and uploading the source again.
+    """
+
+    module = models.ForeignKey(
+        'modules.Module', on_delete=models.CASCADE, db_constraint=False, related_name='source_package_caches'
+    )
+    cache_key = models.CharField(max_length=64, unique=True, help_text='源码包输入参数的 sha256 摘要')
+    revision = models.CharField(max_length=128, help_text='源码版本号')
+    storage_path = models.CharField(max_length=2048, help_text='源码包在对象存储中的路径')
+    sha256 = models.CharField(max_length=64, help_text='源码包的 sha256 摘要')
+    size = models.BigIntegerField(help_text='源码包大小')
+
+    objects = SourcePackageCacheManager()
+
+    def __str__(self):
+        return f'{self.module_id}:{self.revision}:{self.storage_path}'
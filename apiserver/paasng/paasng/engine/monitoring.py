@@ -64,7 +64,8 @@ def deployment_is_frozen(deployment: Deployment, since: datetime.datetime) -> bo
         return True
 
     client = EngineDeployClient(deployment.get_engine_app())
-    log_lines = client.list_build_proc_logs(deployment.build_process_id)
+    # Only the last line is needed
+    log_lines = client.list_build_proc_logs(deployment.build_process_id, tail=1)
 
     # Deployment with no logs lines was frozen
     if not log_lines:
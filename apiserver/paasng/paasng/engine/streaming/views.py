@@ -32,7 +32,7 @@ from rest_framework.viewsets import ViewSet
 from paasng.engine.workflow import ServerSendEvent
 from paasng.platform.core.storages.redisdb import get_default_redis
 from paasng.utils.error_codes import error_codes
-from paasng.utils.rate_limit.constants import UserAction
+from paasng.utils.rate_limit.constants import RateLimitAlgorithm, UserAction
 from paasng.utils.rate_limit.fixed_window import rate_limits_by_user
 from paasng.utils.views import EventStreamRender
 
@@ -49,7 +49,9 @@ class StreamViewSet(ViewSet):
             raise error_codes.CHANNEL_NOT_FOUND
         return subscriber
 
-    @rate_limits_by_user(UserAction.FETCH_DEPLOY_LOG, window_size=60, threshold=10)
+    @rate_limits_by_user(
+        UserAction.FETCH_DEPLOY_LOG, window_size=60, threshold=10, algorithm=RateLimitAlgorithm.SLIDING_WINDOW
+    )
     def streaming(self, request, channel_id):
         subscriber = self.get_subscriber(channel_id)
 
@@ -16,13 +16,18 @@ We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
 import abc
+import copy
 import json
+import logging
 import sys
+import threading
+import time
 from enum import Enum
-from typing import TYPE_CHECKING, Optional, Protocol
+from typing import TYPE_CHECKING, List, Optional, Protocol, Tuple
 
 from blue_krill.redis_tools.messaging import StreamChannel
 from django.conf import settings
+from django.db import connection
 
 from paasng.engine.models import Deployment
 from paasng.platform.core.storages.redisdb import get_default_redis
@@ -31,6 +36,13 @@ from paasng.utils import termcolors
 if TYPE_CHECKING:
     from paas_wl.platform.applications.models.misc import OutputStream
 
+logger = logging.getLogger(__name__)
+
+# Max number of messages buffered by `BufferedRedisWithModelStream`
+STREAM_BUFFER_MAX_LINES = 200
+# Max seconds for a message to stay in the buffer of `BufferedRedisWithModelStream`
+STREAM_BUFFER_FLUSH_INTERVAL = 0.25
+
 
 def make_style(*args, **kwargs):
     colorful = termcolors.make_style(*args, **kwargs)
@@ -100,6 +112,10 @@ class DeployStream(metaclass=abc.ABCMeta):
     def from_deployment_id(cls, deployment_id: str):
         raise NotImplementedError
 
+    def flush(self):
+        """Flush the buffered messages, only useful for buffered streams"""
+        return None
+
 
 class RedisChannelStream(DeployStream):
     """Stream using redis channel"""
@@ -164,6 +180,17 @@ class ModelStream:
         message = self.cleanup_message(message)
         self.model.output_stream.write(line=message, stream=stream)
 
+    def write_messages(self, messages: List[Tuple[str, str]]):
+        """Write multiple messages to output stream in one query
+
+        :param messages: a list of (message, stream)
+        """
+        self.model.output_stream.bulk_write([(self.cleanup_message(msg), stream) for msg, stream in messages])
+
+    def flush(self):
+        """Save the messages buffered by output stream, see `OutputStream.write`"""
+        self.model.output_stream.flush()
+
     @staticmethod
     def cleanup_message(message):
         # Remove bad characters output by slugbuilder
@@ -188,6 +215,126 @@ class RedisWithModelStream(RedisChannelStream):
         self.model_stream.write_message(message, stream)
         super().write_message(message, stream)
 
+    def close(self):
+        self.model_stream.flush()
+        return super().close()
+
+    def flush(self):
+        self.model_stream.flush()
+
+
+class BufferedRedisWithModelStream(RedisWithModelStream):
+    """A buffered version of `RedisWithModelStream`, messages are coalesced and written in batches: lines
+    are saved by one `bulk_create` query and published to redis channel in one pipeline.
+
+    The buffer will be flushed when it's full, when the oldest message has been buffered longer than
+    `flush_interval`(by a background flusher thread), and before writing titles/events or closing the stream.
+    Call `flush` when the stream is no longer used but not closed, it also stops the flusher thread.
+
+    :param max_lines: max number of buffered messages
+    :param flush_interval: max seconds for a message to stay in buffer
+    """
+
+    def __init__(
+        self,
+        model: MessageWriter,
+        stream_channel: StreamChannel,
+        max_lines: int = STREAM_BUFFER_MAX_LINES,
+        flush_interval: float = STREAM_BUFFER_FLUSH_INTERVAL,
+    ):
+        super().__init__(model, stream_channel)
+        self.max_lines = max_lines
+        self.flush_interval = flush_interval
+        self._buffer: List[Tuple[str, str]] = []
+        self._buffered_at = 0.0
+        self._lock = threading.RLock()
+        self._flusher: Optional[threading.Thread] = None
+        self._flusher_stopped = threading.Event()
+
+    def write_message(self, message, stream='STDOUT'):
+        with self._lock:
+            if not self._buffer:
+                self._buffered_at = time.monotonic()
+            self._buffer.append((message, stream))
+            if len(self._buffer) >= self.max_lines:
+                self._flush_buffer()
+            else:
+                self._ensure_flusher()
+
+    def write_title(self, title):
+        self._flush()
+        return super().write_title(title)
+
+    def write_event(self, event_name: str, data: dict):
+        self._flush()
+        return super().write_event(event_name, data)
+
+    def close(self):
+        self.flush()
+        return super().close()
+
+    def flush(self):
+        """Flush the buffered messages and stop the flusher thread"""
+        self._flush()
+        self._stop_flusher()
+
+    def _flush(self):
+        with self._lock:
+            self._flush_buffer()
+
+    def _flush_buffer(self):
+        """Write the buffered messages to model and redis channel, must be called with lock held"""
+        messages, self._buffer = self._buffer, []
+        if not messages:
+            return
+        try:
+            self.model_stream.write_messages(messages)
+        finally:
+            # Always publish the messages even if writing to database failed, so users can still see them
+            self._publish_messages(messages)
+
+    def _publish_messages(self, messages: List[Tuple[str, str]]):
+        """Publish messages to redis channel in one pipeline"""
+        redis_db = getattr(self.channel, 'redis_db', None)
+        if redis_db is None:
+            for message, stream in messages:
+                RedisChannelStream.write_message(self, message, stream)
+            return
+
+        # Make a shallow copy of channel which sends commands to the pipeline instead
+        pipe = redis_db.pipeline(transaction=False)
+        channel = copy.copy(self.channel)
+        channel.redis_db = pipe
+        for message, stream in messages:
+            channel.publish_msg(message=json.dumps({'line': message, 'stream': str(stream)}))
+        pipe.execute()
+
+    def _ensure_flusher(self):
+        """Start the flusher thread if it's not running, must be called with lock held"""
+        if self._flusher and self._flusher.is_alive():
+            return
+        self._flusher_stopped.clear()
+        self._flusher = threading.Thread(target=self._run_flusher, daemon=True)
+        self._flusher.start()
+
+    def _stop_flusher(self):
+        self._flusher_stopped.set()
+        flusher = self._flusher
+        if flusher and flusher is not threading.current_thread():
+            flusher.join()
+
+    def _run_flusher(self):
+        try:
+            while not self._flusher_stopped.wait(self.flush_interval):
+                with self._lock:
+                    if self._buffer and time.monotonic() - self._buffered_at >= self.flush_interval:
+                        self._flush_buffer()
+        except Exception:
+            logger.exception('Unable to flush the buffered messages')
+        finally:
+            # Database connections are thread local, close the one opened by current thread
+            connection.close()
+
 
 def get_default_stream(deployment: Deployment) -> RedisChannelStream:
     stream_channel = StreamChannel(deployment.id, redis_db=get_default_redis())
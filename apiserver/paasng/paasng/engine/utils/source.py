@@ -16,6 +16,8 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
+import hashlib
+import json
 import logging
 from pathlib import Path
 from typing import Dict, Optional
@@ -201,6 +203,36 @@ def get_source_package_path(deployment: Deployment) -> str:
     return f'{engine_app.region}/home/{slug_name}/tar'
 
 
+def get_source_package_cache_key(
+    deployment: Deployment, relative_source_dir: Path, dockerignore: Optional[DockerIgnore] = None
+) -> Optional[str]:
+    """Get the cache key of the source package, deployments with the same key will produce packages with the
+    same content, so the uploaded package can be reused.
+
+    :return: None if the package can not be cached
+    """
+    if not settings.ENGINE_SOURCE_PACKAGE_CACHE_ENABLED:
+        return None
+
+    module: Module = deployment.app_environment.module
+    # Only the revisions of VCS repositories are immutable, packages of other origins must be uploaded every time
+    if ModuleSpecs(module).source_origin_specs.source_origin != SourceOrigin.AUTHORIZED_VCS:
+        return None
+    if not deployment.source_revision:
+        return None
+
+    data = {
+        'module_id': str(module.id),
+        'source_location': deployment.source_location,
+        'revision': deployment.source_revision,
+        'source_dir': str(relative_source_dir),
+        'dockerignore': dockerignore.raw_content if dockerignore else None,
+        # The processes will be injected into the package as Procfile
+        'processes': {p.name: p.command for p in deployment.get_processes()},
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
 def download_source_to_dir(module: Module, operator: str, deployment: Deployment, working_path: Path):
     """Download and extract the module's source files to local path, will generate Procfile if necessary
 
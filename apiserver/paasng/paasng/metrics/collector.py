@@ -25,6 +25,7 @@ from paasng.metrics.basic_services.blob_store import BlobStoreAvailableMetric
 from paasng.metrics.basic_services.mysql import MySQLAvailableMetric
 from paasng.metrics.basic_services.redis import RedisAvailableMetric
 from paasng.metrics.workloads.deployment import UnavailableDeploymentTotalMetric
+from paasng.metrics.workloads.kube_client import KubeClientConnectionPoolMetric, KubeDiscoveryCacheMetric
 
 
 class CallbackMetric(Protocol):
@@ -74,3 +75,5 @@ cb_metric_collector.add(MySQLAvailableMetric)
 cb_metric_collector.add(RedisAvailableMetric)
 # 添加原 workloads metric 指标
 cb_metric_collector.add(UnavailableDeploymentTotalMetric)
+cb_metric_collector.add(KubeClientConnectionPoolMetric)
+cb_metric_collector.add(KubeDiscoveryCacheMetric)
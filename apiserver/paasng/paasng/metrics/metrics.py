@@ -56,5 +56,26 @@ DEPLOYMENT_INFO_COUNTER = Counter("deploy_operation", "", ("source_type", "envir
 SERVICE_BIND_COUNTER = Counter('service_bind', "", ("service", "region"))
 SERVICE_PROVISION_COUNTER = Counter('service_provision', "", ("environment", "service", "plan"))
 
+# 远程增强服务请求耗时，status 为 HTTP 状态码，请求异常时为 error
+REMOTE_SERVICE_REQUEST_HISTOGRAM = Histogram(
+    "remote_service_request_seconds",
+    "",
+    ("service", "method", "status"),
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60],
+)
+# 因熔断而被拒绝的远程增强服务请求
+REMOTE_SERVICE_CIRCUIT_OPEN_COUNTER = Counter("remote_service_circuit_open", "", ("service",))
+
 # 进程
 PROCESS_OPERATE_COUNTER = Counter('process_operate', "", ("environment", "operate_type"))
+
+KUBE_CLIENT_REQUEST_HISTOGRAM = Histogram(
+    "kube_client_request_seconds",
+    "",
+    ("cluster", "host", "status"),
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60],
+)
+KUBE_CLIENT_ENDPOINT_FAILURE_COUNTER = Counter("kube_client_endpoint_failure", "", ("cluster", "host"))
+
+# Ingress 同步结果，result: skipped（无变化，跳过）、created、updated、applied（server-side apply）
+INGRESS_SYNC_COUNTER = Counter("ingress_sync", "", ("result",))
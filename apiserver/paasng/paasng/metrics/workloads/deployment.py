@@ -17,13 +17,17 @@ We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
 import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
 
+from django import db
 from django.core.cache import cache
-from django.utils.timezone import now
 from prometheus_client.core import GaugeMetricFamily
 
 from paas_wl.cluster.models import Cluster
-from paas_wl.resources.base.base import get_client_by_cluster_name
+from paas_wl.resources.base.base import EnhancedApiClient, get_client_by_cluster_name
 from paas_wl.resources.base.kube_client import CoreDynamicClient
 from paas_wl.workloads.processes.utils import list_unavailable_deployment
 
@@ -31,35 +35,40 @@ logger = logging.getLogger(__name__)
 
 
 class UnavailableDeploymentTotalMetric:
+    """统计各集群中不可用的 Deployment 数量
+
+    扫描集群的耗时较长, 因此采集 metric 时只读取缓存中的统计结果, 当结果过期时, 在后台线程中并发扫描所有集群并更新缓存.
+    单个集群扫描失败或超时时, 沿用该集群上一次的统计结果.
+    """
+
     name = "unavailable_deployments_total"
     description = "A gauge for counting unavailable deployments"
 
+    cache_key = f"metrics:{name}"
+    lock_key = f"metrics:{name}:refreshing"
+    # 统计结果的刷新间隔(秒)
+    refresh_interval = 60
+    # 统计结果在缓存中的过期时间(秒), 长时间无法刷新时不再上报
+    cache_timeout = 60 * 10
+    # 扫描单个集群的最长时间(秒)
+    cluster_timeout = 30
+    # 并发扫描集群的最大线程数
+    max_workers = 8
+
+    _refreshing = threading.Lock()
+
     @classmethod
     def calc_metric(cls) -> GaugeMetricFamily:
         """获取 metric"""
-        cache_key = f"metrics:{cls.name}"
-        if v := cache.get(cache_key):
-            return v
+        gauge_family = cls.describe_metric()
+        data = cache.get(cls.cache_key)
+        if not data or time.time() - data["refreshed_at"] > cls.refresh_interval:
+            cls.refresh_in_background()
+        if not data:
+            return gauge_family
 
-        dt = now()
-        gauge_family = GaugeMetricFamily(
-            name=cls.name,
-            documentation=cls.description,
-            labels=["region", "cluster_name"],
-        )
-        for cluster in Cluster.objects.all():
-            try:
-                client = get_client_by_cluster_name(cluster_name=cluster.name)
-            except ValueError:
-                logger.exception(f"configuration of cluster<{cluster.name}> is not ready")
-                continue
-            unavailable_deployments = list_unavailable_deployment(CoreDynamicClient(client))
-            gauge_family.add_metric(
-                labels=[cluster.region, cluster.name],
-                value=len(unavailable_deployments),
-                timestamp=dt.timestamp(),
-            )
-        cache.set(cache_key, gauge_family, timeout=60 * 5)
+        for cluster_name, (region, value, timestamp) in data["clusters"].items():
+            gauge_family.add_metric(labels=[region, cluster_name], value=value, timestamp=timestamp)
         return gauge_family
 
     @classmethod
@@ -70,3 +79,71 @@ class UnavailableDeploymentTotalMetric:
             documentation=cls.description,
             labels=["region", "cluster_name"],
         )
+
+    @classmethod
+    def refresh_in_background(cls):
+        """在后台线程中刷新统计结果, 同一时间只有一个进程在刷新"""
+        if not cls._refreshing.acquire(blocking=False):
+            return
+
+        def _refresh():
+            try:
+                cls.refresh()
+            except Exception:
+                logger.exception("Unable to refresh the unavailable deployments metric")
+            finally:
+                cls._refreshing.release()
+                db.connections.close_all()
+
+        threading.Thread(target=_refresh, daemon=True).start()
+
+    @classmethod
+    def refresh(cls):
+        """并发扫描所有集群, 并更新缓存中的统计结果"""
+        # 使用缓存锁避免多个进程同时扫描集群
+        if not cache.add(cls.lock_key, 1, timeout=cls.cluster_timeout * 2):
+            return
+
+        try:
+            data = cache.get(cls.cache_key) or {"clusters": {}}
+            # 先在当前线程中准备好各集群的 client, 扫描线程中只发送 kubernetes 请求
+            clients: Dict[str, Optional[EnhancedApiClient]] = {}
+            clusters = list(Cluster.objects.all())
+            for cluster in clusters:
+                try:
+                    clients[cluster.name] = get_client_by_cluster_name(cluster_name=cluster.name)
+                except ValueError:
+                    logger.exception(f"configuration of cluster<{cluster.name}> is not ready")
+                    clients[cluster.name] = None
+
+            counts: Dict[str, Optional[int]] = {}
+            if clusters:
+                with ThreadPoolExecutor(max_workers=min(len(clusters), cls.max_workers)) as executor:
+                    for cluster_name, count in zip(
+                        clients.keys(), executor.map(cls._count_unavailable, clients.keys(), clients.values())
+                    ):
+                        counts[cluster_name] = count
+
+            results: Dict[str, Tuple[str, int, float]] = {}
+            for cluster in clusters:
+                count = counts.get(cluster.name)
+                if count is not None:
+                    results[cluster.name] = (cluster.region, count, time.time())
+                elif cluster.name in data["clusters"]:
+                    results[cluster.name] = data["clusters"][cluster.name]
+            cache.set(cls.cache_key, {"refreshed_at": time.time(), "clusters": results}, timeout=cls.cache_timeout)
+        finally:
+            cache.delete(cls.lock_key)
+
+    @classmethod
+    def _count_unavailable(cls, cluster_name: str, client: Optional[EnhancedApiClient]) -> Optional[int]:
+        """统计单个集群中不可用的 Deployment 数量, 失败时返回 None"""
+        if client is None:
+            return None
+
+        deadline = time.monotonic() + cls.cluster_timeout
+        try:
+            return len(list_unavailable_deployment(CoreDynamicClient(client), deadline=deadline))
+        except Exception:
+            logger.exception(f"Unable to list unavailable deployments of cluster<{cluster_name}>")
+            return None
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from paas_wl.resources.base.base import client_registry
+from paas_wl.resources.base.kube_client import get_discoverer_cache
+
+
+class KubeClientConnectionPoolMetric:
+    name = "kube_client_connection_pool"
+    description = "A gauge for the HTTP connection pools of kubernetes clients in current process"
+
+    @classmethod
+    def calc_metric(cls) -> GaugeMetricFamily:
+        """获取 metric"""
+        gauge_family = cls.describe_metric()
+        for cluster_name, configuration, rest_client in client_registry.list_rest_clients():
+            pools = rest_client.pool_manager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if not (pool and pool.pool):
+                    continue
+                # The queue was filled with placeholders at the beginning, connections in use are taken out
+                labels = [cluster_name, configuration.host]
+                gauge_family.add_metric(labels=labels + ['in_use'], value=pool.pool.maxsize - pool.pool.qsize())
+                gauge_family.add_metric(labels=labels + ['max'], value=pool.pool.maxsize)
+        return gauge_family
+
+    @classmethod
+    def describe_metric(cls) -> GaugeMetricFamily:
+        """描述 metric"""
+        return GaugeMetricFamily(
+            name=cls.name,
+            documentation=cls.description,
+            labels=["cluster_name", "host", "state"],
+        )
+
+
+class KubeDiscoveryCacheMetric:
+    name = "kube_discovery_cache"
+    description = "A counter for the hits and misses of kubernetes discovery cache in current process"
+
+    @classmethod
+    def calc_metric(cls) -> CounterMetricFamily:
+        """获取 metric"""
+        discoverer_cache = get_discoverer_cache()
+        counter_family = cls.describe_metric()
+        counter_family.add_metric(labels=['hit'], value=discoverer_cache.hits)
+        counter_family.add_metric(labels=['miss'], value=discoverer_cache.misses)
+        return counter_family
+
+    @classmethod
+    def describe_metric(cls) -> CounterMetricFamily:
+        """描述 metric"""
+        return CounterMetricFamily(name=cls.name, documentation=cls.description, labels=["result"])
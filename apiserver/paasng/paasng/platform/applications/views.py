@@ -29,6 +29,7 @@ from bkpaas_auth.models import user_id_encoder
 from django.conf import settings
 from django.db import IntegrityError as DbIntegrityError
 from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
 from django.shortcuts import get_object_or_404
 from django.utils.translation import gettext_lazy as _
 from drf_yasg.utils import swagger_auto_schema
@@ -158,32 +159,32 @@ class ApplicationViewSet(viewsets.ViewSet):
             applications = applications.exclude(type=ApplicationType.BK_PLUGIN)
 
         paginator = ApplicationListPagination()
-        # 如果将用户标记的应用排在前面，需要特殊处理一下
+        page_applications = applications.select_related('product')
+        # 如果将用户标记的应用排在前面，在数据库中按是否被标记排序，再保持原有的排序规则
         if params.get('prefer_marked'):
-            applications_ids = applications.values_list('id', flat=True)
-            applications_ids = sorted(applications_ids, key=lambda x: x in marked_application_ids, reverse=True)
-
-            page = paginator.paginate_queryset(applications_ids, self.request, view=self)
-            page_applications = list(Application.objects.filter(id__in=page).select_related('product'))
-            page_applications = sorted(page_applications, key=lambda x: applications_ids.index(x.id))
-        else:
-            page_applications = paginator.paginate_queryset(applications, self.request, view=self)
-
+            ordering = applications.query.order_by or Application._meta.ordering
+            page_applications = page_applications.annotate(
+                is_marked=Exists(marked_applications.filter(application=OuterRef('pk')))
+            ).order_by('-is_marked', *ordering)
+        page_applications = paginator.paginate_queryset(page_applications, self.request, view=self)
+
+        # 批量获取（或创建）应用市场访问地址信息
+        market_configs = MarketConfig.objects.get_or_create_by_apps(page_applications)
         data = [
             {
                 'application': application,
-                'product': application.product if hasattr(application, "product") else None,
+                'product': application.get_product(),
                 'marked': application.id in marked_application_ids,
-                # 应用市场访问地址信息
-                'market_config': MarketConfig.objects.get_or_create_by_app(application)[0],
+                'market_config': market_configs[application.id],
             }
             for application in page_applications
         ]
 
-        # 统计普通应用、云原生应用、外链应用的数量
-        default_app_count = applications.filter(type__in=ApplicationType.normal_app_type()).count()
-        engineless_app_count = applications.filter(type=ApplicationType.ENGINELESS_APP).count()
-        cloud_native_app_count = applications.filter(type=ApplicationType.CLOUD_NATIVE).count()
+        # 统计普通应用、云原生应用、外链应用的数量，按类型分组后一次查出
+        type_counts = dict(applications.order_by().values_list('type').annotate(count=Count('id')))
+        default_app_count = sum(type_counts.get(t.value, 0) for t in ApplicationType.normal_app_type())
+        engineless_app_count = type_counts.get(ApplicationType.ENGINELESS_APP.value, 0)
+        cloud_native_app_count = type_counts.get(ApplicationType.CLOUD_NATIVE.value, 0)
 
         serializer = slzs.ApplicationWithMarketSLZ(data, many=True)
         return paginator.get_paginated_response(
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+"""Caches for the metadata(indexes and mappings) of ES log indexes"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from paasng.platform.log.constants import (
+    LOG_INDEX_LOCAL_CACHE_TTL,
+    LOG_INDEX_PROBE_INTERVAL,
+    LOG_INDEX_REFRESH_INTERVAL,
+)
+from paasng.utils.es_log.misc import parse_index_date, to_utc_date
+from paasng.utils.es_log.time_range import SmartTimeRange
+
+logger = logging.getLogger(__name__)
+
+
+class ESIndexMetaCache:
+    """Two-tier cache for the metadata of ES indexes, the entries are stored both in process memory and in
+    the shared cache(redis), so most log queries can skip the `indices.stats`/`get_mapping` requests.
+
+    Entries older than `refresh_interval` are still served, but will be refreshed in a background thread.
+    When the queried time range covers a day whose daily index is not in the cached list, the index list
+    will also be refreshed in background, so the newly created index will be picked up soon.
+
+    :param ttl: seconds before an entry expires in shared cache, 0 means disable the cache
+    :param local_ttl: seconds before an entry expires in process memory
+    :param refresh_interval: seconds before an entry should be refreshed in background
+    :param probe_interval: minimal seconds between two refreshes triggered by missing daily index
+    """
+
+    key_prefix = 'bk_paas3:log:es_index_meta'
+
+    def __init__(
+        self,
+        ttl: float,
+        local_ttl: float = LOG_INDEX_LOCAL_CACHE_TTL,
+        refresh_interval: float = LOG_INDEX_REFRESH_INTERVAL,
+        probe_interval: float = LOG_INDEX_PROBE_INTERVAL,
+    ):
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self.refresh_interval = refresh_interval
+        self.probe_interval = probe_interval
+        self._lock = threading.Lock()
+        # key -> (value, fetched_at, cached_at), "fetched_at" is wall time for sharing between processes
+        self._entries: Dict[str, Tuple[Any, float, float]] = {}
+        self._refreshing: Set[str] = set()
+
+    def get_indexes(
+        self, host_id: str, pattern: str, time_range: SmartTimeRange, fetch: Callable[[], List[str]]
+    ) -> List[str]:
+        """Get all index names which match the pattern
+
+        :param host_id: identity of the ES cluster
+        :param fetch: function for fetching the index names from ES
+        """
+        key = self._make_key('indexes', host_id, pattern)
+        return self._get_or_fetch(key, fetch, is_outdated=lambda indexes: self._lacks_daily_index(indexes, time_range))
+
+    def get_mappings(self, host_id: str, indexes: List[str], fetch: Callable[[], Dict]) -> Dict:
+        """Get the mappings of given indexes, the returned value is shared and must not be modified
+
+        :param host_id: identity of the ES cluster
+        :param fetch: function for fetching the mappings from ES
+        """
+        key = self._make_key('mappings', host_id, ','.join(sorted(indexes)))
+        return self._get_or_fetch(key, fetch)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _get_or_fetch(self, key: str, fetch: Callable[[], Any], is_outdated: Optional[Callable[[Any], bool]] = None):
+        if not self.ttl:
+            return fetch()
+
+        entry = self._get(key)
+        if entry is None:
+            return self._fetch_and_set(key, fetch)
+
+        value, fetched_at = entry
+        age = time.time() - fetched_at
+        if age > self.refresh_interval or (age > self.probe_interval and is_outdated and is_outdated(value)):
+            self._refresh_in_background(key, fetch)
+        return value
+
+    def _get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Get (value, fetched_at) from process memory first, then the shared cache"""
+        now = time.monotonic()
+        with self._lock:
+            local_entry = self._entries.get(key)
+        if local_entry and now - local_entry[2] < self.local_ttl:
+            return local_entry[0], local_entry[1]
+
+        try:
+            shared_entry = cache.get(key)
+        except Exception:
+            logger.exception('Unable to get ES index meta from cache')
+            shared_entry = None
+        if not shared_entry:
+            return None
+
+        value, fetched_at = shared_entry
+        with self._lock:
+            self._entries[key] = (value, fetched_at, now)
+        return value, fetched_at
+
+    def _fetch_and_set(self, key: str, fetch: Callable[[], Any]):
+        value = fetch()
+        if not value:
+            # 不缓存空结果, 避免 index 创建后仍然长时间查询不到日志
+            return value
+        fetched_at = time.time()
+        with self._lock:
+            self._entries[key] = (value, fetched_at, time.monotonic())
+        try:
+            cache.set(key, (value, fetched_at), timeout=self.ttl)
+        except Exception:
+            logger.exception('Unable to set ES index meta to cache')
+        return value
+
+    def _refresh_in_background(self, key: str, fetch: Callable[[], Any]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def _refresh():
+            try:
+                self._fetch_and_set(key, fetch)
+            except Exception:
+                logger.exception('Unable to refresh ES index meta, key: %s', key)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=_refresh, daemon=True).start()
+
+    @staticmethod
+    def _lacks_daily_index(indexes: List[str], time_range: SmartTimeRange) -> bool:
+        """Check if the daily index of the end of the time range is not in the index list, which means a new
+        daily index may be created after the list was cached.
+        """
+        dates = [d for d in map(parse_index_date, indexes) if d]
+        if not dates:
+            return False
+        return max(dates) < to_utc_date(time_range.end_time)
+
+    def _make_key(self, kind: str, host_id: str, value: str) -> str:
+        digest = hashlib.md5(f'{host_id}:{value}'.encode()).hexdigest()
+        return f'{self.key_prefix}:{kind}:{digest}'
+
+
+es_index_meta_cache = ESIndexMetaCache(ttl=settings.ES_INDEX_CACHE_TTL)
@@ -16,24 +16,33 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
+import logging
 from functools import reduce
 from operator import add, attrgetter
-from typing import Dict, List, Optional, Protocol, Tuple, Union
+from typing import Callable, Dict, Iterator, List, Optional, Protocol, Tuple, Union
 
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, TransportError
 from elasticsearch.helpers import ScanError
 from elasticsearch_dsl.aggs import DateHistogram
 from elasticsearch_dsl.response import AggResponse, Response
 from elasticsearch_dsl.response.aggs import FieldBucketData
 
-from paasng.platform.log.constants import DEFAULT_LOG_BATCH_SIZE
+from paasng.platform.log.cache import es_index_meta_cache
+from paasng.platform.log.constants import (
+    DEFAULT_LOG_BATCH_SIZE,
+    LOG_EXPORT_PIT_KEEP_ALIVE,
+    LOG_FIELDS_FILTERS_AGG_SIZE,
+    FieldsFiltersMode,
+)
 from paasng.platform.log.exceptions import LogQueryError, NoIndexError
 from paasng.platform.log.filters import (
     FieldFilter,
     agg_builtin_filters,
+    agg_fields_filters,
     count_filters_options_from_agg,
+    count_filters_options_from_fields_agg,
     count_filters_options_from_logs,
 )
 from paasng.platform.log.models import BKLogConfig, ElasticSearchConfig, ElasticSearchHost
@@ -44,6 +53,8 @@ from paasng.pluginscenter.thirdparty.utils import make_client
 from paasng.utils.es_log.misc import filter_indexes_by_time_range
 from paasng.utils.es_log.search import SmartSearch, SmartTimeRange
 
+logger = logging.getLogger(__name__)
+
 
 class LogClientProtocol(Protocol):
     """LogClient protocol, all log search backend should abide this protocol"""
@@ -56,6 +67,11 @@ class LogClientProtocol(Protocol):
     ) -> Tuple[Response, int]:
         """search log(scrolling) from index with search"""
 
+    def scan(
+        self, index: str, search: SmartSearch, timeout: int, batch_size: int = DEFAULT_LOG_BATCH_SIZE
+    ) -> Iterator[Response]:
+        """Iterate all logs matched the search in batches"""
+
     def aggregate_date_histogram(self, index: str, search: SmartSearch, timeout: int) -> FieldBucketData:
         """Aggregate time-based histogram"""
 
@@ -97,6 +113,22 @@ class BKLogClient:
         """search log(scrolling) from index with search"""
         raise NotImplementedError("TODO: 确认日志平台接口 /esquery_scroll/ 是否可用")
 
+    def scan(
+        self, index: str, search: SmartSearch, timeout: int, batch_size: int = DEFAULT_LOG_BATCH_SIZE
+    ) -> Iterator[Response]:
+        """Iterate all logs matched the search in batches, implement with search_after"""
+
+        def _execute(search: SmartSearch) -> Dict:
+            data = {
+                "indices": index,
+                "scenario_id": self.config.scenarioID,
+                "body": search.to_dict(),
+            }
+            return self._call_api(data, timeout)["data"]
+
+        # 日志平台不支持 point in time, 使用 _id 作为排序的 tiebreaker 保证翻页结果稳定
+        yield from iter_search_after(search.clone().add_tiebreaker("_id"), _execute, batch_size)
+
     def aggregate_date_histogram(self, index: str, search: SmartSearch, timeout: int) -> FieldBucketData:
         """Aggregate time-based histogram"""
         agg = DateHistogram(
@@ -151,10 +183,16 @@ class BKLogClient:
 class ESLogClient:
     """ESLogClient is an implement of LogClientProtocol, the log search backend is official elasticsearch"""
 
-    def __init__(self, host: ElasticSearchHost):
+    def __init__(self, host: ElasticSearchHost, fields_filters_mode: Optional[FieldsFiltersMode] = None):
         self.host = host
+        self.fields_filters_mode = fields_filters_mode or FieldsFiltersMode(settings.LOG_FIELDS_FILTERS_MODE)
         self._client = Elasticsearch(hosts=[host.dict(exclude_none=True)])
 
+    @property
+    def _host_id(self) -> str:
+        """The identity of ES cluster, used as part of the cache key"""
+        return f"{self.host.host}:{self.host.port}{self.host.url_prefix}"
+
     def execute_search(self, index: str, search: SmartSearch, timeout: int) -> Tuple[Response, int]:
         """search log from index with body and params, implement with es client"""
         es_index = self._get_indexes(index, search.time_range, timeout)
@@ -190,6 +228,54 @@ class ESLogClient:
             )
         return (response, self._get_response_count(index, search, timeout, response))
 
+    def scan(
+        self, index: str, search: SmartSearch, timeout: int, batch_size: int = DEFAULT_LOG_BATCH_SIZE
+    ) -> Iterator[Response]:
+        """Iterate all logs matched the search in batches, implement with search_after and point in time"""
+        es_index = self._get_indexes(index, search.time_range, timeout)
+        pit_id = self._open_point_in_time(es_index, timeout)
+        if pit_id is None:
+            # ES 7.10 以下版本不支持 point in time, 使用 _id 作为排序的 tiebreaker 保证翻页结果稳定
+            yield from iter_search_after(
+                search.clone().add_tiebreaker("_id"),
+                lambda s: self._client.search(body=s.to_dict(), index=es_index, params={"request_timeout": timeout}),
+                batch_size,
+            )
+            return
+
+        def _execute(search: SmartSearch) -> Dict:
+            nonlocal pit_id
+            # 使用 point in time 时, ES 会自动添加 _shard_doc 作为排序的 tiebreaker, 且请求不能指定 index
+            body = {**search.to_dict(), "pit": {"id": pit_id, "keep_alive": LOG_EXPORT_PIT_KEEP_ALIVE}}
+            data = self._client.search(body=body, params={"request_timeout": timeout})
+            pit_id = data.get("pit_id", pit_id)
+            return data
+
+        try:
+            yield from iter_search_after(search.clone(), _execute, batch_size)
+        finally:
+            self._close_point_in_time(pit_id, timeout)
+
+    def _open_point_in_time(self, es_index: List[str], timeout: int) -> Optional[str]:
+        """open a point in time for given indexes, return None if ES does not support it"""
+        try:
+            return self._client.transport.perform_request(
+                "POST",
+                f"/{','.join(es_index)}/_pit",
+                params={"keep_alive": LOG_EXPORT_PIT_KEEP_ALIVE, "request_timeout": timeout},
+            )["id"]
+        except TransportError as e:
+            logger.info("unable to open point in time, fallback to plain search_after: %s", e)
+            return None
+
+    def _close_point_in_time(self, pit_id: str, timeout: int):
+        try:
+            self._client.transport.perform_request(
+                "DELETE", "/_pit", body={"id": pit_id}, params={"request_timeout": timeout}
+            )
+        except TransportError:
+            logger.warning("unable to close point in time, it will be expired after %s", LOG_EXPORT_PIT_KEEP_ALIVE)
+
     def aggregate_date_histogram(self, index: str, search: SmartSearch, timeout: int) -> FieldBucketData:
         """Aggregate time-based histogram"""
         agg = DateHistogram(
@@ -213,6 +299,29 @@ class ESLogClient:
         self, index: str, search: SmartSearch, mappings: dict, timeout: int
     ) -> List[FieldFilter]:
         """aggregate fields filter"""
+        if self.fields_filters_mode == FieldsFiltersMode.AGGREGATION:
+            return self._aggregate_fields_filters_by_agg(index, search, mappings, timeout)
+        return self._aggregate_fields_filters_by_sampling(index, search, mappings, timeout)
+
+    def _aggregate_fields_filters_by_agg(
+        self, index: str, search: SmartSearch, mappings: dict, timeout: int
+    ) -> List[FieldFilter]:
+        """aggregate fields filter with terms/value_count aggregations of all properties, no log will be fetched"""
+        es_index = self._get_indexes(index, search.time_range, timeout)
+        all_properties_filters = self._get_properties_filters(mappings)
+        search = agg_fields_filters(search, all_properties_filters, size=LOG_FIELDS_FILTERS_AGG_SIZE)
+        search = search.limit_offset(limit=0, offset=0)
+        response = Response(
+            search.search,
+            self._client.search(body=search.to_dict(), index=es_index, params={"request_timeout": timeout}),
+        )
+        filters = count_filters_options_from_fields_agg(response.aggregations.to_dict(), all_properties_filters)
+        return sorted(filters.values(), key=attrgetter("total", "key"), reverse=True)
+
+    def _aggregate_fields_filters_by_sampling(
+        self, index: str, search: SmartSearch, mappings: dict, timeout: int
+    ) -> List[FieldFilter]:
+        """aggregate fields filter by counting the field options in recent logs"""
         # 拉取最近 DEFAULT_LOG_BATCH_SIZE 条日志, 用于统计字段分布
         es_index = self._get_indexes(index, search.time_range, timeout)
         # 添加内置过滤条件查询语句, 内置过滤条件有 environment, process_id, stream
@@ -233,6 +342,12 @@ class ESLogClient:
         # 当前假设同一批次的 index(类似 aa-2021.04.20,aa-2021.04.19) 拥有相同的 mapping, 因此直接获取最新的 mapping
         # 如果同一批次 index mapping 发生变化，可能会导致日志查询为空
         es_index = self._get_indexes(index, time_range, timeout)
+        return es_index_meta_cache.get_mappings(
+            self._host_id, es_index, fetch=lambda: self._fetch_mappings(es_index, timeout)
+        )
+
+    def _fetch_mappings(self, es_index: List[str], timeout: int) -> dict:
+        """Fetch the latest mapping of given indexes from ES"""
         all_mappings = self._client.indices.get_mapping(es_index, params={"request_timeout": timeout})
         # 由于手动创建会没有 properties, 需要将无 properties 的 mappings 过滤掉
         all_not_empty_mappings = {
@@ -248,11 +363,9 @@ class ESLogClient:
         """Get indexes within the time_range range from ES"""
         # 为了避免 ES 会提前创建 index 导致无法查询到 mappings, 需要精准控制使用的 indexes
         # 为了避免 ES indexes 未即时清理, 导致查询的 indexes 范围过大, 需要精准控制使用的 indexes
-        # Note: 使用 stats 接口优化查询性能
-        all_indexes = list(
-            self._client.indices.stats(
-                index, metric="fielddata", params={"request_timeout": timeout, "level": "indices"}
-            )["indices"].keys()
+        # Note: 使用 stats 接口优化查询性能, 并缓存 indexes 列表
+        all_indexes = es_index_meta_cache.get_indexes(
+            self._host_id, index, time_range, fetch=lambda: self._fetch_indexes(index, timeout)
         )
         if filtered_indexes := filter_indexes_by_time_range(all_indexes, time_range=time_range):
             return filtered_indexes
@@ -261,6 +374,14 @@ class ESLogClient:
             raise NoIndexError
         return sorted(all_indexes)[-10:]
 
+    def _fetch_indexes(self, index: str, timeout: int) -> List[str]:
+        """Fetch all indexes which match the index pattern from ES"""
+        return list(
+            self._client.indices.stats(
+                index, metric="fielddata", params={"request_timeout": timeout, "level": "indices"}
+            )["indices"].keys()
+        )
+
     def _get_response_count(
         self, index: Union[str, List[str]], search: SmartSearch, timeout: int, response: Response
     ) -> int:
@@ -312,6 +433,31 @@ class ESLogClient:
         return []
 
 
+def iter_search_after(
+    search: SmartSearch, execute: Callable[[SmartSearch], Dict], batch_size: int
+) -> Iterator[Response]:
+    """Iterate all hits of the search page by page with search_after, the search must be sorted by unique keys
+
+    :param execute: function which sends the search request and returns the raw response data
+    """
+    search_after: Optional[List] = None
+    while True:
+        page = search.clone().limit_offset(limit=batch_size, offset=0)
+        # 导出日志时无需统计总数
+        page.search = page.search.extra(track_total_hits=False)
+        if search_after:
+            page = page.search_after(search_after)
+
+        response = Response(page.search, execute(page))
+        hits = response.hits
+        if not hits:
+            return
+        yield response
+        if len(hits) < batch_size:
+            return
+        search_after = list(hits[-1].meta.sort)
+
+
 def instantiate_log_client(log_config: ElasticSearchConfig, bk_username: str) -> LogClientProtocol:
     """实例化 log client 实例"""
     if log_config.backend_type == "bkLog":
@@ -22,6 +22,18 @@ from blue_krill.data_types.enum import EnumField, StructuredEnum
 DEFAULT_LOG_CONFIG_PLACEHOLDER = "-"
 # 默认查询日志的分片大小
 DEFAULT_LOG_BATCH_SIZE = 200
+# 进程内缓存 ES indexes/mappings 的时间(秒), 过期后从 Redis 缓存中读取
+LOG_INDEX_LOCAL_CACHE_TTL = 30
+# 缓存的 ES indexes/mappings 超过该时间(秒)后, 将在后台刷新
+LOG_INDEX_REFRESH_INTERVAL = 60
+# 查询时间范围内的新日期 index 未在缓存中时, 两次后台刷新的最短间隔(秒)
+LOG_INDEX_PROBE_INTERVAL = 10
+# 使用聚合统计字段分布时, 每个字段最多返回的可选值数量
+LOG_FIELDS_FILTERS_AGG_SIZE = 20
+# 导出日志时每批次拉取的日志条数
+LOG_EXPORT_BATCH_SIZE = 1000
+# 导出日志时 ES point in time 的保持时间
+LOG_EXPORT_PIT_KEEP_ALIVE = "1m"
 
 
 class LogTimeChoices(str, StructuredEnum):
@@ -53,3 +65,17 @@ class LogCollectorType(str, StructuredEnum):
 
     BK_LOG = EnumField("BK_LOG", label="蓝鲸日志平台")
     ELK = EnumField("ELK", label="ELK")
+
+
+class LogExportFormat(str, StructuredEnum):
+    """日志导出格式"""
+
+    NDJSON = EnumField("ndjson", label="NDJSON")
+    CSV = EnumField("csv", label="CSV")
+
+
+class FieldsFiltersMode(str, StructuredEnum):
+    """统计日志字段分布的方式"""
+
+    SAMPLING = EnumField("sampling", label="根据最近的日志样本统计")
+    AGGREGATION = EnumField("aggregation", label="使用 ES 聚合统计")
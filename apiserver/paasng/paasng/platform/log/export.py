@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+"""Export logs as a stream of NDJSON/CSV content"""
+import csv
+import io
+import json
+import logging
+from typing import Iterable, Iterator, List, Type
+
+from attrs import asdict, fields
+
+from paasng.platform.log.constants import LogExportFormat
+from paasng.utils.es_log.models import LogLine
+
+logger = logging.getLogger(__name__)
+
+
+class LogExporter:
+    """Render log lines into the content of export file, stop rendering when the budget is exhausted
+
+    :param fmt: the format of export file
+    :param line_model: the type of log lines, used for deciding the columns of CSV file
+    :param max_rows: the maximum number of rows to be exported
+    :param max_bytes: the maximum size(in bytes) of the exported content
+    """
+
+    content_types = {
+        LogExportFormat.NDJSON: "application/x-ndjson",
+        LogExportFormat.CSV: "text/csv",
+    }
+    # 导出内容不完整(被截断或中途出错)时, 在文件末尾写入以此开头的标记行
+    marker_prefix = "#incomplete"
+
+    def __init__(self, fmt: LogExportFormat, line_model: Type[LogLine], max_rows: int, max_bytes: int):
+        self.fmt = fmt
+        self.line_model = line_model
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.rows = 0
+        self.bytes = 0
+        self.truncated = False
+        self.interrupted = False
+
+    @property
+    def content_type(self) -> str:
+        return self.content_types[self.fmt]
+
+    @property
+    def columns(self) -> List[str]:
+        """The columns of CSV file, fields in `raw` are not included because they vary from line to line"""
+        return [f.name for f in fields(self.line_model) if f.name != "raw"]
+
+    def iter_content(self, lines: Iterable[LogLine]) -> Iterator[bytes]:
+        """Render log lines into chunks of bytes, it's safe to be used as the content of a streaming response"""
+        if self.fmt == LogExportFormat.CSV:
+            header = self._render_csv_row(self.columns)
+            self.bytes += len(header)
+            yield header
+
+        try:
+            for line in lines:
+                if self.rows >= self.max_rows:
+                    self.truncated = True
+                    break
+                chunk = self._render(line)
+                if self.bytes + len(chunk) > self.max_bytes:
+                    self.truncated = True
+                    break
+                self.rows += 1
+                self.bytes += len(chunk)
+                yield chunk
+        except Exception:
+            # 响应头已发送, 无法再返回错误信息, 只能在文件末尾写入标记后提前结束导出
+            logger.exception("failed to export logs, %d rows were exported", self.rows)
+            self.interrupted = True
+            yield self._render_marker(f"export interrupted by an error after {self.rows} rows; please retry later")
+            return
+
+        if self.truncated:
+            logger.info("log export truncated by the budget, rows: %d, bytes: %d", self.rows, self.bytes)
+            yield self._render_marker(
+                f"export truncated after {self.rows} rows by the limits of "
+                f"{self.max_rows} rows / {self.max_bytes} bytes; please narrow the time range"
+            )
+
+    def _render(self, line: LogLine) -> bytes:
+        if self.fmt == LogExportFormat.CSV:
+            return self._render_csv_row([getattr(line, column) for column in self.columns])
+        return (json.dumps(asdict(line), ensure_ascii=False, default=str) + "\n").encode()
+
+    def _render_marker(self, message: str) -> bytes:
+        """Render the marker which tells the reader that the content is incomplete, it's always the last line"""
+        if self.fmt == LogExportFormat.CSV:
+            return self._render_csv_row([f"{self.marker_prefix} {message}"])
+        return (json.dumps({self.marker_prefix: message}, ensure_ascii=False) + "\n").encode()
+
+    @staticmethod
+    def _render_csv_row(values: List) -> bytes:
+        buffer = io.StringIO()
+        csv.writer(buffer).writerow(["" if v is None else v for v in values])
+        return buffer.getvalue().encode()
@@ -22,7 +22,7 @@ from collections import defaultdict
 from typing import Counter, Dict, List, Optional
 
 import jinja2
-from elasticsearch_dsl.aggs import Terms
+from elasticsearch_dsl.aggs import Terms, ValueCount
 from rest_framework.fields import get_attribute
 
 from paasng.platform.applications.models import ModuleEnvironment
@@ -50,6 +50,38 @@ def agg_builtin_filters(search: SmartSearch, mappings: dict):
     return search
 
 
+def agg_fields_filters(search: SmartSearch, properties: Dict[str, FieldFilter], size: int) -> SmartSearch:
+    """为所有可选字段添加 terms 聚合(统计字段的可选值)和 value_count 聚合(统计字段出现的次数), 在同一个请求中完成统计
+
+    :param properties: 需要统计的 ES 字段, 来自 mappings
+    :param size: 每个字段最多返回的可选值数量
+    """
+    # 字段名可能包含 ES 聚合名称不支持的字符, 因此使用序号作为聚合名称
+    for idx, f in enumerate(properties.values()):
+        search = search.agg(f"options_{idx}", Terms(field=f.key, size=size))
+        search = search.agg(f"total_{idx}", ValueCount(field=f.key))
+    return search
+
+
+def count_filters_options_from_fields_agg(
+    aggregations: dict, properties: Dict[str, FieldFilter]
+) -> Dict[str, FieldFilter]:
+    """根据 agg_fields_filters 的聚合结果统计字段的可选值及分布, 会忽略无可选 options 的 filters"""
+    result = {}
+    for idx, f in enumerate(properties.values()):
+        buckets = aggregations.get(f"options_{idx}", {}).get("buckets", [])
+        total = aggregations.get(f"total_{idx}", {}).get("value", 0)
+        if not buckets or not total:
+            # 该 field 无值可选时, 不允许使用该字段作为过滤条件
+            continue
+        options = [
+            (bucket.get("key_as_string", bucket["key"]), calculate_percentage(bucket["doc_count"], total))
+            for bucket in buckets
+        ]
+        result[f.name] = FieldFilter(name=f.name, key=f.key, options=options, total=total)
+    return result
+
+
 def count_filters_options_from_agg(aggregations: dict, properties: Dict[str, FieldFilter]) -> Dict[str, FieldFilter]:
     """根据 ES 聚合查询结果统计可用的过滤选项"""
     for field_name, agg in aggregations.items():
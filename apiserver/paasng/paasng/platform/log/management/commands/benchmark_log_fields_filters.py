@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+"""Compare the latency and payload size of the modes of aggregating log fields filters"""
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from paasng.platform.applications.models import Application
+from paasng.platform.log.client import ESLogClient
+from paasng.platform.log.constants import FieldsFiltersMode, LogTimeChoices, LogType
+from paasng.platform.log.filters import EnvFilter
+from paasng.platform.log.models import ProcessLogQueryConfig
+from paasng.utils.es_log.search import SmartSearch
+from paasng.utils.es_log.time_range import SmartTimeRange
+
+
+class Command(BaseCommand):
+    help = "对比不同方式统计日志字段分布的耗时及 ES 响应大小, 仅支持 ES 日志后端"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--app-code", dest="app_code", required=True, help="application code")
+        parser.add_argument("--module", dest="module_name", default="default", help="module name")
+        parser.add_argument("--env", dest="environment", default="prod", choices=["stag", "prod"])
+        parser.add_argument(
+            "--log-type", dest="log_type", default=LogType.STANDARD_OUTPUT, choices=LogType.get_values()
+        )
+        parser.add_argument("--process-type", dest="process_type", help="process type, required by structured log")
+        parser.add_argument(
+            "--time-range",
+            dest="time_range",
+            default=LogTimeChoices.ONE_HOUR,
+            choices=[c for c in LogTimeChoices.get_values() if c != LogTimeChoices.CUSTOMIZED],
+        )
+        parser.add_argument("--rounds", dest="rounds", type=int, default=5, help="rounds for each mode")
+
+    def handle(self, app_code, module_name, environment, log_type, process_type, time_range, rounds, **kwargs):
+        env = Application.objects.get(code=app_code).get_module(module_name).get_envs(environment)
+        if log_type == LogType.STANDARD_OUTPUT:
+            log_config = ProcessLogQueryConfig.objects.select_process_irrelevant(env).stdout
+        elif log_type == LogType.INGRESS:
+            log_config = ProcessLogQueryConfig.objects.select_process_irrelevant(env).ingress
+        else:
+            log_config = ProcessLogQueryConfig.objects.get_by_process_type(process_type=process_type, env=env).json
+        if log_config.backend_type != "es" or not log_config.elastic_search_host:
+            raise CommandError("only ES log backend is supported")
+
+        search_params = log_config.search_params
+        smart_time_range = SmartTimeRange(time_range=time_range)
+        for mode in FieldsFiltersMode.get_values():
+            client = ESLogClient(log_config.elastic_search_host, fields_filters_mode=FieldsFiltersMode(mode))
+            payload_sizes = self._record_payload_sizes(client)
+            mappings = client.get_mappings(
+                search_params.indexPattern, time_range=smart_time_range, timeout=settings.DEFAULT_ES_SEARCH_TIMEOUT
+            )
+
+            latencies = []
+            filters_count = 0
+            for _ in range(rounds):
+                es_filter = EnvFilter(env=env, search_params=search_params, mappings=mappings)
+                search = SmartSearch(time_field=search_params.timeField, time_range=smart_time_range)
+                search = es_filter.filter_by_builtin_excludes(
+                    es_filter.filter_by_builtin_filters(es_filter.filter_by_env(search))
+                )
+
+                started_at = time.perf_counter()
+                filters = client.aggregate_fields_filters(
+                    index=search_params.indexPattern,
+                    search=search,
+                    mappings=mappings,
+                    timeout=settings.DEFAULT_ES_SEARCH_TIMEOUT,
+                )
+                latencies.append(time.perf_counter() - started_at)
+                filters_count = len(filters)
+
+            print(
+                f"mode: {mode}, rounds: {rounds}, filters: {filters_count}, "
+                f"latency(ms) avg: {statistics.mean(latencies) * 1000:.1f}, "
+                f"max: {max(latencies) * 1000:.1f}, "
+                f"payload(bytes) avg: {statistics.mean(payload_sizes or [0]):.0f}"
+            )
+
+    @staticmethod
+    def _record_payload_sizes(client: ESLogClient) -> List[int]:
+        """Record the size of every search response of the client"""
+        sizes: List[int] = []
+        original_search = client._client.search
+
+        def search(*args, **kwargs) -> Dict:
+            resp = original_search(*args, **kwargs)
+            sizes.append(len(json.dumps(resp).encode()))
+            return resp
+
+        client._client.search = search  # type: ignore
+        return sizes
@@ -21,7 +21,7 @@ from rest_framework.exceptions import ValidationError
 
 from paasng.utils.es_log.time_range import SmartTimeRange
 
-from .constants import LogTimeChoices
+from .constants import LogExportFormat, LogTimeChoices
 
 
 class StandardOutputLogLineSLZ(serializers.Serializer):
@@ -139,6 +139,12 @@ class LogQueryParamsSLZ(serializers.Serializer):
         return attrs
 
 
+class LogExportParamsSLZ(LogQueryParamsSLZ):
+    """导出日志的 query 参数"""
+
+    format = serializers.ChoiceField(choices=LogExportFormat.get_choices(), default=LogExportFormat.NDJSON)
+
+
 class LogQueryDSLSLZ(serializers.Serializer):
     """查询日志的 DSL 参数"""
 
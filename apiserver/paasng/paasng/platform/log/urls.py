@@ -40,6 +40,16 @@ urlpatterns = [
         views.StructuredLogAPIView.as_view({"post": "aggregate_fields_filters"}),
         name='api.logs.structured.aggregate_fields_filters',
     ),
+    re_path(
+        make_app_pattern(r'/log/structured/overview/$'),
+        views.StructuredLogAPIView.as_view({"post": "query_logs_overview"}),
+        name='api.logs.structured.query_logs_overview',
+    ),
+    re_path(
+        make_app_pattern(r'/log/structured/export/$'),
+        views.StructuredLogAPIView.as_view({"post": "export_logs"}),
+        name='api.logs.structured.export_logs',
+    ),
     # 标准输出日志
     re_path(
         make_app_pattern(r'/log/stdout/list/$'),
@@ -51,6 +61,11 @@ urlpatterns = [
         views.StdoutLogAPIView.as_view({"post": "aggregate_fields_filters"}),
         name='api.logs.stdout.aggregate_fields_filters',
     ),
+    re_path(
+        make_app_pattern(r'/log/stdout/export/$'),
+        views.StdoutLogAPIView.as_view({"post": "export_logs"}),
+        name='api.logs.stdout.export_logs',
+    ),
     # Ingress 日志
     re_path(
         make_app_pattern(r'/log/ingress/list/$'),
@@ -67,6 +82,16 @@ urlpatterns = [
         views.IngressLogAPIView.as_view({"post": "aggregate_fields_filters"}),
         name='api.logs.ingress.aggregate_fields_filters',
     ),
+    re_path(
+        make_app_pattern(r'/log/ingress/overview/$'),
+        views.IngressLogAPIView.as_view({"post": "query_logs_overview"}),
+        name='api.logs.ingress.query_logs_overview',
+    ),
+    re_path(
+        make_app_pattern(r'/log/ingress/export/$'),
+        views.IngressLogAPIView.as_view({"post": "export_logs"}),
+        name='api.logs.ingress.export_logs',
+    ),
     # 模块维度下的日志搜索
     re_path(
         make_app_pattern(r'/log/structured/list/$', include_envs=False),
@@ -83,6 +108,16 @@ urlpatterns = [
         views.ModuleStructuredLogAPIView.as_view({"post": "aggregate_fields_filters"}),
         name='api.logs.structured.aggregate_fields_filters.legacy',
     ),
+    re_path(
+        make_app_pattern(r'/log/structured/overview/$', include_envs=False),
+        views.ModuleStructuredLogAPIView.as_view({"post": "query_logs_overview"}),
+        name='api.logs.structured.query_logs_overview.legacy',
+    ),
+    re_path(
+        make_app_pattern(r'/log/structured/export/$', include_envs=False),
+        views.ModuleStructuredLogAPIView.as_view({"post": "export_logs"}),
+        name='api.logs.structured.export_logs.legacy',
+    ),
     re_path(
         make_app_pattern(r'/log/stdout/list/$', include_envs=False),
         views.ModuleStdoutLogAPIView.as_view({"post": "query_logs_scroll"}),
@@ -93,6 +128,11 @@ urlpatterns = [
         views.ModuleStdoutLogAPIView.as_view({"post": "aggregate_fields_filters"}),
         name='api.logs.stdout.aggregate_fields_filters.legacy',
     ),
+    re_path(
+        make_app_pattern(r'/log/stdout/export/$', include_envs=False),
+        views.ModuleStdoutLogAPIView.as_view({"post": "export_logs"}),
+        name='api.logs.stdout.export_logs.legacy',
+    ),
     re_path(
         make_app_pattern(r'/log/ingress/list/$', include_envs=False),
         views.ModuleIngressLogAPIView.as_view({"post": "query_logs"}),
@@ -108,6 +148,16 @@ urlpatterns = [
         views.ModuleIngressLogAPIView.as_view({"post": "aggregate_fields_filters"}),
         name='api.logs.ingress.aggregate_fields_filters.legacy',
     ),
+    re_path(
+        make_app_pattern(r'/log/ingress/overview/$', include_envs=False),
+        views.ModuleIngressLogAPIView.as_view({"post": "query_logs_overview"}),
+        name='api.logs.ingress.query_logs_overview.legacy',
+    ),
+    re_path(
+        make_app_pattern(r'/log/ingress/export/$', include_envs=False),
+        views.ModuleIngressLogAPIView.as_view({"post": "export_logs"}),
+        name='api.logs.ingress.export_logs.legacy',
+    ),
     # System APIs
     url(
         r'sys/api/log/applications/(?P<code>[^/]+)/modules/(?P<module_name>[^/]+)/'
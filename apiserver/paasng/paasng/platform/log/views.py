@@ -16,14 +16,17 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
+import itertools
 import json
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
-from typing import TYPE_CHECKING, ClassVar, List, Optional, Tuple, Type
+from typing import TYPE_CHECKING, ClassVar, Dict, Iterable, Iterator, List, Optional, Tuple, Type
 
 import cattr
 from django.conf import settings
+from django.http import StreamingHttpResponse
 from django.utils.translation import gettext as _
 from drf_yasg.utils import swagger_auto_schema
 from elasticsearch.exceptions import RequestError
@@ -42,9 +45,10 @@ from paasng.platform.applications.mixins import ApplicationCodeInPathMixin
 from paasng.platform.applications.models import ModuleEnvironment
 from paasng.platform.log import serializers
 from paasng.platform.log.client import instantiate_log_client
-from paasng.platform.log.constants import DEFAULT_LOG_BATCH_SIZE, LogType
+from paasng.platform.log.constants import DEFAULT_LOG_BATCH_SIZE, LOG_EXPORT_BATCH_SIZE, LogType
 from paasng.platform.log.dsl import SearchRequestSchema
-from paasng.platform.log.exceptions import NoIndexError
+from paasng.platform.log.exceptions import LogLineInfoBrokenError, NoIndexError
+from paasng.platform.log.export import LogExporter
 from paasng.platform.log.filters import EnvFilter, ModuleFilter
 from paasng.platform.log.models import ElasticSearchParams, ProcessLogQueryConfig
 from paasng.platform.log.responses import IngressLogLine, StandardOutputLogLine, StructureLogLine
@@ -101,6 +105,14 @@ class LogBaseAPIView(ViewSet, ApplicationCodeInPathMixin):
         :param time_field: ES 时间字段, 默认根据 time_field 排序
         :param highlight_fields: 字段高亮规则
         """
+        search, highlight_query = self._make_search_and_highlight_query(mappings, time_field)
+        # 顺序很重要, querystring 在 simple dsl 里, highlight_fields 必须在 search.query(dsl) 后面
+        if highlight_query and highlight_fields:
+            search = search.highlight(*highlight_fields, highlight_query=highlight_query)
+        return search
+
+    def _make_search_and_highlight_query(self, mappings: dict, time_field: str) -> Tuple[SmartSearch, Dict]:
+        """构造日志查询语句, 同时返回用于高亮的查询条件"""
         slz = serializers.LogQueryParamsSLZ(data=self.request.query_params)
         slz.is_valid(raise_exception=True)
         params = slz.validated_data
@@ -133,11 +145,7 @@ class LogBaseAPIView(ViewSet, ApplicationCodeInPathMixin):
             if query_conditions.sort:
                 sort_params.update({k: {"order": v} for k, v in query_conditions.sort.items()})
             search = search.sort(sort_params)
-
-        # 顺序很重要, querystring 在 simple dsl 里, highlight_fields 必须在 search.query(dsl) 后面
-        if highlight_query and highlight_fields:
-            search = search.highlight(*highlight_fields, highlight_query=highlight_query)
-        return search
+        return search, highlight_query
 
     def _make_base_search(
         self,
@@ -315,12 +323,136 @@ class LogAPIView(LogBaseAPIView):
             mappings=mappings,
             timeout=settings.DEFAULT_ES_SEARCH_TIMEOUT,
         )
-        if log_config.search_params.filedMatcher:
-            matcher = re.compile(log_config.search_params.filedMatcher)
-            fields_filters = [f for f in fields_filters if matcher.fullmatch(f.name)]
-
+        fields_filters = self._match_fields_filters(log_config.search_params, fields_filters)
         return Response(data=serializers.LogFieldFilterSLZ(fields_filters, many=True).data)
 
+    @swagger_auto_schema(
+        query_serializer=serializers.LogQueryParamsSLZ,
+        request_body=serializers.LogQueryBodySLZ,
+    )
+    @transform_noindex_error
+    def query_logs_overview(self, request, code, module_name, environment):
+        """查询日志, 同时统计日志的事件直方图和字段分布
+
+        日志页面所需的 3 个查询互不依赖, 共用同一份查询语句并发执行, 接口耗时取决于最慢的查询
+        """
+        log_client, log_config = self.instantiate_log_client()
+        index = log_config.search_params.indexPattern
+        timeout = settings.DEFAULT_ES_SEARCH_TIMEOUT
+        mappings = log_client.get_mappings(index, time_range=self.parse_time_range(), timeout=timeout)
+        search, highlight_query = self._make_search_and_highlight_query(
+            mappings=mappings, time_field=log_config.search_params.timeField
+        )
+        # 各个查询会修改查询语句(例如分页、聚合), 因此需要使用各自的副本
+        logs_search = search.clone()
+        if highlight_query:
+            logs_search = logs_search.highlight("*", "*.*", highlight_query=highlight_query)
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            logs_future = executor.submit(log_client.execute_search, index=index, search=logs_search, timeout=timeout)
+            histogram_future = executor.submit(
+                log_client.aggregate_date_histogram, index=index, search=search.clone(), timeout=timeout
+            )
+            fields_filters_future = executor.submit(
+                log_client.aggregate_fields_filters,
+                index=index,
+                search=search.clone(),
+                mappings=mappings,
+                timeout=timeout,
+            )
+
+            # 子线程中抛出的异常会在获取结果时重新抛出, 需要统一转换成对应的错误响应
+            try:
+                response, total = logs_future.result()
+                histogram_buckets = histogram_future.result()
+                fields_filters = fields_filters_future.result()
+            except RequestError:
+                raise error_codes.QUERY_REQUEST_ERROR
+            except NoIndexError:
+                raise
+            except Exception:
+                logger.exception("failed to get logs overview")
+                raise error_codes.QUERY_LOG_FAILED.f(_('日志查询失败，请稍后再试。'))
+
+        dsl = json.dumps(search.to_dict())
+        logs = cattr.structure(
+            {"logs": clean_logs(list(response), log_config.search_params), "total": total, "dsl": dsl},
+            Logs[self.line_model],  # type: ignore
+        )
+        date_histogram = cattr.structure({**clean_histogram_buckets(histogram_buckets), "dsl": dsl}, DateHistogram)
+        fields_filters = self._match_fields_filters(log_config.search_params, fields_filters)
+        return Response(
+            data={
+                "logs": self.logs_serializer_class(logs).data,
+                "date_histogram": serializers.DateHistogramSLZ(date_histogram).data,
+                "fields_filters": serializers.LogFieldFilterSLZ(fields_filters, many=True).data,
+            }
+        )
+
+    @swagger_auto_schema(
+        query_serializer=serializers.LogExportParamsSLZ,
+        request_body=serializers.LogQueryBodySLZ,
+    )
+    @transform_noindex_error
+    def export_logs(self, request, code, module_name, environment):
+        """导出日志, 以流式响应返回 NDJSON/CSV 格式的文件, 导出的条数和大小受 LOG_EXPORT_MAX_* 配置限制"""
+        slz = serializers.LogExportParamsSLZ(data=request.query_params)
+        slz.is_valid(raise_exception=True)
+        export_format = slz.validated_data["format"]
+
+        log_client, log_config = self.instantiate_log_client()
+        index = log_config.search_params.indexPattern
+        timeout = settings.DEFAULT_ES_SEARCH_TIMEOUT
+        search = self.make_search(
+            mappings=log_client.get_mappings(index, time_range=self.parse_time_range(), timeout=timeout),
+            time_field=log_config.search_params.timeField,
+        )
+        responses = log_client.scan(index=index, search=search, timeout=timeout, batch_size=LOG_EXPORT_BATCH_SIZE)
+        # 流式响应开始后无法再返回错误, 因此在返回响应前先拉取首批日志(同时完成索引解析和 point in time 的创建),
+        # 让 NoIndexError 等异常能转换成对应的错误响应
+        try:
+            first_response = next(responses, None)
+        except RequestError:
+            raise error_codes.QUERY_REQUEST_ERROR
+        except NoIndexError:
+            raise
+        except Exception:
+            logger.exception("failed to export logs")
+            raise error_codes.QUERY_LOG_FAILED.f(_('日志查询失败，请稍后再试。'))
+        if first_response is not None:
+            responses = itertools.chain([first_response], responses)
+
+        exporter = LogExporter(
+            export_format,
+            line_model=self.line_model,
+            max_rows=settings.LOG_EXPORT_MAX_ROWS,
+            max_bytes=settings.LOG_EXPORT_MAX_BYTES,
+        )
+        response = StreamingHttpResponse(
+            exporter.iter_content(self._iter_log_lines(responses, log_config.search_params)),
+            content_type=exporter.content_type,
+        )
+        filename = f"{code}-{module_name}-{environment or 'all'}-{self.log_type.lower()}.{export_format}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    def _iter_log_lines(self, responses: Iterable, search_params: ElasticSearchParams) -> Iterator:
+        """将分批查询到的 ES 日志转换成 line_model, 忽略关键信息缺失的日志"""
+        for response in responses:
+            for log in clean_logs(list(response), search_params):
+                try:
+                    yield cattr.structure(log, self.line_model)
+                except LogLineInfoBrokenError:
+                    logger.warning("skip broken log line when exporting logs")
+
+    @staticmethod
+    def _match_fields_filters(search_params: ElasticSearchParams, fields_filters: List) -> List:
+        """根据配置的白名单正则表达式过滤可选字段"""
+        if not search_params.filedMatcher:
+            return fields_filters
+        matcher = re.compile(search_params.filedMatcher)
+        return [f for f in fields_filters if matcher.fullmatch(f.name)]
+
 
 class StdoutLogAPIView(LogAPIView):
     line_model = StandardOutputLogLine
@@ -362,6 +494,12 @@ class ModuleLogAPIMixin(_MixinBase):
     def aggregate_fields_filters(self, request, code, module_name, environment=None):
         return super().aggregate_fields_filters(request, code, module_name, environment)
 
+    def query_logs_overview(self, request, code, module_name, environment=None):
+        return super().query_logs_overview(request, code, module_name, environment)
+
+    def export_logs(self, request, code, module_name, environment=None):
+        return super().export_logs(request, code, module_name, environment)
+
     def _get_log_query_config_by_env(self, env: ModuleEnvironment, process_type: Optional[str] = None):
         log_type = self.log_type
         if log_type == LogType.INGRESS:
@@ -21,8 +21,9 @@ import os
 import time
 from collections import namedtuple
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 from urllib.parse import urlparse
+from uuid import UUID
 
 from django.conf import settings
 from django.db import models
@@ -215,24 +216,43 @@ class MarketConfigManager(models.Manager):
         try:
             return application.market_config, False
         except MarketConfig.DoesNotExist:
-            enabled = False
-            url_type = constant.ProductSourceUrlType.DISABLED.value
-            if application.engine_enabled:
-                url_type = constant.ProductSourceUrlType.ENGINE_PROD_ENV.value
-                product = application.get_product()
-                if product and product.state == constant.AppState.RELEASED.value:
-                    enabled = True
-
-            confirm_required_when_publish = AppSpecs(application).confirm_required_when_publish
-            obj = MarketConfig.objects.create(
-                application=application,
-                enabled=enabled,
-                auto_enable_when_deploy=not confirm_required_when_publish,
-                source_module=application.get_default_module(),
-                source_url_type=url_type,
-            )
+            obj = self._make_default(application)
+            obj.save(force_insert=True)
             return obj, True
 
+    def get_or_create_by_apps(self, applications: Sequence[Application]) -> Dict[UUID, 'MarketConfig']:
+        """Get or create MarketConfig objects of multiple applications in bulk
+
+        :return: A dict of MarketConfig objects, keyed by application id
+        """
+        configs = {obj.application_id: obj for obj in self.filter(application__in=applications)}
+        missing_apps = [app for app in applications if app.id not in configs]
+        if missing_apps:
+            # 其他请求可能会并发创建同一应用的配置，忽略冲突后重新查询，确保返回的都是已入库的对象
+            self.bulk_create([self._make_default(app) for app in missing_apps], ignore_conflicts=True)
+            configs.update((obj.application_id, obj) for obj in self.filter(application__in=missing_apps))
+        return configs
+
+    @staticmethod
+    def _make_default(application: Application) -> 'MarketConfig':
+        """Make a MarketConfig object with default values by application, without saving it"""
+        enabled = False
+        url_type = constant.ProductSourceUrlType.DISABLED.value
+        if application.engine_enabled:
+            url_type = constant.ProductSourceUrlType.ENGINE_PROD_ENV.value
+            product = application.get_product()
+            if product and product.state == constant.AppState.RELEASED.value:
+                enabled = True
+
+        confirm_required_when_publish = AppSpecs(application).confirm_required_when_publish
+        return MarketConfig(
+            application=application,
+            enabled=enabled,
+            auto_enable_when_deploy=not confirm_required_when_publish,
+            source_module=application.get_default_module(),
+            source_url_type=url_type,
+        )
+
     def update_enabled(self, application: Application, status: bool) -> 'MarketConfig':
         obj, _ = self.get_or_create_by_app(application)
         obj.enabled = status
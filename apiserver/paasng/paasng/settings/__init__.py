@@ -539,6 +539,15 @@ BK_IAM_MIGRATION_APP_NAME = "bkpaas_iam_migration"
 # 跳过初始化已有应用数据到权限中心（注意：仅跳过初始化数据，所有权限相关的操作还是依赖权限中心）
 BK_IAM_SKIP = settings.get('BK_IAM_SKIP', False)
 
+# 权限中心用户组成员的缓存时间（秒），成员变更时会主动失效，为 0 时不使用缓存
+IAM_USER_GROUP_MEMBERS_CACHE_TIMEOUT = settings.get('IAM_USER_GROUP_MEMBERS_CACHE_TIMEOUT', 60 * 5)
+
+# 用户在应用上的权限策略（用于生成应用列表过滤条件）的缓存时间（秒），成员变更时会主动失效，为 0 时不使用缓存
+IAM_APP_POLICY_CACHE_TIMEOUT = settings.get('IAM_APP_POLICY_CACHE_TIMEOUT', 60)
+
+# 权限中心同步用户组成员信息到具体权限策略的时延（秒），成员变更后的这段时间内不缓存相关用户的权限策略
+IAM_POLICY_SYNC_DELAY = settings.get('IAM_POLICY_SYNC_DELAY', 30)
+
 BKAUTH_DEFAULT_PROVIDER_TYPE = settings.get('BKAUTH_DEFAULT_PROVIDER_TYPE', 'BK')
 
 # 蓝鲸的云 API 地址，用于内置环境变量的配置项
@@ -860,6 +869,10 @@ CONFIGVAR_PROTECTED_NAMES = (
 )
 # 环境变量保留前缀列表
 CONFIGVAR_PROTECTED_PREFIXES = settings.get('CONFIGVAR_PROTECTED_PREFIXES', ["BKPAAS_", "KUBERNETES_"])
+# 组装环境变量时并发获取各来源数据的线程数，为 1 时在当前线程中串行获取
+ENV_VARS_GATHER_CONCURRENCY = settings.get('ENV_VARS_GATHER_CONCURRENCY', 4)
+# 组装环境变量时每个来源的最长执行时间（秒），从该来源实际开始执行时计算，超时将中止组装
+ENV_VARS_SOURCE_TIMEOUT = settings.get('ENV_VARS_SOURCE_TIMEOUT', 30)
 
 # 用于校验内部服务间请求的 JWT 配置，携带用以下任何一个 key 签名的 JWT 的请求会被认为有效
 PAAS_SERVICE_JWT_CLIENTS = get_paas_service_jwt_clients(settings)
@@ -898,6 +911,10 @@ ENGINE_PROC_REPLICAS_BY_TYPE = {
 # 如果应用源码打包后超过该尺寸，打印警告信息
 ENGINE_APP_SOURCE_SIZE_WARNING_THRESHOLD_MB = 300
 
+# 是否复用已上传的源码包：同一模块相同代码版本、部署目录与构建参数的部署（如预发布环境部署后再部署生产环境）
+# 将直接使用已上传的源码包，不再重复下载、打包与上传源码
+ENGINE_SOURCE_PACKAGE_CACHE_ENABLED = settings.get('ENGINE_SOURCE_PACKAGE_CACHE_ENABLED', True)
+
 # 可恢复下架操作的最长时限
 ENGINE_OFFLINE_RESUMABLE_SECS = 60
 
@@ -916,6 +933,20 @@ SERVICES_VENDOR_CONFIGS: Dict[str, Dict] = settings.get('SERVICES_VENDOR_CONFIGS
 
 # 后端轮询任务：刷新远程增强服务信息 - 默认轮询间隔
 REMOTE_SERVICES_UPDATE_INTERVAL_MINUTES = 5
+# 刷新远程增强服务信息时，并发请求各远程服务的线程数
+REMOTE_SERVICES_FETCH_CONCURRENCY = settings.get('REMOTE_SERVICES_FETCH_CONCURRENCY', 8)
+
+# 请求远程增强服务时，每个远程服务的连接池大小
+REMOTE_SERVICE_CLIENT_POOL_MAXSIZE = settings.get('REMOTE_SERVICE_CLIENT_POOL_MAXSIZE', 10)
+# 请求远程增强服务时，连接失败或网关错误（502/503/504）的最大重试次数，POST 请求不会重试
+REMOTE_SERVICE_CLIENT_MAX_RETRIES = settings.get('REMOTE_SERVICE_CLIENT_MAX_RETRIES', 2)
+# 远程增强服务连续失败多少次后熔断，熔断期间所有请求会被直接拒绝，为 0 时不熔断
+REMOTE_SERVICE_CIRCUIT_BREAKER_THRESHOLD = settings.get('REMOTE_SERVICE_CIRCUIT_BREAKER_THRESHOLD', 5)
+# 熔断后等待多少秒再尝试请求远程增强服务
+REMOTE_SERVICE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT = settings.get('REMOTE_SERVICE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT', 30)
+
+# 远程增强服务实例数据（包含凭证信息）的本地缓存时间（秒），数据会加密后存储，为 0 时不缓存
+REMOTE_SERVICE_INSTANCE_CACHE_TIMEOUT = settings.get('REMOTE_SERVICE_INSTANCE_CACHE_TIMEOUT', 300)
 
 # 是否禁用定时任务调度器
 DISABLE_PERIODICAL_JOBS = settings.get("DISABLE_PERIODICAL_JOBS", False)
@@ -997,6 +1028,14 @@ ELASTICSEARCH_HOSTS = settings.get('ELASTICSEARCH_HOSTS', [{'host': 'localhost',
 
 # 日志 ES 搜索超时时间
 DEFAULT_ES_SEARCH_TIMEOUT = 30
+# 日志 ES indexes 列表及 mappings 的缓存时间(秒), 设置为 0 时不缓存
+ES_INDEX_CACHE_TTL = settings.get('ES_INDEX_CACHE_TTL', 60 * 5)
+# 统计日志字段分布的方式, 可选值 "sampling"(统计最近的日志样本), "aggregation"(使用 ES 聚合统计), 仅对 ES 日志后端生效
+LOG_FIELDS_FILTERS_MODE = settings.get('LOG_FIELDS_FILTERS_MODE', 'sampling')
+# 单次导出日志的最大条数
+LOG_EXPORT_MAX_ROWS = settings.get('LOG_EXPORT_MAX_ROWS', 100000)
+# 单次导出日志的最大字节数
+LOG_EXPORT_MAX_BYTES = settings.get('LOG_EXPORT_MAX_BYTES', 100 * 1024 * 1024)
 
 # 日志 Index 名称模式
 ES_K8S_LOG_INDEX_PATTERNS = settings.get('ES_K8S_LOG_INDEX_PATTERNS', 'app_log-*')
@@ -1087,6 +1126,12 @@ CI_CONFIGS = settings.get('CI_CONFIGS', {})
 # 蓝鲸PaaS3.0资料库地址
 BKDOC_URL = settings.get('BKDOC_URL', 'http://localhost:8080')
 
+# 文档搜索时每个搜索后端的最长等待时间（秒），超时的后端结果将被忽略
+DOCUMENT_SEARCH_TIMEOUT = settings.get('DOCUMENT_SEARCH_TIMEOUT', 3)
+
+# 文档搜索结果的缓存时间（秒），为 0 时不缓存
+DOCUMENT_SEARCH_CACHE_TIMEOUT = settings.get('DOCUMENT_SEARCH_CACHE_TIMEOUT', 60)
+
 # 文档应用的应用ID
 BK_DOC_APP_ID = settings.get('BK_DOC_APP_ID', 'bk_docs_center')
 
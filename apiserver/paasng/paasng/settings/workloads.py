@@ -106,6 +106,10 @@ SLUGBUILDER_RESOURCES_SPEC = settings.get('SLUGBUILDER_RESOURCES_SPEC')
 # 环境变量前缀
 SYSTEM_CONFIG_VARS_KEY_PREFIX = settings.get('SYSTEM_CONFIG_VARS_KEY_PREFIX', 'BKPAAS_')
 
+# 部署日志（构建、命令输出等）的存储格式，可选值：lines（逐行存储）、chunks（压缩分块存储），
+# 仅对新创建的日志生效，已有日志保持原格式读取
+OUTPUT_STREAM_STORAGE = settings.get('OUTPUT_STREAM_STORAGE', 'lines')
+
 # 兼容内部旧的日志挂载配置
 VOLUME_NAME_APP_LOGGING = settings.get('VOLUME_NAME_APP_LOGGING', 'applogs')
 VOLUME_MOUNT_APP_LOGGING_DIR = settings.get('VOLUME_MOUNT_APP_LOGGING_DIR', '/app/logs')
@@ -125,6 +129,14 @@ MUL_MODULE_VOLUME_HOST_PATH_APP_LOGGING_DIR = settings.get(
 
 K8S_DEFAULT_CONNECT_TIMEOUT = 5
 K8S_DEFAULT_READ_TIMEOUT = 60
+# 访问集群时，每个 APIServer 地址最多保持的 HTTP 连接数，为空时使用 kubernetes SDK 的默认值
+K8S_CONNECTION_POOL_MAXSIZE = settings.get('K8S_CONNECTION_POOL_MAXSIZE', None)
+
+# 是否启用进程与实例的共享缓存（informer），启用后同一个应用的进程数据由进程内唯一的 LIST+WATCH 维护，
+# 读取与监听进程变动时不再直接请求集群
+PROCESS_INFORMER_ENABLED = settings.get('PROCESS_INFORMER_ENABLED', False)
+# 等待 informer 完成首次同步的最长时间（秒），超时后将退回直接请求集群
+PROCESS_INFORMER_SYNC_TIMEOUT = settings.get('PROCESS_INFORMER_SYNC_TIMEOUT', 5)
 
 # 指定 kubectl 使用的 config.yaml 文件路径，容器化交付时由 secret 挂载而来
 KUBE_CONFIG_FILE = settings.get('KUBE_CONFIG_FILE', '/data/kubelet/conf/kubeconfig.yaml')
@@ -168,6 +180,10 @@ APP_INGRESS_V1_PATH_TRAILING_SLASH = APP_INGRESS_EXT_V1BETA1_PATH_TRAILING_SLASH
 #  - 只能使用 <1.0 版本的 ingress-nginx
 ENABLE_MODERN_INGRESS_SUPPORT = settings.get('ENABLE_MODERN_INGRESS_SUPPORT', True)
 
+# 是否使用 server-side apply 的方式下发 Ingress 资源，开启后平台只声明其管理的字段，其他组件添加的字段不会被覆盖。
+# 注意：要求集群版本 >= 1.18
+APP_INGRESS_SERVER_SIDE_APPLY = settings.get('APP_INGRESS_SERVER_SIDE_APPLY', False)
+
 # 是否开启终端色彩
 COLORFUL_TERMINAL_OUTPUT = True
 
@@ -120,36 +120,42 @@ def count_filters_options(logs: List, properties: Dict[str, FieldFilter]) -> Lis
     return sorted(result, key=attrgetter("total", "key"), reverse=True)
 
 
+_index_date_pattern = re.compile(r"^.*?-(?P<date>\d\d\d\d\.\d\d.\d\d)$")
+
+
+def parse_index_date(index: str) -> Optional[datetime.date]:
+    """Parse the date of index which ends with YYYY.MM.DD, return None if index is not dated"""
+    match_result = _index_date_pattern.match(index)
+    if not match_result:
+        return None
+    try:
+        return datetime.datetime.strptime(match_result.groupdict()["date"], "%Y.%m.%d").date()
+    except ValueError:
+        return None
+
+
+def to_utc_date(value: datetime.datetime) -> datetime.date:
+    """Get the date of given datetime in UTC timezone"""
+    if value.tzinfo:
+        return value.astimezone(pytz.utc).date()
+    # 无时区信息, 不做额外的转换, 避免出错
+    return value.date()
+
+
 def filter_indexes_by_time_range(indexes: List[str], time_range: "SmartTimeRange") -> List[str]:
     """Attempt to filter indexes within the time_range from indexes, Only indexes ending with YYYY.MM.DD are supported
 
     :param indexes: List of indexes
     :param time_range: time_range given
     """
-    pattern = re.compile(r"^.*?-(?P<date>\d\d\d\d\.\d\d.\d\d)$")
     failure_match_indexes = []
     picked_indexes = []
     # ES 日志 index 使用 UTC 时间分块, 因此过滤 indexes 时需要转成 utc 时间
-    if time_range.start_time.tzinfo:
-        start_date = time_range.start_time.astimezone(pytz.utc).date()
-    else:
-        # 无时区信息, 不做额外的转换, 避免出错
-        start_date = time_range.start_time.date()
-    if time_range.end_time.tzinfo:
-        end_date = time_range.end_time.astimezone(pytz.utc).date()
-    else:
-        # 无时区信息, 不做额外的转换, 避免出错
-        end_date = time_range.end_time.date()
+    start_date = to_utc_date(time_range.start_time)
+    end_date = to_utc_date(time_range.end_time)
     for index in indexes:
-        match_result = pattern.match(index)
-        if not match_result:
-            failure_match_indexes.append(index)
-            continue
-
-        date_str = match_result.groupdict()["date"]
-        try:
-            index_date = datetime.datetime.strptime(date_str, "%Y.%m.%d").date()
-        except ValueError:
+        index_date = parse_index_date(index)
+        if not index_date:
             failure_match_indexes.append(index)
             continue
 
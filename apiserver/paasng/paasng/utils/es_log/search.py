@@ -16,7 +16,7 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from django.conf import settings
 from elasticsearch_dsl import Search
@@ -40,6 +40,14 @@ class SmartSearch:
         self.search = Search().filter("range", **time_range.get_time_range_filter(time_field))
         self.search = self.search.sort({time_field: {"order": "desc"}})
 
+    def clone(self) -> "SmartSearch":
+        """Return a copy of current search, modifications of the copy will not affect current search"""
+        obj = self.__class__.__new__(self.__class__)
+        obj.time_field = self.time_field
+        obj.time_range = self.time_range
+        obj.search = self.search._clone()
+        return obj
+
     def filter(self, *args, **kwargs):
         """add filter to search dsl"""
         self.search = self.search.filter(*args, **kwargs)
@@ -64,6 +72,17 @@ class SmartSearch:
         self.search = self.search.sort(keys)
         return self
 
+    def add_tiebreaker(self, field: str):
+        """append a sort key with unique values after current sort keys, required by search_after"""
+        sort = self.search.to_dict().get("sort", [])
+        self.search = self.search.sort(*sort, {field: {"order": "asc"}})
+        return self
+
+    def search_after(self, values: List):
+        """start searching after the sort values of the last hit in previous page"""
+        self.search = self.search.extra(search_after=values)
+        return self
+
     def agg(self, field_name: str, agg: Agg):
         self.search.aggs[field_name] = agg
         return self
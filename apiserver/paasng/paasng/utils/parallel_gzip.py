@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+"""A gzip writer which compresses data blocks in parallel, the output is a single standard gzip member
+just like what `pigz` produces, so it can be read by any gzip decompressor.
+"""
+import io
+import os
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Deque, Optional
+
+# The size of the uncompressed data block compressed by each job, same with pigz's default value
+DEFAULT_BLOCK_SIZE = 128 * 1024
+# Use the last 32K(the max window size of deflate) of previous block as dictionary, like pigz does
+DICT_SIZE = 32 * 1024
+
+
+def get_default_workers() -> int:
+    return min(os.cpu_count() or 1, 8)
+
+
+class ParallelGzipWriter(io.RawIOBase):
+    """Write gzip data to `fileobj`, data blocks are compressed by multiple threads. `zlib` releases the GIL
+    when compressing, so threads work well here.
+
+    The gzip header is written with mtime 0 and no file name, so the output is reproducible for the same input.
+
+    :param fileobj: the file object to write compressed data to, it won't be closed by the writer
+    :param level: compression level
+    :param workers: number of compressing threads
+    :param block_size: size of the uncompressed data block compressed by each job
+    """
+
+    def __init__(
+        self,
+        fileobj: BinaryIO,
+        level: int = 6,
+        workers: Optional[int] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+    ):
+        super().__init__()
+        self.fileobj = fileobj
+        self.level = level
+        self.workers = workers or get_default_workers()
+        self.block_size = block_size
+
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='parallel-gzip')
+        self._pending: Deque[Future] = deque()
+        self._buffer = bytearray()
+        self._last_block = b''
+        self._crc = 0
+        self._size = 0
+        self._write_header()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self.closed:
+            raise ValueError('write to closed file')
+
+        data = memoryview(data).cast('B')
+        pos = 0
+        # Fill the buffered block first
+        if self._buffer:
+            pos = min(self.block_size - len(self._buffer), len(data))
+            self._buffer += data[:pos]
+            if len(self._buffer) < self.block_size:
+                return len(data)
+            self._submit(bytes(self._buffer), last=False)
+            self._buffer = bytearray()
+
+        while len(data) - pos >= self.block_size:
+            self._submit(bytes(data[pos : pos + self.block_size]), last=False)
+            pos += self.block_size
+        self._buffer += data[pos:]
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            self._submit(bytes(self._buffer), last=True)
+            self._buffer = bytearray()
+            while self._pending:
+                self._write_finished()
+            self.fileobj.write(struct.pack('<II', self._crc, self._size & 0xFFFFFFFF))
+        finally:
+            self._executor.shutdown(wait=True)
+            super().close()
+
+    def _write_header(self):
+        # magic, method(deflate), flags(none), mtime(0), extra flags, OS(unknown)
+        self.fileobj.write(b'\x1f\x8b\x08\x00' + struct.pack('<I', 0) + b'\x00\xff')
+
+    def _submit(self, block: bytes, last: bool):
+        """Submit a block to compress, the checksum is calculated in the current thread to keep the order"""
+        self._crc = zlib.crc32(block, self._crc)
+        self._size += len(block)
+        zdict = self._last_block[-DICT_SIZE:]
+        self._last_block = block
+        self._pending.append(self._executor.submit(self._compress, block, zdict, last))
+
+        # Limit the number of pending blocks to keep memory usage bounded
+        while len(self._pending) > self.workers * 2 or (self._pending and self._pending[0].done()):
+            self._write_finished()
+
+    def _write_finished(self):
+        self.fileobj.write(self._pending.popleft().result())
+
+    def _compress(self, block: bytes, zdict: bytes, last: bool) -> bytes:
+        """Compress a block into raw deflate data, non-last blocks are ended by a sync flush so the
+        compressed blocks can be concatenated into a single deflate stream.
+        """
+        if zdict:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=zdict)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        return compressor.compress(block) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
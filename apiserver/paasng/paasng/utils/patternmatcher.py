@@ -64,6 +64,29 @@ class Pattern:
             return bool(self.regexp.match(path))
         return False
 
+    def to_regexp_str(self) -> str:
+        """Return a regexp string which matches the same paths as `match`, useful for combining
+        multiple patterns into one regexp.
+        """
+        if self.match_type is MatchType.Unknown:
+            self.compile(os.sep)
+
+        if self.match_type == MatchType.Excat:
+            return re.escape(self.cleaned_pattern) + r"\Z"
+        elif self.match_type == MatchType.Prefix:
+            return re.escape(self.cleaned_pattern[: len(self.cleaned_pattern) - 2])
+        elif self.match_type == MatchType.Suffix:
+            suffix = self.cleaned_pattern[2:]
+            reg_str = "(?s:.*)" + re.escape(suffix) + r"\Z"
+            if suffix and suffix[0] == os.sep:
+                reg_str += "|" + re.escape(suffix[1:]) + r"\Z"
+            return reg_str
+        elif self.match_type == MatchType.Regexp:
+            assert self.regexp, "match_type is Regexp, but regexp is None"
+            return self.regexp.pattern
+        # Never match
+        return "(?!)"
+
     def compile(self, sl: str):  # noqa: C901
         reg_str = "^"
         pattern = self.cleaned_pattern
@@ -16,7 +16,7 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
-from blue_krill.data_types.enum import StructuredEnum
+from blue_krill.data_types.enum import EnumField, StructuredEnum
 
 
 class UserAction(int, StructuredEnum):
@@ -33,3 +33,12 @@ class UserAction(int, StructuredEnum):
 
     FETCH_DEPLOY_LOG = 1
     WATCH_PROCESS = 2
+
+
+class RateLimitAlgorithm(str, StructuredEnum):
+    """频率限制使用的算法"""
+
+    # 固定窗口：实现简单，但在窗口边界处可能出现两倍于阈值的突发请求
+    FIXED_WINDOW = EnumField('fixed_window', label='固定窗口')
+    # 滑动窗口：基于 Lua 脚本原子计数，每次判断仅需一次 Redis 网络往返
+    SLIDING_WINDOW = EnumField('sliding_window', label='滑动窗口')
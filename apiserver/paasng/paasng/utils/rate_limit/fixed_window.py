@@ -25,7 +25,8 @@ from rest_framework.response import Response
 from rest_framework.status import HTTP_429_TOO_MANY_REQUESTS
 
 from paasng.platform.core.storages.redisdb import get_default_redis
-from paasng.utils.rate_limit.constants import UserAction
+from paasng.utils.rate_limit.constants import RateLimitAlgorithm, UserAction
+from paasng.utils.rate_limit.sliding_window import UserActionRateLimiter as SlidingWindowRateLimiter
 
 
 class RedisFixedWindowRateLimiter(abc.ABC):
@@ -101,14 +102,24 @@ class UserActionRateLimiter(RedisFixedWindowRateLimiter):
         return f'bk_paas3:rate_limits:{self.username}:{self.action}:{self.cur_window}'
 
 
-def rate_limits_by_user(action: UserAction, window_size: int, threshold: int):
-    """适用于 Django View 方法的装饰器，提供频率限制的能力"""
+def rate_limits_by_user(
+    action: UserAction,
+    window_size: int,
+    threshold: int,
+    algorithm: RateLimitAlgorithm = RateLimitAlgorithm.FIXED_WINDOW,
+):
+    """适用于 Django View 方法的装饰器，提供频率限制的能力
+
+    :param algorithm: 频率限制使用的算法，默认为固定窗口
+    """
+    limiter_cls = {
+        RateLimitAlgorithm.FIXED_WINDOW: UserActionRateLimiter,
+        RateLimitAlgorithm.SLIDING_WINDOW: SlidingWindowRateLimiter,
+    }[algorithm]
 
     @wrapt.decorator
     def wrapper(wrapped, instance, args, kwargs):
-        rate_limiter = UserActionRateLimiter(
-            get_default_redis(), instance.request.user.username, action, window_size, threshold
-        )
+        rate_limiter = limiter_cls(get_default_redis(), instance.request.user.username, action, window_size, threshold)
         if not rate_limiter.is_allowed():
             return Response(status=HTTP_429_TOO_MANY_REQUESTS)
 
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+import abc
+import threading
+import time
+import uuid
+from typing import Dict
+
+import redis
+
+from paasng.utils.rate_limit.constants import UserAction
+
+# KEYS[1]: 记录请求时间戳的有序集合
+# ARGV: 当前时间（毫秒）、时间窗口长度（毫秒）、次数阈值、本次请求的唯一标识
+# 返回值：0 表示允许当前行为，否则为需要等待的毫秒数
+_SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local threshold = tonumber(ARGV[3])
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+if redis.call('ZCARD', key) < threshold then
+    redis.call('ZADD', key, now, ARGV[4])
+    redis.call('PEXPIRE', key, window)
+    return 0
+end
+
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return math.max(tonumber(oldest[2]) + window - now, 1)
+"""
+
+
+class LocalDenyCache:
+    """进程内的拒绝记录缓存，在已确定会被限制的时间段内，直接拒绝请求而无需访问 Redis
+
+    :param max_size: 最多记录的 key 数量，超出后将清理已过期的记录
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._denied_until: Dict[str, float] = {}
+
+    def is_denied(self, key: str) -> bool:
+        return self._denied_until.get(key, 0) > time.time()
+
+    def deny(self, key: str, seconds: float):
+        with self._lock:
+            if len(self._denied_until) >= self.max_size:
+                now = time.time()
+                self._denied_until = {k: v for k, v in self._denied_until.items() if v > now}
+            self._denied_until[key] = time.time() + seconds
+
+
+_local_deny_cache = LocalDenyCache()
+
+
+class RedisSlidingWindowRateLimiter(abc.ABC):
+    """基于 Redis 的滑动窗口速率控制器
+
+    判断与计数在 Redis 中通过 Lua 脚本原子完成，每次判断只需一次网络往返；被限制时会在进程内记录
+    解除限制的时间，在此之前的请求将直接被拒绝，不再访问 Redis。
+    """
+
+    def __init__(self, redis_db: redis.Redis, window_size: int, threshold: int):
+        """
+        :param redis_db: redis client
+        :param window_size: 时间窗口长度（单位：秒）
+        :param threshold: 时间窗口内的次数阈值
+        """
+        self.redis_db = redis_db
+        self.window_size = window_size
+        self.threshold = threshold
+        self._script = redis_db.register_script(_SLIDING_WINDOW_SCRIPT)
+
+    def is_allowed(self) -> bool:
+        """
+        是否允许当前行为（未受速率限制影响）
+
+        滑动窗口实现：
+        +--------------+      +-------------------+  denied until ...   +----------------------+
+        | user request | ---> | check local cache | ------------------> | [✗] cause rate limit |
+        +--------------+      +-------------------+                     +----------------------+
+                                        |                                          ^
+                                        v                                          | >= threshold
+                              +-------------------------------------+              |
+                              | (lua) remove records out of window, | -------------+
+                              |       count records in window       |
+                              +-------------------------------------+
+                                        |
+                                        | < threshold
+                                        v
+                              +-------------------------------------+
+                              |    [✓] add record of current time   |
+                              +-------------------------------------+
+        """
+        key = self._gen_key()
+        if _local_deny_cache.is_denied(key):
+            return False
+
+        now_ms = int(time.time() * 1000)
+        wait_ms = self._script(
+            keys=[key], args=[now_ms, self.window_size * 1000, self.threshold, f'{now_ms}:{uuid.uuid4().hex}']
+        )
+        if not wait_ms:
+            return True
+
+        _local_deny_cache.deny(key, int(wait_ms) / 1000)
+        return False
+
+    @abc.abstractmethod
+    def _gen_key(self) -> str:
+        """生成 redis 中的 key"""
+        raise NotImplementedError
+
+
+class UserActionRateLimiter(RedisSlidingWindowRateLimiter):
+    """针对用户行为的速率控制器"""
+
+    def __init__(
+        self,
+        redis_db: redis.Redis,
+        username: str,
+        action: UserAction,
+        window_size: int,
+        threshold: int,
+    ):
+        """
+        :param redis_db: redis client
+        :param username: 用户 ID
+        :param action: 用户操作名
+        :param window_size: 时间窗口长度（单位：秒）
+        :param threshold: 时间窗口内的次数阈值
+        """
+        super().__init__(redis_db, window_size, threshold)
+        self.username = username
+        self.action = action
+
+    def _gen_key(self) -> str:
+        return f'bk_paas3:rate_limits:sliding:{self.username}:{self.action}:{self.window_size}'
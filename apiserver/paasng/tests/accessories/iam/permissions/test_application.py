@@ -16,13 +16,23 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
+from unittest import mock
+
 import pytest
 from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import Q
 
 from paasng.accessories.iam.constants import ResourceType
 from paasng.accessories.iam.permissions.exceptions import PermissionDeniedError
 from paasng.accessories.iam.permissions.perm import ActionResourcesRequest
-from paasng.accessories.iam.permissions.resources.application import AppAction, AppCreatorAction, AppPermCtx
+from paasng.accessories.iam.permissions.resources.application import (
+    AppAction,
+    AppCreatorAction,
+    AppFilterConverter,
+    AppPermCtx,
+    UserAppPolicyCache,
+)
 from tests.accessories.iam.conftest import generate_apply_url
 from tests.utils.helpers import generate_random_string
 
@@ -104,3 +114,85 @@ class TestApplicationCreatorAction:
             'type': ResourceType.Application,
             'system': settings.IAM_PAAS_V3_SYSTEM_ID,
         }
+
+
+class TestAppFilterConverter:
+    def test_merge_or(self):
+        policies = {
+            'op': 'OR',
+            'content': [
+                {'op': 'eq', 'field': 'application.id', 'value': 'app-a'},
+                {'op': 'in', 'field': 'application.id', 'value': ['app-c', 'app-b']},
+                {
+                    'op': 'OR',
+                    'content': [
+                        {'op': 'eq', 'field': 'application.id', 'value': 'app-a'},
+                        {'op': 'eq', 'field': 'application.id', 'value': 'app-d'},
+                    ],
+                },
+            ],
+        }
+        filters = AppFilterConverter({'application.id': 'code'}).convert(policies)
+        assert filters == Q(code__in=['app-a', 'app-b', 'app-c', 'app-d'])
+
+    def test_keep_other_ops(self):
+        policies = {
+            'op': 'OR',
+            'content': [
+                {'op': 'eq', 'field': 'application.id', 'value': 'app-a'},
+                {'op': 'any', 'field': 'application.id', 'value': []},
+            ],
+        }
+        filters = AppFilterConverter({'application.id': 'code'}).convert(policies)
+        assert filters == ~Q(pk=None) | Q(code__in=['app-a'])
+
+
+class TestUserAppPolicyCache:
+    @pytest.fixture(autouse=True)
+    def shared_cache(self):
+        """Use a separated cache backend to avoid polluting other tests"""
+        shared_cache = LocMemCache('test-iam-app-policies', {})
+        shared_cache.clear()
+        with mock.patch('paasng.accessories.iam.permissions.resources.application.cache', new=shared_cache):
+            yield shared_cache
+
+    @pytest.mark.parametrize('policies', [None, {'op': 'any', 'field': 'application.id', 'value': []}])
+    def test_get_or_query(self, policies):
+        policy_cache = UserAppPolicyCache(timeout=60)
+        query = mock.Mock(return_value=policies)
+        for _ in range(2):
+            assert policy_cache.get_or_query('foo', AppAction.VIEW_BASIC_INFO, query) == policies
+        assert query.call_count == 1
+
+    def test_invalidate(self):
+        policy_cache = UserAppPolicyCache(timeout=60)
+        query = mock.Mock(return_value=None)
+        policy_cache.get_or_query('foo', AppAction.VIEW_BASIC_INFO, query)
+        policy_cache.get_or_query('bar', AppAction.VIEW_BASIC_INFO, query)
+
+        policy_cache.invalidate(['foo'])
+        policy_cache.get_or_query('foo', AppAction.VIEW_BASIC_INFO, query)
+        policy_cache.get_or_query('bar', AppAction.VIEW_BASIC_INFO, query)
+        assert query.call_count == 3
+
+    def test_not_cached_during_sync(self):
+        policy_cache = UserAppPolicyCache(timeout=60, sync_delay=30)
+        query = mock.Mock(return_value=None)
+        policy_cache.get_or_query('foo', AppAction.VIEW_BASIC_INFO, query)
+
+        policy_cache.invalidate(['foo'])
+        # 权限中心同步期间，查询结果可能是旧策略，不会被缓存
+        for _ in range(2):
+            policy_cache.get_or_query('foo', AppAction.VIEW_BASIC_INFO, query)
+        assert query.call_count == 3
+
+    def test_cached_after_sync(self, shared_cache):
+        policy_cache = UserAppPolicyCache(timeout=60, sync_delay=30)
+        query = mock.Mock(return_value=None)
+        policy_cache.invalidate(['foo'])
+
+        # 模拟同步时延已过，变更标记过期
+        shared_cache.delete(policy_cache._make_changed_key('foo'))
+        for _ in range(2):
+            policy_cache.get_or_query('foo', AppAction.VIEW_BASIC_INFO, query)
+        assert query.call_count == 1
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+from unittest import mock
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django_dynamic_fixture import G
+
+from paasng.accessories.iam import helpers
+from paasng.accessories.iam.helpers import (
+    UserGroupMembersCache,
+    add_role_members,
+    fetch_application_members,
+    fetch_user_roles_in_apps,
+)
+from paasng.accessories.iam.members.models import ApplicationUserGroup
+from paasng.platform.applications.constants import ApplicationRole
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def shared_cache():
+    """Use a separated cache backend to avoid polluting other tests"""
+    shared_cache = LocMemCache('test-iam-user-group-members', {})
+    with mock.patch('paasng.accessories.iam.helpers.cache', new=shared_cache):
+        yield shared_cache
+
+
+@pytest.fixture
+def members_cache():
+    members_cache = UserGroupMembersCache(timeout=60)
+    with mock.patch('paasng.accessories.iam.helpers.user_group_members_cache', new=members_cache):
+        yield members_cache
+
+
+@pytest.fixture
+def iam_cli():
+    group_members = {1: ['admin_user'], 2: ['dev_user', 'admin_user'], 3: [], 4: ['dev_user']}
+    cli = mock.MagicMock()
+    cli.fetch_user_group_members.side_effect = lambda group_id: list(group_members[group_id])
+    with mock.patch.object(helpers, 'IAM_CLI', new=cli):
+        yield cli
+
+
+@pytest.fixture
+def user_groups():
+    for app_code, role, user_group_id in [
+        ('app-foo', ApplicationRole.ADMINISTRATOR, 1),
+        ('app-foo', ApplicationRole.DEVELOPER, 2),
+        ('app-foo', ApplicationRole.OPERATOR, 3),
+        ('app-bar', ApplicationRole.DEVELOPER, 4),
+    ]:
+        G(ApplicationUserGroup, app_code=app_code, role=role, user_group_id=user_group_id)
+
+
+class TestUserGroupMembersCache:
+    def test_get_many(self, iam_cli):
+        members_cache = UserGroupMembersCache(timeout=60)
+        for _ in range(2):
+            assert members_cache.get_many([1, 2, 1]) == {1: ['admin_user'], 2: ['dev_user', 'admin_user']}
+        assert iam_cli.fetch_user_group_members.call_count == 2
+
+        # Only the missing user groups will be fetched
+        assert members_cache.get_many([1, 3]) == {1: ['admin_user'], 3: []}
+        assert iam_cli.fetch_user_group_members.call_count == 3
+
+    def test_invalidate(self, iam_cli):
+        members_cache = UserGroupMembersCache(timeout=60)
+        members_cache.get(1)
+        members_cache.invalidate([1])
+        members_cache.get(1)
+        assert iam_cli.fetch_user_group_members.call_count == 2
+
+    def test_disabled(self, iam_cli):
+        members_cache = UserGroupMembersCache(timeout=0)
+        members_cache.get(1)
+        members_cache.get(1)
+        assert iam_cli.fetch_user_group_members.call_count == 2
+
+
+class TestHelpers:
+    def test_fetch_user_roles_in_apps(self, iam_cli, members_cache, user_groups):
+        assert fetch_user_roles_in_apps(['app-foo', 'app-bar', 'app-baz'], 'dev_user') == {
+            'app-foo': [ApplicationRole.DEVELOPER],
+            'app-bar': [ApplicationRole.DEVELOPER],
+            'app-baz': [ApplicationRole.NOBODY],
+        }
+        assert fetch_user_roles_in_apps(['app-foo', 'app-bar'], 'admin_user') == {
+            'app-foo': [ApplicationRole.ADMINISTRATOR, ApplicationRole.DEVELOPER],
+            'app-bar': [ApplicationRole.NOBODY],
+        }
+        # All user groups are fetched only once
+        assert iam_cli.fetch_user_group_members.call_count == 4
+
+    def test_fetch_application_members(self, iam_cli, members_cache, user_groups):
+        members = {m['username']: m['roles'] for m in fetch_application_members('app-foo')}
+        assert members == {
+            'admin_user': [ApplicationRole.ADMINISTRATOR, ApplicationRole.DEVELOPER],
+            'dev_user': [ApplicationRole.DEVELOPER],
+        }
+
+    def test_add_role_members_invalidate_cache(self, iam_cli, members_cache, user_groups):
+        fetch_user_roles_in_apps(['app-bar'], 'dev_user')
+        add_role_members('app-bar', ApplicationRole.DEVELOPER, 'new_user')
+        fetch_user_roles_in_apps(['app-bar'], 'dev_user')
+
+        iam_cli.add_user_group_members.assert_called_once()
+        assert iam_cli.fetch_user_group_members.call_count == 2
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+import time
+from unittest import mock
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+
+from paasng.accessories.search.backends import (
+    BaseSearcher,
+    MixSearcher,
+    SearchDocResults,
+    SearchDocumentary,
+    SearchError,
+    search_with_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def search_cache():
+    """Use a separated cache backend to avoid polluting other tests"""
+    search_cache = LocMemCache('test-doc-search', {})
+    search_cache.clear()
+    with mock.patch('paasng.accessories.search.backends.cache', new=search_cache):
+        yield search_cache
+
+
+def make_results(source_type: str, count: int) -> SearchDocResults:
+    docs = [SearchDocumentary(source_type=source_type, title=f'{source_type}-{i}', url='') for i in range(count)]
+    return SearchDocResults(docs=docs, count=count)
+
+
+class FooSearcher(BaseSearcher):
+    def search(self, keyword: str) -> SearchDocResults:
+        return make_results('foo', 2)
+
+
+class BarSearcher(BaseSearcher):
+    def search(self, keyword: str) -> SearchDocResults:
+        return make_results('bar', 1)
+
+
+class SlowSearcher(BaseSearcher):
+    def search(self, keyword: str) -> SearchDocResults:
+        time.sleep(1)
+        return make_results('slow', 1)
+
+
+class BrokenSearcher(BaseSearcher):
+    def search(self, keyword: str) -> SearchDocResults:
+        raise SearchError('unavailable')
+
+
+class TestMixSearcher:
+    def test_mixed(self):
+        with mock.patch('paasng.accessories.search.backends.SEARCHER_CLS', new=[FooSearcher, BarSearcher]):
+            items = MixSearcher().search('foo')
+        assert [item['title'] for item in items] == ['foo-0', 'bar-0', 'foo-1']
+
+    def test_partial_results(self):
+        searcher_cls = [SlowSearcher, BrokenSearcher, FooSearcher]
+        with mock.patch('paasng.accessories.search.backends.SEARCHER_CLS', new=searcher_cls):
+            started_at = time.perf_counter()
+            items = MixSearcher(timeout=0.2).search('foo')
+
+        assert time.perf_counter() - started_at < 0.8
+        assert [item['title'] for item in items] == ['foo-0', 'foo-1']
+
+
+class TestSearchWithCache:
+    def test_cached(self, settings):
+        settings.DOCUMENT_SEARCH_CACHE_TIMEOUT = 60
+        searcher = FooSearcher()
+        with mock.patch.object(searcher, 'search', wraps=searcher.search) as search:
+            for _ in range(3):
+                assert search_with_cache(searcher, 'foo').count == 2
+            search_with_cache(searcher, 'bar')
+        assert search.call_count == 2
+
+    def test_failure_not_cached(self, settings):
+        settings.DOCUMENT_SEARCH_CACHE_TIMEOUT = 60
+        searcher = BrokenSearcher()
+        with mock.patch.object(searcher, 'search', wraps=searcher.search) as search:
+            for _ in range(2):
+                with pytest.raises(SearchError):
+                    search_with_cache(searcher, 'foo')
+        assert search.call_count == 2
@@ -21,6 +21,8 @@ from unittest import mock
 
 import pytest
 from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django_dynamic_fixture import G
 
@@ -29,15 +31,22 @@ from paasng.accounts.models import AccountFeatureFlag, UserProfile
 from paasng.dev_resources.sourcectl.connector import IntegratedSvnAppRepoConnector, SourceSyncResult
 from paasng.extensions.declarative.handlers import get_desc_handler
 from paasng.platform.applications.constants import ApplicationRole
-from paasng.platform.applications.models import Application
+from paasng.platform.applications.models import Application, UserMarkedApplication
+from paasng.platform.applications.serializers import ApplicationWithDeployInfoSLZ
 from paasng.platform.modules.constants import SourceOrigin
 from paasng.platform.operations.constant import OperationType
 from paasng.platform.operations.models import Operation
+from paasng.publish.market.models import MarketConfig
 from paasng.utils.basic import get_username_by_bkpaas_user_id
 from paasng.utils.error_codes import error_codes
 from tests.conftest import CLUSTER_NAME_FOR_TESTING
 from tests.utils.auth import create_user
-from tests.utils.helpers import configure_regions, generate_random_string
+from tests.utils.helpers import (
+    configure_regions,
+    create_app,
+    generate_random_string,
+    register_iam_after_create_application,
+)
 
 pytestmark = pytest.mark.django_db
 
@@ -479,3 +488,59 @@ class TestCreateCloudNativeApp:
         )
         assert response.status_code == 201, f'error: {response.json()["detail"]}'
         assert response.json()['application']['type'] == 'cloud_native'
+
+
+class TestApplicationListDetailed:
+    @pytest.fixture
+    def url(self):
+        return reverse('api.applications')
+
+    @staticmethod
+    def _create_app(user) -> Application:
+        app = create_app(owner_username=user.username)
+        register_iam_after_create_application(app)
+        return app
+
+    def _capture_queries(self, api_client, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = api_client.get(url)
+        assert response.status_code == 200
+        return response, [q['sql'] for q in ctx.captured_queries]
+
+    def test_market_configs_created(self, api_client, bk_user, url):
+        apps = [self._create_app(bk_user) for _ in range(3)]
+        response = api_client.get(url)
+
+        assert response.status_code == 200
+        assert MarketConfig.objects.filter(application__in=apps).count() == 3
+        assert response.data['default_app_count'] == 3
+        assert response.data['engineless_app_count'] == 0
+        assert response.data['cloud_native_app_count'] == 0
+
+    def test_queries_not_grow_with_apps(self, api_client, bk_user, url):
+        self._create_app(bk_user)
+        # The first request will create the missing market configs
+        api_client.get(url)
+        # The modules of each application are serialized by their own serializers(clusters, build config,
+        # exposed links...), stub it to check the queries of the listing itself
+        with mock.patch.object(ApplicationWithDeployInfoSLZ, 'to_representation', return_value={}):
+            _, sqls_one = self._capture_queries(api_client, url)
+
+            for _ in range(4):
+                self._create_app(bk_user)
+            api_client.get(url)
+            response, sqls_many = self._capture_queries(api_client, url)
+        assert response.data['count'] == 5
+
+        assert len(sqls_one) == len(sqls_many)
+        table = MarketConfig._meta.db_table
+        assert len([sql for sql in sqls_many if table in sql]) == 1
+
+    def test_prefer_marked(self, api_client, bk_user, url):
+        apps = sorted([self._create_app(bk_user) for _ in range(3)], key=lambda app: app.name)
+        UserMarkedApplication.objects.create(owner=bk_user.pk, application=apps[-1])
+
+        response = api_client.get(url, {'order_by': 'name', 'prefer_marked': True})
+        results = response.data['results']
+        assert [item['application']['code'] for item in results] == [apps[2].code, apps[0].code, apps[1].code]
+        assert [item['marked'] for item in results] == [True, False, False]
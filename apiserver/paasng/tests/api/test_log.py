@@ -20,8 +20,13 @@ import json
 from unittest import mock
 
 import pytest
+from django.test.utils import override_settings
+from elasticsearch.exceptions import RequestError
 from elasticsearch_dsl.response import Hit
 
+from paasng.platform.log.exceptions import NoIndexError
+from paasng.utils.es_log.models import FieldFilter
+
 pytestmark = pytest.mark.django_db
 
 
@@ -149,3 +154,102 @@ class TestModuleStructuredLogAPIView:
                 "stream": "foo",
             }
         ]
+
+
+def make_structured_hit(app, module, message: str) -> Hit:
+    return Hit(
+        {
+            "fields": {
+                "@timestamp": 1,
+                "json": {"message": message},
+                "region": app.region,
+                "app_code": app.code,
+                "module_name": module.name,
+                "environment": "stag",
+                "process_id": "1234567",
+                "stream": "foo",
+            }
+        }
+    )
+
+
+class TestQueryLogsOverview:
+    @pytest.fixture
+    def url(self, bk_app, bk_module):
+        return (
+            f"/api/bkapps/applications/{bk_app.code}/modules/{bk_module.name}/log/structured/overview/?time_range=1h"
+        )
+
+    def test_overview(self, api_client, bk_app, bk_module, url):
+        with mock.patch("paasng.platform.log.views.instantiate_log_client") as client_factory:
+            client_factory().get_mappings.return_value = {"app_code": {"type": "text"}}
+            client_factory().execute_search.return_value = ([make_structured_hit(bk_app, bk_module, "foo")], 1)
+            client_factory().aggregate_date_histogram.return_value = [{"key": 1683000000000, "doc_count": 1}]
+            client_factory().aggregate_fields_filters.return_value = [
+                FieldFilter(name="stream", key="stream", options=[("foo", "100.00%")], total=1)
+            ]
+            response = api_client.post(url, data={})
+
+        assert response.status_code == 200
+        assert response.data["logs"]["total"] == 1
+        assert response.data["logs"]["logs"][0]["message"] == "foo"
+        assert response.data["date_histogram"]["series"] == [1]
+        assert response.data["date_histogram"]["timestamps"] == [1683000000]
+        assert [f["name"] for f in response.data["fields_filters"]] == ["stream"]
+
+    @pytest.mark.parametrize(
+        "failed_method, exc, expected_code",
+        [
+            ("execute_search", NoIndexError(), "QUERY_LOG_FAILED"),
+            ("aggregate_date_histogram", NoIndexError(), "QUERY_LOG_FAILED"),
+            ("aggregate_fields_filters", RequestError(400, "search_phase_execution_exception"), "QUERY_REQUEST_ERROR"),
+            ("aggregate_date_histogram", RuntimeError("connection reset"), "QUERY_LOG_FAILED"),
+        ],
+    )
+    def test_error(self, api_client, bk_app, bk_module, url, failed_method, exc, expected_code):
+        with mock.patch("paasng.platform.log.views.instantiate_log_client") as client_factory:
+            client_factory().get_mappings.return_value = {"app_code": {"type": "text"}}
+            client_factory().execute_search.return_value = ([], 0)
+            client_factory().aggregate_date_histogram.return_value = []
+            client_factory().aggregate_fields_filters.return_value = []
+            getattr(client_factory(), failed_method).side_effect = exc
+            response = api_client.post(url, data={})
+
+        # 并发查询中任一查询失败, 都应转换成对应的错误响应而不是 500
+        assert response.status_code == 400
+        assert response.json()["code"] == expected_code
+
+
+class TestExportLogs:
+    @pytest.fixture
+    def url(self, bk_app, bk_module):
+        return f"/api/bkapps/applications/{bk_app.code}/modules/{bk_module.name}/log/structured/export/?time_range=1h"
+
+    @override_settings(LOG_EXPORT_MAX_ROWS=1)
+    def test_truncated(self, api_client, bk_app, bk_module, url):
+        hits = [make_structured_hit(bk_app, bk_module, "foo"), make_structured_hit(bk_app, bk_module, "bar")]
+        with mock.patch("paasng.platform.log.views.instantiate_log_client") as client_factory:
+            client_factory().get_mappings.return_value = {"app_code": {"type": "text"}}
+            client_factory().scan.return_value = iter([hits])
+            response = api_client.post(url, data={})
+            content = b"".join(response.streaming_content).decode()
+
+        assert response.status_code == 200
+        rows = [json.loads(line) for line in content.splitlines()]
+        assert len(rows) == 2
+        assert rows[0]["message"] == "foo"
+        assert "export truncated" in rows[1]["#incomplete"]
+
+    def test_no_index(self, api_client, url):
+        def _scan(*args, **kwargs):
+            raise NoIndexError
+            yield
+
+        with mock.patch("paasng.platform.log.views.instantiate_log_client") as client_factory:
+            client_factory().get_mappings.return_value = {"app_code": {"type": "text"}}
+            client_factory().scan.side_effect = _scan
+            response = api_client.post(url, data={})
+
+        # 异常在返回流式响应前抛出, 能正常转换成错误响应
+        assert response.status_code == 400
+        assert response.json()["code"] == "QUERY_LOG_FAILED"
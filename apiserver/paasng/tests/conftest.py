@@ -148,6 +148,16 @@ def pytest_sessionstart(session):
     get_storage_by_bucket(settings.APP_LOGO_BUCKET)
 
 
+@pytest.fixture(autouse=True)
+def _reset_shared_cert_indexes():
+    """The shared certs created by other tests are rolled back without any signals, so the cached indexes
+    must be cleared before each test
+    """
+    from paas_wl.networking.ingress.certs.index import shared_cert_indexes
+
+    shared_cert_indexes.clear()
+
+
 @pytest.fixture
 def legacy_app_code():
     """The legacy App code using for Unit test"""
@@ -170,6 +180,15 @@ def auto_init_legacy_app(request):
         AppManger(session).delete_by_code(legacy_app_code)
 
 
+@pytest.fixture(autouse=True, scope="session")
+def disable_env_vars_concurrency_and_caching():
+    """Data created by tests is invisible to DB connections of other threads, so env variables should be
+    gathered in current thread. Remote instances are mocked by tests, caching them may cause pollution.
+    """
+    with override_settings(ENV_VARS_GATHER_CONCURRENCY=1, REMOTE_SERVICE_INSTANCE_CACHE_TIMEOUT=0):
+        yield
+
+
 @pytest.fixture(autouse=True, scope="session")
 def skip_iam_migrations():
     with override_settings(BK_IAM_SKIP=True):
@@ -344,13 +363,17 @@ def mock_iam():
                 return True
         return False
 
+    from paasng.accessories.iam.helpers import UserGroupMembersCache
     from tests.utils.mocks.iam import StubBKIAMClient
     from tests.utils.mocks.permissions import StubApplicationPermission
 
     with mock.patch('paasng.accessories.iam.client.BKIAMClient', new=StubBKIAMClient), mock.patch(
         'paasng.accessories.iam.helpers.BKIAMClient',
         new=StubBKIAMClient,
-    ), mock.patch('paasng.platform.applications.helpers.BKIAMClient', new=StubBKIAMClient,), mock.patch(
+    ), mock.patch(
+        'paasng.platform.applications.helpers.BKIAMClient',
+        new=StubBKIAMClient,
+    ), mock.patch(
         'paasng.accessories.iam.helpers.IAM_CLI',
         new=StubBKIAMClient(),
     ), mock.patch(
@@ -365,6 +388,9 @@ def mock_iam():
     ), mock.patch(
         'paasng.plat_admin.numbers.app.ApplicationPermission',
         new=StubApplicationPermission,
+    ), mock.patch(
+        'paasng.accessories.iam.helpers.user_group_members_cache',
+        new=UserGroupMembersCache(timeout=0),
     ):
         yield
 
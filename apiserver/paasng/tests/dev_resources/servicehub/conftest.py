@@ -21,6 +21,7 @@ from unittest import mock
 import pytest
 
 from paasng.dev_resources.servicehub.remote import collector
+from paasng.dev_resources.servicehub.remote.client import broker_connections
 from paasng.dev_resources.servicehub.remote.store import get_remote_store
 from tests.dev_resources.servicehub.utils import gen_plan, gen_service
 from tests.utils.api import mock_json_response
@@ -60,6 +61,14 @@ def setup_mocks():
         yield
 
 
+@pytest.fixture(autouse=True)
+def reset_broker_connections():
+    """Failures of the remote services made by other tests should not open the circuit breakers"""
+    broker_connections.clear()
+    yield
+    broker_connections.clear()
+
+
 @pytest.fixture
 def faked_remote_services():
     """Stores some faked remote services"""
@@ -71,7 +80,7 @@ def faked_remote_services():
         'jwt_auth_conf': {'iss': 'foo', 'key': 's1'},
     }
     meta_info = {'version': None}
-    with mock.patch('requests.get') as mocked_get:
+    with mock.patch('requests.Session.get') as mocked_get:
         # Mock requests response
         mocked_get.return_value = mock_json_response(data_mocks.OBJ_STORE_REMOTE_SERVICES_JSON)
 
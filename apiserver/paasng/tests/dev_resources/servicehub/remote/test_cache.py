@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+from unittest import mock
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.test.utils import override_settings
+
+from paasng.dev_resources.servicehub.remote.cache import RemoteInstanceCache
+
+
+class TestRemoteInstanceCache:
+    @pytest.fixture(autouse=True)
+    def local_cache(self):
+        local_cache = LocMemCache('test_remote_instance_cache', {})
+        local_cache.clear()
+        with mock.patch('paasng.dev_resources.servicehub.remote.cache.cache', local_cache), override_settings(
+            REMOTE_SERVICE_INSTANCE_CACHE_TIMEOUT=60
+        ):
+            yield local_cache
+
+    @pytest.fixture
+    def client(self):
+        client = mock.MagicMock()
+        client.retrieve_instance.return_value = {'uuid': 'foo', 'credentials': {'PASSWORD': 'p@ssw0rd'}}
+        return client
+
+    def test_get_or_retrieve(self, client):
+        instance_cache = RemoteInstanceCache()
+        for _ in range(3):
+            data = instance_cache.get_or_retrieve(client, 'foo')
+            assert data['credentials'] == {'PASSWORD': 'p@ssw0rd'}
+        assert client.retrieve_instance.call_count == 1
+
+    def test_encrypted(self, local_cache, client):
+        RemoteInstanceCache().get_or_retrieve(client, 'foo')
+        value = local_cache.get(RemoteInstanceCache()._make_key('foo'))
+        assert value
+        assert 'p@ssw0rd' not in value
+
+    def test_invalidate(self, client):
+        instance_cache = RemoteInstanceCache()
+        instance_cache.get_or_retrieve(client, 'foo')
+        instance_cache.invalidate('foo')
+        instance_cache.get_or_retrieve(client, 'foo')
+        assert client.retrieve_instance.call_count == 2
+
+    def test_disabled(self, client):
+        instance_cache = RemoteInstanceCache()
+        with override_settings(REMOTE_SERVICE_INSTANCE_CACHE_TIMEOUT=0):
+            instance_cache.get_or_retrieve(client, 'foo')
+            instance_cache.get_or_retrieve(client, 'foo')
+        assert client.retrieve_instance.call_count == 2
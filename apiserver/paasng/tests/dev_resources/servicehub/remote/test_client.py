@@ -20,11 +20,18 @@ from unittest import mock
 
 import arrow
 import pytest
+import requests
 from blue_krill.auth.jwt import ClientJWTAuth
+from django.test import override_settings
 from requests import RequestException
-
-from paasng.dev_resources.servicehub.remote.client import RemoteServiceClient
-from paasng.dev_resources.servicehub.remote.exceptions import RClientResponseError, RemoteClientError
+from requests.cookies import MockRequest, create_cookie
+
+from paasng.dev_resources.servicehub.remote.client import CircuitBreaker, RemoteServiceClient, broker_connections
+from paasng.dev_resources.servicehub.remote.exceptions import (
+    RClientResponseError,
+    RemoteClientError,
+    RemoteServiceUnavailable,
+)
 from tests.dev_resources.servicehub import data_mocks
 from tests.utils.api import mock_json_response
 
@@ -34,19 +41,19 @@ class TestClient:
     def client(self, config):
         return RemoteServiceClient(config=config)
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_list_services_error(self, mocked_get, client):
         mocked_get.side_effect = RequestException('faked requests exception')
         with pytest.raises(RemoteClientError):
             client.list_services()
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_list_services_status_code_error(self, mocked_get, client):
         mocked_get.return_value = mock_json_response({}, status_code=400)
         with pytest.raises(RClientResponseError):
             client.list_services()
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_list_services_normal(self, mocked_get, client):
         mocked_get.return_value = mock_json_response(data_mocks.OBJ_STORE_REMOTE_SERVICES_JSON)
 
@@ -56,7 +63,7 @@ class TestClient:
         auth_inst = mocked_get.call_args[1]['auth']
         assert isinstance(auth_inst, ClientJWTAuth)
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_retrieve_instance_normal(self, mocked_get, client):
         mocked_get.return_value = mock_json_response(data_mocks.REMOTE_INSTANCE_JSON)
 
@@ -67,7 +74,7 @@ class TestClient:
         auth_inst = mocked_get.call_args[1]['auth']
         assert isinstance(auth_inst, ClientJWTAuth)
 
-    @mock.patch('requests.post')
+    @mock.patch('requests.Session.post')
     def test_provision_instance_normal(self, mocked_post, client):
         mocked_post.return_value = mock_json_response(data_mocks.REMOTE_INSTANCE_JSON)
 
@@ -80,7 +87,7 @@ class TestClient:
         auth_inst = mocked_post.call_args[1]['auth']
         assert isinstance(auth_inst, ClientJWTAuth)
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_retrieve_instance_has_created_field(self, mocked_get, client):
         mocked_get.return_value = mock_json_response(data_mocks.REMOTE_INSTANCE_JSON)
 
@@ -89,3 +96,100 @@ class TestClient:
 
         # raise nothing
         arrow.get(data['created'])
+
+    @mock.patch('requests.Session.get')
+    def test_session_shared_by_clients(self, mocked_get, config):
+        mocked_get.return_value = mock_json_response(data_mocks.REMOTE_INSTANCE_JSON)
+
+        RemoteServiceClient(config=config).retrieve_instance(instance_id='faked-id')
+        RemoteServiceClient(config=config).retrieve_instance(instance_id='faked-id')
+        assert broker_connections.get_session(config) is broker_connections.get_session(config)
+        assert mocked_get.call_count == 2
+
+    @mock.patch('requests.Session.get')
+    def test_circuit_breaker(self, mocked_get, client):
+        mocked_get.side_effect = RequestException('faked requests exception')
+        with override_settings(REMOTE_SERVICE_CIRCUIT_BREAKER_THRESHOLD=2):
+            for _ in range(2):
+                with pytest.raises(RemoteClientError):
+                    client.list_services()
+
+            with pytest.raises(RemoteServiceUnavailable):
+                client.list_services()
+        assert mocked_get.call_count == 2
+
+    @mock.patch('requests.Session.get')
+    def test_circuit_breaker_ignore_client_errors(self, mocked_get, client):
+        mocked_get.return_value = mock_json_response({}, status_code=404)
+        with override_settings(REMOTE_SERVICE_CIRCUIT_BREAKER_THRESHOLD=2):
+            for _ in range(3):
+                with pytest.raises(RClientResponseError):
+                    client.list_services()
+        assert mocked_get.call_count == 3
+
+    @mock.patch('requests.Session.get')
+    def test_circuit_breaker_trial_raises_unexpected_error(self, mocked_get, client):
+        with override_settings(
+            REMOTE_SERVICE_CIRCUIT_BREAKER_THRESHOLD=1, REMOTE_SERVICE_CIRCUIT_BREAKER_RECOVERY_TIMEOUT=0
+        ):
+            mocked_get.side_effect = RequestException('faked requests exception')
+            with pytest.raises(RemoteClientError):
+                client.list_services()
+
+            # The trial request fails with an exception which is not a RequestException
+            mocked_get.side_effect = ValueError('unexpected error')
+            with pytest.raises(ValueError):
+                client.list_services()
+
+            # The failed trial must be recorded, so that another trial is allowed after the recovery timeout
+            mocked_get.side_effect = None
+            mocked_get.return_value = mock_json_response(data_mocks.OBJ_STORE_REMOTE_SERVICES_JSON)
+            assert len(client.list_services()) == 3
+        assert not broker_connections.get_breaker(client.config).is_open
+
+    def test_session_settings(self, config):
+        session = broker_connections.get_session(config)
+        assert session.get_adapter('http://faked-host/').max_retries.method_whitelist == {'GET'}
+
+        # Cookies from responses are never stored by the shared session
+        cookie = create_cookie('sessionid', 'foo', domain='faked-host')
+        request = MockRequest(requests.Request('GET', 'http://faked-host/services/').prepare())
+        assert not session.cookies.get_policy().set_ok(cookie, request)
+
+
+class TestCircuitBreaker:
+    def test_open(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+        breaker.record_failure()
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.is_open
+        assert not breaker.allow_request()
+
+    def test_success_resets_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert not breaker.is_open
+
+    def test_never_open(self):
+        breaker = CircuitBreaker(failure_threshold=0, recovery_timeout=30)
+        for _ in range(10):
+            breaker.record_failure()
+        assert breaker.allow_request()
+
+    @pytest.mark.parametrize("trial_succeeded, is_open", [(True, False), (False, True)])
+    def test_trial_after_recovery_timeout(self, trial_succeeded, is_open):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+
+        # Only one trial request is allowed
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+
+        if trial_succeeded:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        assert breaker.is_open == is_open
@@ -22,7 +22,12 @@ import pytest
 from django.core.exceptions import ImproperlyConfigured
 from django.test import override_settings
 
-from paasng.dev_resources.servicehub.remote.collector import initialize_remote_services
+from paasng.dev_resources.servicehub.remote.collector import (
+    FetchResult,
+    fetch_all_remote_services,
+    initialize_remote_services,
+)
+from paasng.dev_resources.servicehub.remote.exceptions import FetchRemoteSvcError
 from tests.dev_resources.servicehub import data_mocks
 from tests.utils.api import mock_json_response
 
@@ -35,7 +40,7 @@ class TestInitialize:
         with pytest.raises(ImproperlyConfigured):
             initialize_remote_services(store)
 
-    @mock.patch('requests.get')
+    @mock.patch('requests.Session.get')
     def test_normal(self, mocked_get, config):
         mocked_get.return_value = mock_json_response(data_mocks.OBJ_STORE_REMOTE_SERVICES_JSON)
         mocked_store = mock.MagicMock()
@@ -47,3 +52,18 @@ class TestInitialize:
         assert mocked_store.bulk_upsert.call_count == len(SERVICE_REMOTE_ENDPOINTS)
         assert mocked_get.called
         assert mocked_get.call_args[0][0] == 'http://faked-host/services/'
+
+
+class TestFetchAllRemoteServices:
+    def test_in_order_and_skip_failures(self, config):
+        def fake_fetch(config):
+            if config.name == 'remote-1':
+                raise FetchRemoteSvcError('error fetching services.')
+            return FetchResult(config, [], None)
+
+        endpoints = [dict(config.to_json(), name=f'remote-{i}') for i in range(4)]
+        with override_settings(SERVICE_REMOTE_ENDPOINTS=endpoints), mock.patch(
+            'paasng.dev_resources.servicehub.remote.collector.fetch_remote_service', side_effect=fake_fetch
+        ):
+            results = list(fetch_all_remote_services())
+        assert [ret.config.name for ret in results] == ['remote-0', 'remote-2', 'remote-3']
@@ -183,7 +183,7 @@ class TestRemoteMgrWithRealStore:
         bk_module.save()
 
         meta_info = {'version': None}
-        with mock.patch('requests.get') as mocked_get:
+        with mock.patch('requests.Session.get') as mocked_get:
             # Mock requests response
             bk_service_ver.plans = [bk_plan_r1_v1, bk_plan_r1_v2, bk_plan_r2_v1]
             mocked_get.return_value = mock_json_response(
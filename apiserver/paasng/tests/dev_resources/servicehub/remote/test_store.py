@@ -25,6 +25,7 @@ import pytest
 from paasng.dev_resources.servicehub.constants import Category
 from paasng.dev_resources.servicehub.remote import collector
 from paasng.dev_resources.servicehub.remote.exceptions import ServiceConfigNotFound, ServiceNotFound
+from paasng.dev_resources.servicehub.remote.store import RemoteServiceStore
 from tests.dev_resources.servicehub import data_mocks
 from tests.utils.api import mock_json_response
 
@@ -36,7 +37,7 @@ class TestRemoteStore:
     @pytest.fixture(autouse=True)
     def setup_data(self, config, raw_store):
         meta_info = {'version': None}
-        with mock.patch('requests.get') as mocked_get:
+        with mock.patch('requests.Session.get') as mocked_get:
             # Mock requests response
             mocked_get.return_value = mock_json_response(data_mocks.OBJ_STORE_REMOTE_SERVICES_JSON)
             fetcher = collector.RemoteSvcFetcher(config)
@@ -111,6 +112,22 @@ class TestRemoteStore:
         with pytest.raises(ServiceConfigNotFound):
             store.get_source_config(uuid)
 
+    def test_snapshot_reused(self, raw_store):
+        raw_store.all()
+        with mock.patch.object(raw_store, "_load_services") as load_services:
+            assert len(raw_store.filter("r1")) == 2
+            assert len(raw_store.filter("r1", conditions={"category": Category.DATA_STORAGE})) == 1
+            assert not load_services.called
+
+    def test_snapshot_reloaded_after_upsert(self, raw_store, config):
+        uuid = data_mocks.OBJ_STORE_REMOTE_SERVICES_JSON[0]["uuid"]
+        assert raw_store.get(uuid, "r1")["_meta_info"] == {'version': None}
+
+        # Update the services by another store object, acts as another process
+        another_store = RemoteServiceStore()
+        another_store.bulk_upsert(deepcopy(another_store.all()), {'version': '0.2.0'}, config)
+        assert raw_store.get(uuid, "r1")["_meta_info"] == {'version': '0.2.0'}
+
     def test_bulk_update_conflict(self, store, config):
         config_json = config.to_json()
         meta_info = {'version': None}
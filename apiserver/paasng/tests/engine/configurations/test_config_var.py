@@ -17,14 +17,22 @@ We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
 import io
+import time
 from textwrap import dedent
+from unittest import mock
 
 import pytest
 from blue_krill.contextlib import nullcontext as does_not_raise
 from django.conf import settings
 
-from paasng.engine.configurations.config_var import get_builtin_env_variables, get_env_variables
+from paasng.engine.configurations.config_var import (
+    EnvVarsAssembler,
+    EnvVarsSource,
+    get_builtin_env_variables,
+    get_env_variables,
+)
 from paasng.engine.constants import AppRunTimeBuiltinEnv
+from paasng.engine.exceptions import EnvVarsSourceTimeout
 from paasng.engine.models.config_var import ConfigVar
 from paasng.extensions.declarative.exceptions import DescriptionValidationError
 from paasng.extensions.declarative.handlers import AppDescriptionHandler
@@ -45,6 +53,14 @@ class TestGetEnvVariables:
         env_vars = get_env_variables(bk_stag_env)
         assert env_vars['FOO'] == 'bar'
 
+    def test_write_timings_to_stream(self, bk_stag_env):
+        stream = mock.MagicMock()
+        get_env_variables(bk_stag_env, stream=stream)
+
+        message = stream.write_message.call_args[0][0]
+        assert 'config_vars' in message
+        assert 'services' in message
+
     def test_builtin_id_and_secret(self, bk_app, bk_stag_env):
         env_vars = get_env_variables(bk_stag_env)
         assert env_vars['BKPAAS_APP_ID'] == bk_app.code
@@ -159,3 +175,70 @@ class TestBuiltInEnvVars:
         # 运行时相关的环境变量
         runtime_env_keys = [f'{settings.CONFIGVAR_SYSTEM_PREFIX}{key}' for key in AppRunTimeBuiltinEnv.get_values()]
         assert set(runtime_env_keys).issubset(config_vars.keys())
+
+
+def sleep_and_return(seconds: float, value: dict):
+    def _getter():
+        time.sleep(seconds)
+        return value
+
+    return _getter
+
+
+class TestEnvVarsAssembler:
+    @pytest.mark.parametrize("concurrency", [1, 4])
+    def test_merge_in_order(self, concurrency):
+        sources = [
+            EnvVarsSource('low', sleep_and_return(0.2, {'FOO': 'low', 'BAR': 'low'})),
+            EnvVarsSource('high', lambda: {'FOO': 'high'}),
+        ]
+        env_vars = EnvVarsAssembler(sources, concurrency=concurrency).assemble()
+        assert env_vars == {'FOO': 'high', 'BAR': 'low'}
+
+    def test_fetch_concurrently(self):
+        sources = [EnvVarsSource(f'source-{i}', sleep_and_return(0.3, {f'KEY_{i}': str(i)})) for i in range(3)]
+        assembler = EnvVarsAssembler(sources, concurrency=3)
+
+        started_at = time.perf_counter()
+        env_vars = assembler.assemble()
+        assert time.perf_counter() - started_at < 0.6
+        assert env_vars == {'KEY_0': '0', 'KEY_1': '1', 'KEY_2': '2'}
+        assert [t.name for t in assembler.timings] == ['source-0', 'source-1', 'source-2']
+        assert all(t.status == 'ok' and t.elapsed >= 0.3 for t in assembler.timings)
+
+    def test_timeout(self):
+        sources = [
+            EnvVarsSource('fast', lambda: {'FOO': 'bar'}),
+            EnvVarsSource('slow', sleep_and_return(1, {}), timeout=0.1),
+        ]
+        assembler = EnvVarsAssembler(sources, concurrency=2, timeout=5)
+
+        started_at = time.perf_counter()
+        with pytest.raises(EnvVarsSourceTimeout) as exc_info:
+            assembler.assemble()
+        assert time.perf_counter() - started_at < 0.5
+        assert exc_info.value.source_name == 'slow'
+        assert assembler.has_failures
+        assert 'slow: 0.1' in assembler.format_timings()
+        assert '(timeout)' in assembler.format_timings()
+
+    def test_timeout_excludes_queued_time(self):
+        # The last source waits ~0.3s for a free worker, then runs 0.3s: it's finished 0.6s after the
+        # assembly starts but only 0.3s after itself starts
+        sources = [EnvVarsSource(f'source-{i}', sleep_and_return(0.3, {f'KEY_{i}': str(i)})) for i in range(3)]
+        assembler = EnvVarsAssembler(sources, concurrency=2, timeout=0.5)
+
+        env_vars = assembler.assemble()
+        assert env_vars == {'KEY_0': '0', 'KEY_1': '1', 'KEY_2': '2'}
+        assert not assembler.has_failures
+
+    @pytest.mark.parametrize("concurrency", [1, 2])
+    def test_error(self, concurrency):
+        def _raise():
+            raise ValueError('broken')
+
+        sources = [EnvVarsSource('fine', lambda: {}), EnvVarsSource('broken', _raise)]
+        assembler = EnvVarsAssembler(sources, concurrency=concurrency)
+        with pytest.raises(ValueError):
+            assembler.assemble()
+        assert [(t.name, t.status) for t in assembler.timings] == [('fine', 'ok'), ('broken', 'error')]
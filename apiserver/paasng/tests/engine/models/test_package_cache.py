@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+from unittest import mock
+
+import pytest
+from blue_krill.storages.blobstore.bkrepo import RequestError
+from botocore.exceptions import ClientError
+
+from paasng.engine.models import SourcePackageCache
+
+pytestmark = pytest.mark.django_db
+
+
+class TestSourcePackageCache:
+    def test_record_and_get(self, bk_module):
+        SourcePackageCache.objects.record(bk_module, 'key-1', 'v1', 'path/tar', sha256='abc', size=10)
+
+        with mock.patch('paasng.engine.models.package_cache.make_blob_store') as mocked_store:
+            cache = SourcePackageCache.objects.get_valid('key-1')
+            assert cache is not None
+            assert cache.storage_path == 'path/tar'
+            assert mocked_store().get_file_metadata.call_args[0][0] == 'path/tar'
+
+            assert SourcePackageCache.objects.get_valid('key-2') is None
+
+    @pytest.mark.parametrize(
+        'error',
+        [
+            ClientError({'Error': {'Code': 'NoSuchKey'}}, 'GetObject'),
+            ClientError({'Error': {'Code': '404'}}, 'HeadObject'),
+            RequestError("Can't get file head info", code='404'),
+        ],
+    )
+    def test_package_missing(self, bk_module, error):
+        SourcePackageCache.objects.record(bk_module, 'key-1', 'v1', 'path/tar', sha256='abc', size=10)
+
+        with mock.patch('paasng.engine.models.package_cache.make_blob_store') as mocked_store:
+            mocked_store().get_file_metadata.side_effect = error
+            assert SourcePackageCache.objects.get_valid('key-1') is None
+        assert not SourcePackageCache.objects.filter(cache_key='key-1').exists()
+
+    @pytest.mark.parametrize(
+        'error',
+        [
+            ClientError({'Error': {'Code': 'SlowDown'}}, 'GetObject'),
+            RequestError("Can't get file head info", code='503'),
+            ConnectionError('connection refused'),
+        ],
+    )
+    def test_blobstore_unavailable(self, bk_module, error):
+        SourcePackageCache.objects.record(bk_module, 'key-1', 'v1', 'path/tar', sha256='abc', size=10)
+
+        with mock.patch('paasng.engine.models.package_cache.make_blob_store') as mocked_store:
+            mocked_store().get_file_metadata.side_effect = error
+            assert SourcePackageCache.objects.get_valid('key-1') is None
+        # The cache is kept because the package may still exist
+        assert SourcePackageCache.objects.filter(cache_key='key-1').exists()
+
+    def test_package_overwritten(self, bk_module):
+        SourcePackageCache.objects.record(bk_module, 'key-1', 'v1', 'path/tar', sha256='abc', size=10)
+        # The same path was uploaded with different inputs
+        SourcePackageCache.objects.record(bk_module, 'key-2', 'v1', 'path/tar', sha256='def', size=12)
+
+        assert list(SourcePackageCache.objects.values_list('cache_key', flat=True)) == ['key-2']
@@ -20,7 +20,7 @@ from unittest import mock
 
 import pytest
 
-from paasng.engine.utils.output import ConsoleStream, ModelStream, RedisWithModelStream
+from paasng.engine.utils.output import BufferedRedisWithModelStream, ConsoleStream, ModelStream, RedisWithModelStream
 
 pytestmark = pytest.mark.django_db(databases=['default', 'workloads'])
 
@@ -67,3 +67,67 @@ class TestMixStream:
     def test_write_title(self, build_proc):
         RedisWithModelStream(build_proc, mock.MagicMock()).write_title("title")
         assert build_proc.output_stream.lines.count() == 0, "title should not be saved"
+
+
+class FakeChannel:
+    """A fake stream channel which pushes messages to redis list"""
+
+    def __init__(self, redis_db):
+        self.redis_db = redis_db
+
+    def publish(self, event, data):
+        self.redis_db.rpush("events", event)
+
+    def publish_msg(self, message):
+        self.redis_db.rpush("messages", message)
+
+    def close(self):
+        pass
+
+
+class TestBufferedStream:
+    @pytest.fixture
+    def redis_db(self):
+        return mock.MagicMock()
+
+    @pytest.fixture
+    def stream(self, build_proc, redis_db):
+        stream = BufferedRedisWithModelStream(build_proc, FakeChannel(redis_db), max_lines=3, flush_interval=60)
+        yield stream
+        stream.flush()
+
+    def test_buffered(self, build_proc, stream, redis_db):
+        stream.write_message("foo")
+        stream.write_message("bar")
+        assert build_proc.output_stream.lines.count() == 0
+        assert not redis_db.pipeline.called
+
+    def test_flush_when_full(self, build_proc, stream, redis_db):
+        for i in range(4):
+            stream.write_message(f"line {i}")
+        assert list(build_proc.output_stream.lines.order_by("created", "id").values_list("line", flat=True)) == [
+            "line 0\n",
+            "line 1\n",
+            "line 2\n",
+        ]
+        pipe = redis_db.pipeline.return_value
+        assert pipe.rpush.call_count == 3
+        assert pipe.execute.call_count == 1
+
+    def test_flush_before_title(self, build_proc, stream, redis_db):
+        stream.write_message("foo")
+        stream.write_title("title")
+        assert build_proc.output_stream.lines.count() == 1
+        # Messages should be published before the title
+        assert redis_db.pipeline.return_value.rpush.called
+        redis_db.rpush.assert_called_once_with("events", "title")
+
+    def test_flush_by_interval(self, build_proc, redis_db):
+        stream = BufferedRedisWithModelStream(build_proc, FakeChannel(redis_db), max_lines=100, flush_interval=0.01)
+        # The flusher thread does not share the database transaction of current test, mock the model stream
+        stream.model_stream = mock.MagicMock()
+        with mock.patch("paasng.engine.utils.output.connection"):
+            stream.write_message("foo")
+            stream._flusher_stopped.wait(0.2)
+            stream.flush()
+        stream.model_stream.write_messages.assert_called_once_with([("foo", "STDOUT")])
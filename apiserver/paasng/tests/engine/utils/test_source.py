@@ -29,7 +29,7 @@ from django_dynamic_fixture import G
 
 from paasng.dev_resources.sourcectl.exceptions import DoesNotExistsOnServer
 from paasng.dev_resources.sourcectl.models import SourcePackage
-from paasng.dev_resources.sourcectl.utils import generate_temp_dir, generate_temp_file
+from paasng.dev_resources.sourcectl.utils import DockerIgnore, generate_temp_dir, generate_temp_file
 from paasng.engine.exceptions import DeployShouldAbortError
 from paasng.engine.models import Deployment
 from paasng.engine.utils.output import ConsoleStream
@@ -39,6 +39,7 @@ from paasng.engine.utils.source import (
     download_source_to_dir,
     get_app_description_handler,
     get_processes,
+    get_source_package_cache_key,
     get_source_package_path,
 )
 from paasng.extensions.declarative.constants import CELERY_BEAT_PROCESS, CELERY_PROCESS, WEB_PROCESS
@@ -405,3 +406,48 @@ class TestCheckSourcePackage:
 
             out, err = capsys.readouterr()
             assert out
+
+
+class TestGetSourcePackageCacheKey:
+    @pytest.fixture
+    def make_deployment(self, bk_module):
+        bk_module.source_origin = SourceOrigin.AUTHORIZED_VCS
+        bk_module.save()
+
+        def _make(env: str = 'stag', revision: str = '6f3bfa8adf8be3') -> Deployment:
+            return Deployment.objects.create(
+                region=bk_module.region,
+                operator=bk_module.owner,
+                app_environment=bk_module.get_envs(env),
+                source_type=bk_module.source_type,
+                source_location='http://git.bking.com/node-spa-demo.git',
+                source_revision=revision,
+                source_version_type='branch',
+                source_version_name='dev',
+                advanced_options={},
+            )
+
+        return _make
+
+    def test_same_revision_across_envs(self, make_deployment):
+        stag_key = get_source_package_cache_key(make_deployment('stag'), pathlib.Path('.'))
+        prod_key = get_source_package_cache_key(make_deployment('prod'), pathlib.Path('.'))
+        assert stag_key
+        assert stag_key == prod_key
+
+    def test_inputs_changed(self, make_deployment):
+        key = get_source_package_cache_key(make_deployment(), pathlib.Path('.'))
+        assert key != get_source_package_cache_key(make_deployment(revision='a1b2c3'), pathlib.Path('.'))
+        assert key != get_source_package_cache_key(make_deployment(), pathlib.Path('backend'))
+        assert key != get_source_package_cache_key(make_deployment(), pathlib.Path('.'), DockerIgnore('*.pyc'))
+
+    def test_not_cacheable(self, bk_module, make_deployment):
+        assert get_source_package_cache_key(make_deployment(revision=''), pathlib.Path('.')) is None
+
+        bk_module.source_origin = SourceOrigin.BK_LESS_CODE
+        bk_module.save()
+        assert get_source_package_cache_key(make_deployment(), pathlib.Path('.')) is None
+
+    def test_disabled(self, settings, make_deployment):
+        settings.ENGINE_SOURCE_PACKAGE_CACHE_ENABLED = False
+        assert get_source_package_cache_key(make_deployment(), pathlib.Path('.')) is None
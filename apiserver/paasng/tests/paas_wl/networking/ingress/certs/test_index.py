@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+import pytest
+from django.db import connections
+
+from paas_wl.networking.ingress.certs.index import SharedCertIndex, shared_cert_indexes
+from paas_wl.networking.ingress.certs.utils import pick_shared_cert
+from paas_wl.networking.ingress.models import AppDomainSharedCert
+
+pytestmark = pytest.mark.django_db(databases=["workloads"])
+
+
+class TestSharedCertIndex:
+    @pytest.fixture
+    def certs(self):
+        return [
+            AppDomainSharedCert(name='foo', auto_match_cns='*.foo.com;bar.com'),
+            AppDomainSharedCert(name='bar', auto_match_cns='*.bar.com;*.*.bar.com'),
+            AppDomainSharedCert(name='baz', auto_match_cns='app-*.baz.com'),
+            AppDomainSharedCert(name='foo-2', auto_match_cns='a.foo.com'),
+        ]
+
+    @pytest.mark.parametrize(
+        'hostname,expected',
+        [
+            ('bar.com', 'foo'),
+            ('a.foo.com', 'foo'),
+            ('foo.com', None),
+            ('foobar.com', None),
+            ('a.b.foo.com', None),
+            ('*.foo.com', None),
+            ('a_b.foo.com', None),
+            ('a.bar.com', 'bar'),
+            ('a.b.bar.com', 'bar'),
+            ('a.b.c.bar.com', None),
+            ('app-1.baz.com', 'baz'),
+            ('app.baz.com', None),
+        ],
+    )
+    def test_match(self, certs, hostname, expected):
+        cert = SharedCertIndex(certs).match(hostname)
+        assert (cert.name if cert else None) == expected
+        # The result must be the same as scanning the certs one by one
+        matched = [c for c in certs if c.match_hostname(hostname)]
+        assert (matched[0].name if matched else None) == expected
+
+    def test_first_cert_wins(self):
+        certs = [
+            AppDomainSharedCert(name='partial', auto_match_cns='a-*.foo.com'),
+            AppDomainSharedCert(name='wildcard', auto_match_cns='*.foo.com'),
+        ]
+        assert SharedCertIndex(certs).match('a-1.foo.com').name == 'partial'
+        assert SharedCertIndex(certs[::-1]).match('a-1.foo.com').name == 'wildcard'
+
+
+class TestPickSharedCert:
+    def test_invalidated_after_saving(self, django_capture_on_commit_callbacks):
+        region = 'test-region'
+        assert pick_shared_cert(region, 'a.foo.com') is None
+
+        with django_capture_on_commit_callbacks(using='workloads', execute=True):
+            cert = AppDomainSharedCert.objects.create(name='foo', region=region, auto_match_cns='*.foo.com')
+        assert pick_shared_cert(region, 'a.foo.com') == cert
+
+        with django_capture_on_commit_callbacks(using='workloads', execute=True):
+            cert.auto_match_cns = 'bar.com'
+            cert.save()
+        assert pick_shared_cert(region, 'a.foo.com') is None
+        assert pick_shared_cert(region, 'bar.com') == cert
+
+        with django_capture_on_commit_callbacks(using='workloads', execute=True):
+            cert.delete()
+        assert pick_shared_cert(region, 'bar.com') is None
+
+    def test_invalidated_after_commit(self, django_capture_on_commit_callbacks):
+        region = 'test-region'
+        assert pick_shared_cert(region, 'a.foo.com') is None
+
+        with django_capture_on_commit_callbacks(using='workloads') as callbacks:
+            AppDomainSharedCert.objects.create(name='foo', region=region, auto_match_cns='*.foo.com')
+            # The cached indexes are kept until the transaction is committed
+            assert pick_shared_cert(region, 'a.foo.com') is None
+        assert len(callbacks) == 1
+
+        callbacks[0]()
+        assert pick_shared_cert(region, 'a.foo.com') is not None
+
+    def test_cached(self, django_assert_num_queries):
+        region = 'test-region'
+        AppDomainSharedCert.objects.create(name='foo', region=region, auto_match_cns='*.foo.com')
+        shared_cert_indexes.get(region)
+        with django_assert_num_queries(0, connection=connections['workloads']):
+            for _ in range(3):
+                assert pick_shared_cert(region, 'a.foo.com') is not None
@@ -26,6 +26,7 @@ from kubernetes.dynamic.resource import ResourceInstance
 from paas_wl.cluster.constants import ClusterFeatureFlag
 from paas_wl.cluster.utils import get_cluster_by_app
 from paas_wl.networking.ingress.entities.ingress import (
+    ANNOT_DESIRED_STATE_HASH,
     ConfigurationSnippetPatcher,
     IngressV1Beta1Deserializer,
     IngressV1Beta1Serializer,
@@ -34,6 +35,7 @@ from paas_wl.networking.ingress.entities.ingress import (
     PIngressDomain,
     ProcessIngress,
     ingress_kmodel,
+    make_desired_state_hash,
 )
 from paas_wl.networking.ingress.entities.service import ProcessService, PServicePortPair, service_kmodel
 from paas_wl.networking.ingress.entities.utils import NginxRegexRewrittenProvider
@@ -109,6 +111,27 @@ class TestProcessIngress:
         assert item.domains[1].primary_prefix_path == '/foo/'
         assert item.domains[1].path_prefix_list == ['/foo/', '/extra_bar/']
 
+    @pytest.mark.auto_create_ns
+    def test_sync_skip_unchanged(self, bk_stag_wl_app, service):
+        ingress = ProcessIngress(
+            app=bk_stag_wl_app,
+            name='sync-service',
+            domains=[PIngressDomain(host='foo.com')],
+            service_name=service.name,
+            service_port_name=service.ports[0].name,
+            rewrite_to_root=True,
+        )
+        assert ingress_kmodel.sync(ingress) is True
+
+        item = ingress_kmodel.get(bk_stag_wl_app, 'sync-service')
+        assert ANNOT_DESIRED_STATE_HASH in item._kube_data.metadata.annotations
+        assert ANNOT_DESIRED_STATE_HASH not in item.annotations
+        assert ingress_kmodel.sync(item) is False
+
+        item.domains = [PIngressDomain(host='bar.com')]
+        assert ingress_kmodel.sync(item) is True
+        assert ingress_kmodel.get(bk_stag_wl_app, 'sync-service').domains[0].host == 'bar.com'
+
     def test_serializer_ordering(self, bk_stag_wl_app):
         serializer = ingress_kmodel._make_serializer(bk_stag_wl_app)
         available_apiversions = serializer.gvk_config.available_apiversions
@@ -608,3 +631,23 @@ class TestPatternCompatible:
             bk_stag_wl_app, ResourceInstance(None, request.getfixturevalue(spec_fixture))
         )
         assert result == subpath_ingress
+
+
+def test_make_desired_state_hash():
+    body = {'metadata': {'name': 'foo', 'annotations': {'foo': 'bar'}}, 'spec': {'rules': []}}
+    digest = make_desired_state_hash(body)
+
+    body_with_meta = {
+        'metadata': {
+            'name': 'foo',
+            'resourceVersion': '1',
+            'annotations': {'foo': 'bar', ANNOT_DESIRED_STATE_HASH: 'x'},
+        },
+        'spec': {'rules': []},
+    }
+    assert make_desired_state_hash(body_with_meta) == digest
+    # The body should not be modified
+    assert body_with_meta['metadata']['resourceVersion'] == '1'
+
+    body['metadata']['annotations']['foo'] = 'baz'
+    assert make_desired_state_hash(body) != digest
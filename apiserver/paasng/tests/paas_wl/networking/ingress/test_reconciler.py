@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+import threading
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+
+from paas_wl.networking.ingress.reconciler import BulkReconciler, RateLimiter, ReconcileCheckpoint
+
+
+@pytest.fixture(autouse=True)
+def checkpoint_cache():
+    """Use a separated cache backend to avoid polluting other tests"""
+    checkpoint_cache = LocMemCache('test-ingress-reconciler', {})
+    checkpoint_cache.clear()
+    with mock.patch('paas_wl.networking.ingress.reconciler.cache', new=checkpoint_cache):
+        yield checkpoint_cache
+
+
+@pytest.fixture(autouse=True)
+def _mock_get_cluster():
+    """The cluster of fake app "<cluster>-<n>" is "<cluster>" """
+    with mock.patch(
+        'paas_wl.networking.ingress.reconciler.get_cluster_by_app',
+        side_effect=lambda app: SimpleNamespace(name=app.name.split('-')[0]),
+    ):
+        yield
+
+
+def make_apps(cluster_name: str, count: int):
+    return [SimpleNamespace(name=f'{cluster_name}-{i}') for i in range(count)]
+
+
+class TestBulkReconciler:
+    def test_normal(self):
+        apps = make_apps('foo', 5) + make_apps('bar', 3)
+        handled = []
+        report = BulkReconciler(handled.append, rate_limit=0).run(apps)
+
+        assert sorted(app.name for app in handled) == sorted(app.name for app in apps)
+        assert report.total == 8
+        assert report.succeeded == 8
+        assert report.failed == 0
+
+    def test_failures(self):
+        def handler(app):
+            if app.name == 'foo-1':
+                raise ValueError('something wrong')
+
+        report = BulkReconciler(handler, rate_limit=0).run(make_apps('foo', 3))
+        assert report.succeeded == 2
+        assert report.failures == {'foo-1': 'something wrong'}
+
+    def test_concurrency_per_cluster(self):
+        lock = threading.Lock()
+        running = defaultdict(int)
+        max_running = defaultdict(int)
+
+        def handler(app):
+            cluster_name = app.name.split('-')[0]
+            with lock:
+                running[cluster_name] += 1
+                max_running[cluster_name] = max(max_running[cluster_name], running[cluster_name])
+            time.sleep(0.02)
+            with lock:
+                running[cluster_name] -= 1
+
+        BulkReconciler(handler, concurrency=2, rate_limit=0).run(make_apps('foo', 6) + make_apps('bar', 6))
+        assert max_running == {'foo': 2, 'bar': 2}
+
+    def test_resume_from_checkpoint(self):
+        apps = make_apps('foo', 4)
+
+        def failing_handler(app):
+            if app.name in ('foo-2', 'foo-3'):
+                raise ValueError('something wrong')
+
+        report = BulkReconciler(failing_handler, checkpoint=ReconcileCheckpoint('test'), rate_limit=0).run(apps)
+        assert report.failed == 2
+
+        handled = []
+        # A new checkpoint object acts as another run, the finished apps should be skipped
+        report = BulkReconciler(handled.append, checkpoint=ReconcileCheckpoint('test'), rate_limit=0).run(apps)
+        assert sorted(app.name for app in handled) == ['foo-2', 'foo-3']
+        assert report.skipped == 2
+        assert report.succeeded == 2
+
+    def test_checkpoint_clear(self):
+        checkpoint = ReconcileCheckpoint('test')
+        BulkReconciler(lambda app: None, checkpoint=checkpoint, rate_limit=0).run(make_apps('foo', 2))
+        checkpoint.clear()
+
+        handled = []
+        BulkReconciler(handled.append, checkpoint=ReconcileCheckpoint('test'), rate_limit=0).run(make_apps('foo', 2))
+        assert len(handled) == 2
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(rate=50)
+    started_at = time.perf_counter()
+    for _ in range(6):
+        limiter.acquire()
+    # The first call is not blocked, the others are spread by 0.02 seconds
+    assert time.perf_counter() - started_at >= 0.09
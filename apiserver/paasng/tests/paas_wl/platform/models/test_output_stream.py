@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+from unittest import mock
+
+import pytest
+
+from paas_wl.platform.applications.constants import OutputStreamStorage
+from paas_wl.platform.applications.models import OutputStream, OutputStreamChunk
+
+pytestmark = pytest.mark.django_db(databases=["workloads"])
+
+
+@pytest.fixture(params=[OutputStreamStorage.LINES, OutputStreamStorage.CHUNKS])
+def output_stream(request) -> OutputStream:
+    stream = OutputStream.objects.create(storage=request.param)
+    stream.write('foo')
+    stream.bulk_write([(f'line-{i}', 'STDOUT') for i in range(10)])
+    stream.write('bar', stream='STDERR')
+    return stream
+
+
+class TestOutputStream:
+    def test_iter_lines(self, output_stream):
+        lines = list(output_stream.iter_lines())
+        assert len(lines) == 12
+        assert lines[0].line == 'foo\n'
+        assert lines[-1].line == 'bar\n'
+        assert lines[-1].stream == 'STDERR'
+
+    @pytest.mark.parametrize(
+        'start,limit,expected',
+        [
+            (0, 2, ['foo\n', 'line-0\n']),
+            (3, 3, ['line-2\n', 'line-3\n', 'line-4\n']),
+            (10, None, ['line-9\n', 'bar\n']),
+            (12, None, []),
+            (5, 0, []),
+        ],
+    )
+    def test_iter_lines_paging(self, output_stream, start, limit, expected):
+        assert [obj.line for obj in output_stream.iter_lines(start, limit)] == expected
+
+    def test_count_and_tail(self, output_stream):
+        assert output_stream.count_lines() == 12
+        assert [obj.line for obj in output_stream.tail_lines(2)] == ['line-9\n', 'bar\n']
+        assert len(output_stream.tail_lines(100)) == 12
+
+    @pytest.mark.parametrize(
+        'offset,expected',
+        [
+            (0, 0),
+            # "foo\n" takes 4 bytes
+            (3, 0),
+            (4, 1),
+            # "line-0\n" takes 7 bytes
+            (11, 2),
+            (1000, 12),
+        ],
+    )
+    def test_get_line_number(self, output_stream, offset, expected):
+        assert output_stream.get_line_number(offset) == expected
+
+
+class TestOutputStreamChunk:
+    def test_chunks_index(self):
+        stream = OutputStream.objects.create(storage=OutputStreamStorage.CHUNKS)
+        stream.write('foo')
+        stream.flush()
+        stream.bulk_write([('bar', 'STDOUT'), ('baz', 'STDOUT')])
+
+        chunks = list(OutputStreamChunk.objects.filter(output_stream=stream).order_by('seq'))
+        assert [(c.seq, c.start_line, c.line_count, c.start_offset, c.size) for c in chunks] == [
+            (0, 0, 1, 0, 4),
+            (1, 1, 2, 4, 8),
+        ]
+        assert stream.lines.count() == 0
+
+    def test_write_buffered(self):
+        stream = OutputStream.objects.create(storage=OutputStreamStorage.CHUNKS)
+        for i in range(3):
+            stream.write(f'line-{i}')
+        assert stream.chunks.count() == 0
+
+        # The buffered lines are saved before the lines of bulk write, in one chunk
+        stream.bulk_write([('line-3', 'STDOUT')])
+        assert [(c.start_line, c.line_count) for c in stream.chunks.order_by('seq')] == [(0, 4)]
+
+        stream.write('line-4')
+        # Reading flushes the buffered lines
+        assert [obj.line for obj in stream.iter_lines(3)] == ['line-3\n', 'line-4\n']
+        assert stream.chunks.count() == 2
+
+    def test_write_flushed_by_size(self):
+        stream = OutputStream.objects.create(storage=OutputStreamStorage.CHUNKS)
+        with mock.patch('paas_wl.platform.applications.models.misc.OUTPUT_STREAM_WRITE_BUFFER_MAX_LINES', 2):
+            for i in range(5):
+                stream.write(f'line-{i}')
+        assert [c.line_count for c in stream.chunks.order_by('seq')] == [2, 2]
+
+    def test_write_flushed_by_interval(self):
+        stream = OutputStream.objects.create(storage=OutputStreamStorage.CHUNKS)
+        with mock.patch('paas_wl.platform.applications.models.misc.time.monotonic', side_effect=[0, 0, 0.5, 5]):
+            for i in range(3):
+                stream.write(f'line-{i}')
+        assert [c.line_count for c in stream.chunks.order_by('seq')] == [3]
+
+    def test_large_batch_split(self):
+        stream = OutputStream.objects.create(storage=OutputStreamStorage.CHUNKS)
+        stream.bulk_write([(f'line-{i}', 'STDOUT') for i in range(2500)])
+
+        assert stream.chunks.count() == 3
+        assert stream.count_lines() == 2500
+        assert [obj.line for obj in stream.iter_lines(1999, 2)] == ['line-1999\n', 'line-2000\n']
+
+    def test_default_storage(self, settings):
+        settings.OUTPUT_STREAM_STORAGE = OutputStreamStorage.CHUNKS.value
+        assert OutputStream.objects.create().storage == OutputStreamStorage.CHUNKS
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+import threading
+from unittest import mock
+
+import pytest
+
+from paas_wl.cluster.models import Cluster
+from paas_wl.resources.base.base import ClusterClientRegistry, EnhancedApiClient, client_registry
+from paas_wl.resources.base.kube_client import get_discoverer_cache
+from tests.conftest import CLUSTER_NAME_FOR_TESTING
+
+pytestmark = pytest.mark.django_db(databases=["default", "workloads"])
+
+
+class TestClusterClientRegistry:
+    def test_client_shared(self):
+        registry = ClusterClientRegistry()
+        client = registry.get_client(CLUSTER_NAME_FOR_TESTING)
+        assert isinstance(client, EnhancedApiClient)
+        assert registry.get_client(CLUSTER_NAME_FOR_TESTING) is client
+
+    def test_cluster_not_found(self):
+        with pytest.raises(KeyError):
+            ClusterClientRegistry().get_client('invalid-cluster')
+
+    def test_rest_client_shared(self):
+        registry = ClusterClientRegistry()
+        client = registry.get_client(CLUSTER_NAME_FOR_TESTING)
+        rest_client = registry.get_rest_client(CLUSTER_NAME_FOR_TESTING, client.configuration)
+        assert registry.get_rest_client(CLUSTER_NAME_FOR_TESTING, client.configuration) is rest_client
+        assert registry.list_rest_clients() == [(CLUSTER_NAME_FOR_TESTING, client.configuration, rest_client)]
+
+    def test_invalidate(self):
+        registry = ClusterClientRegistry()
+        client = registry.get_client(CLUSTER_NAME_FOR_TESTING)
+        registry.invalidate()
+        assert registry.get_client(CLUSTER_NAME_FOR_TESTING) is not client
+
+    def test_invalidated_by_other_process(self):
+        registry = ClusterClientRegistry(check_interval=0)
+        client = registry.get_client(CLUSTER_NAME_FOR_TESTING)
+        assert registry.get_client(CLUSTER_NAME_FOR_TESTING) is client
+
+        # Simulate the invalidation from another process, only the generation in cache was updated
+        with mock.patch.object(ClusterClientRegistry, '_reset'):
+            ClusterClientRegistry().invalidate()
+        assert registry.get_client(CLUSTER_NAME_FOR_TESTING) is not client
+
+    def test_invalidated_by_cluster_changes(self):
+        client = client_registry.get_client(CLUSTER_NAME_FOR_TESTING)
+        Cluster.objects.get(name=CLUSTER_NAME_FOR_TESTING).save()
+        assert client_registry.get_client(CLUSTER_NAME_FOR_TESTING) is not client
+
+    def test_rotate_cluster_config(self):
+        client = client_registry.get_client(CLUSTER_NAME_FOR_TESTING)
+        with mock.patch.object(get_discoverer_cache(), 'invalidate_all') as mocked_invalidate_all:
+            cluster = Cluster.objects.get(name=CLUSTER_NAME_FOR_TESTING)
+            cluster.token_value = 'rotated-token'
+            cluster.save()
+
+            new_client = client_registry.get_client(CLUSTER_NAME_FOR_TESTING)
+            assert new_client is not client
+            assert new_client.configuration.api_key['authorization'] == 'Bearer rotated-token'
+            # The discovery data cached for the old configuration must not be used any more
+            assert mocked_invalidate_all.called
+
+
+class TestEnhancedApiClient:
+    def test_configuration_thread_local(self):
+        client = ClusterClientRegistry().get_client(CLUSTER_NAME_FOR_TESTING)
+        default_configuration = client.configuration
+        client.configuration = mock.MagicMock()
+
+        configurations = []
+        t = threading.Thread(target=lambda: configurations.append(client.configuration))
+        t.start()
+        t.join()
+        assert configurations == [default_configuration]
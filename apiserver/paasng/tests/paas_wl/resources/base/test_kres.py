@@ -227,7 +227,7 @@ class TestKNamespace:
         time_started = time.time()
         namespace = resource_name
         with pytest.raises(CreateServiceAccountTimeout), mock.patch.object(
-            KNamespace, "default_sa_exists", return_value=False
+            KNamespace, "_is_default_sa_ready", return_value=False
         ):
             assert cli.wait_for_default_sa(namespace, timeout=2, check_period=0.1)
 
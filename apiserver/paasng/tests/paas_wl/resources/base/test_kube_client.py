@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+import json
+import uuid
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from paas_wl.resources.base.kube_client import DiscovererCache
+
+DISCOVERY_RESPONSES = {
+    '/version': {'major': '1', 'minor': '20', 'gitVersion': 'v1.20.0'},
+    '/apis': {
+        'kind': 'APIGroupList',
+        'groups': [
+            {
+                'name': 'apps',
+                'versions': [{'groupVersion': 'apps/v1', 'version': 'v1'}],
+                'preferredVersion': {'groupVersion': 'apps/v1', 'version': 'v1'},
+            }
+        ],
+    },
+    '/api/v1': {
+        'kind': 'APIResourceList',
+        'groupVersion': 'v1',
+        'resources': [{'name': 'pods', 'singularName': '', 'namespaced': True, 'kind': 'Pod', 'verbs': ['get']}],
+    },
+    '/apis/apps/v1': {
+        'kind': 'APIResourceList',
+        'groupVersion': 'apps/v1',
+        'resources': [
+            {'name': 'deployments', 'singularName': '', 'namespaced': True, 'kind': 'Deployment', 'verbs': ['get']}
+        ],
+    },
+}
+
+
+class FakeApiClient:
+    """A fake api client which only answers the discovery requests"""
+
+    def __init__(self, cluster_name: str, host: str):
+        self.cluster_name = cluster_name
+        self.configuration = SimpleNamespace(host=host)
+        self.requested_paths = []
+
+    def call_api(self, path, method, *args, **kwargs):
+        self.requested_paths.append(path)
+        return SimpleNamespace(data=json.dumps(DISCOVERY_RESPONSES[path]).encode())
+
+    def select_header_accept(self, accepts):
+        return accepts[0]
+
+    def select_header_content_type(self, content_types):
+        return content_types[0]
+
+
+@pytest.fixture
+def host():
+    # Use an unique host to avoid reading the disk cache file written by other tests
+    return f'https://{uuid.uuid4().hex}:6443'
+
+
+@pytest.fixture
+def make_api_client(host):
+    def _make(cluster_name: str = 'foo-cluster', host: str = host):
+        return FakeApiClient(cluster_name, host)
+
+    return _make
+
+
+class TestDiscovererCache:
+    def test_shared_by_same_endpoint(self, make_api_client):
+        cache = DiscovererCache()
+        api_client = make_api_client()
+        cache.get(api_client).resources.get(kind='Deployment')
+        assert api_client.requested_paths
+
+        other_api_client = make_api_client()
+        dynamic_client = cache.get(other_api_client)
+        assert dynamic_client.resources.get(kind='Deployment')
+        assert dynamic_client.resources.get(kind='Pod')
+        assert other_api_client.requested_paths == []
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_bound_to_own_client(self, make_api_client):
+        cache = DiscovererCache()
+        cache.get(make_api_client()).resources.get(kind='Deployment')
+
+        api_client = make_api_client()
+        dynamic_client = cache.get(api_client)
+        assert dynamic_client.client is api_client
+        # The discovered resources must send requests by the caller's own client
+        assert dynamic_client.resources.get(kind='Deployment').client is dynamic_client
+
+    def test_different_endpoints(self, make_api_client, host):
+        cache = DiscovererCache()
+        cache.get(make_api_client())
+        cache.get(make_api_client(host=f'{host}0'))
+        cache.get(make_api_client(cluster_name='bar-cluster'))
+        assert cache.misses == 3
+
+    def test_no_cluster_name(self, make_api_client):
+        cache = DiscovererCache()
+        cache.get(make_api_client(cluster_name=''))
+        assert (cache.hits, cache.misses) == (0, 0)
+
+    def test_ttl(self, make_api_client):
+        cache = DiscovererCache(ttl=10)
+        with mock.patch('paas_wl.resources.base.kube_client.time.monotonic', return_value=100):
+            cache.get(make_api_client())
+        with mock.patch('paas_wl.resources.base.kube_client.time.monotonic', return_value=105):
+            api_client = make_api_client()
+            cache.get(api_client)
+            assert api_client.requested_paths == []
+        with mock.patch('paas_wl.resources.base.kube_client.time.monotonic', return_value=111):
+            api_client = make_api_client()
+            cache.get(api_client)
+            assert api_client.requested_paths
+
+    def test_invalidate(self, make_api_client):
+        cache = DiscovererCache()
+        stale_dynamic_client = cache.get(make_api_client())
+        cache.invalidate('foo-cluster')
+
+        # Updates made by the dynamic clients created before invalidation should be ignored
+        stale_dynamic_client.resources.get(kind='Deployment')
+
+        api_client = make_api_client()
+        cache.get(api_client)
+        assert api_client.requested_paths
+        assert (cache.hits, cache.misses) == (0, 2)
+
+    def test_invalidate_all(self, make_api_client):
+        cache = DiscovererCache()
+        cache.get(make_api_client())
+        cache.get(make_api_client(cluster_name='bar-cluster'))
+        cache.invalidate_all()
+
+        for cluster_name in ['foo-cluster', 'bar-cluster']:
+            api_client = make_api_client(cluster_name=cluster_name)
+            cache.get(api_client)
+            assert api_client.requested_paths
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+from kubernetes.client.rest import ApiException
+from urllib3.exceptions import ReadTimeoutError
+
+from paas_wl.resources.base.waiter import ResourceWaiter, WaitResourceTimeout
+
+
+def make_pod(phase: str) -> SimpleNamespace:
+    return SimpleNamespace(status=SimpleNamespace(phase=phase))
+
+
+def phase_is(phase: str):
+    return lambda obj: obj is not None and obj.status.phase == phase
+
+
+@pytest.fixture
+def waiter():
+    return ResourceWaiter(mock.MagicMock(), 'foo', namespace='default')
+
+
+class TestResourceWaiter:
+    def test_satisfied_by_list(self, waiter):
+        pod = make_pod('Succeeded')
+        with mock.patch.object(waiter, '_list', return_value=(pod, '1')), mock.patch.object(
+            waiter, '_watch'
+        ) as mocked_watch:
+            assert waiter.wait(phase_is('Succeeded'), timeout=1) is pod
+        assert not mocked_watch.called
+
+    def test_satisfied_by_event(self, waiter):
+        pod = make_pod('Succeeded')
+        events = [('MODIFIED', make_pod('Running')), ('MODIFIED', pod)]
+        with mock.patch.object(waiter, '_list', return_value=(make_pod('Pending'), '1')), mock.patch.object(
+            waiter, '_watch', return_value=iter(events)
+        ) as mocked_watch:
+            assert waiter.wait(phase_is('Succeeded'), timeout=1) is pod
+        mocked_watch.assert_called_once()
+        assert mocked_watch.call_args[0][0] == '1'
+
+    def test_deleted(self, waiter):
+        with mock.patch.object(waiter, '_list', return_value=(make_pod('Running'), '1')), mock.patch.object(
+            waiter, '_watch', return_value=iter([('DELETED', make_pod('Running'))])
+        ):
+            assert waiter.wait(lambda obj: obj is None, timeout=1) is None
+
+    @pytest.mark.parametrize(
+        'exc', [ApiException(status=410, reason='Gone'), ReadTimeoutError(None, '', 'read timed out')]
+    )
+    def test_relist_after_watch_ended(self, waiter, exc):
+        pod = make_pod('Succeeded')
+        with mock.patch.object(
+            waiter, '_list', side_effect=[(make_pod('Pending'), '1'), (pod, '5')]
+        ) as mocked_list, mock.patch.object(waiter, '_watch', side_effect=exc), mock.patch(
+            'paas_wl.resources.base.waiter.time.sleep'
+        ) as mocked_sleep:
+            assert waiter.wait(phase_is('Succeeded'), timeout=10) is pod
+        assert mocked_list.call_count == 2
+        mocked_sleep.assert_called_once_with(0.5)
+
+    def test_backoff(self, waiter):
+        pod = make_pod('Succeeded')
+        pending = (make_pod('Pending'), '1')
+        with mock.patch.object(
+            waiter, '_list', side_effect=[pending, pending, pending, (pod, '5')]
+        ), mock.patch.object(waiter, '_watch', side_effect=ReadTimeoutError(None, '', 'read timed out')), mock.patch(
+            'paas_wl.resources.base.waiter.time.sleep'
+        ) as mocked_sleep:
+            assert waiter.wait(phase_is('Succeeded')) is pod
+        assert [c[0][0] for c in mocked_sleep.call_args_list] == [0.5, 1, 2]
+
+    def test_backoff_bounded_by_deadline(self, waiter):
+        with mock.patch.object(waiter, '_list', return_value=(make_pod('Pending'), '1')), mock.patch.object(
+            waiter, '_watch', side_effect=ReadTimeoutError(None, '', 'read timed out')
+        ), pytest.raises(WaitResourceTimeout):
+            # The backoff(0.5s, 1s, ...) is cut to the remaining time, so the waiter gives up in time
+            waiter.wait(phase_is('Succeeded'), timeout=0.2)
+
+    def test_no_backoff_after_watch_timeout(self, waiter):
+        pod = make_pod('Succeeded')
+        with mock.patch.object(
+            waiter, '_list', side_effect=[(make_pod('Pending'), '1'), (pod, '5')]
+        ), mock.patch.object(waiter, '_watch', return_value=iter([])), mock.patch(
+            'paas_wl.resources.base.waiter.time.sleep'
+        ) as mocked_sleep:
+            assert waiter.wait(phase_is('Succeeded'), timeout=10) is pod
+        assert not mocked_sleep.called
+
+    def test_api_error(self, waiter):
+        with mock.patch.object(waiter, '_list', return_value=(make_pod('Pending'), '1')), mock.patch.object(
+            waiter, '_watch', side_effect=ApiException(status=403, reason='Forbidden')
+        ), pytest.raises(ApiException):
+            waiter.wait(phase_is('Succeeded'), timeout=1)
+
+    def test_timeout(self, waiter):
+        pod = make_pod('Pending')
+        with mock.patch.object(waiter, '_list', return_value=(pod, '1')), mock.patch.object(
+            waiter, '_watch', return_value=iter([])
+        ), pytest.raises(WaitResourceTimeout) as exc_info:
+            waiter.wait(phase_is('Succeeded'), timeout=0)
+        assert exc_info.value.last_obj is pod
+
+    def test_condition_error_propagated(self, waiter):
+        def _condition(obj):
+            raise ValueError('failed')
+
+        with mock.patch.object(waiter, '_list', return_value=(None, '1')), pytest.raises(ValueError):
+            waiter.wait(_condition, timeout=1)
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+import time
+import uuid
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Dict
+from unittest import mock
+
+import pytest
+from kubernetes.dynamic import ResourceField, ResourceInstance
+
+from paas_wl.resources.kube_res.base import ResourceList
+from paas_wl.resources.kube_res.exceptions import WatchKubeResourceError
+from paas_wl.workloads.processes.informers import (
+    EVENT_TYPE_ERROR,
+    InformerRegistry,
+    ResourceInformer,
+    Subscription,
+    _get_synced_informer,
+)
+
+pytestmark = pytest.mark.django_db(databases=["default", "workloads"])
+
+
+@dataclass
+class FakeEntity:
+    name: str
+    type: str
+    resource_version: str
+    _kube_data = None
+
+    def get_resource_version(self) -> str:
+        return self.resource_version
+
+
+def make_entity(name: str, type_: str, rv: str, labels: Dict) -> FakeEntity:
+    obj = FakeEntity(name=name, type=type_, resource_version=rv)
+    obj._kube_data = ResourceInstance(
+        None, {'kind': 'Deployment', 'metadata': {'name': name, 'resourceVersion': rv, 'labels': labels}}
+    )
+    return obj
+
+
+@pytest.fixture
+def informer(wl_app):
+    reader = mock.MagicMock()
+    reader.list_by_app_with_meta.return_value = ResourceList(
+        items=[
+            make_entity('web-1', 'web', '10', {'process': 'web'}),
+            make_entity('worker-1', 'worker', '11', {'process': 'worker'}),
+        ],
+        metadata=ResourceField({'resourceVersion': '12'}),
+    )
+    informer = ResourceInformer(reader, wl_app, index_func=lambda obj: obj.type, history_size=3)
+    informer._list()
+    return informer
+
+
+class TestResourceInformer:
+    def test_list(self, informer):
+        resources = informer.list()
+        assert [obj.name for obj in resources.items] == ['web-1', 'worker-1']
+        assert resources.get_resource_version() == '12'
+
+    def test_list_filtered(self, informer):
+        assert [obj.name for obj in informer.list(index_key='web').items] == ['web-1']
+        assert [obj.name for obj in informer.list(labels={'process': 'worker'}).items] == ['worker-1']
+        assert informer.list(index_key='web', labels={'process': 'worker'}).items == []
+
+    def test_list_returns_copies(self, informer):
+        informer.list().items[0].type = 'changed'
+        assert informer.list().items[0].type == 'web'
+
+    def test_handle_events(self, informer):
+        informer._handle_event({'type': 'ADDED', 'res_object': make_entity('web-2', 'web', '13', {})})
+        informer._handle_event({'type': 'DELETED', 'res_object': make_entity('worker-1', 'worker', '14', {})})
+
+        resources = informer.list()
+        assert [obj.name for obj in resources.items] == ['web-1', 'web-2']
+        assert resources.get_resource_version() == '14'
+        assert informer.list(index_key='worker').items == []
+
+    def test_subscribe_without_rv(self, informer):
+        subscription = Subscription()
+        informer.subscribe(subscription)
+        events = list(subscription.iter_events(timeout_seconds=0.1))
+        assert {(e['type'], e['res_object'].name) for e in events} == {('ADDED', 'web-1'), ('ADDED', 'worker-1')}
+
+    def test_subscribe_resume(self, informer):
+        informer._handle_event({'type': 'ADDED', 'res_object': make_entity('web-2', 'web', '13', {})})
+        informer._handle_event({'type': 'MODIFIED', 'res_object': make_entity('web-2', 'web', '14', {})})
+
+        subscription = Subscription()
+        informer.subscribe(subscription, resource_version=13)
+        informer._handle_event({'type': 'DELETED', 'res_object': make_entity('web-2', 'web', '15', {})})
+
+        events = list(subscription.iter_events(timeout_seconds=0.1))
+        assert [(e['type'], e['res_object'].get_resource_version()) for e in events] == [
+            ('MODIFIED', '14'),
+            ('DELETED', '15'),
+        ]
+        # The subscription should be removed after iteration finished
+        assert not informer._subscriptions
+
+    def test_subscribe_too_old_rv(self, informer):
+        for rv in range(13, 17):
+            informer._handle_event({'type': 'MODIFIED', 'res_object': make_entity('web-1', 'web', str(rv), {})})
+
+        subscription = Subscription()
+        informer.subscribe(subscription, resource_version=12)
+        events = list(subscription.iter_events(timeout_seconds=0.1))
+        assert [e['type'] for e in events] == [EVENT_TYPE_ERROR]
+
+    def test_subscription_overflow(self, informer):
+        subscription = Subscription(maxsize=1)
+        informer.subscribe(subscription)
+        events = list(subscription.iter_events(timeout_seconds=0.1))
+        assert events[-1]['type'] == EVENT_TYPE_ERROR
+
+    def test_initial_list_failed(self, wl_app):
+        reader = mock.MagicMock()
+        reader.list_by_app_with_meta.side_effect = ValueError('apiserver unavailable')
+        informer = ResourceInformer(reader, wl_app, index_func=lambda obj: obj.type)
+        informer.start()
+        try:
+            assert not informer.wait_for_synced(timeout=5)
+            assert isinstance(informer.last_error, ValueError)
+
+            # The failure is recorded, later callers should not wait for the informer any more
+            started_at = time.monotonic()
+            assert not informer.wait_for_synced(timeout=5)
+            assert time.monotonic() - started_at < 1
+        finally:
+            informer.stop()
+
+    def test_relist_failed_after_synced(self, wl_app, settings):
+        settings.PROCESS_INFORMER_SYNC_TIMEOUT = 0.1
+        reader = mock.MagicMock()
+        reader.list_by_app_with_meta.side_effect = [
+            ResourceList(items=[], metadata=ResourceField({'resourceVersion': '12'})),
+            ValueError('apiserver unavailable'),
+        ]
+        # The watch request ends at once, so the informer lists again
+        reader.watch_by_app.side_effect = WatchKubeResourceError('too old resource version')
+        informer = ResourceInformer(reader, wl_app, index_func=lambda obj: obj.type)
+        with mock.patch('paas_wl.workloads.processes.informers.informer_registry') as registry:
+            registry.get.return_value = informer
+            informer.start()
+            try:
+                for _ in range(50):
+                    if informer.last_error is not None:
+                        break
+                    time.sleep(0.1)
+                assert isinstance(informer.last_error, ValueError)
+
+                # The stale informer should not be used any more
+                assert _get_synced_informer(reader, wl_app) is None
+            finally:
+                informer.stop()
+
+
+class TestInformerRegistry:
+    def test_keyed_by_app(self):
+        registry = InformerRegistry()
+        apps = [SimpleNamespace(uuid=uuid.uuid4(), namespace='bkapp-foo-stag') for _ in range(2)]
+        with mock.patch(
+            'paas_wl.workloads.processes.informers.get_cluster_by_app', return_value=SimpleNamespace(name='default')
+        ), mock.patch.object(ResourceInformer, 'start'), mock.patch.object(ResourceInformer, 'is_alive') as is_alive:
+            is_alive.return_value = True
+            reader = mock.MagicMock()
+            informers = [registry.get(reader, app, index_func=lambda obj: obj.type) for app in apps]
+
+            # Modules sharing a namespace must not share informers
+            assert informers[0] is not informers[1]
+            assert informers[0].app is apps[0]
+            assert informers[1].app is apps[1]
+            assert registry.get(reader, apps[0], index_func=lambda obj: obj.type) is informers[0]
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+import time
+from typing import Dict, List, Optional
+from unittest import mock
+
+import pytest
+from kubernetes.dynamic.resource import ResourceInstance
+
+from paas_wl.workloads.processes.constants import PROCESS_NAME_KEY
+from paas_wl.workloads.processes.utils import iter_deployments, list_unavailable_deployment
+
+
+def make_deployment(name: str, namespace: str, available: bool = True) -> Dict:
+    return {
+        'metadata': {'name': name, 'namespace': namespace},
+        'status': {
+            'replicas': 1,
+            'updatedReplicas': 1,
+            'conditions': [{'type': 'Available', 'status': 'True' if available else 'False'}],
+        },
+    }
+
+
+def make_list(items: List[Dict], continue_token: Optional[str] = None) -> ResourceInstance:
+    metadata = {'continue': continue_token} if continue_token else {}
+    return ResourceInstance(
+        None, {'kind': 'DeploymentList', 'apiVersion': 'apps/v1', 'metadata': metadata, 'items': items}
+    )
+
+
+@pytest.fixture
+def client():
+    return mock.MagicMock()
+
+
+class TestIterDeployments:
+    def test_paginated(self, client):
+        client.get.side_effect = [
+            make_list([make_deployment('foo', 'bkapp-foo')], continue_token='token'),
+            make_list([make_deployment('bar', 'bkapp-bar')]),
+        ]
+        names = [d.metadata.name for d in iter_deployments(client, label_selector='pod_selector', page_size=1)]
+
+        assert names == ['foo', 'bar']
+        assert client.get.call_count == 2
+        assert client.get.call_args_list[0][1]['_continue'] is None
+        assert client.get.call_args_list[1][1]['_continue'] == 'token'
+        assert client.get.call_args_list[1][1]['label_selector'] == 'pod_selector'
+        assert client.get.call_args_list[1][1]['limit'] == 1
+
+    def test_deadline_exceeded(self, client):
+        client.get.return_value = make_list([make_deployment('foo', 'bkapp-foo')], continue_token='token')
+        with pytest.raises(TimeoutError):
+            list(iter_deployments(client, deadline=time.monotonic() - 1))
+
+
+class TestListUnavailableDeployment:
+    def test_normal(self, client):
+        def _get(resource, label_selector, **kwargs):
+            if label_selector == PROCESS_NAME_KEY:
+                return make_list([make_deployment('cnative', 'bkapp-cnative', available=False)])
+            return make_list(
+                [
+                    make_deployment('available', 'bkapp-foo'),
+                    make_deployment('unavailable', 'bkapp-foo', available=False),
+                    make_deployment('other', 'default', available=False),
+                ]
+            )
+
+        client.get.side_effect = _get
+        deployments = list_unavailable_deployment(client)
+        assert sorted(d.metadata.name for d in deployments) == ['cnative', 'unavailable']
+
+    def test_deduplicated(self, client):
+        client.get.return_value = make_list([make_deployment('foo', 'bkapp-foo', available=False)])
+        assert len(list_unavailable_deployment(client)) == 1
@@ -18,6 +18,7 @@ to the current version of the project delivered to anyone in the future.
 """
 import pytest
 
+from paas_wl.resources.kube_res.exceptions import WatchKubeResourceError
 from paas_wl.workloads.processes.watch import ParallelChainedGenerator
 
 pytestmark = pytest.mark.django_db
@@ -32,3 +33,26 @@ class TestParallelChainedGenerators:
         gen.start()
         results = list(gen.iter_results())
         assert len(results) == 10
+
+    def test_error(self):
+        def broken_range():
+            yield 1
+            raise WatchKubeResourceError('expired')
+
+        gen = ParallelChainedGenerator([broken_range()])
+        gen.start()
+        assert list(gen.iter_results()) == [1, {'type': 'ERROR', 'message': 'expired'}]
+
+    def test_close(self):
+        def endless():
+            while True:
+                yield 1
+
+        gen = ParallelChainedGenerator([endless()], maxsize=2)
+        gen.start()
+        results = gen.iter_results()
+        assert [next(results) for _ in range(5)] == [1] * 5
+
+        gen.close()
+        gen.tasks[0].join(timeout=5)
+        assert not gen.tasks[0].is_alive()
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+from unittest import mock
+
+import arrow
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+
+from paasng.platform.log.cache import ESIndexMetaCache
+from paasng.utils.es_log.time_range import SmartTimeRange
+
+
+@pytest.fixture(autouse=True)
+def shared_cache():
+    """Use a separated cache backend to avoid polluting other tests"""
+    shared_cache = LocMemCache('test-es-index-meta', {})
+    with mock.patch('paasng.platform.log.cache.cache', new=shared_cache):
+        yield shared_cache
+
+
+@pytest.fixture
+def time_range():
+    return SmartTimeRange(
+        time_range="customized",
+        start_time=arrow.get("2023-05-10 02:00:00+00:00").datetime,
+        end_time=arrow.get("2023-05-11 03:00:00+00:00").datetime,
+    )
+
+
+class TestESIndexMetaCache:
+    def test_get_indexes(self, time_range):
+        meta_cache = ESIndexMetaCache(ttl=60)
+        fetch = mock.Mock(return_value=["app_log-2023.05.10", "app_log-2023.05.11"])
+        for _ in range(3):
+            assert meta_cache.get_indexes("es:9200", "app_log-*", time_range, fetch) == [
+                "app_log-2023.05.10",
+                "app_log-2023.05.11",
+            ]
+        assert fetch.call_count == 1
+
+    def test_shared_between_processes(self, time_range):
+        fetch = mock.Mock(return_value=["app_log-2023.05.11"])
+        ESIndexMetaCache(ttl=60).get_indexes("es:9200", "app_log-*", time_range, fetch)
+        # A new cache object acts as another process, it should read from the shared cache
+        ESIndexMetaCache(ttl=60).get_indexes("es:9200", "app_log-*", time_range, fetch)
+        assert fetch.call_count == 1
+
+    def test_disabled(self, time_range):
+        meta_cache = ESIndexMetaCache(ttl=0)
+        fetch = mock.Mock(return_value=["app_log-2023.05.11"])
+        meta_cache.get_indexes("es:9200", "app_log-*", time_range, fetch)
+        meta_cache.get_indexes("es:9200", "app_log-*", time_range, fetch)
+        assert fetch.call_count == 2
+
+    def test_empty_not_cached(self, time_range):
+        meta_cache = ESIndexMetaCache(ttl=60)
+        fetch = mock.Mock(return_value=[])
+        meta_cache.get_indexes("es:9200", "app_log-*", time_range, fetch)
+        meta_cache.get_indexes("es:9200", "app_log-*", time_range, fetch)
+        assert fetch.call_count == 2
+
+    @pytest.mark.parametrize(
+        "indexes, refresh_expected",
+        [
+            (["app_log-2023.05.10", "app_log-2023.05.11"], False),
+            # The daily index of 2023.05.11 was created after the list was cached
+            (["app_log-2023.05.09", "app_log-2023.05.10"], True),
+            (["app_log-foo"], False),
+        ],
+    )
+    def test_refresh_when_daily_index_missing(self, time_range, indexes, refresh_expected):
+        meta_cache = ESIndexMetaCache(ttl=60, probe_interval=0)
+        fetch = mock.Mock(return_value=indexes)
+        meta_cache.get_indexes("es:9200", "app_log-*", time_range, fetch)
+        with mock.patch.object(meta_cache, "_refresh_in_background") as refresh:
+            assert meta_cache.get_indexes("es:9200", "app_log-*", time_range, fetch) == indexes
+        assert refresh.called is refresh_expected
+
+    def test_refresh_in_background(self, time_range):
+        meta_cache = ESIndexMetaCache(ttl=60, refresh_interval=0)
+        meta_cache.get_indexes("es:9200", "app_log-*", time_range, mock.Mock(return_value=["app_log-2023.05.10"]))
+        with mock.patch("paasng.platform.log.cache.threading.Thread") as thread_cls:
+            # The outdated value is returned, the new value is fetched in background
+            assert meta_cache.get_indexes(
+                "es:9200", "app_log-*", time_range, mock.Mock(return_value=["app_log-2023.05.11"])
+            ) == ["app_log-2023.05.10"]
+            thread_cls.call_args.kwargs["target"]()
+            assert meta_cache.get_indexes("es:9200", "app_log-*", time_range, mock.Mock()) == ["app_log-2023.05.11"]
+
+    def test_get_mappings(self):
+        meta_cache = ESIndexMetaCache(ttl=60)
+        fetch = mock.Mock(return_value={"json": {"type": "text"}})
+        meta_cache.get_mappings("es:9200", ["app_log-2023.05.11", "app_log-2023.05.10"], fetch)
+        meta_cache.get_mappings("es:9200", ["app_log-2023.05.10", "app_log-2023.05.11"], fetch)
+        assert fetch.call_count == 1
+        # A new index batch should not use the cached mappings
+        meta_cache.get_mappings("es:9200", ["app_log-2023.05.11"], fetch)
+        assert fetch.call_count == 2
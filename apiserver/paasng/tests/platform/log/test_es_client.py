@@ -18,8 +18,10 @@ to the current version of the project delivered to anyone in the future.
 """
 import pytest
 
-from paasng.platform.log.client import ESLogClient
+from paasng.platform.log.client import ESLogClient, iter_search_after
 from paasng.utils.es_log.models import FieldFilter
+from paasng.utils.es_log.search import SmartSearch
+from paasng.utils.es_log.time_range import SmartTimeRange
 
 
 @pytest.mark.parametrize(
@@ -50,3 +52,31 @@ from paasng.utils.es_log.models import FieldFilter
 def test_clean_property(nested_name, mapping, expected):
     # 测试 _clean_property 无需构造真正的 ESLogClient 实例
     assert ESLogClient._clean_property(nested_name, mapping) == expected
+
+
+def make_hits_data(start: int, count: int):
+    return {
+        "hits": {
+            "total": {"value": 0, "relation": "gte"},
+            "hits": [
+                {"_index": "foo", "_id": str(i), "_source": {"message": str(i)}, "sort": [i]}
+                for i in range(start, start + count)
+            ],
+        }
+    }
+
+
+def test_iter_search_after():
+    search = SmartSearch(time_field="@timestamp", time_range=SmartTimeRange(time_range="1h"))
+    pages = [make_hits_data(0, 2), make_hits_data(2, 2), make_hits_data(4, 1)]
+    requests = []
+
+    def execute(s):
+        requests.append(s.to_dict())
+        return pages[len(requests) - 1]
+
+    responses = list(iter_search_after(search, execute, batch_size=2))
+    assert [hit.message for response in responses for hit in response] == ["0", "1", "2", "3", "4"]
+    assert "search_after" not in requests[0]
+    assert [r["search_after"] for r in requests[1:]] == [[1], [3]]
+    assert all(r["size"] == 2 for r in requests)
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+import json
+
+import pytest
+
+from paasng.platform.log.constants import LogExportFormat
+from paasng.platform.log.export import LogExporter
+from paasng.platform.log.responses import StructureLogLine
+
+
+def make_lines(count: int):
+    raw = {
+        "region": None,
+        "app_code": "foo",
+        "module_name": "default",
+        "environment": "prod",
+        "process_id": "web",
+        "stream": "django",
+    }
+    return [StructureLogLine(timestamp=1683000000 + i, message=f"message {i}", raw=dict(raw)) for i in range(count)]
+
+
+class TestLogExporter:
+    def test_ndjson(self):
+        exporter = LogExporter(LogExportFormat.NDJSON, StructureLogLine, max_rows=10, max_bytes=1024 * 1024)
+        chunks = list(exporter.iter_content(make_lines(3)))
+        rows = [json.loads(line) for line in b"".join(chunks).decode().splitlines()]
+        assert [r["message"] for r in rows] == ["message 0", "message 1", "message 2"]
+        assert rows[0]["stream"] == "django"
+        assert exporter.truncated is False
+
+    def test_csv(self):
+        exporter = LogExporter(LogExportFormat.CSV, StructureLogLine, max_rows=10, max_bytes=1024 * 1024)
+        content = b"".join(exporter.iter_content(make_lines(2))).decode().splitlines()
+        assert content[0].split(",")[:2] == ["timestamp", "message"]
+        assert "raw" not in content[0]
+        assert content[1].startswith("1683000000,message 0,")
+        assert len(content) == 3
+
+    @pytest.mark.parametrize(
+        "max_rows, max_bytes, expected_rows",
+        [
+            (2, 1024 * 1024, 2),
+            (10, 1, 0),
+            (10, 1024 * 1024, 5),
+        ],
+    )
+    def test_budget(self, max_rows, max_bytes, expected_rows):
+        exporter = LogExporter(LogExportFormat.NDJSON, StructureLogLine, max_rows=max_rows, max_bytes=max_bytes)
+        rows = [json.loads(line) for line in b"".join(exporter.iter_content(make_lines(5))).decode().splitlines()]
+        assert exporter.rows == expected_rows
+        assert exporter.truncated is (expected_rows < 5)
+        if exporter.truncated:
+            # 被截断时, 最后一行是截断标记
+            assert len(rows) == expected_rows + 1
+            assert "export truncated" in rows[-1][LogExporter.marker_prefix]
+        else:
+            assert len(rows) == expected_rows
+            assert all(LogExporter.marker_prefix not in row for row in rows)
+
+    def test_csv_truncated(self):
+        exporter = LogExporter(LogExportFormat.CSV, StructureLogLine, max_rows=1, max_bytes=1024 * 1024)
+        content = b"".join(exporter.iter_content(make_lines(2))).decode().splitlines()
+        assert len(content) == 3
+        assert content[-1].startswith(f"{LogExporter.marker_prefix} export truncated after 1 rows")
+
+    def test_source_error(self):
+        def _lines():
+            yield from make_lines(1)
+            raise RuntimeError("scroll failed")
+
+        exporter = LogExporter(LogExportFormat.NDJSON, StructureLogLine, max_rows=10, max_bytes=1024 * 1024)
+        rows = [json.loads(line) for line in b"".join(exporter.iter_content(_lines())).decode().splitlines()]
+        assert len(rows) == 2
+        assert exporter.interrupted is True
+        assert "export interrupted" in rows[-1][LogExporter.marker_prefix]
@@ -25,7 +25,9 @@ from paasng.platform.log.filters import (
     EnvFilter,
     ESFilter,
     ModuleFilter,
+    agg_fields_filters,
     count_filters_options_from_agg,
+    count_filters_options_from_fields_agg,
     count_filters_options_from_logs,
 )
 from paasng.platform.log.models import ElasticSearchParams
@@ -113,6 +115,32 @@ def test_count_filters_options_from_logs_when_options_has_been_set(all_filters):
     }
 
 
+def test_agg_fields_filters(all_filters):
+    search = SmartSearch.__new__(SmartSearch)
+    search.search = Search()
+    aggs = agg_fields_filters(search, all_filters, size=5).to_dict()["aggs"]
+    assert aggs["options_0"] == {"terms": {"field": "foo.keyword", "size": 5}}
+    assert aggs["total_0"] == {"value_count": {"field": "foo.keyword"}}
+    assert aggs["options_2"] == {"terms": {"field": "b.a.z", "size": 5}}
+    assert len(aggs) == 6
+
+
+def test_count_filters_options_from_fields_agg(all_filters):
+    aggregations = {
+        "options_0": {"buckets": [{"key": "stag", "doc_count": 3}, {"key": "prod", "doc_count": 1}]},
+        "total_0": {"value": 4},
+        # 无可选值的字段会被忽略
+        "options_1": {"buckets": []},
+        "total_1": {"value": 0},
+        "options_2": {"buckets": [{"key": 1, "key_as_string": "true", "doc_count": 2}]},
+        "total_2": {"value": 2},
+    }
+    assert count_filters_options_from_fields_agg(aggregations, all_filters) == {
+        "foo": FieldFilter(name="foo", key="foo.keyword", options=[("stag", "75.00%"), ("prod", "25.00%")], total=4),
+        "b.a.z": FieldFilter(name="b.a.z", key="b.a.z", options=[("true", "100.00%")], total=2),
+    }
+
+
 # 设置 app code, module name, engine app name 以简化单测样例复杂度
 @pytest.fixture
 def bk_app(bk_app):
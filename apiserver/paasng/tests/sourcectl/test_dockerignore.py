@@ -177,3 +177,26 @@ def test_compress_with_docker_ignore():
                 "src/flag.md",
                 "src/__main__.py",
             }
+
+
+def test_compress_prune_ignored_dirs():
+    di = DockerIgnore(
+        dedent(
+            """
+        node_modules
+        **/*.pyc
+        """
+        )
+    )
+    with generate_temp_dir() as workdir, generate_temp_file(suffix=".tar.gz") as dest:
+        (workdir / "node_modules" / "foo").mkdir(parents=True)
+        (workdir / "node_modules" / "foo" / "index.js").write_text("")
+        (workdir / "src" / "b").mkdir(parents=True)
+        (workdir / "src" / "b" / "main.py").write_text("")
+        (workdir / "src" / "b" / "main.pyc").write_text("")
+        (workdir / "src" / "a.py").write_text("")
+
+        compress_directory_ext(workdir, dest, di.should_ignore, workers=2)
+        with tarfile.open(dest, mode="r:gz") as tf:
+            # Entries are sorted by name
+            assert [m.name for m in tf.getmembers()] == ["src/a.py", "src/b/main.py"]
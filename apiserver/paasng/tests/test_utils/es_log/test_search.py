@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+from elasticsearch_dsl.aggs import Terms
+
+from paasng.utils.es_log.search import SmartSearch
+from paasng.utils.es_log.time_range import SmartTimeRange
+
+
+class TestSmartSearch:
+    def test_clone(self):
+        search = SmartSearch(time_field="@timestamp", time_range=SmartTimeRange(time_range="1h"))
+        search = search.filter("term", app_code="foo").limit_offset(limit=10, offset=0)
+        expected = search.to_dict()
+
+        cloned = search.clone()
+        cloned.agg("stream", Terms(field="stream")).limit_offset(0, 0).filter("term", stream="stdout")
+
+        assert search.to_dict() == expected
+        assert cloned.time_range is search.time_range
+        assert cloned.to_dict()["size"] == 0
+        assert "stream" in cloned.to_dict()["aggs"]
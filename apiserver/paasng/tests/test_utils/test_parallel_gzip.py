@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+"""
+TencentBlueKing is pleased to support the open source community by making
+蓝鲸智云 - PaaS 平台 (BlueKing - PaaS System) available.
+Copyright (C) 2017 THL A29 Limited, a Tencent company. All rights reserved.
+Licensed under the MIT License (the "License"); you may not use this file except
+in compliance with the License. You may obtain a copy of the License at
+
+    http://opensource.org/licenses/MIT
+
+Unless required by applicable law or agreed to in writing, software distributed under
+the License is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND,
+either express or implied. See the License for the specific language governing permissions and
+limitations under the License.
+
+We undertake not to change the open source license (MIT license) applicable
+to the current version of the project delivered to anyone in the future.
+"""
+import gzip
+import io
+import os
+
+import pytest
+
+from paasng.utils.parallel_gzip import ParallelGzipWriter
+
+
+@pytest.mark.parametrize("size", [0, 10, 1024, 1024 * 64 + 1])
+@pytest.mark.parametrize("write_size", [1, 100, 4096])
+def test_parallel_gzip(size, write_size):
+    data = os.urandom(size // 2) + b"paas" * (size // 8)
+    fp = io.BytesIO()
+    with ParallelGzipWriter(fp, workers=3, block_size=1024) as gz:
+        for i in range(0, len(data), write_size):
+            gz.write(data[i : i + write_size])
+
+    assert gzip.decompress(fp.getvalue()) == data
+
+
+def test_output_is_reproducible():
+    data = b"foo bar" * 10000
+    outputs = []
+    for workers in [1, 4]:
+        fp = io.BytesIO()
+        with ParallelGzipWriter(fp, workers=workers, block_size=1024) as gz:
+            gz.write(data)
+        outputs.append(fp.getvalue())
+    assert outputs[0] == outputs[1]
@@ -16,76 +16,84 @@ limitations under the License.
 We undertake not to change the open source license (MIT license) applicable
 to the current version of the project delivered to anyone in the future.
 """
+import re
+
 import pytest
 
 from paasng.utils.patternmatcher import Pattern
 
+PATTERN_CASES = [
+    ("**", "file", True),
+    ("**", "file/", True),
+    ("**/", "file", False),
+    ("**/", "file/", True),
+    ("**", "/", True),
+    ("**/", "/", True),
+    ("**", "dir/file", True),
+    ("**/", "dir/file", False),
+    ("**", "dir/file/", True),
+    ("**/", "dir/file/", True),
+    ("**/**", "dir/file", True),
+    ("**/**", "dir/file/", True),
+    ("dir/**", "dir/file", True),
+    ("dir/**", "dir/file/", True),
+    ("dir/**", "dir/dir2/file", True),
+    ("dir/**", "dir/dir2/file/", True),
+    ("**/dir2/*", "dir/dir2/file", True),
+    ("**/dir2/*", "dir/dir2/file/", False),
+    ("**/dir2/**", "dir/dir2/dir3/file", True),
+    ("**/dir2/**", "dir/dir2/dir3/file/", True),
+    ("**file", "file", True),
+    ("**file", "dir/file", True),
+    ("**/file", "dir/file", True),
+    ("**file", "dir/dir/file", True),
+    ("**/file", "dir/dir/file", True),
+    ("**/file*", "dir/dir/file", True),
+    ("**/file*", "dir/dir/file.txt", True),
+    ("**/file*txt", "dir/dir/file.txt", True),
+    ("**/file*.txt", "dir/dir/file.txt", True),
+    ("**/file*.txt*", "dir/dir/file.txt", True),
+    ("**/**/*.txt", "dir/dir/file.txt", True),
+    ("**/**/*.txt2", "dir/dir/file.txt", False),
+    ("**/*.txt", "file.txt", True),
+    ("**/**/*.txt", "file.txt", True),
+    ("a**/*.txt", "a/file.txt", True),
+    ("a**/*.txt", "a/dir/file.txt", True),
+    ("a**/*.txt", "a/dir/dir/file.txt", True),
+    ("a/*.txt", "a/dir/file.txt", False),
+    ("a/*.txt", "a/file.txt", True),
+    ("a/*.txt**", "a/file.txt", True),
+    ("a[b-d]e", "ae", False),
+    ("a[b-d]e", "ace", True),
+    ("a[b-d]e", "aae", False),
+    ("a[^b-d]e", "aze", True),
+    (".*", ".foo", True),
+    (".*", "foo", False),
+    ("abc.def", "abcdef", False),
+    ("abc.def", "abc.def", True),
+    ("abc.def", "abcZdef", False),
+    ("abc?def", "abcZdef", True),
+    ("abc?def", "abcdef", False),
+    ("a\\*b", "a*b", True),
+    ("a\\", "a", False),
+    ("a\\", "a\\", True),
+    ("a\\\\", "a\\", True),
+    ("**/foo/bar", "foo/bar", True),
+    ("**/foo/bar", "dir/foo/bar", True),
+    ("**/foo/bar", "dir/dir2/foo/bar", True),
+    ("abc/**", "abc", False),
+    ("abc/**", "abc/def", True),
+    ("abc/**", "abc/def/ghi", True),
+]
+
 
-@pytest.mark.parametrize(
-    "pattern, path, expected",
-    [
-        ("**", "file", True),
-        ("**", "file/", True),
-        ("**/", "file", False),
-        ("**/", "file/", True),
-        ("**", "/", True),
-        ("**/", "/", True),
-        ("**", "dir/file", True),
-        ("**/", "dir/file", False),
-        ("**", "dir/file/", True),
-        ("**/", "dir/file/", True),
-        ("**/**", "dir/file", True),
-        ("**/**", "dir/file/", True),
-        ("dir/**", "dir/file", True),
-        ("dir/**", "dir/file/", True),
-        ("dir/**", "dir/dir2/file", True),
-        ("dir/**", "dir/dir2/file/", True),
-        ("**/dir2/*", "dir/dir2/file", True),
-        ("**/dir2/*", "dir/dir2/file/", False),
-        ("**/dir2/**", "dir/dir2/dir3/file", True),
-        ("**/dir2/**", "dir/dir2/dir3/file/", True),
-        ("**file", "file", True),
-        ("**file", "dir/file", True),
-        ("**/file", "dir/file", True),
-        ("**file", "dir/dir/file", True),
-        ("**/file", "dir/dir/file", True),
-        ("**/file*", "dir/dir/file", True),
-        ("**/file*", "dir/dir/file.txt", True),
-        ("**/file*txt", "dir/dir/file.txt", True),
-        ("**/file*.txt", "dir/dir/file.txt", True),
-        ("**/file*.txt*", "dir/dir/file.txt", True),
-        ("**/**/*.txt", "dir/dir/file.txt", True),
-        ("**/**/*.txt2", "dir/dir/file.txt", False),
-        ("**/*.txt", "file.txt", True),
-        ("**/**/*.txt", "file.txt", True),
-        ("a**/*.txt", "a/file.txt", True),
-        ("a**/*.txt", "a/dir/file.txt", True),
-        ("a**/*.txt", "a/dir/dir/file.txt", True),
-        ("a/*.txt", "a/dir/file.txt", False),
-        ("a/*.txt", "a/file.txt", True),
-        ("a/*.txt**", "a/file.txt", True),
-        ("a[b-d]e", "ae", False),
-        ("a[b-d]e", "ace", True),
-        ("a[b-d]e", "aae", False),
-        ("a[^b-d]e", "aze", True),
-        (".*", ".foo", True),
-        (".*", "foo", False),
-        ("abc.def", "abcdef", False),
-        ("abc.def", "abc.def", True),
-        ("abc.def", "abcZdef", False),
-        ("abc?def", "abcZdef", True),
-        ("abc?def", "abcdef", False),
-        ("a\\*b", "a*b", True),
-        ("a\\", "a", False),
-        ("a\\", "a\\", True),
-        ("a\\\\", "a\\", True),
-        ("**/foo/bar", "foo/bar", True),
-        ("**/foo/bar", "dir/foo/bar", True),
-        ("**/foo/bar", "dir/dir2/foo/bar", True),
-        ("abc/**", "abc", False),
-        ("abc/**", "abc/def", True),
-        ("abc/**", "abc/def/ghi", True),
-    ],
-)
+@pytest.mark.parametrize("pattern, path, expected", PATTERN_CASES)
 def test_pattern(pattern, path, expected):
     assert Pattern(pattern).match(path) is expected
+
+
+@pytest.mark.parametrize("pattern, path, expected", PATTERN_CASES)
+def test_pattern_regexp_str(pattern, path, expected):
+    # Combine with a never-matched pattern to make sure the regexp works in alternation
+    combined = re.compile(f"(?:{Pattern(pattern).to_regexp_str()})|(?:^never-matched$)")
+    assert bool(combined.match(path)) is expected
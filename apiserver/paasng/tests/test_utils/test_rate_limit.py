@@ -24,14 +24,19 @@ from rest_framework.response import Response
 from rest_framework.status import HTTP_200_OK, HTTP_429_TOO_MANY_REQUESTS
 
 from paasng.platform.core.storages.redisdb import get_default_redis
-from paasng.utils.rate_limit.constants import UserAction
+from paasng.utils.rate_limit.constants import RateLimitAlgorithm, UserAction
 from paasng.utils.rate_limit.fixed_window import UserActionRateLimiter as UserActionFixedWindowRateLimiter
 from paasng.utils.rate_limit.fixed_window import rate_limits_by_user
+from paasng.utils.rate_limit.sliding_window import LocalDenyCache
+from paasng.utils.rate_limit.sliding_window import UserActionRateLimiter as UserActionSlidingWindowRateLimiter
 from paasng.utils.rate_limit.token_bucket import UserActionRateLimiter as UserActionTokenBucketRateLimiter
 from tests.utils.auth import create_user
 
 
-@pytest.mark.parametrize('RateLimiter', [UserActionTokenBucketRateLimiter, UserActionFixedWindowRateLimiter])
+@pytest.mark.parametrize(
+    'RateLimiter',
+    [UserActionTokenBucketRateLimiter, UserActionFixedWindowRateLimiter, UserActionSlidingWindowRateLimiter],
+)
 def test_UserActionRateLimiter(RateLimiter):
     window_size, threshold = 3, 2
     user = create_user()
@@ -48,7 +53,8 @@ def test_UserActionRateLimiter(RateLimiter):
     assert rate_limiter.is_allowed()
 
 
-def test_rate_limits_on_view_func():
+@pytest.mark.parametrize('algorithm', [RateLimitAlgorithm.FIXED_WINDOW, RateLimitAlgorithm.SLIDING_WINDOW])
+def test_rate_limits_on_view_func(algorithm):
     window_size, threshold = 3, 2
     fake_request = HttpRequest()
     fake_request.user = create_user()
@@ -56,7 +62,7 @@ def test_rate_limits_on_view_func():
     class FakeViewSet:
         request = fake_request
 
-        @rate_limits_by_user(UserAction.WATCH_PROCESS, window_size, threshold)
+        @rate_limits_by_user(UserAction.WATCH_PROCESS, window_size, threshold, algorithm=algorithm)
         def fake_view_func(self):
             return Response("ok")
 
@@ -68,3 +74,42 @@ def test_rate_limits_on_view_func():
     assert viewset.fake_view_func().status_code == HTTP_429_TOO_MANY_REQUESTS
     time.sleep(window_size)
     assert viewset.fake_view_func().status_code == HTTP_200_OK
+
+
+def test_sliding_window_no_burst_at_boundary():
+    window_size, threshold = 2, 2
+    user = create_user()
+    rate_limiter = UserActionSlidingWindowRateLimiter(
+        get_default_redis(), user.username, UserAction.WATCH_PROCESS, window_size, threshold
+    )
+    assert rate_limiter.is_allowed()
+    time.sleep(1)
+    assert rate_limiter.is_allowed()
+    assert not rate_limiter.is_allowed()
+
+    # Only the first record has been moved out of the window
+    time.sleep(1)
+    assert rate_limiter.is_allowed()
+    assert not rate_limiter.is_allowed()
+
+
+class TestLocalDenyCache:
+    def test_deny(self):
+        cache = LocalDenyCache()
+        cache.deny('foo', 10)
+        assert cache.is_denied('foo')
+        assert not cache.is_denied('bar')
+
+    def test_expired(self):
+        cache = LocalDenyCache()
+        cache.deny('foo', -1)
+        assert not cache.is_denied('foo')
+
+    def test_max_size(self):
+        cache = LocalDenyCache(max_size=2)
+        cache.deny('foo', -1)
+        cache.deny('bar', 10)
+        cache.deny('baz', 10)
+        assert cache.is_denied('bar')
+        assert cache.is_denied('baz')
+        assert 'foo' not in cache._denied_until